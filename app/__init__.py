@@ -102,6 +102,10 @@ def create_app():
     from app.services.diagnostic_log import init_diagnostic_log
     init_diagnostic_log(app)
 
+    # Place the AI response cache next to the database
+    from app.services.gateway_cache import init_gateway_cache
+    init_gateway_cache(app)
+
     # Drain background milestone tracking notifications into flash
     @app.before_request
     def drain_milestone_notifications():
@@ -153,7 +157,13 @@ def create_app():
     app.register_blueprint(connect_export_bp)
     app.register_blueprint(backup_bp)
     app.register_blueprint(reports_bp)
-    
+
+    # Catch milestone tracker rows left stale by raw SQL writes or an earlier
+    # run; from here on each commit that changes their sources refreshes them
+    from app.services.milestone_tracker_snapshot import refresh_tracker_snapshot
+    with app.app_context():
+        refresh_tracker_snapshot()
+
     # Start MSX token refresh job (background thread)
     # This keeps the az login token fresh for CRM API calls
     from app.services.msx_auth import start_token_refresh_job
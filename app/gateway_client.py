@@ -12,14 +12,26 @@ Usage::
 
     result = gateway_call("/v1/suggest-topics", {"call_notes": "..."})
     # result == {"success": True, "topics": [...], "usage": {...}}
+
+Responses from deterministic endpoints are served from a local cache when
+the same request was made recently (see ``app.services.gateway_cache``);
+pass ``refresh=True`` to force a new completion.
+
+``gateway_stream`` is the streaming variant for ``/v1/chat`` and
+``/v1/connect-summary``: it yields token deltas as the gateway relays them.
+All requests share one keep-alive connection pool.
 """
+import json
 import logging
 import os
-from typing import Any
+from typing import Any, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
 from azure.identity import DefaultAzureCredential, AzureCliCredential
 
+from app.services import gateway_cache
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -48,6 +60,13 @@ _GATEWAY_RESOURCE = "https://management.azure.com"
 # Microsoft corporate tenant — must match the APIM JWT policy
 _REQUIRED_TENANT_ID = "72f988bf-86f1-41af-91ab-2d7cd011db47"
 
+# Keep-alive connection pool shared by every gateway call. Sized for the
+# parallel Connect summary chunks plus a chat and a background job or two.
+_POOL_SIZE = 8
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=_POOL_SIZE))
+_session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=_POOL_SIZE))
+
 # Cached credential + token
 _credential = None
 _cached_token: str | None = None
@@ -143,70 +162,54 @@ def _verify_tenant(token: str) -> None:
         )
 
 
-def gateway_call(
-    endpoint: str,
-    payload: dict[str, Any],
-    timeout: int = 120,
-) -> dict[str, Any]:
-    """Call a gateway endpoint through APIM.
-
-    Args:
-        endpoint: Path like ``/v1/suggest-topics``.
-        payload: JSON body to POST.
-        timeout: HTTP timeout in seconds (AI calls can be slow).
-
-    Returns:
-        Parsed JSON response dict from the gateway.
+def _post(url: str, payload: dict[str, Any], timeout: int,
+          stream: bool = False, no_cache: bool = False) -> requests.Response:
+    """POST through the pooled session, retrying once on a stale token.
 
-    Raises:
-        GatewayError: On HTTP errors or connection failures.
+    ``no_cache`` asks the gateway to skip its response cache as well.
     """
-    url = f"{_GATEWAY_URL}{endpoint}"
-    token = _get_token()
-
-    try:
-        resp = requests.post(
-            url,
-            json=payload,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            timeout=timeout,
-        )
-    except requests.RequestException as exc:
-        raise GatewayError(f"Gateway request failed: {exc}") from exc
+    headers = {"Content-Type": "application/json"}
+    if stream:
+        headers["Accept"] = "text/event-stream"
+    if no_cache:
+        headers["Cache-Control"] = "no-cache"
 
-    if resp.status_code == 401:
-        # Token may have expired between cache check and request — retry once
-        global _cached_token
-        _cached_token = None
-        token = _get_token()
+    def send(token: str) -> requests.Response:
         try:
-            resp = requests.post(
+            return _session.post(
                 url,
                 json=payload,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                },
+                headers={**headers, "Authorization": f"Bearer {token}"},
                 timeout=timeout,
+                stream=stream,
             )
         except requests.RequestException as exc:
             raise GatewayError(f"Gateway request failed: {exc}") from exc
 
+    resp = send(_get_token())
+    if resp.status_code == 401:
+        # Token may have expired between cache check and request — retry once
+        global _cached_token
+        _cached_token = None
+        resp.close()
+        resp = send(_get_token())
+    return resp
+
+
+def _log_and_raise_for_status(endpoint: str, payload: dict[str, Any],
+                              resp: requests.Response) -> None:
+    """Write the diagnostic log entry and raise GatewayError on HTTP errors."""
     if resp.status_code == 429:
         raise GatewayError("Rate limit exceeded — try again later", status_code=429)
 
     # Diagnostic log: capture gateway call details
     try:
         from app.services.diagnostic_log import diag_log
-        import json as _dj
         diag_log('gateway',
                  endpoint=endpoint,
-                 req_body=_dj.dumps(payload, default=str)[:5000],
+                 req_body=json.dumps(payload, default=str)[:5000],
                  status=resp.status_code,
-                 resp_body=resp.text[:5000] if resp.text else None)
+                 resp_body=None if _is_event_stream(resp) else (resp.text[:5000] if resp.text else None))
     except Exception:
         pass
 
@@ -218,7 +221,111 @@ def gateway_call(
             msg = resp.text[:200]
         raise GatewayError(f"Gateway returned {resp.status_code}: {msg}", status_code=resp.status_code)
 
-    return resp.json()
+
+def _is_event_stream(resp: requests.Response) -> bool:
+    """True if the gateway answered with server-sent events."""
+    return resp.headers.get("Content-Type", "").startswith("text/event-stream")
+
+
+def gateway_call(
+    endpoint: str,
+    payload: dict[str, Any],
+    timeout: int = 120,
+    refresh: bool = False,
+) -> dict[str, Any]:
+    """Call a gateway endpoint through APIM.
+
+    Args:
+        endpoint: Path like ``/v1/suggest-topics``.
+        payload: JSON body to POST.
+        timeout: HTTP timeout in seconds (AI calls can be slow).
+        refresh: Skip the local and gateway response caches ("regenerate");
+            the fresh response still replaces the cached ones.
+
+    Returns:
+        Parsed JSON response dict from the gateway. Responses from the local
+        cache also carry ``cache_hit=True`` and ``tokens_saved``; ones the
+        gateway answered from its cache carry ``cached=True`` and
+        ``tokens_saved`` with zeroed ``usage``.
+
+    Raises:
+        GatewayError: On HTTP errors or connection failures.
+    """
+    if not refresh:
+        cached = gateway_cache.lookup(endpoint, payload, _GATEWAY_URL)
+        if cached is not None:
+            try:
+                from app.services.diagnostic_log import diag_log
+                diag_log('gateway', endpoint=endpoint, cache='hit',
+                         tokens_saved=cached.get('tokens_saved'))
+            except Exception:
+                pass
+            return cached
+
+    url = f"{_GATEWAY_URL}{endpoint}"
+    resp = _post(url, payload, timeout, no_cache=refresh)
+
+    _log_and_raise_for_status(endpoint, payload, resp)
+
+    result = resp.json()
+    gateway_cache.store(endpoint, payload, _GATEWAY_URL, result)
+    return result
+
+
+def gateway_stream(
+    endpoint: str,
+    payload: dict[str, Any],
+    timeout: int = 180,
+) -> Iterator[dict[str, Any]]:
+    """Call a streaming gateway endpoint, yielding output as it arrives.
+
+    Supported by ``/v1/chat`` and ``/v1/connect-summary``. Streamed
+    responses are never cached.
+
+    Args:
+        endpoint: Path like ``/v1/chat``.
+        payload: JSON body to POST (``stream: true`` is added).
+        timeout: Connect/read timeout in seconds (between events).
+
+    Yields:
+        ``{"type": "delta", "text": str}`` for each token fragment, then one
+        ``{"type": "done", ...}`` carrying the body ``gateway_call`` would
+        have returned. A gateway without streaming support produces just
+        the ``done`` event.
+
+    Raises:
+        GatewayError: On HTTP errors, connection failures, or an error
+            event from the gateway.
+    """
+    url = f"{_GATEWAY_URL}{endpoint}"
+    resp = _post(url, {**payload, "stream": True}, timeout, stream=True)
+    try:
+        _log_and_raise_for_status(endpoint, payload, resp)
+        if not _is_event_stream(resp):
+            yield {"type": "done", **resp.json()}
+            return
+
+        resp.encoding = "utf-8"
+        event = "message"
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+                continue
+            if not line.startswith("data:"):
+                continue
+            data = json.loads(line[len("data:"):].strip())
+            if event == "delta":
+                yield {"type": "delta", "text": data.get("text", "")}
+            elif event == "error":
+                raise GatewayError(f"Gateway stream failed: {data.get('error', 'unknown error')}")
+            elif event == "done":
+                yield {"type": "done", **data}
+                return
+        raise GatewayError("Gateway stream ended without a final response")
+    except (requests.RequestException, ValueError) as exc:
+        raise GatewayError(f"Gateway stream failed: {exc}") from exc
+    finally:
+        resp.close()
 
 
 class GatewayError(Exception):
@@ -196,6 +196,8 @@ def run_migrations(db):
         _add_column_if_not_exists(db, inspector, 'milestones', 'completed_at', 'DATETIME')
         _add_column_if_not_exists(db, inspector, 'milestones', 'msx_created_on', 'DATETIME')
         _add_column_if_not_exists(db, inspector, 'milestones', 'msx_modified_on', 'DATETIME')
+        _add_column_if_not_exists(db, inspector, 'milestones', 'cached_comments_hash', 'VARCHAR(64)')
+        _add_column_if_not_exists(db, inspector, 'milestones', 'comments_modified_on', 'DATETIME')
 
     # Migration: Add heartbeat_at column to sync_status (detect actively running syncs)
     if _table_exists(inspector, 'sync_status'):
@@ -264,6 +266,8 @@ def run_migrations(db):
                               'milestone_sync_minute', "INTEGER")
     _add_column_if_not_exists(db, inspector, 'user_preferences',
                               'last_milestone_sync', "DATETIME")
+    _add_column_if_not_exists(db, inspector, 'user_preferences',
+                              'milestone_sync_priority', "TEXT")
 
     # Migration: Add title column to partner_contacts
     _add_column_if_not_exists(db, inspector, 'partner_contacts', 'title', 'VARCHAR(200)')
@@ -305,6 +309,35 @@ def run_migrations(db):
     # sync (import_stream in msx.py), not seeded here. Users should run an
     # account sync after upgrading to populate DAEs as internal contacts.
 
+    # Note: milestone_tracker_rows table is created by db.create_all() and
+    # populated lazily by refresh_tracker_snapshot() - no migration needed
+
+    # Migration: Add AI response cache tracking to ai_query_log
+    _add_column_if_not_exists(db, inspector, 'ai_query_log',
+                              'cache_hit', "BOOLEAN DEFAULT 0 NOT NULL")
+    _add_column_if_not_exists(db, inspector, 'ai_query_log', 'tokens_saved', 'INTEGER')
+
+    # Migration: Track chat tool-result shaping savings separately from cache hits
+    _add_column_if_not_exists(db, inspector, 'ai_query_log', 'tool_tokens_saved', 'INTEGER')
+
+    # Note: connect_summary_partials table is created by db.create_all() -
+    # no migration needed
+
+    # Migration: Record the analyzed month window on revenue analysis runs
+    _add_column_if_not_exists(db, inspector, 'revenue_analysis_runs', 'month_window', 'TEXT')
+
+    # Migration: Track customer updates (versions the cached favicon URL)
+    _add_column_if_not_exists(db, inspector, 'customers', 'updated_at', 'DATETIME')
+    with db.engine.connect() as conn:
+        conn.execute(text(
+            "UPDATE customers SET updated_at = created_at WHERE updated_at IS NULL"
+        ))
+        conn.commit()
+
+    # Migration: Store the plain text of note content for exports
+    _add_column_if_not_exists(db, inspector, 'notes', 'content_text', 'TEXT')
+    _backfill_note_content_text(db)
+
     # =========================================================================
     # End migrations
     # =========================================================================
@@ -1459,3 +1492,25 @@ def _migrate_estimated_acr_to_int(db, inspector):
 
         if converted:
             print(f"  Converted {converted} estimated_acr values to integer")
+
+
+def _backfill_note_content_text(db):
+    """Fill notes.content_text for notes written before the column existed.
+
+    New writes keep it current through the Note flush listener. Idempotent:
+    only rows with a NULL content_text are touched.
+    """
+    from app.models import note_plain_text
+
+    with db.engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT id, content FROM notes WHERE content_text IS NULL"
+        )).fetchall()
+        if not rows:
+            return
+        conn.execute(
+            text("UPDATE notes SET content_text = :text WHERE id = :id"),
+            [{'id': row[0], 'text': note_plain_text(row[1])} for row in rows],
+        )
+        conn.commit()
+    print(f"  Backfilled plain text for {len(rows)} notes")
@@ -2,9 +2,12 @@
 Database models for Sales Buddy application.
 All SQLAlchemy models and association tables.
 """
+import hashlib
+import re
 from datetime import datetime, timezone, date
 from typing import Optional
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
 
 # This will be initialized by the app factory
 db = SQLAlchemy()
@@ -15,6 +18,18 @@ def utc_now():
     return datetime.now(timezone.utc)
 
 
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def note_plain_text(html_text: Optional[str]) -> str:
+    """Remove HTML tags and blank lines from note content."""
+    if not html_text:
+        return ''
+    text = _TAG_RE.sub('', html_text)
+    lines = [line.strip() for line in text.splitlines()]
+    return '\n'.join(line for line in lines if line)
+
+
 def get_single_user():
     """Get the single default user for single-user mode."""
     return User.query.first()
@@ -413,6 +428,7 @@ class Customer(db.Model):
     dae_alias = db.Column(db.String(100), nullable=True)  # DAE email alias (part before @microsoft.com)
     csam_id = db.Column(db.Integer, db.ForeignKey('customer_csams.id'), nullable=True)  # User-selected primary CSAM
     created_at = db.Column(db.DateTime, default=utc_now, nullable=False)
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now, nullable=True)  # Versions the cached favicon URL
 
     # Relationships
     seller = db.relationship('Seller', back_populates='customers')
@@ -592,6 +608,9 @@ class Note(db.Model):
     # DateTime for full timestamp - date portion for display, time for meeting imports
     call_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now())
     content = db.Column(db.Text, nullable=False)
+    # Plain text of content, kept in step by _sync_note_content_text so
+    # exports can skip loading and stripping the HTML
+    content_text = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=utc_now, nullable=False)
     updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now, nullable=False)
     
@@ -652,6 +671,15 @@ class Note(db.Model):
         return f'<Note {self.id} for {name}>'
 
 
+@event.listens_for(Note, 'before_insert')
+@event.listens_for(Note, 'before_update')
+def _sync_note_content_text(mapper, connection, target):
+    """Re-derive Note.content_text when a flush writes new content."""
+    state = inspect(target)
+    if state.pending or state.attrs.content.history.has_changes():
+        target.content_text = note_plain_text(target.content)
+
+
 class InternalContact(db.Model):
     """Microsoft internal contact not tracked as a Seller or Solution Engineer.
 
@@ -1055,6 +1083,8 @@ class Milestone(db.Model):
     owner_name = db.Column(db.String(200), nullable=True)  # Milestone owner display name from MSX
     on_my_team = db.Column(db.Boolean, default=False, nullable=False, server_default='0')  # Am I on the milestone access team?
     cached_comments_json = db.Column(db.Text, nullable=True)  # MSX forecast comments cached as JSON
+    cached_comments_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of cached_comments_json
+    comments_modified_on = db.Column(db.DateTime, nullable=True)  # msx_modified_on when comments were last read
     details_fetched_at = db.Column(db.DateTime, nullable=True)  # When MSX details were last fetched
     committed_at = db.Column(db.DateTime, nullable=True)  # When commitment changed to Committed (detected by sync)
     completed_at = db.Column(db.DateTime, nullable=True)  # When status changed to Completed (detected by sync)
@@ -1125,10 +1155,100 @@ class Milestone(db.Model):
         else:
             return 'future'
     
+    @property
+    def comments_stale(self) -> bool:
+        """Return True if MSX may hold newer comments than the local cache.
+
+        Comments live on the milestone record, so any comment edit bumps
+        modifiedon. If modifiedon hasn't advanced past the value recorded
+        when comments were cached, a re-fetch would return the same set.
+        """
+        if self.cached_comments_json is None:
+            return True
+        if self.msx_modified_on is None or self.comments_modified_on is None:
+            return True
+        return self.msx_modified_on > self.comments_modified_on
+
+    def set_cached_comments(self, comments_json: str,
+                            modified_on: Optional[datetime] = None) -> bool:
+        """Cache MSX forecast comments, skipping the write when unchanged.
+
+        Args:
+            comments_json: Serialized comments array.
+            modified_on: The milestone's MSX modifiedon the comments were
+                read at (defaults to the current msx_modified_on).
+
+        Returns:
+            True if the cached comment content changed.
+        """
+        content_hash = hashlib.sha256(comments_json.encode('utf-8')).hexdigest()
+        modified_on = modified_on or self.msx_modified_on
+        if modified_on and self.comments_modified_on != modified_on:
+            self.comments_modified_on = modified_on
+        if (content_hash == self.cached_comments_hash
+                and self.cached_comments_json is not None):
+            return False
+        self.cached_comments_json = comments_json
+        self.cached_comments_hash = content_hash
+        return True
+
     def __repr__(self) -> str:
         return f'<Milestone {self.id}: {self.title or self.milestone_number or self.url[:50]}>'
 
 
+class MilestoneTrackerRow(db.Model):
+    """Denormalized milestone tracker row, one per milestone.
+
+    Precomputes the joins and derived fields the tracker needs (customer,
+    seller, territory, fiscal quarter, workload area) so the tracker page
+    and /api/milestone-tracker can filter, sort and paginate in SQL.
+    Rebuilt incrementally by app.services.milestone_tracker_snapshot.
+    """
+    __tablename__ = 'milestone_tracker_rows'
+
+    id = db.Column(db.Integer, primary_key=True)
+    milestone_id = db.Column(db.Integer, db.ForeignKey('milestones.id'), nullable=False, unique=True)
+
+    # Milestone fields
+    title = db.Column(db.String(500), nullable=True)
+    milestone_number = db.Column(db.String(50), nullable=True)
+    status = db.Column(db.String(50), nullable=True, index=True)
+    status_sort = db.Column(db.Integer, nullable=False, default=99)
+    opportunity_name = db.Column(db.String(500), nullable=True)
+    workload = db.Column(db.String(200), nullable=True)
+    workload_area = db.Column(db.String(200), nullable=True, index=True)
+    monthly_usage = db.Column(db.Float, nullable=True)
+    dollar_value = db.Column(db.Float, nullable=True)
+    due_date = db.Column(db.DateTime, nullable=True, index=True)
+    fiscal_quarter = db.Column(db.String(10), nullable=True, index=True)  # e.g. "FY26 Q3"
+    fiscal_year = db.Column(db.String(10), nullable=True)  # e.g. "FY26"
+    url = db.Column(db.String(2000), nullable=True)
+    msx_milestone_id = db.Column(db.String(50), nullable=True)
+    last_synced_at = db.Column(db.DateTime, nullable=True)
+    on_my_team = db.Column(db.Boolean, default=False, nullable=False)
+    customer_commitment = db.Column(db.String(50), nullable=True)
+
+    # Related records (flattened)
+    customer_id = db.Column(db.Integer, nullable=True, index=True)
+    customer_name = db.Column(db.String(200), nullable=True)
+    customer_tpid_url = db.Column(db.String(500), nullable=True)
+    favicon_version = db.Column(db.Integer, nullable=True)  # Customer.updated_at in ms; NULL = no favicon
+    seller_id = db.Column(db.Integer, nullable=True, index=True)
+    seller_name = db.Column(db.String(200), nullable=True)
+    territory_id = db.Column(db.Integer, nullable=True)
+    territory_name = db.Column(db.String(200), nullable=True)
+    opportunity_id = db.Column(db.Integer, nullable=True)
+    opportunity_ref_name = db.Column(db.String(500), nullable=True)
+
+    # Staleness tracking
+    milestone_updated_at = db.Column(db.DateTime, nullable=True)  # Milestone.updated_at at build time
+    context_signature = db.Column(db.Text, nullable=True)  # Customer/seller/territory/opp fingerprint
+    refreshed_at = db.Column(db.DateTime, default=utc_now, nullable=False)
+
+    def __repr__(self) -> str:
+        return f'<MilestoneTrackerRow milestone={self.milestone_id}>'
+
+
 class MsxTask(db.Model):
     """Task created in MSX linked to a milestone and note."""
     __tablename__ = 'msx_tasks'
@@ -1281,6 +1401,7 @@ class UserPreference(db.Model):
     milestone_sync_hour = db.Column(db.Integer, nullable=True)  # Random hour (5-8) for daily milestone sync
     milestone_sync_minute = db.Column(db.Integer, nullable=True)  # Random minute (0-59) for sync time
     last_milestone_sync = db.Column(db.DateTime, nullable=True)  # Last time milestone sync ran (UTC)
+    milestone_sync_priority = db.Column(db.Text, nullable=True)  # JSON dict of sync priority weight overrides (null = defaults)
     compensated_buckets = db.Column(db.Text, nullable=True)  # JSON array of selected ServiceCompGrouping buckets (fallback for localStorage)
     revenue_import_reminder = db.Column(db.Boolean, default=True, nullable=False, server_default='1')
     created_at = db.Column(db.DateTime, default=utc_now, nullable=False)
@@ -1335,6 +1456,13 @@ class AIQueryLog(db.Model):
     completion_tokens = db.Column(db.Integer, nullable=True)
     total_tokens = db.Column(db.Integer, nullable=True)
     
+    # Response cache tracking (tokens the original, uncached call used)
+    cache_hit = db.Column(db.Boolean, default=False, nullable=False)
+    tokens_saved = db.Column(db.Integer, nullable=True)
+    
+    # Chat prompt tokens saved by fitting tool results into their budgets
+    tool_tokens_saved = db.Column(db.Integer, nullable=True)
+    
     def __repr__(self) -> str:
         status = 'success' if self.success else 'failed'
         return f'<AIQueryLog {status} at {self.timestamp}>'
@@ -1492,6 +1620,69 @@ class ProductRevenueData(db.Model):
         return f'<ProductRevenueData {self.customer_name} {self.bucket}/{self.product} {self.fiscal_month}: ${self.revenue:,.0f}>'
 
 
+class RevenueBucketRollup(db.Model):
+    """Per customer/bucket revenue totals, rebuilt from CustomerRevenueData.
+
+    Materialized after each import by app.services.revenue_rollups so the
+    whitespace reports don't re-aggregate the raw monthly rows per request.
+    The trailing window is the latest month and the two before it.
+    """
+    __tablename__ = 'revenue_bucket_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    customer_name = db.Column(db.String(500), nullable=False, index=True)
+    bucket = db.Column(db.String(50), nullable=False, index=True)
+    customer_id = db.Column(db.Integer, nullable=True, index=True)
+    total_revenue = db.Column(db.Float, nullable=False, default=0.0)
+    trailing_revenue = db.Column(db.Float, nullable=False, default=0.0)  # Sum over trailing window
+    trailing_months = db.Column(db.Integer, nullable=False, default=0)  # Data points in window
+    has_spend = db.Column(db.Boolean, nullable=False, default=False)  # Any month > $0
+    
+    def __repr__(self) -> str:
+        return f'<RevenueBucketRollup {self.customer_name} {self.bucket}>'
+
+
+class RevenueProductRollup(db.Model):
+    """Per customer/bucket/product revenue totals, rebuilt from ProductRevenueData.
+
+    Carries the first month with spend and the latest month's revenue so
+    product usage and "new users" reports read one small row per product.
+    """
+    __tablename__ = 'revenue_product_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    customer_name = db.Column(db.String(500), nullable=False, index=True)
+    bucket = db.Column(db.String(50), nullable=False)
+    product = db.Column(db.String(200), nullable=False, index=True)
+    customer_id = db.Column(db.Integer, nullable=True, index=True)
+    total_revenue = db.Column(db.Float, nullable=False, default=0.0)
+    latest_month = db.Column(db.Date, nullable=True)  # Latest month with a data point
+    latest_month_revenue = db.Column(db.Float, nullable=False, default=0.0)  # In the newest month overall
+    first_usage_month = db.Column(db.Date, nullable=True)  # First month > $0
+    has_spend = db.Column(db.Boolean, nullable=False, default=False)
+    
+    def __repr__(self) -> str:
+        return f'<RevenueProductRollup {self.customer_name} {self.bucket}/{self.product}>'
+
+
+class RevenueSellerProductRollup(db.Model):
+    """Per seller/product usage: customer/bucket pairs with spend and their revenue.
+
+    Seller assignment comes from RevenueAnalysis, so this is rebuilt after
+    each analysis run as well as after imports.
+    """
+    __tablename__ = 'revenue_seller_product_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    seller_name = db.Column(db.String(200), nullable=False, index=True)
+    product = db.Column(db.String(200), nullable=False)
+    customer_count = db.Column(db.Integer, nullable=False, default=0)
+    total_revenue = db.Column(db.Float, nullable=False, default=0.0)
+    
+    def __repr__(self) -> str:
+        return f'<RevenueSellerProductRollup {self.seller_name} {self.product}>'
+
+
 class RevenueAnalysis(db.Model):
     """Computed analysis for a customer/bucket - regenerated on demand or after import.
     
@@ -1596,6 +1787,30 @@ class RevenueConfig(db.Model):
         return f'<RevenueConfig id={self.id}>'
 
 
+class RevenueAnalysisRun(db.Model):
+    """One completed revenue analysis pass.
+
+    Records what the pass covered so the next one can re-analyze only the
+    series written by newer imports, plus those with data in a month that
+    entered or left the window. A different config means the stored
+    results are stale and the next pass must be full.
+    """
+    __tablename__ = 'revenue_analysis_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    completed_at = db.Column(db.DateTime, default=utc_now, nullable=False)
+    incremental = db.Column(db.Boolean, default=False, nullable=False)
+    config_fingerprint = db.Column(db.String(64), nullable=False)  # AnalysisConfig thresholds
+    months_fingerprint = db.Column(db.String(64), nullable=False)  # Analyzed month window
+    month_window = db.Column(db.Text, nullable=True)  # Comma-separated ISO month dates analyzed
+    through_import_id = db.Column(db.Integer, nullable=True)  # Newest RevenueImport covered
+    series_analyzed = db.Column(db.Integer, default=0)  # Customer/bucket series processed
+    
+    def __repr__(self) -> str:
+        mode = 'incremental' if self.incremental else 'full'
+        return f'<RevenueAnalysisRun {mode} through import {self.through_import_id}>'
+
+
 class RevenueEngagement(db.Model):
     """Tracks follow-up on a specific revenue recommendation.
     
@@ -1797,6 +2012,28 @@ class ConnectExport(db.Model):
         return f'<ConnectExport {self.name} ({self.start_date} to {self.end_date})>'
 
 
+class ConnectSummaryPartial(db.Model):
+    """Cached evidence summary of one customer for Connect AI summaries.
+
+    ``unit_key`` hashes the customer's text block and the partial prompt
+    version, so a regeneration reuses the partial while that customer is
+    unchanged and re-summarizes only the changed customers before the
+    synthesis step.
+    """
+    __tablename__ = 'connect_summary_partials'
+
+    id = db.Column(db.Integer, primary_key=True)
+    unit_key = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    label = db.Column(db.String(300), nullable=False)
+    summary = db.Column(db.Text, nullable=False)
+    total_tokens = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=utc_now, nullable=False)
+    last_used_at = db.Column(db.DateTime, default=utc_now, nullable=False)
+
+    def __repr__(self) -> str:
+        return f'<ConnectSummaryPartial {self.label} {self.unit_key[:8]}>'
+
+
 # =============================================================================
 # Usage Telemetry
 # =============================================================================
@@ -19,10 +19,14 @@ from flask import Blueprint, current_app, render_template, request, redirect, ur
 from app.models import (
     db, User, POD, Territory, Seller, Customer, Topic, Note, AIQueryLog,
     RevenueImport, CustomerRevenueData, ProductRevenueData, RevenueAnalysis,
-    RevenueConfig, RevenueEngagement, Milestone, Opportunity, MsxTask,
+    RevenueAnalysisRun, RevenueConfig, RevenueEngagement, RevenueBucketRollup,
+    RevenueProductRollup, RevenueSellerProductRollup, Milestone, Opportunity, MsxTask,
     SolutionEngineer, SyncStatus, UserPreference, UsageEvent, DailyFeatureStats,
     notes_milestones, utc_now
 )
+from app.services.revenue_cache import clear_revenue_view_caches, revenue_cache_stats
+from app.services.revenue_store import clear_revenue_store
+from app.services.gateway_cache import get_stats as get_gateway_cache_stats
 
 # Create blueprint
 admin_bp = Blueprint('admin', __name__)
@@ -79,7 +83,8 @@ def admin_panel():
         if started.year == now.year and started.month >= 7:
             fy_season = False
 
-    return render_template('admin_panel.html', stats=stats, fy_season=fy_season)
+    return render_template('admin_panel.html', stats=stats, fy_season=fy_season,
+                           revenue_cache_stats=revenue_cache_stats())
 
 
 @admin_bp.route('/admin/ai-logs')
@@ -88,7 +93,20 @@ def admin_ai_logs():
     # Get recent logs (last 50)
     logs = AIQueryLog.query.order_by(AIQueryLog.timestamp.desc()).limit(50).all()
     
-    return render_template('admin_ai_logs.html', logs=logs)
+    # Response cache totals across the whole log
+    cache_hits, tokens_saved = db.session.query(
+        db.func.count(AIQueryLog.id), db.func.sum(AIQueryLog.tokens_saved)
+    ).filter(AIQueryLog.cache_hit.is_(True)).one()
+    
+    # Chat prompt tokens saved by tool-result budgets
+    tool_tokens_saved = db.session.query(
+        db.func.sum(AIQueryLog.tool_tokens_saved)
+    ).scalar()
+    
+    return render_template('admin_ai_logs.html', logs=logs,
+                           cache_hits=cache_hits, tokens_saved=tokens_saved or 0,
+                           tool_tokens_saved=tool_tokens_saved or 0,
+                           cache_stats=get_gateway_cache_stats())
 
 
 @admin_bp.route('/api/admin/clear-revenue', methods=['POST'])
@@ -98,14 +116,23 @@ def api_clear_revenue_data():
         deleted = {}
         deleted['engagements'] = RevenueEngagement.query.delete()
         deleted['analyses'] = RevenueAnalysis.query.delete()
+        deleted['analysis_runs'] = RevenueAnalysisRun.query.delete()
         deleted['product_records'] = ProductRevenueData.query.delete()
         deleted['bucket_records'] = CustomerRevenueData.query.delete()
         deleted['imports'] = RevenueImport.query.delete()
         deleted['configs'] = RevenueConfig.query.delete()
+        deleted['rollups'] = (
+            RevenueBucketRollup.query.delete()
+            + RevenueProductRollup.query.delete()
+            + RevenueSellerProductRollup.query.delete()
+        )
         # Reset sync statuses so wizard/UI returns to clean state
         SyncStatus.reset('revenue_import')
         SyncStatus.reset('revenue_analysis')
+        SyncStatus.reset('revenue_rollups')
         db.session.commit()
+        clear_revenue_view_caches()
+        clear_revenue_store()
         total = sum(deleted.values())
         return jsonify({
             'success': True,
@@ -9,13 +9,22 @@ No direct Azure OpenAI credentials are needed locally.
 AI is always enabled for any user signed in with a Microsoft
 corporate account.
 """
-from flask import Blueprint, request, jsonify, g, current_app
+from flask import Blueprint, Response, request, jsonify, g, current_app, stream_with_context
 import json
 import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from app.models import db, AIQueryLog, Topic
-from app.gateway_client import gateway_call, GatewayError
-from app.services.salesiq_tools import get_openai_tools, execute_tool
+from app.gateway_client import gateway_call, gateway_stream, GatewayError
+from app.services.gateway_cache import log_fields as cache_log_fields
+from app.services.candidate_ranking import prepare_candidates, record_case
+from app.services.chat_tool_cache import tool_results
+from app.services.diagnostic_log import (
+    diag_log, get_correlation_id, is_suppressed, set_correlation_id, set_suppressed,
+)
+from app.services.salesiq_tools import get_openai_tools, execute_tool, shape_tool_result
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +47,7 @@ def api_ai_suggest_topics():
         result = gateway_call("/v1/suggest-topics", {
             "call_notes": call_notes,
             "existing_topics": existing_topics,
-        })
+        }, refresh=bool(data.get('regenerate')))
         suggested_topics = result.get("topics", [])
         usage = result.get("usage", {})
 
@@ -50,6 +59,7 @@ def api_ai_suggest_topics():
             prompt_tokens=usage.get("prompt_tokens"),
             completion_tokens=usage.get("completion_tokens"),
             total_tokens=usage.get("total_tokens"),
+            **cache_log_fields(result),
         )
         db.session.add(log_entry)
 
@@ -100,15 +110,21 @@ def api_ai_match_milestone():
     if not milestones or len(milestones) == 0:
         return jsonify({'success': False, 'error': 'No milestones provided'}), 400
 
+    # Only the best lexical matches go to the model (see candidate_ranking)
+    candidates = prepare_candidates("/v1/match-milestone", call_notes, milestones)
+
     try:
         result = gateway_call("/v1/match-milestone", {
             "call_notes": call_notes,
-            "milestones": milestones,
-        })
+            "milestones": candidates,
+        }, refresh=bool(data.get('regenerate')))
+        record_case("/v1/match-milestone", call_notes, candidates, result)
         log_entry = AIQueryLog(
-            request_text=f"Match milestone: {call_notes[:500]}...",
+            request_text=f"Match milestone (top {len(candidates)} of {len(milestones)}): "
+                         f"{call_notes[:500]}...",
             response_text=json.dumps(result)[:500],
             success=True,
+            **cache_log_fields(result),
         )
         db.session.add(log_entry)
         db.session.commit()
@@ -155,15 +171,21 @@ def api_ai_match_opportunity():
     if not opportunities or len(opportunities) == 0:
         return jsonify({'success': False, 'error': 'No opportunities provided'}), 400
 
+    # Only the best lexical matches go to the model (see candidate_ranking)
+    candidates = prepare_candidates("/v1/match-opportunity", call_notes, opportunities)
+
     try:
         result = gateway_call("/v1/match-opportunity", {
             "call_notes": call_notes,
-            "opportunities": opportunities,
-        })
+            "opportunities": candidates,
+        }, refresh=bool(data.get('regenerate')))
+        record_case("/v1/match-opportunity", call_notes, candidates, result)
         log_entry = AIQueryLog(
-            request_text=f"Match opportunity: {call_notes[:500]}...",
+            request_text=f"Match opportunity (top {len(candidates)} of {len(opportunities)}): "
+                         f"{call_notes[:500]}...",
             response_text=json.dumps(result)[:500],
             success=True,
+            **cache_log_fields(result),
         )
         db.session.add(log_entry)
         db.session.commit()
@@ -215,7 +237,8 @@ def api_ai_analyze_call():
         return jsonify({'success': False, 'error': 'Call notes are too short to analyze'}), 400
 
     try:
-        result = gateway_call("/v1/analyze-call", {"call_notes": call_notes})
+        result = gateway_call("/v1/analyze-call", {"call_notes": call_notes},
+                              refresh=bool(data.get('regenerate')))
         topics = result.get("topics", [])
         usage = result.get("usage", {})
 
@@ -227,6 +250,7 @@ def api_ai_analyze_call():
             prompt_tokens=usage.get("prompt_tokens"),
             completion_tokens=usage.get("completion_tokens"),
             total_tokens=usage.get("total_tokens"),
+            **cache_log_fields(result),
         )
         db.session.add(log_entry)
 
@@ -740,6 +764,9 @@ def api_ai_recommend_partners():
 # ---------------------------------------------------------------------------
 MAX_TOOL_ROUNDS = 3
 
+# Tool calls from one round run in parallel, each in its own app context
+MAX_TOOL_WORKERS = 4
+
 
 @ai_bp.route('/api/ai/chat', methods=['POST'])
 def api_ai_chat():
@@ -757,10 +784,17 @@ def api_ai_chat():
         message (str): The user's message (max 2000 chars).
         history (list): Previous messages [{role, content}, ...].
         context (dict): Page context with required ``page`` field.
+        conversation_id (str, optional): Client-generated ID; tool results
+            are memoized per conversation for a short TTL.
 
     Returns:
         reply (str): The assistant's final text response.
         tools_used (list): Names of tools that were called.
+        tokens_saved (int): Estimated prompt tokens saved by fitting tool
+            results into their budgets (see ``shape_tool_result``).
+
+    With ``Accept: text/event-stream`` the reply is streamed instead (see
+    ``_chat_event_stream``).
     """
     if not current_app.debug:
         return jsonify({'error': 'Not found'}), 404
@@ -804,9 +838,27 @@ def api_ai_chat():
 
     # Build messages array for the gateway
     messages = list(history) + [{"role": "user", "content": message}]
-
     tools = get_openai_tools()
+
+    # Tool results are memoized per conversation; without an ID they are
+    # only shared between rounds of this request.
+    conversation_id = str(data.get('conversation_id') or '')[:64] or uuid.uuid4().hex
+
+    # Streaming path: relay token deltas as server-sent events
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        return Response(
+            stream_with_context(_chat_event_stream(
+                message, messages, tools, context, conversation_id,
+            )),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no',
+            },
+        )
+
     tools_used = []
+    tokens_saved = 0
     total_usage = {
         "prompt_tokens": 0,
         "completion_tokens": 0,
@@ -843,84 +895,245 @@ def api_ai_chat():
             else:
                 # Execute tool calls locally
                 messages.append(assistant_msg)
-
-                for tc in tool_calls:
-                    func = tc.get("function", {})
-                    tool_name = func.get("name", "")
-                    try:
-                        tool_args = json.loads(func.get("arguments", "{}"))
-                    except json.JSONDecodeError:
-                        tool_args = {}
-
-                    tools_used.append(tool_name)
-
-                    try:
-                        tool_result = execute_tool(tool_name, tool_args)
-                        tool_content = json.dumps(
-                            tool_result, default=str
-                        )[:8000]
-                    except Exception as tool_exc:
-                        logger.warning(
-                            f"Tool {tool_name} failed: {tool_exc}"
-                        )
-                        tool_content = json.dumps({
-                            "error": f"Tool failed: {tool_exc}"
-                        })
-
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tc.get("id", ""),
-                        "content": tool_content,
-                    })
+                tokens_saved += _execute_tool_calls(tool_calls, messages, tools_used, conversation_id)
         else:
             # Exhausted all rounds without a final response
-            reply = assistant_msg.get("content", "") or (
-                "I needed too many steps to answer that. "
-                "Could you try a more specific question?"
-            )
+            reply = assistant_msg.get("content", "") or _TOO_MANY_STEPS
 
-        # Log the interaction
-        log_entry = AIQueryLog(
-            request_text=message[:1000],
-            response_text=(reply or "")[:1000],
-            success=True,
-            model=model,
-            prompt_tokens=total_usage.get("prompt_tokens"),
-            completion_tokens=total_usage.get("completion_tokens"),
-            total_tokens=total_usage.get("total_tokens"),
-        )
-        db.session.add(log_entry)
-        db.session.commit()
+        _log_chat(message, reply, model, total_usage, tokens_saved)
 
         return jsonify({
             'success': True,
             'reply': reply,
             'tools_used': tools_used,
             'usage': total_usage,
+            'tokens_saved': tokens_saved,
         })
 
     except GatewayError as e:
-        log_entry = AIQueryLog(
-            request_text=message[:1000],
-            response_text='',
-            success=False,
-            error_message=str(e)[:500],
-        )
-        db.session.add(log_entry)
-        db.session.commit()
-        logger.error(f"Chat gateway error: {e}")
+        _log_chat_error(message, e)
 
-        # Detect Azure OpenAI content filter (jailbreak / prompt injection)
-        err_str = str(e).lower()
-        if 'content_filter' in err_str or 'content_management_policy' in err_str:
-            return jsonify({
-                'success': True,
-                'reply': '<img src="/static/hal9000.svg" alt="HAL 9000" '
-                         'style="width:24px;height:24px;vertical-align:middle;margin-right:6px;">'
-                         "I'm sorry Dave, I'm afraid I can't do that.",
-                'tools_used': [],
-            })
+        filtered = _content_filter_reply(e)
+        if filtered:
+            return jsonify(filtered)
 
         status = getattr(e, 'status_code', None) or 502
         return jsonify({'success': False, 'error': str(e)}), status
 
+
+_TOO_MANY_STEPS = (
+    "I needed too many steps to answer that. "
+    "Could you try a more specific question?"
+)
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _chat_event_stream(message: str, messages: list, tools: list, context: dict,
+                       conversation_id: str):
+    """Run the chat tool loop over gateway_stream, yielding SSE events.
+
+    Events: ``delta`` ({text}) for each token of the assistant's reply,
+    ``tool`` ({name}) when a tool runs (the client should discard text
+    streamed so far in that round), then ``done`` with the same body as
+    the JSON response, or ``error``.
+    """
+    tools_used = []
+    tokens_saved = 0
+    total_usage = {
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+    }
+    model = "gateway"
+
+    try:
+        for _round in range(MAX_TOOL_ROUNDS + 1):
+            result = {}
+            for event in gateway_stream("/v1/chat", {
+                "messages": messages,
+                "tools": tools,
+                "context": context,
+            }):
+                if event["type"] == "delta":
+                    yield _sse('delta', {'text': event["text"]})
+                else:
+                    result = event
+
+            if not result.get("success"):
+                yield _sse('error', {
+                    'success': False,
+                    'error': result.get('error', 'Gateway error'),
+                })
+                return
+
+            usage = result.get("usage", {})
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                total_usage[key] += usage.get(key, 0)
+            model = usage.get("model", "gateway")
+
+            assistant_msg = result.get("message", {})
+            tool_calls = assistant_msg.get("tool_calls")
+
+            if not tool_calls:
+                reply = assistant_msg.get("content", "")
+                break
+
+            messages.append(assistant_msg)
+            for tc in tool_calls:
+                yield _sse('tool', {'name': tc.get("function", {}).get("name", "")})
+            tokens_saved += _execute_tool_calls(tool_calls, messages, tools_used, conversation_id)
+        else:
+            reply = assistant_msg.get("content", "") or _TOO_MANY_STEPS
+
+        _log_chat(message, reply, model, total_usage, tokens_saved)
+        yield _sse('done', {
+            'success': True,
+            'reply': reply,
+            'tools_used': tools_used,
+            'usage': total_usage,
+            'tokens_saved': tokens_saved,
+        })
+
+    except GatewayError as e:
+        _log_chat_error(message, e)
+        filtered = _content_filter_reply(e)
+        if filtered:
+            yield _sse('done', filtered)
+        else:
+            yield _sse('error', {'success': False, 'error': str(e)})
+
+
+def _execute_tool_calls(tool_calls: list, messages: list, tools_used: list,
+                        conversation_id: str) -> int:
+    """Run the model's tool calls locally and append their results to messages.
+
+    Calls run concurrently (they are read-only queries) and results are
+    appended in the order the model asked for them, as the API requires.
+
+    Returns:
+        Estimated prompt tokens saved by shaping the results.
+    """
+    calls = []
+    for tc in tool_calls:
+        func = tc.get("function", {})
+        tool_name = func.get("name", "")
+        try:
+            tool_args = json.loads(func.get("arguments", "{}"))
+        except json.JSONDecodeError:
+            tool_args = {}
+        tools_used.append(tool_name)
+        calls.append((tool_name, tool_args))
+
+    app = current_app._get_current_object()
+    cid = get_correlation_id()
+    suppressed = is_suppressed()
+
+    if len(calls) == 1:
+        results = [_run_tool(*calls[0], conversation_id)]
+    else:
+        def run_in_context(call):
+            set_correlation_id(cid)
+            set_suppressed(suppressed)
+            with app.app_context():
+                return _run_tool(*call, conversation_id)
+
+        with ThreadPoolExecutor(max_workers=min(len(calls), MAX_TOOL_WORKERS)) as executor:
+            results = list(executor.map(run_in_context, calls))
+
+    for tc, (tool_content, _saved) in zip(tool_calls, results):
+        messages.append({
+            "role": "tool",
+            "tool_call_id": tc.get("id", ""),
+            "content": tool_content,
+        })
+    return sum(saved for _content, saved in results)
+
+
+def _run_tool(tool_name: str, tool_args: dict, conversation_id: str) -> tuple[str, int]:
+    """Execute one tool (or reuse this conversation's memoized result).
+
+    Returns the JSON tool message content, shaped to the tool's token
+    budget, and the tokens that saved. Failures are returned as an error
+    object for the model rather than raised.
+    """
+    start = time.perf_counter()
+    memo = tool_results.get(conversation_id, tool_name, tool_args)
+    cached = memo is not None
+    ok = True
+    if cached:
+        tool_content, saved = memo
+    else:
+        saved = 0
+        try:
+            params = dict(tool_args)
+            cursor = params.pop('cursor', None)
+            tool_result = execute_tool(tool_name, params)
+            shaped, saved = shape_tool_result(tool_name, tool_result, cursor)
+            tool_content = json.dumps(shaped, default=str)
+            tool_results.put(conversation_id, tool_name, tool_args, (tool_content, saved))
+        except Exception as tool_exc:
+            ok = False
+            logger.warning(
+                f"Tool {tool_name} failed: {tool_exc}"
+            )
+            tool_content = json.dumps({
+                "error": f"Tool failed: {tool_exc}"
+            })
+
+    diag_log('chat_tool',
+             tool=tool_name,
+             conversation=conversation_id,
+             cached=cached,
+             success=ok,
+             tokens_saved=saved,
+             duration_ms=round((time.perf_counter() - start) * 1000, 1))
+    return tool_content, saved
+
+
+def _log_chat(message: str, reply: str, model: str, usage: dict,
+              tokens_saved: int = 0) -> None:
+    """Log a completed chat interaction."""
+    log_entry = AIQueryLog(
+        request_text=message[:1000],
+        response_text=(reply or "")[:1000],
+        success=True,
+        model=model,
+        prompt_tokens=usage.get("prompt_tokens"),
+        completion_tokens=usage.get("completion_tokens"),
+        total_tokens=usage.get("total_tokens"),
+        tool_tokens_saved=tokens_saved or None,
+    )
+    db.session.add(log_entry)
+    db.session.commit()
+
+
+def _log_chat_error(message: str, error: GatewayError) -> None:
+    """Log a failed chat interaction."""
+    log_entry = AIQueryLog(
+        request_text=message[:1000],
+        response_text='',
+        success=False,
+        error_message=str(error)[:500],
+    )
+    db.session.add(log_entry)
+    db.session.commit()
+    logger.error(f"Chat gateway error: {error}")
+
+
+def _content_filter_reply(error: GatewayError) -> dict | None:
+    """Canned reply when Azure OpenAI's content filter blocked the request."""
+    # Detect Azure OpenAI content filter (jailbreak / prompt injection)
+    err_str = str(error).lower()
+    if 'content_filter' in err_str or 'content_management_policy' in err_str:
+        return {
+            'success': True,
+            'reply': '<img src="/static/hal9000.svg" alt="HAL 9000" '
+                     'style="width:24px;height:24px;vertical-align:middle;margin-right:6px;">'
+                     "I'm sorry Dave, I'm afraid I can't do that.",
+            'tools_used': [],
+        }
+    return None
@@ -8,21 +8,22 @@ a configurable date range, with milestone revenue impact per customer.
 V2 adds AI-assisted summary generation using Azure OpenAI to produce
 polished Connect narratives from raw note data.
 """
+import hashlib
 import json
-import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Iterator
 
 from flask import (
     Blueprint, Response, current_app, g, jsonify, redirect, render_template,
-    request, url_for, flash,
+    request, stream_with_context, url_for, flash,
 )
 
 from app.models import (
-    Note, ConnectExport, Customer, Milestone, db,
+    Note, ConnectExport, ConnectSummaryPartial, Customer, Milestone, db,
+    note_plain_text, utc_now,
 )
-from app.gateway_client import gateway_call, GatewayError
+from app.gateway_client import gateway_call, gateway_stream, GatewayError
 
 connect_export_bp = Blueprint('connect_export', __name__)
 
@@ -39,10 +40,36 @@ CHARS_PER_TOKEN = 4
 MAX_INPUT_TOKENS = 100_000
 
 # When chunking by customer, each chunk targets this many tokens so we stay
-# well under the per-call limit while leaving room for the summary header that
-# rides along with every chunk.
+# well under the per-call limit while leaving room for the header that rides
+# along with every chunk.
 CHUNK_TARGET_TOKENS = 80_000
 
+# Large exports are summarized per customer ("partials") and then combined.
+# Customers are packed into chunk calls that return each customer's evidence
+# separately, and each partial is cached under its customer's key (a hash of
+# the customer's text block and this version) and reused while that customer
+# is unchanged: bump the version when the gateway's chunk prompt changes so
+# cached partials are recomputed.
+PARTIAL_PROMPT_VERSION = 1
+
+# Stats header sent with each partial. Period totals only go to the
+# synthesis step, so a partial depends on nothing but its own customer.
+PARTIAL_HEADER = "Evidence for a single customer; period totals are added when partials are combined."
+
+# Partials not reused for this long are dropped
+PARTIAL_RETENTION_DAYS = 365
+
+# Cached partials are looked up in batches so IN (...) lists stay under
+# SQLite's variable limit
+PARTIAL_LOOKUP_BATCH = 500
+
+# Matches the gateway's connect lane (GATEWAY_CONNECT_WORKERS); more parallel
+# calls would only queue there and risk its busy timeout.
+MAX_PARTIAL_WORKERS = 2
+
+# Sent with a reduction call that condenses several partials into one
+REDUCE_HEADER = "Combined evidence summaries for several customers; condense them without losing concrete examples."
+
 # System prompts for Connect AI (GPT-5.3-chat with evidence scaffolding).
 # These are reference copies — the gateway (infra/gateway/prompts.py) holds
 # the authoritative versions used at runtime.
@@ -83,30 +110,22 @@ CONNECT_SYNTHESIS_SYSTEM_PROMPT = (
     "- If evidence is weak or missing, say so.\n"
 )
 
-# HTML tag stripper for plain-text output
-_TAG_RE = re.compile(r'<[^>]+>')
-
-
-def _strip_html(html_text: str) -> str:
-    """Remove HTML tags and collapse whitespace for plain-text output."""
-    if not html_text:
-        return ''
-    text = _TAG_RE.sub('', html_text)
-    # Collapse multiple newlines/spaces
-    lines = [line.strip() for line in text.splitlines()]
-    return '\n'.join(line for line in lines if line)
-
-
-def _build_export_data(start_date: date, end_date: date) -> dict[str, Any]:
+def _build_export_data(
+    start_date: date, end_date: date, include_html: bool = False,
+) -> dict[str, Any]:
     """
     Query all notes in the date range and build structured export data.
 
+    Notes carry their stored plain text (``content_text``). The HTML
+    ``content`` is only loaded and included when ``include_html`` is set,
+    which the JSON download does.
+
     Returns a dict with:
         - summary: aggregate counts and topic/customer breakdowns
         - customers: per-customer detail with notes, topics, milestone revenue
     """
     from sqlalchemy import func
-    from sqlalchemy.orm import joinedload
+    from sqlalchemy.orm import defer, joinedload, selectinload
 
     # Convert dates to datetime range for query (inclusive of end_date)
     start_dt = datetime.combine(start_date, datetime.min.time())
@@ -122,13 +141,26 @@ def _build_export_data(start_date: date, end_date: date) -> dict[str, Any]:
         .options(
             joinedload(Note.customer).joinedload(Customer.seller),
             joinedload(Note.customer).joinedload(Customer.territory),
-            joinedload(Note.topics),
-            joinedload(Note.milestones),
+            # Separate IN query so note content isn't repeated per topic row
+            selectinload(Note.topics),
+            *([] if include_html else [defer(Note.content)]),
         )
         .order_by(Note.call_date.asc())
         .all()
     )
 
+    def note_entry(cl: Note, topics_list: list[str]) -> dict[str, Any]:
+        entry = {
+            'id': cl.id,
+            'date': cl.call_date.strftime('%Y-%m-%d'),
+            'content_text': (cl.content_text if cl.content_text is not None
+                             else note_plain_text(cl.content)),
+            'topics': topics_list,
+        }
+        if include_html:
+            entry['content'] = cl.content
+        return entry
+
     # Group by customer
     customers_map: dict[int, dict] = {}
     topic_counts: dict[str, dict] = {}  # topic_name -> {count, customers set}
@@ -139,13 +171,7 @@ def _build_export_data(start_date: date, end_date: date) -> dict[str, Any]:
         if not cust:
             # General note (not customer-associated)
             topics_list = [t.name for t in cl.topics]
-            general_notes.append({
-                'id': cl.id,
-                'date': cl.call_date.strftime('%Y-%m-%d'),
-                'content': cl.content,
-                'content_text': _strip_html(cl.content),
-                'topics': topics_list,
-            })
+            general_notes.append(note_entry(cl, topics_list))
             # Still track topics from general notes
             for topic_name in topics_list:
                 if topic_name not in topic_counts:
@@ -170,13 +196,7 @@ def _build_export_data(start_date: date, end_date: date) -> dict[str, Any]:
 
         # Add note
         topics_list = [t.name for t in cl.topics]
-        customers_map[cust_id]['notes'].append({
-            'id': cl.id,
-            'date': cl.call_date.strftime('%Y-%m-%d'),
-            'content': cl.content,
-            'content_text': _strip_html(cl.content),
-            'topics': topics_list,
-        })
+        customers_map[cust_id]['notes'].append(note_entry(cl, topics_list))
         customers_map[cust_id]['topics'].update(topics_list)
 
         # Track topic counts
@@ -186,22 +206,28 @@ def _build_export_data(start_date: date, end_date: date) -> dict[str, Any]:
             topic_counts[topic_name]['count'] += 1
             topic_counts[topic_name]['customers'].add(cust.get_display_name())
 
-    # Get milestone revenue per customer (completed milestones where user is on team)
-    for cust_id, cust_data in customers_map.items():
-        completed_milestones = (
-            Milestone.query
+    # Milestone revenue per customer (completed milestones where user is on
+    # team, updated in the period) in one grouped query
+    if customers_map:
+        revenue_rows = (
+            db.session.query(
+                Milestone.customer_id,
+                func.coalesce(func.sum(Milestone.dollar_value), 0),
+                func.count(Milestone.id),
+            )
             .filter(
-                Milestone.customer_id == cust_id,
+                Milestone.customer_id.in_(list(customers_map)),
                 Milestone.on_my_team == True,
                 Milestone.msx_status == 'Completed',
+                Milestone.updated_at >= start_dt,
+                Milestone.updated_at <= end_dt,
             )
+            .group_by(Milestone.customer_id)
             .all()
         )
-        # Filter to milestones that were updated in the period
-        for ms in completed_milestones:
-            if ms.updated_at and start_dt <= ms.updated_at <= end_dt:
-                cust_data['milestone_revenue'] += ms.dollar_value or 0
-                cust_data['milestone_count'] += 1
+        for cust_id, revenue, count in revenue_rows:
+            customers_map[cust_id]['milestone_revenue'] = float(revenue)
+            customers_map[cust_id]['milestone_count'] = count
 
     # Convert sets to sorted lists for serialization
     for cust_data in customers_map.values():
@@ -264,22 +290,21 @@ def _format_currency(amount: float) -> str:
         return f"${amount:,.0f}"
 
 
-def _build_text_export(data: dict, name: str) -> str:
-    """Build a copy-pastable plain-text export from structured data."""
+def _iter_text_export(data: dict, name: str) -> Iterator[str]:
+    """Yield the plain-text export line by line (without newlines)."""
     summary = data['summary']
     customers = data['customers']
 
-    lines = []
-    lines.append(f"{'=' * 60}")
-    lines.append(f"{name}")
-    lines.append(f"Period: {summary['start_date']} to {summary['end_date']}")
-    lines.append(f"{'=' * 60}")
-    lines.append("")
-    lines.append(f"{summary['total_notes']} notes across "
-                 f"{summary['unique_customers']} customers")
+    yield f"{'=' * 60}"
+    yield f"{name}"
+    yield f"Period: {summary['start_date']} to {summary['end_date']}"
+    yield f"{'=' * 60}"
+    yield ""
+    yield (f"{summary['total_notes']} notes across "
+           f"{summary['unique_customers']} customers")
 
     if summary['total_milestone_revenue'] > 0:
-        lines.append(
+        yield (
             f"Influenced {_format_currency(summary['total_milestone_revenue'])} "
             f"of committed milestone revenue "
             f"({summary['total_milestone_count']} milestones)"
@@ -287,63 +312,66 @@ def _build_text_export(data: dict, name: str) -> str:
 
     # Topic summary
     if summary['topics']:
-        lines.append("")
-        lines.append(f"--- Topics ({summary['unique_topics']}) ---")
+        yield ""
+        yield f"--- Topics ({summary['unique_topics']}) ---"
         for topic in summary['topics']:
             customer_names = ', '.join(topic['customers'][:5])
             suffix = f", +{len(topic['customers']) - 5} more" if len(topic['customers']) > 5 else ""
-            lines.append(
+            yield (
                 f"  {topic['name']} ({topic['call_count']} calls, "
                 f"{topic['customer_count']} customers): {customer_names}{suffix}"
             )
 
     # Per-customer detail
-    lines.append("")
-    lines.append(f"{'=' * 60}")
-    lines.append("CUSTOMER DETAIL")
-    lines.append(f"{'=' * 60}")
+    yield ""
+    yield f"{'=' * 60}"
+    yield "CUSTOMER DETAIL"
+    yield f"{'=' * 60}"
 
     for cust in customers:
-        lines.append("")
-        lines.append(f"--- {cust['name']} ({len(cust['notes'])} notes) ---")
+        yield ""
+        yield f"--- {cust['name']} ({len(cust['notes'])} notes) ---"
         if cust['seller']:
-            lines.append(f"Seller: {cust['seller']}")
+            yield f"Seller: {cust['seller']}"
         if cust['territory']:
-            lines.append(f"Territory: {cust['territory']}")
+            yield f"Territory: {cust['territory']}"
         if cust['topics']:
-            lines.append(f"Topics: {', '.join(cust['topics'])}")
+            yield f"Topics: {', '.join(cust['topics'])}"
         if cust['milestone_revenue'] > 0:
-            lines.append(
+            yield (
                 f"Influenced {_format_currency(cust['milestone_revenue'])} "
                 f"of committed milestone revenue "
                 f"({cust['milestone_count']} milestones)"
             )
-        lines.append("")
+        yield ""
 
         for cl in cust['notes']:
             topic_str = f" [{', '.join(cl['topics'])}]" if cl['topics'] else ""
-            lines.append(f"  [{cl['date']}]{topic_str}")
+            yield f"  [{cl['date']}]{topic_str}"
             # Indent note content
             for content_line in cl['content_text'].splitlines():
-                lines.append(f"    {content_line}")
-            lines.append("")
+                yield f"    {content_line}"
+            yield ""
 
     # General notes (not associated with a customer)
     general_notes = data.get('general_notes', [])
     if general_notes:
-        lines.append("")
-        lines.append(f"{'=' * 60}")
-        lines.append(f"GENERAL NOTES ({len(general_notes)})")
-        lines.append(f"{'=' * 60}")
-        lines.append("")
+        yield ""
+        yield f"{'=' * 60}"
+        yield f"GENERAL NOTES ({len(general_notes)})"
+        yield f"{'=' * 60}"
+        yield ""
         for cl in general_notes:
             topic_str = f" [{', '.join(cl['topics'])}]" if cl['topics'] else ""
-            lines.append(f"  [{cl['date']}]{topic_str}")
+            yield f"  [{cl['date']}]{topic_str}"
             for content_line in cl['content_text'].splitlines():
-                lines.append(f"    {content_line}")
-            lines.append("")
+                yield f"    {content_line}"
+            yield ""
 
-    return '\n'.join(lines)
+
+def _build_text_export(data: dict, name: str) -> str:
+    """Build a copy-pastable plain-text export from structured data."""
+    return '\n'.join(_iter_text_export(data, name))
 
 
 def _build_json_export(data: dict, name: str) -> dict:
@@ -360,20 +388,54 @@ def _build_json_export(data: dict, name: str) -> dict:
     return result
 
 
-def _build_markdown_export(data: dict, name: str) -> str:
-    """Build a Markdown-formatted export from structured data."""
+def _json_value(value: Any, depth: int) -> str:
+    """Encode ``value`` as indented JSON nested ``depth`` levels deep."""
+    # Newlines inside strings are escaped, so every raw newline is layout
+    return json.dumps(value, indent=2).replace('\n', '\n' + '  ' * depth)
+
+
+def _iter_json_array(records: list, depth: int) -> Iterator[str]:
+    """Yield an indented JSON array one encoded record at a time."""
+    if not records:
+        yield '[]'
+        return
+    pad = '  ' * (depth + 1)
+    yield '['
+    for i, record in enumerate(records):
+        yield (',\n' if i else '\n') + pad + _json_value(record, depth + 1)
+    yield '\n' + '  ' * depth + ']'
+
+
+def _iter_json_export(data: dict, name: str) -> Iterator[str]:
+    """Yield the JSON export of ``_build_json_export`` record by record.
+
+    The output matches ``json.dumps(..., indent=2)``, but each customer and
+    general note is encoded only when it is sent.
+    """
+    export = _build_json_export(data, name)
+    yield '{'
+    for i, (key, value) in enumerate(export.items()):
+        yield (',\n  ' if i else '\n  ') + json.dumps(key) + ': '
+        if isinstance(value, list):
+            yield from _iter_json_array(value, 1)
+        else:
+            yield _json_value(value, 1)
+    yield '\n}'
+
+
+def _iter_markdown_export(data: dict, name: str) -> Iterator[str]:
+    """Yield the Markdown export line by line (without newlines)."""
     summary = data['summary']
     customers = data['customers']
 
-    lines = []
-    lines.append(f"# {name}")
-    lines.append(f"**Period:** {summary['start_date']} to {summary['end_date']}")
-    lines.append("")
-    lines.append(f"{summary['total_notes']} notes across "
-                 f"{summary['unique_customers']} customers")
+    yield f"# {name}"
+    yield f"**Period:** {summary['start_date']} to {summary['end_date']}"
+    yield ""
+    yield (f"{summary['total_notes']} notes across "
+           f"{summary['unique_customers']} customers")
 
     if summary['total_milestone_revenue'] > 0:
-        lines.append(
+        yield (
             f"Influenced **{_format_currency(summary['total_milestone_revenue'])}** "
             f"of committed milestone revenue "
             f"({summary['total_milestone_count']} milestones)"
@@ -381,27 +443,27 @@ def _build_markdown_export(data: dict, name: str) -> str:
 
     # Topic summary
     if summary['topics']:
-        lines.append("")
-        lines.append(f"## Topics ({summary['unique_topics']})")
-        lines.append("")
+        yield ""
+        yield f"## Topics ({summary['unique_topics']})"
+        yield ""
         for topic in summary['topics']:
             customer_names = ', '.join(topic['customers'][:5])
             suffix = f", +{len(topic['customers']) - 5} more" if len(topic['customers']) > 5 else ""
-            lines.append(
+            yield (
                 f"- **{topic['name']}** ({topic['call_count']} calls, "
                 f"{topic['customer_count']} customers): {customer_names}{suffix}"
             )
 
     # Per-customer detail
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append("## Customer Detail")
+    yield ""
+    yield "---"
+    yield ""
+    yield "## Customer Detail"
 
     for cust in customers:
-        lines.append("")
-        lines.append(f"### {cust['name']} ({len(cust['notes'])} notes)")
-        lines.append("")
+        yield ""
+        yield f"### {cust['name']} ({len(cust['notes'])} notes)"
+        yield ""
         meta_parts = []
         if cust['seller']:
             meta_parts.append(f"**Seller:** {cust['seller']}")
@@ -410,39 +472,42 @@ def _build_markdown_export(data: dict, name: str) -> str:
         if cust['topics']:
             meta_parts.append(f"**Topics:** {', '.join(cust['topics'])}")
         if meta_parts:
-            lines.append(' | '.join(meta_parts))
-            lines.append("")
+            yield ' | '.join(meta_parts)
+            yield ""
         if cust['milestone_revenue'] > 0:
-            lines.append(
+            yield (
                 f"Influenced **{_format_currency(cust['milestone_revenue'])}** "
                 f"of committed milestone revenue "
                 f"({cust['milestone_count']} milestones)"
             )
-            lines.append("")
+            yield ""
 
         for cl in cust['notes']:
             topic_str = f" *[{', '.join(cl['topics'])}]*" if cl['topics'] else ""
-            lines.append(f"**{cl['date']}**{topic_str}")
-            lines.append("")
-            lines.append(cl['content_text'])
-            lines.append("")
+            yield f"**{cl['date']}**{topic_str}"
+            yield ""
+            yield cl['content_text']
+            yield ""
 
     # General notes (not associated with a customer)
     general_notes = data.get('general_notes', [])
     if general_notes:
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        lines.append(f"## General Notes ({len(general_notes)})")
-        lines.append("")
+        yield ""
+        yield "---"
+        yield ""
+        yield f"## General Notes ({len(general_notes)})"
+        yield ""
         for cl in general_notes:
             topic_str = f" *[{', '.join(cl['topics'])}]*" if cl['topics'] else ""
-            lines.append(f"**{cl['date']}**{topic_str}")
-            lines.append("")
-            lines.append(cl['content_text'])
-            lines.append("")
+            yield f"**{cl['date']}**{topic_str}"
+            yield ""
+            yield cl['content_text']
+            yield ""
 
-    return '\n'.join(lines)
+
+def _build_markdown_export(data: dict, name: str) -> str:
+    """Build a Markdown-formatted export from structured data."""
+    return '\n'.join(_iter_markdown_export(data, name))
 
 
 # ---------------------------------------------------------------------------
@@ -455,7 +520,7 @@ def _estimate_tokens(text: str) -> int:
 
 
 def _build_summary_header(data: dict) -> str:
-    """Build a compact stats header to include in every AI prompt chunk."""
+    """Build a compact stats header for the synthesis prompt."""
     summary = data['summary']
     lines = [
         f"Period: {summary['start_date']} to {summary['end_date']}",
@@ -517,39 +582,53 @@ def _build_general_notes_text_block(general_notes: list[dict]) -> str:
     return '\n'.join(lines)
 
 
-def _chunk_customers(data: dict, max_tokens: int = CHUNK_TARGET_TOKENS) -> list[list[dict]]:
-    """
-    Split customer list into chunks that each fit within *max_tokens*.
+def _partial_units(data: dict) -> list[tuple[str, str]]:
+    """(label, text block) per customer, then general notes."""
+    units = [(cust['name'], _build_customer_text_block(cust)) for cust in data['customers']]
+    general_notes = data.get('general_notes', [])
+    if general_notes:
+        units.append(('General Notes', _build_general_notes_text_block(general_notes)))
+    return units
+
 
-    The summary header rides along with every chunk, so its cost is
-    subtracted from the budget up front.
+def _partial_key(text_block: str) -> str:
+    """Cache key for one unit: its text block plus the prompt version."""
+    raw = f"v{PARTIAL_PROMPT_VERSION}\0{text_block}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
 
-    Returns a list of customer-lists (each list is one chunk).
+
+def _pack_blocks(blocks: list[str], max_tokens: int) -> list[list[int]]:
     """
-    header = _build_summary_header(data)
-    header_tokens = _estimate_tokens(header)
-    budget = max_tokens - header_tokens - 500  # 500 token buffer
+    Greedily pack text blocks, in order, into groups of at most *max_tokens*.
 
-    chunks: list[list[dict]] = []
-    current_chunk: list[dict] = []
+    A block larger than the budget gets a group of its own. Returns lists
+    of block indexes.
+    """
+    groups: list[list[int]] = []
+    current: list[int] = []
     current_tokens = 0
+    for i, block in enumerate(blocks):
+        tokens = _estimate_tokens(block)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
 
-    for cust in data['customers']:
-        cust_text = _build_customer_text_block(cust)
-        cust_tokens = _estimate_tokens(cust_text)
 
-        if current_chunk and current_tokens + cust_tokens > budget:
-            chunks.append(current_chunk)
-            current_chunk = [cust]
-            current_tokens = cust_tokens
-        else:
-            current_chunk.append(cust)
-            current_tokens += cust_tokens
+def _chunk_budget(header: str) -> int:
+    """Tokens of notes per chunk call, after the header that rides along."""
+    return CHUNK_TARGET_TOKENS - _estimate_tokens(header) - 500  # 500 token buffer
 
-    if current_chunk:
-        chunks.append(current_chunk)
 
-    return chunks
+def _group_label(labels: list[str]) -> str:
+    label = ', '.join(labels[:5])
+    if len(labels) > 5:
+        label += f' (+{len(labels) - 5} more)'
+    return label
 
 
 def _generate_ai_summary_single(data: dict, text_export: str) -> tuple[str, dict]:
@@ -561,16 +640,50 @@ def _generate_ai_summary_single(data: dict, text_export: str) -> tuple[str, dict
     return result.get("summary", ""), result.get("usage", {})
 
 
-def _generate_ai_summary_chunked(data: dict, text_export: str) -> tuple[str, dict]:
+def _plan_partials(data: dict) -> dict:
+    """Find cached partials still valid for this export and chunk the rest.
+
+    A customer's cached partial is reused while its text block is
+    unchanged. Only the customers without one are packed into
+    token-budgeted chunks, one gateway call each.
+
+    Returns a plan dict with ``units`` ([(label, text)]), ``keys`` (one per
+    unit), ``reused`` ([(unit index, ConnectSummaryPartial)]) and
+    ``chunks`` (lists of unit indexes that need a gateway call).
     """
-    Generate an AI summary by splitting customers into chunks, processing
-    them in parallel, and running a final synthesis call.
+    units = _partial_units(data)
+    keys = [_partial_key(text) for _, text in units]
+
+    cached: dict[str, ConnectSummaryPartial] = {}
+    for start in range(0, len(keys), PARTIAL_LOOKUP_BATCH):
+        for partial in ConnectSummaryPartial.query.filter(
+            ConnectSummaryPartial.unit_key.in_(keys[start:start + PARTIAL_LOOKUP_BATCH])
+        ):
+            cached[partial.unit_key] = partial
+
+    reused = [(i, cached[key]) for i, key in enumerate(keys) if key in cached]
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    groups = _pack_blocks([units[i][1] for i in missing], _chunk_budget(PARTIAL_HEADER))
+    chunks = [[missing[j] for j in group] for group in groups]
+    return {
+        'units': units, 'keys': keys, 'reused': reused, 'chunks': chunks,
+        'reused_units': len(reused),
+    }
 
-    Returns (final_summary_text, aggregated_usage).
+
+def _complete_partials(plan: dict) -> tuple[list[str], dict]:
     """
-    header = _build_summary_header(data)
-    chunks = _chunk_customers(data)
-    chunk_count = len(chunks)
+    Summarize the uncached chunks in parallel and cache the results.
+
+    Each chunk call returns one summary per customer, cached under that
+    customer's key. If the model did not return a summary for every
+    customer in a chunk, the chunk's combined summary is used for this
+    export and nothing is cached for it.
+
+    Returns (partial summaries in unit order, aggregated_usage). The usage
+    dict also carries ``partials``: {reused, total} counted in units.
+    """
+    units, keys, reused, chunks = plan['units'], plan['keys'], plan['reused'], plan['chunks']
 
     aggregated_usage = {
         'model': '',
@@ -578,51 +691,132 @@ def _generate_ai_summary_chunked(data: dict, text_export: str) -> tuple[str, dic
         'completion_tokens': 0,
         'total_tokens': 0,
     }
-    partial_summaries: list[str] = [''] * chunk_count
-
-    def _process_chunk_gw(index: int, customers: list[dict]) -> tuple[int, str, dict]:
-        customer_text = '\n'.join(_build_customer_text_block(c) for c in customers)
-        general_notes_text = ''
-        if index == chunk_count - 1:
-            gn = data.get('general_notes', [])
-            if gn:
-                general_notes_text = '\n\n' + _build_general_notes_text_block(gn)
 
+    def _process_partial_gw(index: int) -> tuple[int, dict]:
         result = gateway_call("/v1/connect-summary", {
             "mode": "chunk",
-            "header": header,
-            "customer_text": customer_text,
-            "general_notes_text": general_notes_text,
+            "header": PARTIAL_HEADER,
+            "units": [units[i][1] for i in chunks[index]],
+            "general_notes_text": "",
             "chunk_index": index + 1,
-            "chunk_count": chunk_count,
+            "chunk_count": len(chunks),
         }, timeout=180)
-        return index, result.get("summary", ""), result.get("usage", {})
-
-    with ThreadPoolExecutor(max_workers=min(chunk_count, 4)) as executor:
-        futures = [
-            executor.submit(_process_chunk_gw, i, customers)
-            for i, customers in enumerate(chunks)
-        ]
-        for future in as_completed(futures):
-            idx, text, usage = future.result()
-            partial_summaries[idx] = text
-            aggregated_usage['model'] = usage.get('model', '')
-            aggregated_usage['prompt_tokens'] += usage.get('prompt_tokens', 0)
-            aggregated_usage['completion_tokens'] += usage.get('completion_tokens', 0)
-            aggregated_usage['total_tokens'] += usage.get('total_tokens', 0)
+        return index, result
+
+    # (first unit index, label, summary) per partial
+    partials = [(i, p.label, p.summary) for i, p in reused]
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_PARTIAL_WORKERS)) as executor:
+            futures = [executor.submit(_process_partial_gw, i) for i in range(len(chunks))]
+            for future in as_completed(futures):
+                idx, result = future.result()
+                members = chunks[idx]
+                usage = result.get("usage", {})
+                aggregated_usage['model'] = usage.get('model', '')
+                _add_usage(aggregated_usage, usage)
+                summaries = result.get("summaries") or []
+                if len(summaries) == len(members) and all(summaries):
+                    for i, text in zip(members, summaries):
+                        partials.append((i, units[i][0], text))
+                        db.session.add(ConnectSummaryPartial(
+                            unit_key=keys[i],
+                            label=units[i][0][:300],
+                            summary=text,
+                            total_tokens=usage.get('total_tokens', 0) // len(members),
+                        ))
+                elif result.get("summary"):
+                    label = _group_label([units[i][0] for i in members])
+                    partials.append((members[0], label, result["summary"]))
+
+    now = utc_now()
+    for _, partial in reused:
+        partial.last_used_at = now
+    ConnectSummaryPartial.query.filter(
+        ConnectSummaryPartial.last_used_at < now - timedelta(days=PARTIAL_RETENTION_DAYS)
+    ).delete(synchronize_session=False)
+    try:
+        db.session.commit()
+    except Exception:
+        # A concurrent regeneration cached the same partial first
+        db.session.rollback()
+
+    partial_summaries = [f"**{label}**\n{text}" for _, label, text in sorted(partials)]
+    aggregated_usage['partials'] = {'reused': plan['reused_units'], 'total': len(units)}
+    return partial_summaries, aggregated_usage
+
+
+def _reduce_partials(header: str, partial_summaries: list[str],
+                     usage: dict) -> list[str]:
+    """
+    Condense partial summaries until they fit the synthesis call.
+
+    Each round packs neighbouring summaries into budgeted groups and
+    summarizes every multi-summary group with one chunk call, so the
+    synthesis input stays under MAX_INPUT_TOKENS however many partials the
+    cache supplied.
+    """
+    budget = MAX_INPUT_TOKENS - _estimate_tokens(header) - 500
+    while sum(_estimate_tokens(s) for s in partial_summaries) > budget:
+        groups = _pack_blocks(partial_summaries, min(budget, _chunk_budget(REDUCE_HEADER)))
+        if len(groups) == len(partial_summaries):
+            break  # every summary is already as large as a group can be
+
+        def _reduce_gw(group: list[int]) -> tuple[str, dict]:
+            result = gateway_call("/v1/connect-summary", {
+                "mode": "chunk",
+                "header": REDUCE_HEADER,
+                "customer_text": '\n\n'.join(partial_summaries[i] for i in group),
+                "general_notes_text": "",
+                "chunk_index": 1,
+                "chunk_count": 1,
+            }, timeout=180)
+            return result.get("summary", ""), result.get("usage", {})
+
+        reduced: list[str] = [''] * len(groups)
+        with ThreadPoolExecutor(max_workers=MAX_PARTIAL_WORKERS) as executor:
+            futures = {
+                executor.submit(_reduce_gw, group): group_idx
+                for group_idx, group in enumerate(groups) if len(group) > 1
+            }
+            for group_idx, group in enumerate(groups):
+                if len(group) == 1:
+                    reduced[group_idx] = partial_summaries[group[0]]
+            for future in as_completed(futures):
+                text, call_usage = future.result()
+                reduced[futures[future]] = text
+                _add_usage(usage, call_usage)
+        partial_summaries = reduced
+    return partial_summaries
+
+
+def _add_usage(total: dict, usage: dict) -> None:
+    """Add one call's token counts into ``total``."""
+    total['prompt_tokens'] += usage.get('prompt_tokens', 0)
+    total['completion_tokens'] += usage.get('completion_tokens', 0)
+    total['total_tokens'] += usage.get('total_tokens', 0)
+
+
+def _generate_ai_summary_chunked(data: dict, text_export: str) -> tuple[str, dict]:
+    """
+    Generate an AI summary from customer-chunk partials (cached where the
+    customers' notes are unchanged) and a final synthesis call, condensing
+    the partials first if they would not fit it.
+
+    Returns (final_summary_text, aggregated_usage).
+    """
+    header = _build_summary_header(data)
+    partial_summaries, aggregated_usage = _complete_partials(_plan_partials(data))
+    partial_summaries = _reduce_partials(header, partial_summaries, aggregated_usage)
 
     # Synthesis call
     result = gateway_call("/v1/connect-summary", {
         "mode": "synthesis",
         "header": header,
         "partial_summaries": partial_summaries,
-        "chunk_count": chunk_count,
+        "chunk_count": len(partial_summaries),
     }, timeout=180)
     final_text = result.get("summary", "")
-    synthesis_usage = result.get("usage", {})
-    aggregated_usage['prompt_tokens'] += synthesis_usage.get('prompt_tokens', 0)
-    aggregated_usage['completion_tokens'] += synthesis_usage.get('completion_tokens', 0)
-    aggregated_usage['total_tokens'] += synthesis_usage.get('total_tokens', 0)
+    _add_usage(aggregated_usage, result.get("usage", {}))
 
     return final_text, aggregated_usage
 
@@ -632,7 +826,8 @@ def generate_ai_summary(data: dict, text_export: str) -> tuple[str, dict]:
     Generate an AI-powered Connect summary from export data.
 
     Automatically chooses single-call or chunked strategy based on
-    estimated token count.
+    estimated token count. The chunked strategy reuses cached per-customer
+    partials and reports how many in ``usage['partials']``.
 
     Returns (summary_text, usage_dict).
     """
@@ -644,6 +839,51 @@ def generate_ai_summary(data: dict, text_export: str) -> tuple[str, dict]:
         return _generate_ai_summary_chunked(data, text_export)
 
 
+def stream_ai_summary(data: dict, text_export: str) -> Iterator[dict]:
+    """
+    Streaming variant of :func:`generate_ai_summary`.
+
+    Yields ``{"type": "progress", "stage": ...}`` while partials are being
+    summarized, ``{"type": "delta", "text": ...}`` for each token of the
+    final summary, and finally ``{"type": "done", "summary", "usage"}``.
+    Only the last call (single or synthesis) is streamed; partial calls run
+    in parallel as before.
+    """
+    if _estimate_tokens(text_export) <= MAX_INPUT_TOKENS:
+        payload = {"mode": "single", "text_export": text_export}
+        usage = {'model': '', 'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    else:
+        header = _build_summary_header(data)
+        plan = _plan_partials(data)
+        yield {
+            "type": "progress",
+            "stage": "partials",
+            "total": len(plan['units']),
+            "reused": plan['reused_units'],
+        }
+        partial_summaries, usage = _complete_partials(plan)
+        partial_summaries = _reduce_partials(header, partial_summaries, usage)
+        yield {"type": "progress", "stage": "synthesis", "total": len(partial_summaries)}
+        payload = {
+            "mode": "synthesis",
+            "header": header,
+            "partial_summaries": partial_summaries,
+            "chunk_count": len(partial_summaries),
+        }
+
+    summary = ''
+    for event in gateway_stream("/v1/connect-summary", payload, timeout=180):
+        if event["type"] == "delta":
+            yield event
+        else:
+            summary = event.get("summary", "")
+            final_usage = event.get("usage", {})
+            usage['model'] = final_usage.get('model', usage['model'])
+            _add_usage(usage, final_usage)
+
+    yield {"type": "done", "summary": summary, "usage": usage}
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
@@ -686,7 +926,8 @@ def generate_connect_export():
         start_date: string (YYYY-MM-DD)
         end_date: string (YYYY-MM-DD)
 
-    Returns JSON with summary and text/json export data.
+    Returns JSON with the export id and summary. The page loads the text
+    view and downloads from the streamed download endpoint.
     """
     if not request.is_json:
         return jsonify({'success': False, 'error': 'JSON body required'}), 400
@@ -713,11 +954,6 @@ def generate_connect_export():
     # Build the export data
     data = _build_export_data(start_date, end_date)
 
-    # Generate all formats
-    text_export = _build_text_export(data, name)
-    json_export = _build_json_export(data, name)
-    markdown_export = _build_markdown_export(data, name)
-
     # Save the export record
     export_record = ConnectExport(
         name=name,
@@ -733,9 +969,6 @@ def generate_connect_export():
         'success': True,
         'export_id': export_record.id,
         'summary': data['summary'],
-        'text_export': text_export,
-        'json_export': json_export,
-        'markdown_export': markdown_export,
     })
 
 
@@ -750,24 +983,67 @@ def view_connect_export(export_id: int):
     if not export_record:
         return jsonify({'success': False, 'error': 'Export not found'}), 404
 
-    # Regenerate the data from the stored date range
+    # Regenerate the summary from the stored date range
     data = _build_export_data(export_record.start_date, export_record.end_date)
-    text_export = _build_text_export(data, export_record.name)
-    json_export = _build_json_export(data, export_record.name)
-    markdown_export = _build_markdown_export(data, export_record.name)
 
     return jsonify({
         'success': True,
         'export_id': export_record.id,
         'name': export_record.name,
         'summary': data['summary'],
-        'text_export': text_export,
-        'json_export': json_export,
-        'markdown_export': markdown_export,
         'ai_summary': export_record.ai_summary,
     })
 
 
+def _with_newlines(lines: Iterator[str]) -> Iterator[str]:
+    for line in lines:
+        yield line + '\n'
+
+
+# Streamed download formats: (chunk generator, file extension, mimetype)
+_DOWNLOAD_FORMATS = {
+    'text': (lambda data, name: _with_newlines(_iter_text_export(data, name)),
+             'txt', 'text/plain'),
+    'markdown': (lambda data, name: _with_newlines(_iter_markdown_export(data, name)),
+                 'md', 'text/markdown'),
+    'json': (_iter_json_export, 'json', 'application/json'),
+}
+
+
+@connect_export_bp.route('/api/connect-export/<int:export_id>/download/<fmt>')
+def download_connect_export(export_id: int, fmt: str):
+    """Download a saved export as text, Markdown or JSON, streamed.
+
+    The page also loads its text view from here, so the full text is only
+    built while it is being sent.
+    """
+    export_record = ConnectExport.query.filter_by(
+        id=export_id,
+    ).first()
+
+    if not export_record:
+        return jsonify({'success': False, 'error': 'Export not found'}), 404
+    if fmt not in _DOWNLOAD_FORMATS:
+        return jsonify({'success': False, 'error': 'Unknown export format'}), 400
+
+    chunks, ext, mimetype = _DOWNLOAD_FORMATS[fmt]
+    # Only the JSON file carries each note's HTML
+    data = _build_export_data(
+        export_record.start_date, export_record.end_date,
+        include_html=(fmt == 'json'),
+    )
+    filename = (
+        f"connect_export_{export_record.start_date.isoformat()}_"
+        f"{export_record.end_date.isoformat()}.{ext}"
+    )
+
+    return Response(
+        chunks(data, export_record.name),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+
 @connect_export_bp.route('/api/connect-export/<int:export_id>/ai-summary', methods=['POST'])
 def generate_connect_ai_summary(export_id: int):
     """
@@ -776,10 +1052,11 @@ def generate_connect_ai_summary(export_id: int):
     Regenerates the structured data from the saved date range, feeds it to
     Azure OpenAI, and caches the result on the ConnectExport record.
 
-    Automatically chunks large exports and processes them in parallel.
+    Large exports are summarized in token-budgeted customer chunks, reusing
+    cached partials whose customers' notes are unchanged.
+    With ``Accept: text/event-stream`` the summary is streamed as it is
+    written (see ``_ai_summary_event_stream``).
     """
-    from app.models import AIQueryLog
-
     user = g.user
     export_record = ConnectExport.query.filter_by(
         id=export_id,
@@ -800,29 +1077,26 @@ def generate_connect_ai_summary(export_id: int):
 
     # Estimate tokens for informational purposes
     estimated_tokens = _estimate_tokens(text_export)
-    chunks_needed = len(_chunk_customers(data)) if estimated_tokens > MAX_INPUT_TOKENS else 1
+    chunks_needed = 1
+    if estimated_tokens > MAX_INPUT_TOKENS:
+        chunks_needed = len(_pack_blocks(
+            [text for _, text in _partial_units(data)], _chunk_budget(PARTIAL_HEADER)))
+
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        return Response(
+            stream_with_context(_ai_summary_event_stream(
+                export_id, data, text_export, estimated_tokens, chunks_needed,
+            )),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no',
+            },
+        )
 
     try:
         summary_text, usage = generate_ai_summary(data, text_export)
-
-        # Cache the AI summary on the export record
-        export_record.ai_summary = summary_text
-        db.session.commit()
-
-        # Log the AI query
-        log_entry = AIQueryLog(
-            request_text=f"Connect AI summary for '{export_record.name}' "
-                         f"({export_record.start_date} to {export_record.end_date}), "
-                         f"{estimated_tokens} est. input tokens, {chunks_needed} chunk(s)",
-            response_text=summary_text[:500],
-            success=True,
-            model=usage.get('model', ''),
-            prompt_tokens=usage.get('prompt_tokens'),
-            completion_tokens=usage.get('completion_tokens'),
-            total_tokens=usage.get('total_tokens'),
-        )
-        db.session.add(log_entry)
-        db.session.commit()
+        _save_ai_summary(export_record, summary_text, usage, estimated_tokens, chunks_needed)
 
         return jsonify({
             'success': True,
@@ -833,18 +1107,7 @@ def generate_connect_ai_summary(export_id: int):
 
     except Exception as e:
         error_msg = str(e)
-        current_app.logger.error(f"Connect AI summary failed: {error_msg}")
-
-        # Log the failure
-        log_entry = AIQueryLog(
-            request_text=f"Connect AI summary for '{export_record.name}' "
-                         f"({export_record.start_date} to {export_record.end_date})",
-            response_text=None,
-            success=False,
-            error_message=error_msg[:500],
-        )
-        db.session.add(log_entry)
-        db.session.commit()
+        _log_ai_summary_failure(export_record, error_msg)
 
         return jsonify({
             'success': False,
@@ -852,6 +1115,90 @@ def generate_connect_ai_summary(export_id: int):
         }), 500
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _ai_summary_event_stream(export_id: int, data: dict, text_export: str,
+                             estimated_tokens: int, chunks_needed: int):
+    """Yield SSE events for an AI summary: progress, delta, then done or error.
+
+    stream_with_context runs this in a fresh app context with its own
+    session, so the export is loaded here by ID rather than reusing the
+    view's (by then detached) instance.
+    """
+    try:
+        for event in stream_ai_summary(data, text_export):
+            if event["type"] == "done":
+                summary_text, usage = event["summary"], event["usage"]
+            else:
+                yield _sse(event.pop("type"), event)
+
+        export_record = db.session.get(ConnectExport, export_id)
+        if export_record is None:
+            raise LookupError('Export was deleted while the summary was generated')
+        _save_ai_summary(export_record, summary_text, usage, estimated_tokens, chunks_needed)
+        yield _sse('done', {
+            'success': True,
+            'ai_summary': summary_text,
+            'usage': usage,
+            'chunks_used': chunks_needed,
+        })
+
+    except Exception as e:
+        error_msg = str(e)
+        db.session.rollback()
+        export_record = db.session.get(ConnectExport, export_id)
+        if export_record is not None:
+            _log_ai_summary_failure(export_record, error_msg)
+        else:
+            current_app.logger.error(f"Connect AI summary failed: {error_msg}")
+        yield _sse('error', {
+            'success': False,
+            'error': f'AI request failed: {error_msg}',
+        })
+
+
+def _save_ai_summary(export_record: ConnectExport, summary_text: str, usage: dict,
+                     estimated_tokens: int, chunks_needed: int) -> None:
+    """Cache the AI summary on the export record and log the query."""
+    from app.models import AIQueryLog
+
+    export_record.ai_summary = summary_text
+    db.session.commit()
+
+    log_entry = AIQueryLog(
+        request_text=f"Connect AI summary for '{export_record.name}' "
+                     f"({export_record.start_date} to {export_record.end_date}), "
+                     f"{estimated_tokens} est. input tokens, {chunks_needed} chunk(s)",
+        response_text=summary_text[:500],
+        success=True,
+        model=usage.get('model', ''),
+        prompt_tokens=usage.get('prompt_tokens'),
+        completion_tokens=usage.get('completion_tokens'),
+        total_tokens=usage.get('total_tokens'),
+    )
+    db.session.add(log_entry)
+    db.session.commit()
+
+
+def _log_ai_summary_failure(export_record: ConnectExport, error_msg: str) -> None:
+    """Log a failed AI summary attempt."""
+    from app.models import AIQueryLog
+
+    current_app.logger.error(f"Connect AI summary failed: {error_msg}")
+    log_entry = AIQueryLog(
+        request_text=f"Connect AI summary for '{export_record.name}' "
+                     f"({export_record.start_date} to {export_record.end_date})",
+        response_text=None,
+        success=False,
+        error_message=error_msg[:500],
+    )
+    db.session.add(log_entry)
+    db.session.commit()
+
+
 @connect_export_bp.route('/api/connect-export/<int:export_id>', methods=['DELETE'])
 def delete_connect_export(export_id: int):
     """Delete a Connect export record."""
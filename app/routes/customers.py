@@ -535,6 +535,31 @@ def api_customer_contact_photo(contact_id):
     return jsonify({'success': True, 'photo_b64': contact.photo_b64})
 
 
+@customers_bp.route('/api/customer/<int:customer_id>/favicon')
+def api_customer_favicon(customer_id):
+    """Serve a customer's cached favicon as a PNG.
+
+    Lets list views reference favicons by URL instead of inlining base64 on
+    every row. Callers add a ?v= version, so the response is cacheable.
+    """
+    import base64
+    import binascii
+    from flask import Response
+
+    favicon_b64 = db.session.query(Customer.favicon_b64).filter(
+        Customer.id == customer_id
+    ).scalar()
+    if not favicon_b64:
+        return jsonify({'error': 'No favicon'}), 404
+    try:
+        data = base64.b64decode(favicon_b64)
+    except (binascii.Error, ValueError):
+        return jsonify({'error': 'Invalid favicon'}), 404
+    return Response(data, mimetype='image/png', headers={
+        'Cache-Control': 'private, max-age=86400',
+    })
+
+
 @customers_bp.route('/api/customer/<int:customer_id>/info')
 def api_customer_info(customer_id):
     """Return customer details for the note-form customer flyout."""
@@ -1210,6 +1210,51 @@ def update_msx_auto_writeback():
     return jsonify({'success': True, 'msx_auto_writeback': pref.msx_auto_writeback}), 200
 
 
+@main_bp.route('/api/preferences/milestone-sync-priority', methods=['GET'])
+def get_milestone_sync_priority():
+    """Return the effective milestone sync priority weights."""
+    from app.services.milestone_sync import (
+        DEFAULT_SYNC_PRIORITY_WEIGHTS, get_sync_priority_weights,
+    )
+    return jsonify({
+        'weights': get_sync_priority_weights(),
+        'defaults': DEFAULT_SYNC_PRIORITY_WEIGHTS,
+    }), 200
+
+
+@main_bp.route('/api/preferences/milestone-sync-priority', methods=['POST'])
+def update_milestone_sync_priority():
+    """Save milestone sync priority weight overrides.
+
+    Accepts a JSON object of weight names to integers. Unknown names are
+    rejected; an empty object resets to the defaults.
+    """
+    from app.services.milestone_sync import (
+        DEFAULT_SYNC_PRIORITY_WEIGHTS, get_sync_priority_weights,
+    )
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Expected a JSON object'}), 400
+
+    overrides = {}
+    for key, value in data.items():
+        if key not in DEFAULT_SYNC_PRIORITY_WEIGHTS:
+            return jsonify({'success': False, 'error': f'Unknown weight: {key}'}), 400
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return jsonify({'success': False, 'error': f'Weight {key} must be a number'}), 400
+        overrides[key] = int(value)
+
+    pref = UserPreference.query.first()
+    if not pref:
+        pref = UserPreference()
+        db.session.add(pref)
+
+    pref.milestone_sync_priority = json.dumps(overrides) if overrides else None
+    db.session.commit()
+
+    return jsonify({'success': True, 'weights': get_sync_priority_weights()}), 200
+
+
 @main_bp.route('/api/preferences/dashboard-toggle', methods=['POST'])
 def update_dashboard_toggle():
     """Toggle dashboard display preferences."""
@@ -13,6 +13,7 @@ from flask import (
     flash, g, jsonify, Response, stream_with_context, current_app,
 )
 from app.models import db, Milestone, MsxTask, Note, Customer, Seller, SolutionEngineer, Favorite
+from app.services.milestone_tracker_snapshot import refresh_tracker_snapshot
 from app.services.seller_mode import get_seller_mode_seller_id
 
 logger = logging.getLogger(__name__)
@@ -243,6 +244,7 @@ def milestone_edit(id):
         milestone.url = url
         milestone.title = title
         db.session.commit()
+        refresh_tracker_snapshot([milestone.id])
         
         flash('Milestone updated successfully', 'success')
         return redirect(url_for('milestones.milestone_view', id=milestone.id))
@@ -263,6 +265,7 @@ def milestone_delete(id):
     
     db.session.delete(milestone)
     db.session.commit()
+    refresh_tracker_snapshot()
     
     flash('Milestone deleted successfully', 'success')
     return redirect(url_for('milestones.milestones_list'))
@@ -313,7 +316,7 @@ def api_milestone_msx_details(id: int):
                     pass
             comments = msx_data.get("comments")
             if comments is not None:
-                milestone.cached_comments_json = json.dumps(comments)
+                milestone.set_cached_comments(json.dumps(comments))
             milestone.details_fetched_at = datetime.now(timezone.utc)
             db.session.commit()
         except Exception:
@@ -471,19 +474,23 @@ def milestone_tracker():
     Shows all active (uncommitted) milestones across customers, sorted by
     dollar value and grouped by due date urgency. Provides a sync button
     to pull fresh data from MSX.
+
+    Only the first page is rendered here; filtering, sorting and later
+    pages are fetched from /api/milestone-tracker.
     """
     from app.services.milestone_sync import (
         get_milestone_tracker_data, get_milestone_tracker_data_for_seller
     )
+    from app.services.milestone_tracker_snapshot import PAGE_SIZE
     from app.models import SyncStatus
     
     seller_mode_sid = get_seller_mode_seller_id()
     locked_seller = None
     if seller_mode_sid:
-        tracker_data = get_milestone_tracker_data_for_seller(seller_mode_sid)
+        tracker_data = get_milestone_tracker_data_for_seller(seller_mode_sid, per_page=PAGE_SIZE)
         locked_seller = Seller.query.get(seller_mode_sid)
     else:
-        tracker_data = get_milestone_tracker_data()
+        tracker_data = get_milestone_tracker_data(per_page=PAGE_SIZE)
     
     sync_status = SyncStatus.get_status('milestones')
     favorited_ms_ids = {f.object_id for f in Favorite.query.filter_by(object_type='milestone').all()}
@@ -498,8 +505,80 @@ def milestone_tracker():
         sync_status=sync_status,
         locked_seller=locked_seller,
         favorited_ms_ids=favorited_ms_ids,
+        page_size=PAGE_SIZE,
+    )
+
+
+@bp.route('/api/milestone-tracker')
+def api_milestone_tracker():
+    """Server-side filtered, sorted and paginated milestone tracker rows.
+
+    Query params:
+        seller_id: int seller ID (ignored in seller mode, which forces its own)
+        area:      comma-separated workload areas
+        quarters:  comma-separated fiscal quarters ('none' matches no quarter)
+        status:    comma-separated MSX statuses
+        urgency:   past_due, this_week, this_month, future or no_date
+        team:      'on' or 'off' for milestones the user is / isn't on the
+                   team for (team_only=1 is the same as team=on)
+        commitment: customer commitment (Committed, Uncommitted)
+        favorites: '1' for favorited milestones only
+        q:         search text (title, opportunity, customer, seller, workload)
+        sort:      monthly_usage (default), dollar_value, due_date, customer,
+                   seller, title, status or workload
+        dir:       'asc' or 'desc' (default)
+        page:      1-based page number (default 1)
+        per_page:  rows per page (default 100, max 500)
+        html:      '1' to include the page's table rows as rows_html
+        locked:    '1' to render rows_html without the seller column
+
+    Returns JSON with milestones, total, page, per_page, pages, summary
+    and filter options. Favicons are returned as URLs.
+    """
+    from app.services.milestone_tracker_snapshot import (
+        PAGE_SIZE, query_tracker_rows, tracker_filter_options,
     )
 
+    def _csv(name):
+        raw = request.args.get(name, '')
+        return [v.strip() for v in raw.split(',') if v.strip()]
+
+    seller_mode_sid = get_seller_mode_seller_id()
+    seller_id = seller_mode_sid or request.args.get('seller_id', type=int)
+    team = 'on' if request.args.get('team_only') == '1' else request.args.get('team')
+    quarters = _csv('quarters') if request.args.get('quarters') else None
+    favorited_ms_ids = {f.object_id for f in Favorite.query.filter_by(object_type='milestone').all()}
+
+    data = query_tracker_rows(
+        seller_id=seller_id,
+        areas=_csv('area'),
+        quarters=quarters,
+        statuses=_csv('status'),
+        urgency=request.args.get('urgency') or None,
+        on_my_team={'on': True, 'off': False}.get(team),
+        commitment=request.args.get('commitment') or None,
+        milestone_ids=favorited_ms_ids if request.args.get('favorites') == '1' else None,
+        search=request.args.get('q', '').strip() or None,
+        sort=request.args.get('sort', 'monthly_usage'),
+        direction='asc' if request.args.get('dir') == 'asc' else 'desc',
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', PAGE_SIZE, type=int) or PAGE_SIZE,
+    )
+    if request.args.get('html') == '1':
+        data['rows_html'] = render_template(
+            'partials/milestone_tracker_rows.html',
+            milestones=data['milestones'],
+            favorited_ms_ids=favorited_ms_ids,
+            locked_seller=bool(seller_mode_sid) or request.args.get('locked') == '1',
+        )
+    for item in data['milestones']:
+        item['favorited'] = item['id'] in favorited_ms_ids
+        for key in ('due_date', 'last_synced_at'):
+            if item[key]:
+                item[key] = item[key].isoformat()
+    data['filters'] = tracker_filter_options(seller_id=seller_id)
+    return jsonify(data)
+
 
 @bp.route('/api/milestone-tracker/sync', methods=['POST'])
 def api_sync_milestones():
@@ -1104,19 +1104,25 @@ def api_fill_my_day_process():
 
                         # AI match milestones via gateway
                         if len(milestones) > 0:
+                            from app.services.candidate_ranking import (
+                                prepare_candidates, record_case,
+                            )
+                            call_notes = result['summary'][:2000]
+                            candidates = prepare_candidates("/v1/match-milestone", call_notes, [
+                                {
+                                    "id": m['id'],
+                                    "name": m['name'],
+                                    "status": m['status'],
+                                    "opportunity": m.get('opportunity_name', ''),
+                                    "workload": m.get('workload', ''),
+                                }
+                                for m in milestones
+                            ])
                             ms_result = gateway_call("/v1/match-milestone", {
-                                "call_notes": result['summary'][:2000],
-                                "milestones": [
-                                    {
-                                        "id": m['id'],
-                                        "name": m['name'],
-                                        "status": m['status'],
-                                        "opportunity": m.get('opportunity_name', ''),
-                                        "workload": m.get('workload', ''),
-                                    }
-                                    for m in milestones
-                                ],
+                                "call_notes": call_notes,
+                                "milestones": candidates,
                             })
+                            record_case("/v1/match-milestone", call_notes, candidates, ms_result)
                             matched_id = ms_result.get('milestone_id')
 
                             if matched_id:
@@ -1305,9 +1311,15 @@ def api_fill_my_day_save():
 
 @notes_bp.route('/api/share/note/<int:note_id>')
 def api_share_serialize_note(note_id):
-    """Serialize a single note for sharing."""
+    """Serialize a single note for sharing.
+
+    With ``?packed=1`` returns a chunked transfer of ``{note: {...}}``.
+    """
     from app.services.note_sharing import serialize_note
     note = Note.query.get_or_404(note_id)
+    if request.args.get('packed'):
+        from app.services.share_transfer import pack_payload
+        return jsonify({'success': True, **pack_payload({'note': serialize_note(note)})})
     return jsonify({'success': True, 'note': serialize_note(note)})
 
 
@@ -616,17 +616,46 @@ def api_share_connection_info():
 
 @partners_bp.route('/api/share/partner/<int:partner_id>')
 def api_share_serialize_partner(partner_id):
-    """Serialize a single partner for sharing."""
+    """Serialize a single partner for sharing.
+
+    With ``?packed=1`` returns a chunked transfer of ``{partners: [...]}``.
+    """
     from app.services.partner_sharing import serialize_partner
     partner = Partner.query.get_or_404(partner_id)
+    if request.args.get('packed'):
+        from app.services.share_transfer import pack_payload
+        return jsonify({'success': True, **pack_payload({'partners': [serialize_partner(partner)]})})
     return jsonify({'success': True, 'partner': serialize_partner(partner)})
 
 
 @partners_bp.route('/api/share/directory')
 def api_share_serialize_directory():
-    """Serialize the entire partner directory for sharing."""
+    """Serialize the entire partner directory for sharing.
+
+    With ``?packed=1`` returns a chunked transfer of ``{partners: [...]}``.
+    """
     from app.services.partner_sharing import serialize_all_partners
-    return jsonify({'success': True, 'partners': serialize_all_partners()})
+    partners = serialize_all_partners()
+    if request.args.get('packed'):
+        from app.services.share_transfer import pack_payload
+        return jsonify({'success': True, 'count': len(partners),
+                        **pack_payload({'partners': partners})})
+    return jsonify({'success': True, 'partners': partners})
+
+
+@partners_bp.route('/api/share/unpack', methods=['POST'])
+def api_share_unpack():
+    """Reassemble a received chunked transfer into its share payload."""
+    from app.services.share_transfer import ShareTransferError, unpack_chunks
+    data = request.get_json()
+    if not data or not isinstance(data.get('transfer'), dict):
+        return jsonify({'success': False, 'error': 'No transfer provided'}), 400
+
+    try:
+        payload = unpack_chunks(data['transfer'], data.get('chunks') or [])
+    except ShareTransferError as e:
+        return jsonify({'success': False, 'error': str(e), 'bad_chunks': e.bad_chunks}), 400
+    return jsonify({'success': True, 'payload': payload})
 
 
 @partners_bp.route('/api/share/preview', methods=['POST'])
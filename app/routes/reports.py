@@ -5,9 +5,10 @@ from flask import Blueprint, render_template, url_for, jsonify, request
 from app.models import (
     db, Customer, Engagement, Note, Milestone, MilestoneAudit, Opportunity, Seller,
     SolutionEngineer, SyncStatus, MsxTask,
-    Topic, RevenueAnalysis, HygieneNote, CustomerRevenueData, ProductRevenueData,
+    Topic, RevenueAnalysis, HygieneNote, RevenueBucketRollup, RevenueProductRollup,
     notes_engagements, notes_milestones, notes_topics,
 )
+from app.services.revenue_rollups import ensure_revenue_rollups
 from sqlalchemy import func, desc, or_
 
 logger = logging.getLogger(__name__)
@@ -809,29 +810,23 @@ def api_whitespace_grid():
     selected_buckets = [b.strip() for b in bucket_param.split(',') if b.strip()]
     min_revenue = float(request.args.get('min_revenue', 0))
 
-    # Find the latest month in the data
-    latest_month = db.session.query(
-        func.max(CustomerRevenueData.month_date)
-    ).scalar()
-    if not latest_month:
-        return jsonify(customers=[], buckets=selected_buckets)
-
-    # Get the trailing 3 months for a more stable view
-    trailing_start = latest_month - timedelta(days=62)  # ~2 months back
+    ensure_revenue_rollups()
 
     # Average revenue per customer per bucket over the trailing 3 months
+    # (the rollup carries the trailing-window sum and month count)
     spend_query = (
         db.session.query(
-            CustomerRevenueData.customer_id,
-            CustomerRevenueData.bucket,
-            func.avg(CustomerRevenueData.revenue).label('avg_revenue')
+            RevenueBucketRollup.customer_id,
+            RevenueBucketRollup.bucket,
+            (func.sum(RevenueBucketRollup.trailing_revenue)
+             / func.sum(RevenueBucketRollup.trailing_months)).label('avg_revenue')
         )
         .filter(
-            CustomerRevenueData.customer_id.isnot(None),
-            CustomerRevenueData.bucket.in_(selected_buckets),
-            CustomerRevenueData.month_date >= trailing_start,
+            RevenueBucketRollup.customer_id.isnot(None),
+            RevenueBucketRollup.bucket.in_(selected_buckets),
+            RevenueBucketRollup.trailing_months > 0,
         )
-        .group_by(CustomerRevenueData.customer_id, CustomerRevenueData.bucket)
+        .group_by(RevenueBucketRollup.customer_id, RevenueBucketRollup.bucket)
         .all()
     )
 
@@ -889,16 +884,18 @@ def api_whitespace_reverse(customer_id: int):
     if not customer:
         return jsonify(error='Customer not found'), 404
 
+    ensure_revenue_rollups()
+
     # All distinct buckets in the database
     all_buckets = {
         r[0] for r in
-        db.session.query(CustomerRevenueData.bucket).distinct().all()
+        db.session.query(RevenueBucketRollup.bucket).distinct().all()
         if r[0]
     }
 
     # All distinct products per bucket
     all_products_rows = (
-        db.session.query(ProductRevenueData.bucket, ProductRevenueData.product)
+        db.session.query(RevenueProductRollup.bucket, RevenueProductRollup.product)
         .distinct()
         .all()
     )
@@ -910,10 +907,10 @@ def api_whitespace_reverse(customer_id: int):
     # This customer's buckets (any non-zero spend ever)
     customer_buckets = {
         r[0] for r in
-        db.session.query(CustomerRevenueData.bucket)
+        db.session.query(RevenueBucketRollup.bucket)
         .filter(
-            CustomerRevenueData.customer_id == customer_id,
-            CustomerRevenueData.revenue > 0,
+            RevenueBucketRollup.customer_id == customer_id,
+            RevenueBucketRollup.has_spend.is_(True),
         )
         .distinct()
         .all()
@@ -922,10 +919,10 @@ def api_whitespace_reverse(customer_id: int):
 
     # This customer's products per bucket
     customer_products_rows = (
-        db.session.query(ProductRevenueData.bucket, ProductRevenueData.product)
+        db.session.query(RevenueProductRollup.bucket, RevenueProductRollup.product)
         .filter(
-            ProductRevenueData.customer_id == customer_id,
-            ProductRevenueData.revenue > 0,
+            RevenueProductRollup.customer_id == customer_id,
+            RevenueProductRollup.has_spend.is_(True),
         )
         .distinct()
         .all()
@@ -970,10 +967,12 @@ def api_whitespace_penetration():
         if bucket_param else None
     )
 
+    ensure_revenue_rollups()
+
     # Total customers with any revenue data
     total_customers = (
-        db.session.query(func.count(func.distinct(CustomerRevenueData.customer_id)))
-        .filter(CustomerRevenueData.customer_id.isnot(None))
+        db.session.query(func.count(func.distinct(RevenueBucketRollup.customer_id)))
+        .filter(RevenueBucketRollup.customer_id.isnot(None))
         .scalar()
     ) or 0
 
@@ -983,17 +982,17 @@ def api_whitespace_penetration():
     # Customers with spend per bucket
     query = (
         db.session.query(
-            CustomerRevenueData.bucket,
-            func.count(func.distinct(CustomerRevenueData.customer_id))
+            RevenueBucketRollup.bucket,
+            func.count(func.distinct(RevenueBucketRollup.customer_id))
         )
         .filter(
-            CustomerRevenueData.customer_id.isnot(None),
-            CustomerRevenueData.revenue > 0,
+            RevenueBucketRollup.customer_id.isnot(None),
+            RevenueBucketRollup.has_spend.is_(True),
         )
     )
     if selected_buckets:
-        query = query.filter(CustomerRevenueData.bucket.in_(selected_buckets))
-    bucket_counts = query.group_by(CustomerRevenueData.bucket).all()
+        query = query.filter(RevenueBucketRollup.bucket.in_(selected_buckets))
+    bucket_counts = query.group_by(RevenueBucketRollup.bucket).all()
 
     result = []
     for bucket, count in sorted(bucket_counts, key=lambda x: x[0]):
@@ -1022,22 +1021,24 @@ def api_whitespace_penetration_customers():
     if not bucket:
         return jsonify(error='Bucket name is required'), 400
 
+    ensure_revenue_rollups()
+
     # All customer IDs with any revenue data
     all_customer_ids = {
         r[0] for r in
-        db.session.query(func.distinct(CustomerRevenueData.customer_id))
-        .filter(CustomerRevenueData.customer_id.isnot(None))
+        db.session.query(func.distinct(RevenueBucketRollup.customer_id))
+        .filter(RevenueBucketRollup.customer_id.isnot(None))
         .all()
     }
 
     # Customer IDs with spend > 0 in this bucket
     with_spend_ids = {
         r[0] for r in
-        db.session.query(func.distinct(CustomerRevenueData.customer_id))
+        db.session.query(func.distinct(RevenueBucketRollup.customer_id))
         .filter(
-            CustomerRevenueData.customer_id.isnot(None),
-            CustomerRevenueData.bucket == bucket,
-            CustomerRevenueData.revenue > 0,
+            RevenueBucketRollup.customer_id.isnot(None),
+            RevenueBucketRollup.bucket == bucket,
+            RevenueBucketRollup.has_spend.is_(True),
         )
         .all()
     }
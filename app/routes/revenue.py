@@ -9,6 +9,7 @@ import json
 import time
 import tempfile
 from io import StringIO
+from typing import Optional
 
 from app.models import (
     db, RevenueImport, CustomerRevenueData, ProductRevenueData, RevenueAnalysis, 
@@ -16,8 +17,8 @@ from app.models import (
 )
 from app.services.revenue_import import (
     import_revenue_csv, get_import_history, get_months_in_database,
-    get_customer_revenue_history, get_product_revenue_history,
-    get_products_for_bucket, get_all_products, get_customers_using_product,
+    get_bucket_revenue_grid, get_customer_revenue_view, get_all_products,
+    get_customers_using_product,
     get_seller_products, get_seller_customers_using_product,
     consolidate_products_list, consolidate_product_name,
     import_revenue_csv_streaming,
@@ -27,6 +28,8 @@ from app.services.revenue_analysis import (
     run_analysis_for_all, run_analysis_streaming, get_actionable_analyses,
     get_seller_alerts, AnalysisConfig
 )
+from app.services.revenue_cache import dashboard_views, seller_product_views, seller_views
+from app.services.revenue_store import get_revenue_store
 from app.services.seller_mode import get_seller_mode_seller_id
 
 # Create blueprint
@@ -49,15 +52,19 @@ def _redirect_reports_list():
     return redirect(url_for('revenue.reports_list'), code=301)
 
 
-@revenue_bp.route('/reports/revenue')
-def revenue_dashboard():
-    """Main revenue attention dashboard."""
-    seller_mode_sid = get_seller_mode_seller_id()
-    seller_mode_name = None
-    if seller_mode_sid:
-        seller_obj = Seller.query.get(seller_mode_sid)
-        seller_mode_name = seller_obj.name if seller_obj else None
+def _analyses_by_id(ids: list[int]) -> list[RevenueAnalysis]:
+    """Load analyses in the given order (review status is always live)."""
+    if not ids:
+        return []
+    rows = RevenueAnalysis.query.options(
+        db.joinedload(RevenueAnalysis.customer)
+    ).filter(RevenueAnalysis.id.in_(ids)).all()
+    by_id = {a.id: a for a in rows}
+    return [by_id[i] for i in ids if i in by_id]
 
+
+def _build_dashboard_view(seller_mode_name: Optional[str]) -> dict:
+    """Aggregates behind the revenue dashboard (cached per data version)."""
     # Get actionable analyses (scoped to seller in seller mode)
     analyses = get_actionable_analyses(
         min_priority=20, limit=50, seller_name=seller_mode_name
@@ -83,15 +90,37 @@ def revenue_dashboard():
             RevenueAnalysis.seller_name == seller_mode_name
         )
     seller_names = seller_alerts_q.distinct().all()
-    sellers_with_alerts = [s[0] for s in seller_names if s[0]]
-
-    # Map seller names to IDs for color-coding badges
-    all_sellers = Seller.query.all()
-    seller_id_map = {s.name: s.id for s in all_sellers}
     
     # Get import stats
     latest_import = RevenueImport.query.order_by(RevenueImport.imported_at.desc()).first()
-    months_data = get_months_in_database()
+    
+    return {
+        'analysis_ids': [a.id for a in analyses],
+        'category_counts': category_counts,
+        'sellers_with_alerts': [s[0] for s in seller_names if s[0]],
+        # Map seller names to IDs for color-coding badges
+        'seller_id_map': dict(db.session.query(Seller.name, Seller.id).all()),
+        'latest_import': {'imported_at': latest_import.imported_at} if latest_import else None,
+        'months_data': get_months_in_database(),
+    }
+
+
+@revenue_bp.route('/reports/revenue')
+def revenue_dashboard():
+    """Main revenue attention dashboard."""
+    seller_mode_sid = get_seller_mode_seller_id()
+    seller_mode_name = None
+    if seller_mode_sid:
+        seller_obj = Seller.query.get(seller_mode_sid)
+        seller_mode_name = seller_obj.name if seller_obj else None
+
+    # Sellers are edited outside imports; their count and max id keep the
+    # cached name -> id map honest
+    seller_stamp = tuple(db.session.query(db.func.count(Seller.id), db.func.max(Seller.id)).one())
+    view = dashboard_views.get_or_build(
+        (seller_mode_name, seller_stamp),
+        lambda: _build_dashboard_view(seller_mode_name),
+    )
     
     # Get sync status for warning banners
     import_status = SyncStatus.get_status('revenue_import')
@@ -99,14 +128,14 @@ def revenue_dashboard():
     
     return render_template(
         'revenue_dashboard.html',
-        analyses=analyses,
-        category_counts=category_counts,
-        sellers_with_alerts=sellers_with_alerts,
-        latest_import=latest_import,
-        months_data=months_data,
+        analyses=_analyses_by_id(view['analysis_ids']),
+        category_counts=view['category_counts'],
+        sellers_with_alerts=view['sellers_with_alerts'],
+        latest_import=view['latest_import'],
+        months_data=view['months_data'],
         import_status=import_status,
         analysis_status=analysis_status,
-        seller_id_map=seller_id_map,
+        seller_id_map=view['seller_id_map'],
     )
 
 
@@ -148,7 +177,8 @@ def revenue_import_stream():
         return jsonify({'error': 'Only CSV files are supported'}), 400
     
     filename = secure_filename(file.filename)
-    content = file.read()
+    # Parsed straight from the upload stream in chunks (kept open by stream_with_context)
+    upload = file.stream
     run_analysis = request.form.get('run_analysis', 'on') not in ('off', 'no', '0', '')
     
     def generate():
@@ -157,11 +187,13 @@ def revenue_import_stream():
             import_start_time = time.time()
             # Stream import progress
             import_result = None
-            for progress in import_revenue_csv_streaming(content, filename):
+            for progress in import_revenue_csv_streaming(upload, filename):
                 if progress.get('complete'):
                     import_result = progress.get('result')
                 else:
                     yield "data: " + json.dumps(progress) + "\n\n"
+                    if progress.get('error'):
+                        return
             
             if not import_result:
                 yield "data: " + json.dumps({"error": "Import failed - no result"}) + "\n\n"
@@ -172,7 +204,8 @@ def revenue_import_stream():
                 yield "data: " + json.dumps({"message": "Analyzing revenue trends...", "analysis_started": True}) + "\n\n"
                 
                 analysis_stats = None
-                for update in run_analysis_streaming():
+                # Only series this import or the moved month window changed, unless thresholds changed
+                for update in run_analysis_streaming(incremental=True):
                     if update.get('complete'):
                         analysis_stats = update['stats']
                     else:
@@ -181,7 +214,11 @@ def revenue_import_stream():
                             "progress": update['progress']
                         }) + "\n\n"
                 
-                if analysis_stats:
+                if analysis_stats and analysis_stats.get('mode') == 'incremental':
+                    yield "data: " + json.dumps({
+                        "message": f"Analysis updated: {analysis_stats['analyzed']} changed customers re-analyzed, {analysis_stats['actionable']} need attention"
+                    }) + "\n\n"
+                elif analysis_stats:
                     yield "data: " + json.dumps({
                         "message": f"Analysis complete: {analysis_stats['analyzed']} customers, {analysis_stats['actionable']} need attention"
                     }) + "\n\n"
@@ -238,12 +275,19 @@ def revenue_analyze():
 @revenue_bp.route('/revenue/seller/<seller_name>')
 def revenue_seller_view(seller_name: str):
     """View revenue analysis for a specific seller."""
-    # Get alerts for this seller
-    alerts = get_seller_alerts(seller_name)
+    def build():
+        alerts = get_seller_alerts(seller_name)
+        return {
+            'alert_ids': [a.id for a in alerts],
+            'total_at_risk': sum(a.dollars_at_risk or 0 for a in alerts),
+            'total_opportunity': sum(a.dollars_opportunity or 0 for a in alerts),
+        }
     
-    # Calculate totals
-    total_at_risk = sum(a.dollars_at_risk or 0 for a in alerts)
-    total_opportunity = sum(a.dollars_opportunity or 0 for a in alerts)
+    # Alerts for this seller, with totals
+    view = seller_views.get_or_build(seller_name, build)
+    alerts = _analyses_by_id(view['alert_ids'])
+    total_at_risk = view['total_at_risk']
+    total_opportunity = view['total_opportunity']
     
     # Try to match to a Sales Buddy Seller
     seller = Seller.query.filter(
@@ -288,7 +332,8 @@ def revenue_seller_export(seller_name: str):
     header.append('Total')
     writer.writerow(header)
     
-    # Data rows with product breakdown
+    # Data rows with product breakdown, all read from one store lookup
+    store = get_revenue_store()
     for a in alerts:
         # Write the bucket summary row
         bucket_row = [
@@ -304,22 +349,18 @@ def revenue_seller_export(seller_name: str):
             a.priority_score,
             f'{a.trend_slope:+.1f}%'
         ]
-        # Get bucket totals by month
-        bucket_history = get_customer_revenue_history(a.customer_name, a.bucket)
-        bucket_month_revenues = {rd.fiscal_month: rd.revenue for rd in bucket_history}
-        bucket_total = sum(rd.revenue for rd in bucket_history)
+        # Bucket and product grids in one read (memory-mapped when available)
+        grid = get_bucket_revenue_grid(a.bucket, customer_name=a.customer_name, store=store)
         for month in recent_months:
-            rev = bucket_month_revenues.get(month)
+            rev = grid['bucket_month_revenues'].get(month)
             bucket_row.append(f'${rev:,.0f}' if rev else '')
-        bucket_row.append(f'${bucket_total:,.0f}')
+        bucket_row.append(f'${grid["bucket_total"]:,.0f}')
         writer.writerow(bucket_row)
         
-        # Get products for this bucket and write product rows
-        products = get_products_for_bucket(a.customer_name, a.bucket)
-        for p in products:
-            product_history = get_product_revenue_history(a.customer_name, a.bucket, p['product'])
-            month_revenues = {rd.fiscal_month: rd.revenue for rd in product_history}
-            product_total = sum(rd.revenue for rd in product_history)
+        # Write product rows for this bucket
+        for p in grid['product_summary']:
+            month_revenues = p['month_revenues']
+            product_total = p['total_revenue']
             
             product_row = [
                 '',  # Customer name only on first row
@@ -357,10 +398,11 @@ def revenue_seller_export(seller_name: str):
 @revenue_bp.route('/revenue/seller/<seller_name>/products')
 def revenue_seller_products(seller_name: str):
     """View all products used by a seller's customers."""
-    products = get_seller_products(seller_name)
-    
     # Consolidate products (e.g., roll up Azure Synapse Analytics*)
-    products = consolidate_products_list(products)
+    products = seller_product_views.get_or_build(
+        ('products', seller_name),
+        lambda: consolidate_products_list(get_seller_products(seller_name)),
+    )
     
     # Handle sorting
     sort = request.args.get('sort', 'revenue')
@@ -384,9 +426,8 @@ def revenue_seller_products(seller_name: str):
     )
 
 
-@revenue_bp.route('/revenue/seller/<seller_name>/product/<path:product>')
-def revenue_seller_product_view(seller_name: str, product: str):
-    """View seller's customers using a specific product with revenue grid."""
+def _build_seller_product_view(seller_name: str, product: str) -> dict:
+    """Customer revenue grid for one seller/product (cached per data version)."""
     from app.services.revenue_import import PRODUCT_CONSOLIDATION_PREFIXES
     
     # Check if this is a consolidated product (e.g., "Azure Synapse Analytics")
@@ -460,6 +501,23 @@ def revenue_seller_product_view(seller_name: str, product: str):
             'month_revenues': month_revenues
         })
     
+    return {
+        'customers': customers,
+        'customer_summary': customer_summary,
+        'recent_months': recent_months,
+        'is_consolidated': is_consolidated,
+        'matching_products': matching_products,
+    }
+
+
+@revenue_bp.route('/revenue/seller/<seller_name>/product/<path:product>')
+def revenue_seller_product_view(seller_name: str, product: str):
+    """View seller's customers using a specific product with revenue grid."""
+    view = seller_product_views.get_or_build(
+        ('product', seller_name, product),
+        lambda: _build_seller_product_view(seller_name, product),
+    )
+    
     # Try to match to a Sales Buddy Seller
     seller = Seller.query.filter(
         db.func.lower(Seller.name) == seller_name.lower()
@@ -470,11 +528,11 @@ def revenue_seller_product_view(seller_name: str, product: str):
         seller_name=seller_name,
         seller=seller,
         product=product,
-        customers=customers,
-        customer_summary=customer_summary,
-        recent_months=recent_months,
-        is_consolidated=is_consolidated,
-        sub_products=matching_products if is_consolidated else None
+        customers=view['customers'],
+        customer_summary=view['customer_summary'],
+        recent_months=view['recent_months'],
+        is_consolidated=view['is_consolidated'],
+        sub_products=view['matching_products'] if view['is_consolidated'] else None
     )
 
 
@@ -495,92 +553,15 @@ def revenue_customer_view(customer_id: int):
     # Get all analyses for this customer (all buckets)
     analyses = RevenueAnalysis.query.filter_by(customer_id=customer_id).all()
     
-    # Get revenue history by bucket (discover buckets dynamically from data)
-    bucket_rows = db.session.query(CustomerRevenueData.bucket).filter(
-        CustomerRevenueData.customer_id == customer_id
-    ).distinct().all()
-    buckets = sorted([r[0] for r in bucket_rows if r[0]])
-    revenue_by_bucket = {}
-    products_by_bucket = {}
-    bucket_product_data = {}  # Full product data with monthly revenues
-    
-    for bucket in buckets:
-        history = get_customer_revenue_history(bucket=bucket, customer_id=customer_id)
-        if history:
-            revenue_by_bucket[bucket] = history
-            # Get products for this bucket
-            products = get_products_for_bucket(bucket=bucket, customer_id=customer_id)
-            products_by_bucket[bucket] = products
-            
-            # Get product history for grid display
-            product_history = {}
-            for p in products:
-                p_history = get_product_revenue_history(
-                    bucket=bucket, product=p['product'], customer_id=customer_id
-                )
-                if p_history:
-                    product_history[p['product']] = p_history
-            
-            # Get the 7 most recent months for this bucket
-            all_months = {}
-            for ph in product_history.values():
-                for rd in ph:
-                    all_months[rd.fiscal_month] = rd.month_date
-            # Also include bucket totals months
-            for rd in history:
-                all_months[rd.fiscal_month] = rd.month_date
-            sorted_months = sorted(all_months.items(), key=lambda x: x[1])
-            recent_months = [m[0] for m in sorted_months[-7:]]
-            
-            # Build product summary with monthly revenues
-            product_summary = []
-            for p in products:
-                p_hist = product_history.get(p['product'], [])
-                month_revenues = {rd.fiscal_month: rd.revenue for rd in p_hist}
-                product_summary.append({
-                    'product': p['product'],
-                    'total_revenue': p['total_revenue'],
-                    'month_revenues': month_revenues
-                })
-            
-            # Build bucket total monthly revenues
-            bucket_month_revenues = {rd.fiscal_month: rd.revenue for rd in history}
-            
-            bucket_product_data[bucket] = {
-                'recent_months': recent_months,
-                'product_summary': product_summary,
-                'bucket_month_revenues': bucket_month_revenues,
-                'bucket_total': sum(rd.revenue for rd in history)
-            }
-    
-    # Build grand total across all buckets (month-by-month)
-    grand_month_revenues = {}
-    for bucket, bdata in bucket_product_data.items():
-        for month, rev in bdata['bucket_month_revenues'].items():
-            grand_month_revenues[month] = grand_month_revenues.get(month, 0) + rev
-
-    # Get the 7 most recent months across all buckets for the total card
-    all_bucket_months = {}
-    for bucket, bdata in bucket_product_data.items():
-        for month in bdata['recent_months']:
-            for rd in revenue_by_bucket.get(bucket, []):
-                if rd.fiscal_month == month:
-                    all_bucket_months[month] = rd.month_date
-    sorted_grand_months = sorted(all_bucket_months.items(), key=lambda x: x[1])
-    grand_recent_months = [m[0] for m in sorted_grand_months[-7:]]
-    grand_total = sum(grand_month_revenues.values())
+    # Bucket and product history, pivoted for the grids (cached per import)
+    view = get_customer_revenue_view(customer_id)
 
     return render_template(
         'revenue_customer_view.html',
         customer_name=customer_name,
         customer=customer,
         analyses=analyses,
-        revenue_by_bucket=revenue_by_bucket,
-        products_by_bucket=products_by_bucket,
-        bucket_product_data=bucket_product_data,
-        grand_month_revenues=grand_month_revenues,
-        grand_recent_months=grand_recent_months,
-        grand_total=grand_total,
+        **view,
     )
 
 
@@ -595,38 +576,13 @@ def revenue_bucket_products(customer_id: int, bucket: str):
         return redirect(url_for('revenue.revenue_dashboard'))
     
     customer_name = customer.name
-    # Get products with totals (query by customer_id for fuzzy-matched customers)
-    products = get_products_for_bucket(bucket=bucket, customer_id=customer_id)
-    
-    # Get product history for drill-down
-    product_history = {}
-    for p in products:
-        history = get_product_revenue_history(
-            bucket=bucket, product=p['product'], customer_id=customer_id
-        )
-        if history:
-            product_history[p['product']] = history
-    
-    # Get the 7 most recent months across all products for the summary table
-    # Use (month_date, fiscal_month) tuples to sort chronologically
-    all_months = {}
-    for history in product_history.values():
-        for rd in history:
-            all_months[rd.fiscal_month] = rd.month_date
-    # Sort by actual date, then take most recent 7
-    sorted_months = sorted(all_months.items(), key=lambda x: x[1])
-    recent_months = [m[0] for m in sorted_months[-7:]]
-    
-    # Build summary data for each product: monthly revenue for recent months
-    product_summary = []
-    for p in products:
-        history = product_history.get(p['product'], [])
-        month_revenues = {rd.fiscal_month: rd.revenue for rd in history}
-        product_summary.append({
-            'product': p['product'],
-            'total_revenue': p['total_revenue'],
-            'month_revenues': month_revenues
-        })
+    # Products with totals, per-product history and the recent-month grid
+    # (query by customer_id for fuzzy-matched customers)
+    grid = get_bucket_revenue_grid(bucket, customer_id=customer_id)
+    products = grid['products']
+    product_history = grid['product_history']
+    product_summary = grid['product_summary']
+    recent_months = grid['recent_months']
     
     # Get the bucket-level analysis if it exists
     analysis = RevenueAnalysis.query.filter_by(
@@ -838,54 +794,12 @@ def api_get_analysis_detail(analysis_id: int):
     if not analysis.customer_id:
         return '<div class="text-muted p-3">No matched customer for this alert.</div>'
 
-    # Build bucket product data (same logic as revenue_customer_view)
-    history = get_customer_revenue_history(
-        bucket=analysis.bucket, customer_id=analysis.customer_id
-    )
-    products = get_products_for_bucket(
-        bucket=analysis.bucket, customer_id=analysis.customer_id
+    # Same grid as the bucket section of revenue_customer_view
+    bucket_data = get_customer_revenue_view(analysis.customer_id)['bucket_product_data'].get(
+        analysis.bucket,
+        {'recent_months': [], 'product_summary': [], 'bucket_month_revenues': {}, 'bucket_total': 0},
     )
 
-    product_history = {}
-    for p in products:
-        p_history = get_product_revenue_history(
-            bucket=analysis.bucket, product=p['product'],
-            customer_id=analysis.customer_id,
-        )
-        if p_history:
-            product_history[p['product']] = p_history
-
-    # Collect months and pick 7 most recent
-    all_months: dict[str, object] = {}
-    for ph in product_history.values():
-        for rd in ph:
-            all_months[rd.fiscal_month] = rd.month_date
-    for rd in history:
-        all_months[rd.fiscal_month] = rd.month_date
-
-    sorted_months = sorted(all_months.items(), key=lambda x: x[1])
-    recent_months = [m[0] for m in sorted_months[-7:]]
-
-    product_summary = []
-    for p in products:
-        p_hist = product_history.get(p['product'], [])
-        month_revenues = {rd.fiscal_month: rd.revenue for rd in p_hist}
-        product_summary.append({
-            'product': p['product'],
-            'total_revenue': p['total_revenue'],
-            'month_revenues': month_revenues,
-        })
-
-    bucket_month_revenues = {rd.fiscal_month: rd.revenue for rd in history}
-    bucket_total = sum(rd.revenue for rd in history)
-
-    bucket_data = {
-        'recent_months': recent_months,
-        'product_summary': product_summary,
-        'bucket_month_revenues': bucket_month_revenues,
-        'bucket_total': bucket_total,
-    }
-
     return render_template(
         'partials/revenue_alert_detail.html',
         a=analysis,
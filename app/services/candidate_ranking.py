@@ -0,0 +1,185 @@
+"""Local BM25 pre-ranking of milestone/opportunity candidates for AI matching.
+
+The note form and Fill My Day send every milestone (or opportunity) on the
+customer to the gateway's match endpoints, which for large customers is
+hundreds of candidates per call. ``top_candidates`` scores candidates
+against the call notes with Okapi BM25 over their text fields and keeps the
+best ``MATCH_TOP_K``, so the model only reads the plausible ones.
+
+- ``AI_MATCH_TOP_K`` sets K (default 15); ``0`` sends the full list.
+- Lists of K or fewer candidates are sent unchanged, in their original order.
+- ``AI_MATCH_RECORD=1`` sends full lists and appends each case to
+  ``logs/match_cases.jsonl``. ``evaluate`` scores those cases offline;
+``scripts/evaluate_candidate_ranking.py`` runs it from the command line.
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+
+from app.services.diagnostic_log import LOG_DIR
+
+MATCH_TOP_K = int(os.environ.get('AI_MATCH_TOP_K', '15'))
+
+RECORD_FILE = os.path.join(LOG_DIR, 'match_cases.jsonl')
+
+# Candidate fields that carry text worth matching, per endpoint
+MILESTONE_FIELDS = ('name', 'workload', 'opportunity', 'opportunity_name')
+OPPORTUNITY_FIELDS = ('name', 'description', 'number')
+
+_FIELDS = {
+    '/v1/match-milestone': MILESTONE_FIELDS,
+    '/v1/match-opportunity': OPPORTUNITY_FIELDS,
+}
+_ID_KEYS = {
+    '/v1/match-milestone': 'milestone_id',
+    '/v1/match-opportunity': 'opportunity_id',
+}
+
+# BM25 parameters (the usual defaults)
+_K1 = 1.2
+_B = 0.75
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+_STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its of on or '
+    'our so that the their them they this to was we were will with you your'.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens without HTML tags or stopwords."""
+    return [t for t in _TOKEN_RE.findall(_TAG_RE.sub(' ', text or '').lower())
+            if t not in _STOPWORDS and len(t) > 1]
+
+
+def bm25_scores(query: str, documents: list[str]) -> list[float]:
+    """Okapi BM25 score of each document for ``query``."""
+    docs = [Counter(tokenize(d)) for d in documents]
+    if not docs:
+        return []
+    lengths = [sum(d.values()) for d in docs]
+    avg_length = (sum(lengths) / len(docs)) or 1.0
+    doc_freq = Counter(term for d in docs for term in d)
+    n = len(docs)
+
+    scores = [0.0] * n
+    for term in set(tokenize(query)):
+        df = doc_freq.get(term)
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i, d in enumerate(docs):
+            tf = d.get(term)
+            if tf:
+                norm = _K1 * (1 - _B + _B * lengths[i] / avg_length)
+                scores[i] += idf * tf * (_K1 + 1) / (tf + norm)
+    return scores
+
+
+def candidate_text(candidate: dict, fields: tuple[str, ...]) -> str:
+    """The text BM25 indexes for one candidate."""
+    return ' '.join(str(candidate.get(f) or '') for f in fields)
+
+
+def top_candidates(call_notes: str, candidates: list[dict], fields: tuple[str, ...],
+                   k: int | None = None) -> list[dict]:
+    """The ``k`` candidates that best match the notes, best first.
+
+    Returns ``candidates`` unchanged when ``k`` is 0 or the list is no
+    longer than ``k``. Ties (including candidates with no overlapping
+    terms) keep their original order.
+    """
+    k = MATCH_TOP_K if k is None else k
+    if k <= 0 or len(candidates) <= k:
+        return candidates
+    scores = bm25_scores(call_notes, [candidate_text(c, fields) for c in candidates])
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i], i))
+    return [candidates[i] for i in order[:k]]
+
+
+def recording_enabled() -> bool:
+    return os.environ.get('AI_MATCH_RECORD', '').lower() in ('1', 'true', 'yes')
+
+
+def prepare_candidates(endpoint: str, call_notes: str, candidates: list[dict]) -> list[dict]:
+    """Candidates to send to ``endpoint``: the top K, or all while recording."""
+    if recording_enabled():
+        return candidates
+    return top_candidates(call_notes, candidates, _FIELDS[endpoint])
+
+
+def record_case(endpoint: str, call_notes: str, candidates: list[dict],
+                result: dict[str, Any]) -> None:
+    """Append a full-list match to the evaluation file (when recording)."""
+    if not recording_enabled():
+        return
+    case = {
+        'ts': datetime.now(timezone.utc).isoformat(),
+        'endpoint': endpoint,
+        'call_notes': call_notes,
+        'candidates': candidates,
+        'matched_id': result.get(_ID_KEYS[endpoint]),
+    }
+    try:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        with open(RECORD_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(case, default=str) + '\n')
+    except OSError:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Offline evaluation
+# ---------------------------------------------------------------------------
+
+def load_cases(path: str) -> list[dict]:
+    """Recorded cases that have a full-list match to compare against."""
+    with open(path, encoding='utf-8') as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    return [c for c in cases if c.get('matched_id') and c.get('endpoint') in _FIELDS]
+
+
+def evaluate(cases: list[dict], ks: list[int], gateway: bool = False) -> list[dict]:
+    """Agreement with the full-list match for each K.
+
+    Returns one row per K with ``recall`` (full-list match kept in the
+    top K), the average candidates sent versus the full list, and, with
+    ``gateway=True``, ``agreement`` (the gateway returned the same match
+    from the top-K list).
+    """
+    if gateway:
+        from app.gateway_client import gateway_call
+
+    rows = []
+    for k in ks:
+        kept = agreed = sent = full = 0
+        for case in cases:
+            endpoint = case['endpoint']
+            ranked = top_candidates(case['call_notes'], case['candidates'], _FIELDS[endpoint], k)
+            ids = [c.get('id') for c in ranked]
+            kept += case['matched_id'] in ids
+            sent += len(ranked)
+            full += len(case['candidates'])
+            if gateway:
+                key = 'milestones' if endpoint == '/v1/match-milestone' else 'opportunities'
+                result = gateway_call(endpoint, {'call_notes': case['call_notes'], key: ranked})
+                agreed += result.get(_ID_KEYS[endpoint]) == case['matched_id']
+        n = len(cases) or 1
+        row = {
+            'k': k,
+            'cases': len(cases),
+            'recall': round(kept / n, 3),
+            'avg_sent': round(sent / n, 1),
+            'avg_full': round(full / n, 1),
+        }
+        if gateway:
+            row['agreement'] = round(agreed / n, 3)
+        rows.append(row)
+    return rows
+
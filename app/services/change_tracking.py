@@ -0,0 +1,109 @@
+"""
+Change tracking for derived tables.
+
+Snapshot and rollup tables built from other tables register their source
+models here. ``watch_model_changes`` calls back when a flush or an ORM bulk
+UPDATE/DELETE touches one of those models, so the owner can mark itself
+stale and refresh on its next read. ``refresh_on_commit`` instead rebuilds
+the derived table inside the commit of the transaction that changed its
+sources, so readers never have to write. Raw SQL writes through ``text()``
+or Core tables are not seen; those writers have to flag the owner themselves.
+"""
+import logging
+from itertools import chain
+from typing import Callable, Iterable, Mapping, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def _watch(
+    models: tuple,
+    on_change: Callable[[Session, type], None],
+    columns: Optional[Mapping[type, Iterable[str]]],
+) -> None:
+    """Call ``on_change(session, model)`` for each flushed or bulk change."""
+    columns = {model: tuple(names) for model, names in (columns or {}).items()}
+
+    def _counts(obj) -> bool:
+        names = columns.get(type(obj))
+        if names is None:
+            return True
+        attrs = inspect(obj).attrs
+        return any(attrs[name].history.has_changes() for name in names)
+
+    @event.listens_for(Session, 'after_flush')
+    def _on_flush(session, flush_context):
+        # Attribute history still holds the flushed changes at this point
+        for obj in chain(session.new, session.deleted):
+            if isinstance(obj, models):
+                on_change(session, type(obj))
+        for obj in session.dirty:
+            if isinstance(obj, models) and _counts(obj):
+                on_change(session, type(obj))
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _on_bulk(orm_execute_state):
+        mapper = orm_execute_state.bind_mapper
+        if ((orm_execute_state.is_update or orm_execute_state.is_delete)
+                and mapper is not None and mapper.class_ in models):
+            on_change(orm_execute_state.session, mapper.class_)
+
+
+def watch_model_changes(
+    models: Iterable[type],
+    on_change: Callable[[type], None],
+    columns: Optional[Mapping[type, Iterable[str]]] = None,
+) -> None:
+    """Call ``on_change(model)`` whenever rows of one of ``models`` change.
+
+    Args:
+        models: Model classes to watch.
+        on_change: Called with the model class of each changed row. It may
+            run several times per flush, so it should be cheap.
+        columns: Optional ``{model: attribute names}``. For these models a
+            flushed update only counts when one of the named attributes
+            changed. Inserts, deletes and bulk statements always count.
+    """
+    _watch(tuple(models), lambda session, model: on_change(model), columns)
+
+
+def refresh_on_commit(
+    models: Iterable[type],
+    refresh: Callable[[], None],
+    columns: Optional[Mapping[type, Iterable[str]]] = None,
+) -> None:
+    """Run ``refresh()`` inside each commit whose transaction changed ``models``.
+
+    The changes are flushed first, so ``refresh`` sees them and its own
+    writes commit atomically with them. It must not commit or roll back.
+    A failing refresh is logged and does not fail the caller's commit.
+
+    Args:
+        models: Model classes to watch.
+        refresh: Rebuilds the derived table through the session.
+        columns: As for ``watch_model_changes``.
+    """
+    key = ('refresh_on_commit', refresh)
+
+    def _mark(session, model):
+        session.info[key] = True
+
+    _watch(tuple(models), _mark, columns)
+
+    @event.listens_for(Session, 'before_commit')
+    def _before_commit(session):
+        session.flush()
+        if not session.info.pop(key, False):
+            return
+        try:
+            refresh()
+            session.flush()
+        except Exception:
+            logger.exception("Error refreshing %s on commit", refresh.__qualname__)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _after_rollback(session):
+        session.info.pop(key, None)
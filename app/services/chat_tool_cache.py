@@ -0,0 +1,80 @@
+"""Short-lived memo of SalesIQ tool results, scoped to one chat conversation.
+
+The copilot chat resends its history every turn, and the model tends to ask
+for the same ``get_customer_summary`` or ``report_workload`` again in later
+rounds and turns. Results are kept per conversation ID for ``TTL_SECONDS``
+so those repeats skip the database; the short TTL keeps answers close to
+what the user would see on the page.
+
+Only successful results are stored, as the serialized (and budget-shaped)
+tool message content plus the tokens shaping saved, so cached values are
+immutable. Set ``CHAT_TOOL_CACHE_TTL=0`` to
+disable the memo.
+
+Usage::
+
+    from app.services.chat_tool_cache import tool_results
+    memo = tool_results.get(conversation_id, name, args)  # (content, tokens_saved)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+TTL_SECONDS = float(os.environ.get('CHAT_TOOL_CACHE_TTL', '120'))
+MAX_ENTRIES = 512
+
+
+class ToolResultCache:
+    """Bounded, thread-safe TTL memo keyed on (conversation, tool, arguments)."""
+
+    def __init__(self, ttl: float = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, tuple[str, int]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(conversation_id: str, name: str, args: dict[str, Any]) -> tuple:
+        return conversation_id, name, json.dumps(args, sort_keys=True, default=str)
+
+    def get(self, conversation_id: str, name: str,
+            args: dict[str, Any]) -> tuple[str, int] | None:
+        """Return the memoized (content, tokens_saved), or None if absent or expired."""
+        if self.ttl <= 0:
+            return None
+        key = self._key(conversation_id, name, args)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, conversation_id: str, name: str, args: dict[str, Any],
+            value: tuple[str, int]) -> None:
+        """Memoize a successful tool result for this conversation."""
+        if self.ttl <= 0:
+            return
+        key = self._key(conversation_id, name, args)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+tool_results = ToolResultCache()
@@ -345,6 +345,9 @@ def finalize_alignments(synced_tpids: list[int]) -> dict:
             purge_pods += 1
 
     db.session.commit()
+    if purge_revenue:
+        from app.services.revenue_rollups import mark_revenue_rollups_stale
+        mark_revenue_rollups_stale()
 
     # Exit transition mode
     exit_transition_mode()
@@ -0,0 +1,247 @@
+"""Persistent response cache for deterministic AI gateway endpoints.
+
+Re-opening a note and asking for topic suggestions or a milestone match
+again sends the exact same prompt, as does Fill My Day when it reprocesses
+a meeting. Successful responses from those endpoints are stored in a small
+SQLite file next to the app database (``data/ai_response_cache.db``),
+keyed on the endpoint, a hash of the normalized payload and the gateway URL
+(so staging and production answers never mix).
+
+- Each endpoint has its own TTL; endpoints not listed in ``ENDPOINT_TTLS``
+  (notably ``/v1/chat``) are never cached.
+- Only successful responses are stored; gateway errors raise before they
+  reach the cache.
+- The file is bounded to ``MAX_ENTRIES`` rows, evicting least recently used.
+
+The cache lives in its own file rather than the app database because
+``gateway_call`` also runs in worker threads without an app context.
+Set ``AI_RESPONSE_CACHE=0`` to disable it.
+
+Usage::
+
+    from app.services.gateway_cache import lookup, store
+    cached = lookup(endpoint, payload, gateway_url)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+_HOUR = 3600
+_DAY = 24 * _HOUR
+
+# Endpoint -> seconds a response stays valid. Anything else is not cached.
+ENDPOINT_TTLS = {
+    '/v1/suggest-topics': 7 * _DAY,
+    '/v1/analyze-call': 7 * _DAY,
+    '/v1/match-milestone': _DAY,
+    '/v1/match-opportunity': _DAY,
+    '/v1/summarize-note': _DAY,
+}
+
+# Never cached, even if someone adds them to ENDPOINT_TTLS
+_NEVER_CACHED = frozenset({'/v1/chat', '/v1/ping'})
+
+MAX_ENTRIES = int(os.environ.get('AI_RESPONSE_CACHE_MAX_ENTRIES', '2000'))
+
+CACHE_FILENAME = 'ai_response_cache.db'
+
+_cache_path: str | None = None
+_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    response TEXT NOT NULL,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used_at);
+"""
+
+
+def is_enabled() -> bool:
+    """Return True if the cache has a file and isn't switched off."""
+    return bool(_cache_path) and os.environ.get('AI_RESPONSE_CACHE', '1').lower() not in ('0', 'false', 'no')
+
+
+def is_cacheable(endpoint: str) -> bool:
+    """Return True if responses from ``endpoint`` may be cached."""
+    return endpoint in ENDPOINT_TTLS and endpoint not in _NEVER_CACHED
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+def _normalize(value: Any) -> Any:
+    """Normalize line endings and surrounding whitespace in payload strings."""
+    if isinstance(value, str):
+        return value.replace('\r\n', '\n').strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def cache_key(endpoint: str, payload: dict[str, Any], gateway_url: str) -> str:
+    """Stable key for a request: endpoint, normalized payload, gateway URL."""
+    body = json.dumps(_normalize(payload), sort_keys=True, separators=(',', ':'), default=str)
+    digest = hashlib.sha256()
+    for part in (gateway_url.rstrip('/'), endpoint, body):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(_cache_path, timeout=5)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def lookup(endpoint: str, payload: dict[str, Any], gateway_url: str) -> dict[str, Any] | None:
+    """Return a cached response for this request, or None.
+
+    The returned dict carries ``cache_hit=True`` and ``tokens_saved`` (the
+    tokens the original call used); its ``usage`` token counts are zeroed
+    since nothing was spent.
+    """
+    if not is_enabled() or not is_cacheable(endpoint):
+        return None
+    key = cache_key(endpoint, payload, gateway_url)
+    now = time.time()
+    try:
+        with _lock, _connect() as conn:
+            row = conn.execute(
+                'SELECT response, total_tokens, expires_at FROM responses WHERE key = ?',
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+            conn.execute(
+                'UPDATE responses SET last_used_at = ?, hits = hits + 1 WHERE key = ?',
+                (now, key),
+            )
+        response = json.loads(row[0])
+    except (sqlite3.Error, ValueError):
+        logger.debug('AI response cache lookup failed', exc_info=True)
+        return None
+
+    usage = response.get('usage')
+    if isinstance(usage, dict):
+        response['usage'] = {
+            **usage, 'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0,
+        }
+    response['cache_hit'] = True
+    response['tokens_saved'] = row[1]
+    return response
+
+
+def store(endpoint: str, payload: dict[str, Any], gateway_url: str,
+          response: dict[str, Any]) -> None:
+    """Cache a successful response and evict least recently used overflow."""
+    if not is_enabled() or not is_cacheable(endpoint):
+        return
+    if not isinstance(response, dict) or response.get('success') is False or response.get('error'):
+        return
+    usage = response.get('usage') if isinstance(response.get('usage'), dict) else {}
+    # A gateway cache hit has zeroed usage; keep what the original call cost
+    total_tokens = int(usage.get('total_tokens') or response.get('tokens_saved') or 0)
+    now = time.time()
+    try:
+        body = json.dumps(response, default=str)
+        with _lock, _connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, endpoint, response, total_tokens, created_at, expires_at, last_used_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (cache_key(endpoint, payload, gateway_url), endpoint, body,
+                 total_tokens, now, now + ENDPOINT_TTLS[endpoint], now),
+            )
+            conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                ' SELECT key FROM responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)',
+                (MAX_ENTRIES,),
+            )
+    except (sqlite3.Error, TypeError, ValueError):
+        logger.debug('AI response cache store failed', exc_info=True)
+
+
+def clear() -> int:
+    """Delete every cached response. Returns the number removed."""
+    if not _cache_path or not os.path.exists(_cache_path):
+        return 0
+    with _lock, _connect() as conn:
+        return conn.execute('DELETE FROM responses').rowcount
+
+
+def get_stats() -> dict:
+    """Entry count and lifetime hits per endpoint, for the admin page."""
+    if not _cache_path or not os.path.exists(_cache_path):
+        return {'enabled': is_enabled(), 'entries': 0, 'hits': 0, 'endpoints': []}
+    with _lock, _connect() as conn:
+        rows = conn.execute(
+            'SELECT endpoint, COUNT(*), SUM(hits), SUM(hits * total_tokens) '
+            'FROM responses GROUP BY endpoint ORDER BY endpoint'
+        ).fetchall()
+    endpoints = [
+        {'endpoint': e, 'entries': n, 'hits': h or 0, 'tokens_saved': t or 0}
+        for e, n, h, t in rows
+    ]
+    return {
+        'enabled': is_enabled(),
+        'entries': sum(e['entries'] for e in endpoints),
+        'hits': sum(e['hits'] for e in endpoints),
+        'endpoints': endpoints,
+    }
+
+
+def log_fields(result: dict[str, Any]) -> dict[str, Any]:
+    """AIQueryLog columns describing whether ``result`` came from a cache.
+
+    Covers both the local cache (``cache_hit``) and the gateway's own
+    (``cached``); either way ``usage`` is zeroed and ``tokens_saved`` holds
+    the original call's tokens.
+    """
+    if result.get('cache_hit') or result.get('cached'):
+        return {'cache_hit': True, 'tokens_saved': result.get('tokens_saved') or 0}
+    return {'cache_hit': False}
+
+
+# ---------------------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------------------
+
+def init_gateway_cache(app) -> None:
+    """Place the cache file next to the SQLite database, if there is one."""
+    global _cache_path
+    db_url = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if not db_url.startswith('sqlite:///') or db_url.endswith(':memory:'):
+        _cache_path = None
+        return
+    db_path = db_url[len('sqlite:///'):]
+    _cache_path = os.path.join(os.path.dirname(os.path.abspath(db_path)), CACHE_FILENAME)
@@ -2,19 +2,24 @@
 Milestone sync service for Sales Buddy.
 
 Pulls active (uncommitted) milestones from MSX for all customers
-and upserts them into the local database. Uses 3 concurrent workers
-for the MSX API query phase, then writes to the database sequentially.
+and upserts them into the local database. Customers are synced in
+priority order (favorites, my-team customers, recent notes first) using
+3 concurrent workers for the MSX API queries; database writes happen
+sequentially on the calling thread as each fetch completes.
 """
 import json
 import logging
 import math
 import queue
 import time as _time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Generator, Tuple
 
-from app.models import db, Customer, Milestone, MilestoneAudit, MsxTask, Opportunity, User, SyncStatus
+from app.models import (
+    db, Customer, Engagement, Favorite, Milestone, MilestoneAudit, MsxTask,
+    Note, Opportunity, User, UserPreference, SyncStatus,
+)
 from app.services.msx_api import (
     extract_account_id_from_url,
     get_milestones_by_account,
@@ -28,8 +33,14 @@ from app.services.msx_api import (
     build_task_url,
     TASK_CATEGORIES,
     HOK_TASK_CATEGORIES,
+    MSX_MAX_CONCURRENCY,
 )
 from app.services.msx_auth import is_vpn_blocked
+from app.services.milestone_tracker_snapshot import (
+    query_tracker_rows,
+    refresh_tracker_snapshot,
+    tracker_filter_options,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +48,101 @@ logger = logging.getLogger(__name__)
 ACTIVE_STATUSES = {'On Track', 'At Risk', 'Blocked'}
 
 # Number of concurrent workers for MSX API queries
-_MILESTONE_WORKERS = 3
+_MILESTONE_WORKERS = MSX_MAX_CONCURRENCY
+
+# Weights for ordering the sync queue. Each customer scores the sum of the
+# weights for the signals it matches; higher scores are fetched and committed
+# first. Overridable via UserPreference.milestone_sync_priority (JSON).
+DEFAULT_SYNC_PRIORITY_WEIGHTS = {
+    'favorite': 100,       # has a favorited milestone, engagement or opportunity
+    'my_team': 50,         # has a milestone I'm on the team for
+    'recent_notes': 25,    # has a note dated this week
+}
+
+
+def get_sync_priority_weights() -> Dict[str, int]:
+    """Return the sync priority weights, with any saved overrides applied."""
+    weights = dict(DEFAULT_SYNC_PRIORITY_WEIGHTS)
+    pref = UserPreference.query.first()
+    if pref and pref.milestone_sync_priority:
+        try:
+            overrides = json.loads(pref.milestone_sync_priority)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring invalid milestone_sync_priority preference")
+            return weights
+        for key, value in overrides.items():
+            if key in weights and isinstance(value, (int, float)):
+                weights[key] = int(value)
+    return weights
+
+
+def _customer_sync_priorities(
+    weights: Optional[Dict[str, int]] = None,
+) -> Dict[int, int]:
+    """
+    Score customers for sync ordering.
+
+    Runs one query per signal and returns {customer_id: score} for customers
+    that match at least one signal. Customers not in the dict score 0.
+    """
+    if weights is None:
+        weights = get_sync_priority_weights()
+
+    signals: Dict[str, set] = {}
+
+    fav_ids = set()
+    for model, object_type in (
+        (Milestone, 'milestone'),
+        (Engagement, 'engagement'),
+        (Opportunity, 'opportunity'),
+    ):
+        rows = db.session.query(model.customer_id).join(
+            Favorite,
+            db.and_(Favorite.object_type == object_type,
+                    Favorite.object_id == model.id),
+        ).filter(model.customer_id.isnot(None)).distinct()
+        fav_ids.update(cid for (cid,) in rows)
+    signals['favorite'] = fav_ids
+
+    signals['my_team'] = {
+        cid for (cid,) in db.session.query(Milestone.customer_id).filter(
+            Milestone.on_my_team.is_(True),
+            Milestone.customer_id.isnot(None),
+        ).distinct()
+    }
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today - timedelta(days=today.weekday())
+    signals['recent_notes'] = {
+        cid for (cid,) in db.session.query(Note.customer_id).filter(
+            Note.call_date >= week_start,
+            Note.customer_id.isnot(None),
+        ).distinct()
+    }
+
+    scores: Dict[int, int] = {}
+    for signal, customer_ids in signals.items():
+        weight = weights.get(signal, 0)
+        if not weight:
+            continue
+        for cid in customer_ids:
+            scores[cid] = scores.get(cid, 0) + weight
+    return scores
+
+
+def _prioritized_sync_customers() -> Tuple[List[Customer], Dict[int, int]]:
+    """
+    Return customers with MSX account links, highest sync priority first.
+
+    Ties keep a stable alphabetical order so runs are predictable.
+    """
+    customers = Customer.query.filter(
+        Customer.tpid_url.isnot(None),
+        Customer.tpid_url != '',
+    ).all()
+    scores = _customer_sync_priorities()
+    customers.sort(key=lambda c: (-scores.get(c.id, 0), c.get_display_name().lower()))
+    return customers, scores
 
 
 def sync_all_customer_milestones() -> Dict[str, Any]:
@@ -76,11 +181,8 @@ def sync_all_customer_milestones() -> Dict[str, Any]:
         "duration_seconds": 0,
     }
     
-    # Get all customers with MSX account links
-    customers = Customer.query.filter(
-        Customer.tpid_url.isnot(None),
-        Customer.tpid_url != '',
-    ).all()
+    # Get all customers with MSX account links, high-priority accounts first
+    customers, _scores = _prioritized_sync_customers()
     
     if not customers:
         results["success"] = True
@@ -159,6 +261,9 @@ def sync_all_customer_milestones() -> Dict[str, Any]:
         audit_result = stop.value
         results["audit_fields_saved"] = audit_result.get("fields_saved", 0)
 
+    # Rebuild tracker rows for everything this sync touched
+    refresh_tracker_snapshot()
+
     logger.info(
         f"Milestone sync complete: {results['customers_synced']} synced, "
         f"{results['customers_failed']} failed, "
@@ -182,11 +287,14 @@ def sync_all_customer_milestones() -> Dict[str, Any]:
 
 
 def _ms_fetch_worker(
-    tasks: List[tuple],
+    task_q: queue.Queue,
     progress_q: queue.Queue,
 ) -> None:
     """
-    Worker thread: fetch milestones from MSX for a batch of customers.
+    Worker thread: fetch milestones from MSX for customers pulled off task_q.
+
+    task_q is pre-filled in priority order, so the pool as a whole always
+    picks up the highest-priority customer that hasn't been fetched yet.
 
     Puts results onto progress_q as tuples of
     ('fetched', cust_id, cust_name, msx_result),
@@ -196,7 +304,12 @@ def _ms_fetch_worker(
     """
     from app.services.msx_api import msx_retry_state
 
-    for cust_id, cust_name, account_id in tasks:
+    while True:
+        try:
+            cust_id, cust_name, account_id = task_q.get_nowait()
+        except queue.Empty:
+            break
+
         if is_vpn_blocked():
             progress_q.put(('vpn', cust_id, cust_name, None))
             return
@@ -225,21 +338,20 @@ def sync_all_customer_milestones_stream(
     """
     Stream milestone sync progress as Server-Sent Events.
 
-    Uses 3 concurrent workers for the MSX API query phase, then writes
-    to the database sequentially.
+    Customers are queued in priority order (favorites, my-team customers,
+    customers with notes this week) and fetched by 3 concurrent workers.
+    Each customer's milestones are written as soon as its fetch returns,
+    so high-priority accounts are committed within the first few seconds.
 
     Event types:
-        - start: total customer count
+        - start: total customer count and how many were prioritized
         - progress: per-customer fetch/write result
         - vpn_blocked: VPN block detected
         - complete: final summary (includes opportunities_created)
     """
     start_time = _time.time()
 
-    customers = Customer.query.filter(
-        Customer.tpid_url.isnot(None),
-        Customer.tpid_url != '',
-    ).all()
+    customers, scores = _prioritized_sync_customers()
 
     total = len(customers)
     if total == 0:
@@ -258,52 +370,57 @@ def sync_all_customer_milestones_stream(
 
     # Mark sync as started so interrupted syncs are detectable
     SyncStatus.mark_started('milestones')
-    yield _sse_event('start', {'total': total})
+    yield _sse_event('start', {
+        'total': total,
+        'prioritized': sum(1 for c in customers if scores.get(c.id)),
+    })
 
     # -----------------------------------------------------------------
-    # Prep: extract account IDs (fast, main thread)
+    # Prep: extract account IDs (fast, main thread), in priority order
     # -----------------------------------------------------------------
-    customer_tasks = []   # [(cust_id, cust_name, account_id), ...]
+    task_q = queue.Queue()
     customer_map = {}     # cust_id -> Customer
     skip_ids = set()      # customers where account_id extraction failed
 
     for c in customers:
         account_id = extract_account_id_from_url(c.tpid_url)
         if account_id:
-            customer_tasks.append((c.id, c.get_display_name(), account_id))
+            task_q.put((c.id, c.get_display_name(), account_id))
             customer_map[c.id] = c
         else:
             skip_ids.add(c.id)
 
     # -----------------------------------------------------------------
-    # Phase 1: Parallel MSX queries (3 workers)
+    # Phase 1: Parallel MSX queries (3 workers) with sequential DB writes
+    # as each fetch completes
     # -----------------------------------------------------------------
-    fetch_results = {}    # cust_id -> msx_result dict
     progress_q = queue.Queue()
-    n_workers = min(_MILESTONE_WORKERS, len(customer_tasks)) if customer_tasks else 0
+    n_workers = min(_MILESTONE_WORKERS, len(customer_map))
     vpn_hit = False
-    fetched = 0
+    processed = 0
 
-    if n_workers > 0:
-        chunk_size = math.ceil(len(customer_tasks) / n_workers)
-        chunks = [
-            customer_tasks[i:i + chunk_size]
-            for i in range(0, len(customer_tasks), chunk_size)
-        ]
-        actual_workers = len(chunks)
+    synced = 0
+    failed = len(skip_ids)
+    total_created = 0
+    total_updated = 0
+    total_deactivated = 0
+    total_opps_created = 0
+    total_tasks_created = 0
+    total_tasks_updated = 0
+    errors: List[str] = []
 
-        with ThreadPoolExecutor(max_workers=actual_workers) as pool:
-            for chunk in chunks:
-                pool.submit(_ms_fetch_worker, chunk, progress_q)
+    if n_workers > 0:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            for _ in range(n_workers):
+                pool.submit(_ms_fetch_worker, task_q, progress_q)
 
             done_count = 0
-            while done_count < actual_workers:
-                msg = progress_q.get()
-                evt, cust_id, cust_name, result = msg
+            while done_count < n_workers:
+                evt, cust_id, cust_name, result = progress_q.get()
 
                 if evt == 'vpn':
                     vpn_hit = True
-                    remaining = total - fetched - len(skip_ids)
+                    remaining = total - processed - len(skip_ids)
                     yield _sse_event('vpn_blocked', {
                         'message': 'IP address is blocked -- connect to VPN and retry.',
                         'skipped': remaining,
@@ -311,99 +428,70 @@ def sync_all_customer_milestones_stream(
                     break
                 elif evt == 'retry':
                     yield _sse_event('progress', {
-                        'current': fetched,
+                        'current': processed,
                         'total': total,
                         'customer': result,
                         'status': 'retrying',
-                        'progress': int((fetched / total) * 65),
+                        'progress': int((processed / total) * 70),
                     })
                 elif evt == 'fetched':
-                    fetch_results[cust_id] = result
-                    fetched += 1
+                    processed += 1
                     SyncStatus.update_heartbeat('milestones')
-                    pct = int((fetched / total) * 65)  # 0-65%
-                    yield _sse_event('progress', {
-                        'current': fetched,
-                        'total': total,
-                        'customer': cust_name,
-                        'status': 'fetching',
-                        'progress': pct,
-                    })
+                    pct = int((processed / total) * 70)  # 0-70%
+
+                    if not result or not result.get('success'):
+                        failed += 1
+                        err = result.get('error', 'Fetch failed') if result else 'No data'
+                        errors.append(f"{cust_name}: {err}")
+                        yield _sse_event('progress', {
+                            'current': processed,
+                            'total': total,
+                            'customer': cust_name,
+                            'status': 'error',
+                            'error': err,
+                            'progress': pct,
+                        })
+                        continue
+
+                    try:
+                        wr = _apply_customer_milestones(
+                            customer_map[cust_id], result.get('milestones', [])
+                        )
+                        if wr['success']:
+                            synced += 1
+                            total_created += wr['created']
+                            total_updated += wr['updated']
+                            total_deactivated += wr['deactivated']
+                            total_opps_created += wr['opportunities_created']
+
+                            yield _sse_event('progress', {
+                                'current': processed,
+                                'total': total,
+                                'customer': cust_name,
+                                'status': 'ok',
+                                'created': wr['created'],
+                                'updated': wr['updated'],
+                                'progress': pct,
+                            })
+                        else:
+                            failed += 1
+                            errors.append(f"{cust_name}: {wr['error']}")
+                    except Exception as e:
+                        failed += 1
+                        errors.append(f"{cust_name}: {str(e)}")
+                        logger.exception(f"Error saving milestones for customer {cust_id}")
                 elif evt == 'done':
                     done_count += 1
 
     if vpn_hit:
         SyncStatus.mark_completed(
-            'milestones', success=False, items_synced=0,
+            'milestones', success=False, items_synced=total_created + total_updated,
             details=json.dumps({'error': 'VPN blocked'}),
         )
         return
 
     # -----------------------------------------------------------------
-    # Phase 2: Sequential DB writes
-    # -----------------------------------------------------------------
-    synced = 0
-    failed = len(skip_ids)
-    total_created = 0
-    total_updated = 0
-    total_deactivated = 0
-    total_opps_created = 0
-    total_tasks_created = 0
-    total_tasks_updated = 0
-    errors: List[str] = []
-
-    write_count = len(customer_tasks)
-    for i, (cust_id, cust_name, _acct) in enumerate(customer_tasks, 1):
-        customer = customer_map[cust_id]
-        fetch_data = fetch_results.get(cust_id)
-        SyncStatus.update_heartbeat('milestones')
-
-        if not fetch_data or not fetch_data.get('success'):
-            failed += 1
-            err = fetch_data.get('error', 'Fetch failed') if fetch_data else 'No data'
-            errors.append(f"{cust_name}: {err}")
-            pct = 65 + int((i / write_count) * 5)  # 65-70%
-            yield _sse_event('progress', {
-                'current': fetched + i,
-                'total': total,
-                'customer': cust_name,
-                'status': 'error',
-                'error': err,
-                'progress': pct,
-            })
-            continue
-
-        try:
-            wr = _apply_customer_milestones(
-                customer, fetch_data.get('milestones', [])
-            )
-            if wr['success']:
-                synced += 1
-                total_created += wr['created']
-                total_updated += wr['updated']
-                total_deactivated += wr['deactivated']
-                total_opps_created += wr['opportunities_created']
-
-                pct = 65 + int((i / write_count) * 5)  # 65-70%
-                yield _sse_event('progress', {
-                    'current': fetched + i,
-                    'total': total,
-                    'customer': cust_name,
-                    'status': 'ok',
-                    'created': wr['created'],
-                    'updated': wr['updated'],
-                    'progress': pct,
-                })
-            else:
-                failed += 1
-                errors.append(f"{cust_name}: {wr['error']}")
-        except Exception as e:
-            failed += 1
-            errors.append(f"{cust_name}: {str(e)}")
-            logger.exception(f"Error saving milestones for customer {cust_id}")
-
-    # -----------------------------------------------------------------
-    # Phase 2b: Batched task sync (per-batch progress)
+    # Phase 2: Batched task sync (per-batch progress)
     # -----------------------------------------------------------------
     yield _sse_event('task_sync_start', {
         'message': 'Syncing tasks for milestones...',
@@ -504,6 +592,9 @@ def sync_all_customer_milestones_stream(
         'audit_fields_saved': audit_fields_saved,
     })
 
+    # Rebuild tracker rows for everything this sync touched
+    refresh_tracker_snapshot()
+
     duration = round(_time.time() - start_time, 1)
     sync_success = synced > 0 or failed == 0
 
@@ -984,6 +1075,18 @@ def _sync_customer_tasks(
     return result
 
 
+def _fetch_comments_worker(msx_milestone_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Worker thread: fetch forecast comments for one milestone (API only).
+
+    Returns None without calling MSX if a VPN block was detected, so
+    queued fetches drain quickly once the sync has to bail.
+    """
+    if is_vpn_blocked():
+        return None
+    return get_milestone_comments(msx_milestone_id)
+
+
 def _sync_team_milestone_comments(
     since: Optional[datetime] = None,
 ) -> Generator[
@@ -993,7 +1096,11 @@ def _sync_team_milestone_comments(
     Sync forecast comments from MSX for milestones where the user is on the team.
 
     Skips milestones whose comments were already cached during this sync
-    (details_fetched_at >= since).
+    (details_fetched_at >= since) and milestones whose MSX modifiedon has
+    not advanced since their comments were cached (see
+    Milestone.comments_stale). The remaining fetches run concurrently,
+    bounded by MSX_MAX_CONCURRENCY; DB writes stay on the calling thread
+    and are skipped when the comment content hash is unchanged.
 
     Args:
         since: If provided, skip milestones with details_fetched_at >= this time
@@ -1006,7 +1113,8 @@ def _sync_team_milestone_comments(
         Dict with:
         - success: bool
         - comments_synced: int (milestones whose comments were updated)
-        - comments_skipped: int (already cached from bulk fetch)
+        - comments_skipped: int (already cached from bulk fetch or not modified)
+        - comments_unchanged: int (fetched, but content matched the cache)
         - comments_failed: int
         - error: str if completely failed
     """
@@ -1014,6 +1122,7 @@ def _sync_team_milestone_comments(
         "success": True,
         "comments_synced": 0,
         "comments_skipped": 0,
+        "comments_unchanged": 0,
         "comments_failed": 0,
         "error": "",
     }
@@ -1034,52 +1143,69 @@ def _sync_team_milestone_comments(
     if not team_milestones:
         return result
 
-    # Filter out milestones already cached during this sync
-    if since_naive:
-        need_fetch = [
-            ms for ms in team_milestones
-            if not ms.details_fetched_at or ms.details_fetched_at < since_naive
-        ]
-        result["comments_skipped"] = len(team_milestones) - len(need_fetch)
-    else:
-        need_fetch = team_milestones
+    # Filter out milestones already cached during this sync, then those
+    # whose modifiedon hasn't moved since their comments were cached.
+    need_fetch = [
+        ms for ms in team_milestones
+        if not (
+            since_naive
+            and ms.details_fetched_at
+            and ms.details_fetched_at >= since_naive
+        )
+        and ms.comments_stale
+    ]
+    result["comments_skipped"] = len(team_milestones) - len(need_fetch)
 
     if not need_fetch:
         logger.info(
             f"All {len(team_milestones)} team milestones already have "
-            f"fresh comments from bulk fetch - skipping comment sync"
+            f"fresh comments - skipping comment sync"
         )
         return result
 
     total = len(need_fetch)
     now = datetime.now(timezone.utc)
+    n_workers = min(MSX_MAX_CONCURRENCY, total)
 
-    for i, ms in enumerate(need_fetch, 1):
-        yield (i, total, ms.title or ms.milestone_number or "Unknown")
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        futures = {
+            pool.submit(_fetch_comments_worker, ms.msx_milestone_id): ms
+            for ms in need_fetch
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            ms = futures[future]
+            yield (i, total, ms.title or ms.milestone_number or "Unknown")
 
-        if is_vpn_blocked():
-            result["error"] = "VPN blocked during comment sync"
-            break
+            try:
+                comment_result = future.result()
+            except Exception:
+                result["comments_failed"] += 1
+                logger.exception(
+                    f"Error fetching comments for milestone {ms.msx_milestone_id}"
+                )
+                continue
+
+            if comment_result is None or is_vpn_blocked():
+                result["error"] = "VPN blocked during comment sync"
+                for pending in futures:
+                    pending.cancel()
+                break
 
-        try:
-            comment_result = get_milestone_comments(ms.msx_milestone_id)
             if comment_result.get("success"):
-                ms.cached_comments_json = json.dumps(
-                    comment_result.get("comments", [])
+                changed = ms.set_cached_comments(
+                    json.dumps(comment_result.get("comments", []))
                 )
-                ms.details_fetched_at = now
-                result["comments_synced"] += 1
+                if changed:
+                    ms.details_fetched_at = now
+                    result["comments_synced"] += 1
+                else:
+                    result["comments_unchanged"] += 1
             else:
                 result["comments_failed"] += 1
                 logger.warning(
                     f"Failed to fetch comments for milestone {ms.msx_milestone_id}: "
                     f"{comment_result.get('error')}"
                 )
-        except Exception as e:
-            result["comments_failed"] += 1
-            logger.exception(
-                f"Error fetching comments for milestone {ms.msx_milestone_id}"
-            )
 
     try:
         db.session.commit()
@@ -1120,7 +1246,7 @@ def _update_milestone_from_msx(
     # Cache comments if included in the bulk fetch (None = field not requested,
     # so we only update when the key is present in the dict)
     if "comments_json" in msx_data:
-        milestone.cached_comments_json = msx_data["comments_json"] or "[]"
+        milestone.set_cached_comments(msx_data["comments_json"] or "[]")
         milestone.details_fetched_at = now
 
 
@@ -1153,7 +1279,7 @@ def _create_milestone_from_msx(
     )
     # Cache comments if included in the bulk fetch
     if "comments_json" in msx_data:
-        ms.cached_comments_json = msx_data["comments_json"] or "[]"
+        ms.set_cached_comments(msx_data["comments_json"] or "[]")
         ms.details_fetched_at = now
     return ms
 
@@ -1497,118 +1623,28 @@ def _update_deal_team_memberships() -> None:
         db.session.rollback()
 
 
-def get_milestone_tracker_data() -> Dict[str, Any]:
+def get_milestone_tracker_data(per_page: Optional[int] = None) -> Dict[str, Any]:
     """
     Get milestone data formatted for the tracker page.
     
-    Returns active milestones grouped by urgency, sorted by dollar value
-    (largest first within each group).
+    Reads the precomputed tracker snapshot (refreshing any stale rows
+    first), sorted by monthly usage (largest first). Customer favicons are
+    referenced by URL rather than embedded.
+    
+    Args:
+        per_page: Return only the first page of this many rows (the
+            summary still covers every row); None returns all rows.
     
     Returns:
         Dict with:
         - milestones: list of milestone dicts with customer/seller info
         - summary: dict with totals and counts
         - last_sync: datetime of most recent sync, or None
+        - sellers, areas, quarters: filter dropdown options
     """
-    # Query all milestones with eager-loaded relationships
-    milestones = (
-        Milestone.query
-        .options(
-            db.joinedload(Milestone.customer).joinedload(Customer.seller),
-            db.joinedload(Milestone.customer).joinedload(Customer.territory),
-            db.joinedload(Milestone.opportunity),
-        )
-        .all()
-    )
-    
-    # Build the data structure
-    now = datetime.now(timezone.utc)
-    tracker_items = []
-    
-    total_monthly_usage = 0
-    past_due_count = 0
-    this_week_count = 0
-    
-    for ms in milestones:
-        urgency = ms.due_date_urgency
-        if urgency == 'past_due':
-            past_due_count += 1
-        elif urgency == 'this_week':
-            this_week_count += 1
-        
-        if ms.monthly_usage and ms.monthly_usage > 0:
-            total_monthly_usage += ms.monthly_usage
-        
-        # Days until due
-        days_until = None
-        fiscal_quarter = ""
-        fiscal_year = ""
-        if ms.due_date:
-            due = ms.due_date if ms.due_date.tzinfo else ms.due_date.replace(tzinfo=timezone.utc)
-            days_until = (due - now).days
-            # Microsoft fiscal year starts July 1
-            # Q1 = Jul-Sep, Q2 = Oct-Dec, Q3 = Jan-Mar, Q4 = Apr-Jun
-            month = ms.due_date.month
-            year = ms.due_date.year
-            if month >= 7:
-                fy = year + 1
-                q = 1 if month <= 9 else 2
-            else:
-                fy = year
-                q = 3 if month <= 3 else 4
-            fiscal_quarter = f"FY{fy % 100:02d} Q{q}"
-            fiscal_year = f"FY{fy % 100:02d}"
-        
-        # Extract area prefix from workload (e.g., "Infra" from "Infra: Windows")
-        workload_area = ""
-        if ms.workload and ':' in ms.workload:
-            workload_area = ms.workload.split(':', 1)[0].strip()
-        elif ms.workload:
-            workload_area = ms.workload.strip()
-        
-        tracker_items.append({
-            "id": ms.id,
-            "title": ms.display_text,
-            "milestone_number": ms.milestone_number,
-            "status": ms.msx_status,
-            "status_sort": ms.status_sort_order,
-            "opportunity_name": ms.opportunity_name,
-            "workload": ms.workload,
-            "workload_area": workload_area,
-            "monthly_usage": ms.monthly_usage,
-            "due_date": ms.due_date,
-            "dollar_value": ms.dollar_value,
-            "days_until_due": days_until,
-            "fiscal_quarter": fiscal_quarter,
-            "fiscal_year": fiscal_year,
-            "urgency": urgency,
-            "url": ms.url,
-            "msx_milestone_id": ms.msx_milestone_id,
-            "last_synced_at": ms.last_synced_at,
-            "on_my_team": ms.on_my_team,
-            "customer_commitment": ms.customer_commitment or "",
-            "customer": {
-                "id": ms.customer.id if ms.customer else None,
-                "name": ms.customer.get_display_name() if ms.customer else "Unknown",
-                "favicon_b64": ms.customer.favicon_b64 if ms.customer else None,
-                "tpid_url": ms.customer.tpid_url if ms.customer else None,
-            } if ms.customer else None,
-            "seller": {
-                "id": ms.customer.seller.id,
-                "name": ms.customer.seller.name,
-            } if ms.customer and ms.customer.seller else None,
-            "territory": {
-                "id": ms.customer.territory.id,
-                "name": ms.customer.territory.name,
-            } if ms.customer and ms.customer.territory else None,
-            "opportunity": {
-                "id": ms.opportunity.id,
-                "name": ms.opportunity.name,
-            } if ms.opportunity else None,
-        })
-    
-    # Default sort: largest monthly usage first
-    tracker_items.sort(key=lambda x: -(x["monthly_usage"] or 0))
+
+    data = query_tracker_rows(sort='monthly_usage', direction='desc', per_page=per_page)
+    options = tracker_filter_options()
     
     # Get last sync time
     last_sync = (
@@ -1617,198 +1653,43 @@ def get_milestone_tracker_data() -> Dict[str, Any]:
         .scalar()
     )
     
-    # Get unique sellers for filter dropdown
-    seller_ids = set()
-    sellers = []
-    for item in tracker_items:
-        if item["seller"] and item["seller"]["id"] not in seller_ids:
-            seller_ids.add(item["seller"]["id"])
-            sellers.append(item["seller"])
-    sellers.sort(key=lambda s: s["name"])
-    
-    # Get unique workload areas for filter dropdown
-    areas = sorted(set(
-        item["workload_area"] for item in tracker_items
-        if item["workload_area"]
-    ))
-    
-    # Get unique fiscal quarters for filter dropdown, sorted chronologically
-    quarters = sorted(set(
-        item["fiscal_quarter"] for item in tracker_items
-        if item["fiscal_quarter"]
-    ))
-    
     return {
-        "milestones": tracker_items,
-        "summary": {
-            "total_count": len(tracker_items),
-            "total_monthly_usage": total_monthly_usage,
-            "past_due_count": past_due_count,
-            "this_week_count": this_week_count,
-        },
+        "milestones": data["milestones"],
+        "summary": data["summary"],
         "last_sync": last_sync,
-        "sellers": sellers,
-        "areas": areas,
-        "quarters": quarters,
+        "sellers": options["sellers"],
+        "areas": options["areas"],
+        "quarters": options["quarters"],
     }
 
 
-def get_milestone_tracker_data_for_seller(seller_id: int) -> Dict[str, Any]:
+def get_milestone_tracker_data_for_seller(seller_id: int,
+                                         per_page: Optional[int] = None) -> Dict[str, Any]:
     """
     Get milestone tracker data filtered for a specific seller's customers.
     
     Returns the same format as get_milestone_tracker_data, but only includes
-    milestones for customers assigned to the specified seller.
+    milestones for customers assigned to the specified seller that the user
+    is on the team for, sorted by due date (closest first, nulls last).
     
     Args:
         seller_id: The ID of the seller to filter by
+        per_page: Return only the first page of this many rows; None
+            returns all rows.
         
     Returns:
         Dict with milestones, summary, areas, quarters (no sellers list needed)
     """
-    from app.models import Seller
-    
-    # Get seller's customer IDs
-    seller = db.session.get(Seller, seller_id)
-    if not seller:
-        return {
-            "milestones": [],
-            "summary": {
-                "total_count": 0,
-                "total_monthly_usage": 0,
-                "past_due_count": 0,
-                "this_week_count": 0,
-            },
-            "areas": [],
-            "quarters": [],
-        }
-    
-    customer_ids = [c.id for c in seller.customers]
-    if not customer_ids:
-        return {
-            "milestones": [],
-            "summary": {
-                "total_count": 0,
-                "total_monthly_usage": 0,
-                "past_due_count": 0,
-                "this_week_count": 0,
-            },
-            "areas": [],
-            "quarters": [],
-        }
-    
-    # Query milestones for this seller's customers (only ones we're on the team for)
-    milestones = (
-        Milestone.query
-        .filter(
-            Milestone.customer_id.in_(customer_ids),
-            Milestone.on_my_team == True,
-        )
-        .options(
-            db.joinedload(Milestone.customer).joinedload(Customer.seller),
-            db.joinedload(Milestone.customer).joinedload(Customer.territory),
-            db.joinedload(Milestone.opportunity),
-        )
-        .all()
+
+    data = query_tracker_rows(
+        seller_id=seller_id, on_my_team=True, sort='due_date', direction='asc',
+        per_page=per_page,
     )
-    
-    # Build the data structure (same format as get_milestone_tracker_data)
-    now = datetime.now(timezone.utc)
-    tracker_items = []
-    
-    total_monthly_usage = 0
-    past_due_count = 0
-    this_week_count = 0
-    
-    for ms in milestones:
-        urgency = ms.due_date_urgency
-        if urgency == 'past_due':
-            past_due_count += 1
-        elif urgency == 'this_week':
-            this_week_count += 1
-        
-        if ms.monthly_usage and ms.monthly_usage > 0:
-            total_monthly_usage += ms.monthly_usage
-        
-        # Days until due
-        days_until = None
-        fiscal_quarter = ""
-        if ms.due_date:
-            due = ms.due_date if ms.due_date.tzinfo else ms.due_date.replace(tzinfo=timezone.utc)
-            days_until = (due - now).days
-            # Microsoft fiscal year starts July 1
-            month = ms.due_date.month
-            year = ms.due_date.year
-            if month >= 7:
-                fy = year + 1
-                q = 1 if month <= 9 else 2
-            else:
-                fy = year
-                q = 3 if month <= 3 else 4
-            fiscal_quarter = f"FY{fy % 100:02d} Q{q}"
-        
-        # Extract area prefix from workload
-        workload_area = ""
-        if ms.workload and ':' in ms.workload:
-            workload_area = ms.workload.split(':', 1)[0].strip()
-        elif ms.workload:
-            workload_area = ms.workload.strip()
-        
-        tracker_items.append({
-            "id": ms.id,
-            "title": ms.display_text,
-            "milestone_number": ms.milestone_number,
-            "status": ms.msx_status,
-            "status_sort": ms.status_sort_order,
-            "opportunity_name": ms.opportunity_name,
-            "workload": ms.workload,
-            "workload_area": workload_area,
-            "monthly_usage": ms.monthly_usage,
-            "due_date": ms.due_date,
-            "dollar_value": ms.dollar_value,
-            "days_until_due": days_until,
-            "fiscal_quarter": fiscal_quarter,
-            "urgency": urgency,
-            "url": ms.url,
-            "msx_milestone_id": ms.msx_milestone_id,
-            "on_my_team": ms.on_my_team,
-            "customer_commitment": ms.customer_commitment or "",
-            "customer": {
-                "id": ms.customer.id if ms.customer else None,
-                "name": ms.customer.get_display_name() if ms.customer else "Unknown",
-                "favicon_b64": ms.customer.favicon_b64 if ms.customer else None,
-                "tpid_url": ms.customer.tpid_url if ms.customer else None,
-            } if ms.customer else None,
-            "seller": {
-                "id": ms.customer.seller.id,
-                "name": ms.customer.seller.name,
-            } if ms.customer and ms.customer.seller else None,
-        })
-    
-    # Sort by due date (closest first, nulls last) to match seller view expectation
-    far_future = datetime(9999, 12, 31, tzinfo=timezone.utc)
-    tracker_items.sort(key=lambda x: x["due_date"].replace(tzinfo=timezone.utc) if x["due_date"] else far_future)
-    
-    # Get unique workload areas
-    areas = sorted(set(
-        item["workload_area"] for item in tracker_items
-        if item["workload_area"]
-    ))
-    
-    # Get unique fiscal quarters
-    quarters = sorted(set(
-        item["fiscal_quarter"] for item in tracker_items
-        if item["fiscal_quarter"]
-    ))
+    options = tracker_filter_options(seller_id=seller_id, team_only=True)
     
     return {
-        "milestones": tracker_items,
-        "summary": {
-            "total_count": len(tracker_items),
-            "total_monthly_usage": total_monthly_usage,
-            "past_due_count": past_due_count,
-            "this_week_count": this_week_count,
-        },
-        "areas": areas,
-        "quarters": quarters,
+        "milestones": data["milestones"],
+        "summary": data["summary"],
+        "areas": options["areas"],
+        "quarters": options["quarters"],
     }
@@ -0,0 +1,526 @@
+"""
+Milestone tracker snapshot for Sales Buddy.
+
+Maintains the denormalized ``milestone_tracker_rows`` table so the
+Milestone Tracker can be served without joining customers, sellers,
+territories and opportunities (or shipping every customer's base64
+favicon) on each page load.
+
+Rows are refreshed incrementally: a single SQL pass finds milestones whose
+row is missing, whose ``updated_at`` moved, or whose customer/seller/
+territory/opportunity context changed, and rebuilds just those rows.
+Any commit that changed one of those tables (a milestone sync, a customer
+rename, a favicon fetch) refreshes the stale rows inside that same commit,
+and ``refresh_tracker_snapshot()`` can be called directly (it also runs
+once at startup). Reads are plain SELECTs against the snapshot.
+"""
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import String, and_, case, cast, func, or_
+
+from app.models import (
+    db, Customer, Milestone, MilestoneTrackerRow, Opportunity, Seller, Territory,
+)
+from app.services.change_tracking import refresh_on_commit
+from app.services.msx_api import MILESTONE_STATUS_ORDER
+
+logger = logging.getLogger(__name__)
+
+# Sort keys accepted by query_tracker_rows -> snapshot column
+SORT_COLUMNS = {
+    'monthly_usage': MilestoneTrackerRow.monthly_usage,
+    'dollar_value': MilestoneTrackerRow.dollar_value,
+    'due_date': MilestoneTrackerRow.due_date,
+    'customer': MilestoneTrackerRow.customer_name,
+    'seller': MilestoneTrackerRow.seller_name,
+    'title': MilestoneTrackerRow.title,
+    'status': MilestoneTrackerRow.status_sort,
+    'workload': MilestoneTrackerRow.workload,
+}
+
+# Rows the tracker page renders up front and asks the API for per page
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Rebuild in batches so IN (...) lists stay under SQLite's variable limit
+_REFRESH_BATCH = 500
+
+# Tables a tracker row is built from
+_SOURCE_MODELS = (Milestone, Customer, Seller, Territory, Opportunity)
+
+
+def fiscal_period(due_date: Optional[datetime]) -> Tuple[str, str]:
+    """
+    Return (fiscal_quarter, fiscal_year) labels for a due date.
+
+    Microsoft fiscal year starts July 1:
+    Q1 = Jul-Sep, Q2 = Oct-Dec, Q3 = Jan-Mar, Q4 = Apr-Jun.
+
+    Returns:
+        Tuple like ("FY26 Q3", "FY26"), or ("", "") when no date.
+    """
+    if not due_date:
+        return "", ""
+    month = due_date.month
+    year = due_date.year
+    if month >= 7:
+        fy = year + 1
+        q = 1 if month <= 9 else 2
+    else:
+        fy = year
+        q = 3 if month <= 3 else 4
+    return f"FY{fy % 100:02d} Q{q}", f"FY{fy % 100:02d}"
+
+
+def workload_area(workload: Optional[str]) -> str:
+    """Extract the area prefix from a workload (e.g. "Infra" from "Infra: Windows")."""
+    if not workload:
+        return ""
+    if ':' in workload:
+        return workload.split(':', 1)[0].strip()
+    return workload.strip()
+
+
+def _context_signature_expr():
+    """
+    SQL expression fingerprinting the non-milestone data a row depends on.
+
+    Evaluated both when a row is built and when checking for staleness, so
+    renaming a customer, reassigning its seller or fetching a new favicon
+    (which bumps ``Customer.updated_at``) marks its rows stale without
+    reading the favicon itself.
+    """
+    parts = [
+        cast(Customer.id, String),
+        func.coalesce(Customer.nickname, Customer.name),
+        Customer.tpid_url,
+        cast(Customer.updated_at, String),
+        cast(Seller.id, String),
+        Seller.name,
+        cast(Territory.id, String),
+        Territory.name,
+        cast(Opportunity.id, String),
+        Opportunity.name,
+    ]
+    expr = func.coalesce(parts[0], '')
+    for part in parts[1:]:
+        expr = expr + '|' + func.coalesce(part, '')
+    return expr
+
+
+def _source_query():
+    """Base query joining a milestone to everything its tracker row needs."""
+    return (
+        db.session.query(Milestone)
+        .outerjoin(Customer, Milestone.customer_id == Customer.id)
+        .outerjoin(Seller, Customer.seller_id == Seller.id)
+        .outerjoin(Territory, Customer.territory_id == Territory.id)
+        .outerjoin(Opportunity, Milestone.opportunity_id == Opportunity.id)
+    )
+
+
+def _find_stale_milestone_ids() -> List[int]:
+    """Return IDs of milestones whose tracker row is missing or out of date."""
+    row = MilestoneTrackerRow
+    stale = (
+        _source_query()
+        .outerjoin(row, row.milestone_id == Milestone.id)
+        .filter(or_(
+            row.id.is_(None),
+            row.milestone_updated_at.is_(None),
+            row.milestone_updated_at != Milestone.updated_at,
+            row.on_my_team != Milestone.on_my_team,
+            row.context_signature != _context_signature_expr(),
+        ))
+        .with_entities(Milestone.id)
+        .all()
+    )
+    return [r[0] for r in stale]
+
+
+def _favicon_version(has_favicon: bool, customer_updated_at: Optional[datetime]) -> Optional[int]:
+    """Favicon cache-buster: the customer's last update in milliseconds."""
+    if not has_favicon:
+        return None
+    if customer_updated_at is None:
+        return 1
+    if customer_updated_at.tzinfo is None:
+        customer_updated_at = customer_updated_at.replace(tzinfo=timezone.utc)
+    return int(customer_updated_at.timestamp() * 1000)
+
+
+def _build_rows(milestone_ids: List[int], now: datetime) -> List[Dict[str, Any]]:
+    """Build snapshot row dicts for the given milestones (one SELECT, no blobs)."""
+    results = (
+        _source_query()
+        .filter(Milestone.id.in_(milestone_ids))
+        .with_entities(
+            Milestone.id,
+            Milestone.title,
+            Milestone.milestone_number,
+            Milestone.url,
+            Milestone.msx_status,
+            Milestone.opportunity_name,
+            Milestone.workload,
+            Milestone.monthly_usage,
+            Milestone.dollar_value,
+            Milestone.due_date,
+            Milestone.msx_milestone_id,
+            Milestone.last_synced_at,
+            Milestone.on_my_team,
+            Milestone.customer_commitment,
+            Milestone.updated_at,
+            Customer.id,
+            func.coalesce(Customer.nickname, Customer.name),
+            Customer.tpid_url,
+            Customer.favicon_b64.isnot(None),
+            Customer.updated_at,
+            Seller.id,
+            Seller.name,
+            Territory.id,
+            Territory.name,
+            Opportunity.id,
+            Opportunity.name,
+            _context_signature_expr(),
+        )
+        .all()
+    )
+
+    rows = []
+    for (ms_id, title, number, url, status, opp_name, workload, usage,
+         dollars, due_date, msx_id, last_synced, on_team, commitment,
+         updated_at, cust_id, cust_name, tpid_url, has_favicon, cust_updated_at, seller_id,
+         seller_name, terr_id, terr_name, opp_id, opp_ref_name,
+         signature) in results:
+        quarter, year = fiscal_period(due_date)
+        rows.append({
+            "milestone_id": ms_id,
+            # Mirrors Milestone.display_text
+            "title": title or number or 'View in MSX',
+            "milestone_number": number,
+            "status": status,
+            "status_sort": MILESTONE_STATUS_ORDER.get(status, 99),
+            "opportunity_name": opp_name,
+            "workload": workload,
+            "workload_area": workload_area(workload),
+            "monthly_usage": usage,
+            "dollar_value": dollars,
+            "due_date": due_date,
+            "fiscal_quarter": quarter,
+            "fiscal_year": year,
+            "url": url,
+            "msx_milestone_id": msx_id,
+            "last_synced_at": last_synced,
+            "on_my_team": bool(on_team),
+            "customer_commitment": commitment,
+            "customer_id": cust_id,
+            "customer_name": cust_name,
+            "customer_tpid_url": tpid_url,
+            "favicon_version": _favicon_version(has_favicon, cust_updated_at),
+            "seller_id": seller_id,
+            "seller_name": seller_name,
+            "territory_id": terr_id,
+            "territory_name": terr_name,
+            "opportunity_id": opp_id,
+            "opportunity_ref_name": opp_ref_name,
+            "milestone_updated_at": updated_at,
+            "context_signature": signature,
+            "refreshed_at": now,
+        })
+    return rows
+
+
+def _rebuild_rows(milestone_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuild stale (or the given) rows in the current transaction."""
+    now = datetime.now(timezone.utc)
+    # Drop rows whose milestone was deleted
+    orphaned = (
+        db.session.query(MilestoneTrackerRow.id)
+        .outerjoin(Milestone, MilestoneTrackerRow.milestone_id == Milestone.id)
+        .filter(Milestone.id.is_(None))
+        .all()
+    )
+    if orphaned:
+        MilestoneTrackerRow.query.filter(
+            MilestoneTrackerRow.id.in_([r[0] for r in orphaned])
+        ).delete(synchronize_session=False)
+
+    if milestone_ids is None:
+        ids = _find_stale_milestone_ids()
+    else:
+        ids = list(milestone_ids)
+
+    for start in range(0, len(ids), _REFRESH_BATCH):
+        batch = ids[start:start + _REFRESH_BATCH]
+        MilestoneTrackerRow.query.filter(
+            MilestoneTrackerRow.milestone_id.in_(batch)
+        ).delete(synchronize_session=False)
+        rows = _build_rows(batch, now)
+        if rows:
+            db.session.execute(db.insert(MilestoneTrackerRow), rows)
+    return len(ids)
+
+
+def _refresh_in_commit() -> None:
+    _rebuild_rows()
+
+
+refresh_on_commit(_SOURCE_MODELS, _refresh_in_commit)
+
+
+def refresh_tracker_snapshot(milestone_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Bring milestone_tracker_rows up to date and commit.
+
+    Args:
+        milestone_ids: Force-rebuild these milestones' rows. When omitted,
+            stale rows are detected automatically.
+
+    Returns:
+        Number of rows rebuilt.
+    """
+    try:
+        rebuilt = _rebuild_rows(milestone_ids)
+        db.session.commit()
+        return rebuilt
+    except Exception:
+        db.session.rollback()
+        logger.exception("Error refreshing milestone tracker snapshot")
+        return 0
+
+
+def favicon_url(customer_id: Optional[int], version: Optional[int]) -> Optional[str]:
+    """URL for a customer's cached favicon, versioned so browsers can cache it."""
+    if not customer_id or not version:
+        return None
+    return f"/api/customer/{customer_id}/favicon?v={version}"
+
+
+def row_to_item(row: MilestoneTrackerRow, now: datetime) -> Dict[str, Any]:
+    """
+    Convert a snapshot row to the tracker item dict the templates expect.
+
+    Urgency and days-until-due depend on today's date, so they're derived
+    here rather than stored.
+    """
+    days_until = None
+    urgency = 'no_date'
+    if row.due_date:
+        due = row.due_date if row.due_date.tzinfo else row.due_date.replace(tzinfo=timezone.utc)
+        days_until = (due - now).days
+        if days_until < 0:
+            urgency = 'past_due'
+        elif days_until <= 7:
+            urgency = 'this_week'
+        elif days_until <= 30:
+            urgency = 'this_month'
+        else:
+            urgency = 'future'
+
+    return {
+        "id": row.milestone_id,
+        "title": row.title,
+        "milestone_number": row.milestone_number,
+        "status": row.status,
+        "status_sort": row.status_sort,
+        "opportunity_name": row.opportunity_name,
+        "workload": row.workload,
+        "workload_area": row.workload_area or "",
+        "monthly_usage": row.monthly_usage,
+        "due_date": row.due_date,
+        "dollar_value": row.dollar_value,
+        "days_until_due": days_until,
+        "fiscal_quarter": row.fiscal_quarter or "",
+        "fiscal_year": row.fiscal_year or "",
+        "urgency": urgency,
+        "url": row.url,
+        "msx_milestone_id": row.msx_milestone_id,
+        "last_synced_at": row.last_synced_at,
+        "on_my_team": row.on_my_team,
+        "customer_commitment": row.customer_commitment or "",
+        "customer": {
+            "id": row.customer_id,
+            "name": row.customer_name or "Unknown",
+            "favicon_url": favicon_url(row.customer_id, row.favicon_version),
+            "tpid_url": row.customer_tpid_url,
+        } if row.customer_id else None,
+        "seller": {
+            "id": row.seller_id,
+            "name": row.seller_name,
+        } if row.seller_id else None,
+        "territory": {
+            "id": row.territory_id,
+            "name": row.territory_name,
+        } if row.territory_id else None,
+        "opportunity": {
+            "id": row.opportunity_id,
+            "name": row.opportunity_ref_name,
+        } if row.opportunity_id else None,
+    }
+
+
+def _urgency_filter(urgency: str, now_naive: datetime):
+    """SQL filter matching row_to_item's urgency buckets."""
+    due = MilestoneTrackerRow.due_date
+    week_end = now_naive + timedelta(days=8)
+    month_end = now_naive + timedelta(days=31)
+    if urgency == 'past_due':
+        return due < now_naive
+    if urgency == 'this_week':
+        return and_(due >= now_naive, due < week_end)
+    if urgency == 'this_month':
+        return and_(due >= week_end, due < month_end)
+    if urgency == 'future':
+        return due >= month_end
+    if urgency == 'no_date':
+        return due.is_(None)
+    return None
+
+
+def query_tracker_rows(
+    seller_id: Optional[int] = None,
+    areas: Optional[List[str]] = None,
+    quarters: Optional[List[str]] = None,
+    statuses: Optional[List[str]] = None,
+    urgency: Optional[str] = None,
+    on_my_team: Optional[bool] = None,
+    commitment: Optional[str] = None,
+    milestone_ids: Optional[Iterable[int]] = None,
+    search: Optional[str] = None,
+    sort: str = 'monthly_usage',
+    direction: str = 'desc',
+    page: int = 1,
+    per_page: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Filter, sort and paginate tracker rows in SQL.
+
+    Only refreshes the snapshot first if a source table changed since the
+    last refresh; otherwise this is read-only.
+
+    Args:
+        seller_id: Only milestones for this seller's customers.
+        areas: Workload areas to include.
+        quarters: Fiscal quarter labels to include (empty list = none).
+        statuses: MSX statuses to include.
+        urgency: One of past_due, this_week, this_month, future, no_date.
+        on_my_team: True for milestones the user is on the team for,
+            False for the rest.
+        commitment: Customer commitment value (Committed, Uncommitted).
+        milestone_ids: Only these milestones (e.g. the user's favorites).
+        search: Case-insensitive substring over title, opportunity,
+            customer, seller and workload.
+        sort: Key from SORT_COLUMNS.
+        direction: 'asc' or 'desc' (NULLs always sort last).
+        page: 1-based page number.
+        per_page: Page size (capped at MAX_PAGE_SIZE); None returns all rows.
+
+    Returns:
+        Dict with milestones (tracker item dicts), total, page, per_page,
+        pages and summary (computed over the whole filtered set).
+    """
+    now = datetime.now(timezone.utc)
+    now_naive = now.replace(tzinfo=None)
+    row = MilestoneTrackerRow
+    q = row.query
+
+    if seller_id:
+        q = q.filter(row.seller_id == seller_id)
+    if areas:
+        q = q.filter(row.workload_area.in_(areas))
+    if quarters is not None:
+        # Milestones without a due date have no quarter and stay visible
+        q = q.filter(or_(row.fiscal_quarter.in_(quarters), row.fiscal_quarter == ''))
+    if statuses:
+        q = q.filter(row.status.in_(statuses))
+    if urgency:
+        cond = _urgency_filter(urgency, now_naive)
+        if cond is not None:
+            q = q.filter(cond)
+    if on_my_team is not None:
+        q = q.filter(row.on_my_team.is_(on_my_team))
+    if commitment:
+        q = q.filter(row.customer_commitment == commitment)
+    if milestone_ids is not None:
+        q = q.filter(row.milestone_id.in_(list(milestone_ids)))
+    if search:
+        like = f"%{search.lower()}%"
+        q = q.filter(or_(
+            func.lower(row.title).like(like),
+            func.lower(row.opportunity_name).like(like),
+            func.lower(row.customer_name).like(like),
+            func.lower(row.seller_name).like(like),
+            func.lower(row.workload).like(like),
+        ))
+
+    totals = q.with_entities(
+        func.count(row.id),
+        func.coalesce(func.sum(case((row.monthly_usage > 0, row.monthly_usage), else_=0)), 0),
+        func.coalesce(func.sum(case((row.due_date < now_naive, 1), else_=0)), 0),
+        func.coalesce(func.sum(case(
+            (and_(row.due_date >= now_naive,
+                  row.due_date < now_naive + timedelta(days=8)), 1),
+            else_=0,
+        )), 0),
+    ).one()
+    total = totals[0]
+
+    sort_col = SORT_COLUMNS.get(sort, row.monthly_usage)
+    ordering = sort_col.asc() if direction == 'asc' else sort_col.desc()
+    q = q.order_by(sort_col.is_(None), ordering, row.milestone_id)
+
+    if per_page:
+        per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+        page = max(1, page)
+        q = q.offset((page - 1) * per_page).limit(per_page)
+        pages = max(1, math.ceil(total / per_page))
+    else:
+        page, pages = 1, 1
+
+    return {
+        "milestones": [row_to_item(r, now) for r in q.all()],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": pages,
+        "summary": {
+            "total_count": total,
+            "total_monthly_usage": totals[1],
+            "past_due_count": totals[2],
+            "this_week_count": totals[3],
+        },
+    }
+
+
+def tracker_filter_options(seller_id: Optional[int] = None,
+                           team_only: bool = False) -> Dict[str, List]:
+    """
+    Distinct sellers, workload areas and fiscal quarters for filter dropdowns.
+
+    Args:
+        seller_id: Restrict options to one seller's rows.
+        team_only: Restrict options to on-my-team rows.
+    """
+    row = MilestoneTrackerRow
+    base = row.query
+    if seller_id:
+        base = base.filter(row.seller_id == seller_id)
+    if team_only:
+        base = base.filter(row.on_my_team.is_(True))
+
+    sellers = [
+        {"id": sid, "name": name}
+        for sid, name in base.filter(row.seller_id.isnot(None))
+        .with_entities(row.seller_id, row.seller_name).distinct().all()
+    ]
+    sellers.sort(key=lambda s: s["name"] or "")
+    areas = sorted(
+        a for (a,) in base.with_entities(row.workload_area).distinct().all() if a
+    )
+    quarters = sorted(
+        fq for (fq,) in base.with_entities(row.fiscal_quarter).distinct().all() if fq
+    )
+    return {"sellers": sellers, "areas": areas, "quarters": quarters}
@@ -121,7 +121,7 @@ def _refresh_cached_comments(msx_milestone_id: str, app=None) -> None:
                 msx_milestone_id=msx_milestone_id
             ).first()
             if ms:
-                ms.cached_comments_json = comments_json
+                ms.set_cached_comments(comments_json)
                 db.session.commit()
                 print(f"[milestone-tracking] refreshed cached comments for {msx_milestone_id}")
 
@@ -34,6 +34,11 @@ MSX_APP_ID = "fe0c3504-3700-e911-a849-000d3a10b7cc"
 # failing fast on Dynamics 365 hiccups (was 45s, caused multi-minute stalls).
 REQUEST_TIMEOUT = 15
 
+# Max concurrent MSX requests any one bulk operation should issue.
+# Dynamics 365 starts throttling (429 / timeouts) above ~3 parallel callers
+# per user, so every thread pool that fans out MSX calls sizes itself to this.
+MSX_MAX_CONCURRENCY = 3
+
 
 def _is_writeback_disabled() -> bool:
     """Check if MSX writeback is disabled via environment variable."""
@@ -957,7 +962,7 @@ def get_milestone_audits(
     try:
         from concurrent.futures import ThreadPoolExecutor, as_completed
         completed = 0
-        with ThreadPoolExecutor(max_workers=3) as pool:
+        with ThreadPoolExecutor(max_workers=MSX_MAX_CONCURRENCY) as pool:
             futures = {pool.submit(_fetch_batch, b): b for b in batches}
             for future in as_completed(futures):
                 result = future.result()
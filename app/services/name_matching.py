@@ -0,0 +1,288 @@
+"""
+Company name matching for linking free-text names to local records.
+
+Used by the revenue import to link MSXI account names to customers.
+Shared-note and partner imports do not use it: they match on TPID, exact
+lower-cased names and website domains (``note_sharing``,
+``partner_sharing.PartnerImportIndex``), since a prefix or acronym hit there
+would attach shared data to a different record.
+
+Matching tiers, in order:
+1. Case-insensitive exact match on the name or nickname
+2. Progressive word-prefix matching ("Azara Healthcare, LLC" -> "Azara Healthcare")
+3. Acronym matching ("Facilities Survey Inc" <-> "FSI")
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional
+
+from app.models import Customer
+
+
+# Words too short or generic to match on when dropping trailing words
+_SKIP_WORDS = {
+    'a', 'an', 'the', 'of', 'and', 'for', 'in', 'at', 'by', 'to',
+    'american', 'national', 'global', 'united', 'general', 'international',
+}
+
+# Minimum number of words required for a prefix match
+_MIN_PREFIX_WORDS = 1
+
+# Minimum character length for a single-word prefix match
+_MIN_PREFIX_LEN = 4
+
+
+def _clean_for_matching(name: str) -> str:
+    """Clean a company name for prefix matching.
+
+    Lowercases, strips punctuation (commas, periods, etc.), and collapses
+    whitespace so "Azara Healthcare, LLC" becomes "azara healthcare llc".
+
+    Args:
+        name: Raw company name
+
+    Returns:
+        Cleaned lowercase string with punctuation removed
+    """
+    cleaned = re.sub(r'[^\w\s]', '', name.lower())
+    return ' '.join(cleaned.split())
+
+
+def _progressive_word_prefix_match(
+    name_a: str,
+    name_b: str,
+) -> bool:
+    """Check if one name's words match the leading words of the other,
+    progressively dropping trailing words.
+
+    Works at the WORD level, not character level. So "streamline health"
+    does NOT match "streamline healthcare" on the first try (because
+    "health" != "healthcare"), but after dropping "health", "streamline"
+    matches the first word of "streamline healthcare solutions".
+
+    Args:
+        name_a: First cleaned name (from _clean_for_matching)
+        name_b: Second cleaned name (from _clean_for_matching)
+
+    Returns:
+        True if a progressive word-level prefix match is found
+    """
+    if not name_a or not name_b:
+        return False
+
+    words_a = name_a.split()
+    words_b = name_b.split()
+
+    # Try both directions
+    for src_words, tgt_words in [(words_a, words_b), (words_b, words_a)]:
+        # Progressively drop trailing words from src and check if
+        # the remaining words match the leading words of tgt exactly
+        candidate = list(src_words)
+        while candidate:
+            if len(candidate) <= len(tgt_words):
+                # Check if candidate words match the first N words of target
+                if candidate == tgt_words[:len(candidate)]:
+                    # Ensure the match is meaningful
+                    match_str = ' '.join(candidate)
+                    if len(candidate) >= 2 or len(match_str) >= _MIN_PREFIX_LEN:
+                        return True
+            candidate.pop()
+            # Skip trailing stop words
+            while candidate and candidate[-1] in _SKIP_WORDS:
+                candidate.pop()
+
+    return False
+
+
+def _get_acronym(name: str) -> str:
+    """Get the acronym from a company name (first letter of each word).
+
+    Only uses words that are 2+ chars and not stop words.
+    E.g., "Facilities Survey Inc" -> "FSI"
+
+    Args:
+        name: Company name
+
+    Returns:
+        Uppercase acronym string, or empty string if too short
+    """
+    cleaned = re.sub(r'[^\w\s]', '', name)
+    words = [w for w in cleaned.split() if len(w) >= 2 and w.lower() not in _SKIP_WORDS]
+    return ''.join(w[0] for w in words).upper()
+
+
+def _build_customer_lookup() -> tuple[
+    dict[str, int],
+    list[tuple[str, int]],
+    dict[str, int],
+]:
+    """Build customer lookup structures for matching revenue data to customers.
+
+    Returns:
+        Tuple of:
+        - Quick lookup dict: lowercased exact name/nickname -> customer ID
+        - Cleaned names list: (cleaned_name, customer_id) for prefix matching
+        - Acronym lookup: uppercase acronym -> customer ID (for names/nicknames
+          that are 2-6 chars and look like acronyms)
+    """
+    exact_lookup: dict[str, int] = {}
+    cleaned_names: list[tuple[str, int]] = []
+    acronym_lookup: dict[str, int] = {}
+
+    for c in Customer.query.all():
+        exact_lookup[c.name.lower()] = c.id
+        cleaned_names.append((_clean_for_matching(c.name), c.id))
+        # Register acronym of long customer names so CSV short names can match
+        # e.g., customer "Facilities Survey Inc" -> acronym "FSI"
+        name_acronym = _get_acronym(c.name)
+        if len(name_acronym) >= 2 and name_acronym not in acronym_lookup:
+            acronym_lookup[name_acronym] = c.id
+        # If customer name itself looks like an acronym (2-6 chars, all alpha),
+        # register it so revenue names can match by their acronym
+        stripped = c.name.strip()
+        if 2 <= len(stripped) <= 6 and stripped.isalpha():
+            acronym_lookup[stripped.upper()] = c.id
+        if c.nickname:
+            exact_lookup[c.nickname.lower()] = c.id
+            cleaned_names.append((_clean_for_matching(c.nickname), c.id))
+            nick_acronym = _get_acronym(c.nickname)
+            if len(nick_acronym) >= 2 and nick_acronym not in acronym_lookup:
+                acronym_lookup[nick_acronym] = c.id
+            nick_stripped = c.nickname.strip()
+            if 2 <= len(nick_stripped) <= 6 and nick_stripped.isalpha():
+                acronym_lookup[nick_stripped.upper()] = c.id
+
+    return exact_lookup, cleaned_names, acronym_lookup
+
+
+def _resolve_customer_id(
+    exact_lookup: dict[str, int],
+    cleaned_names: list[tuple[str, int]],
+    customer_name: str,
+    acronym_lookup: dict[str, int] | None = None,
+) -> int | None:
+    """Look up a customer ID using exact match, prefix match, then acronym.
+
+    Matching tiers:
+    1. Exact match on name or nickname (case-insensitive)
+    2. Progressive word-prefix matching (drop trailing words)
+    3. Acronym matching ("Facilities Survey Inc" -> "FSI")
+
+    Args:
+        exact_lookup: Dict from _build_customer_lookup() for exact matches
+        cleaned_names: List from _build_customer_lookup() for prefix matches
+        customer_name: Raw customer name from revenue data
+        acronym_lookup: Optional dict from _build_customer_lookup() for acronyms
+
+    Returns:
+        Customer ID if found, None otherwise
+    """
+    # Tier 1: Exact match on name or nickname (case-insensitive)
+    result = exact_lookup.get(customer_name.lower())
+    if result is not None:
+        return result
+
+    # Tier 2: Progressive prefix matching
+    cleaned = _clean_for_matching(customer_name)
+    if len(cleaned) >= _MIN_PREFIX_LEN:
+        for cust_cleaned, cust_id in cleaned_names:
+            if _progressive_word_prefix_match(cleaned, cust_cleaned):
+                return cust_id
+
+    # Tier 3: Acronym matching
+    # Direction A: Revenue name is long, customer name is short acronym
+    #   e.g., CSV "Facilities Survey Inc" -> acronym "FSI" -> matches customer "FSI"
+    # Direction B: Revenue name is short acronym, customer name is long
+    #   e.g., CSV "FSI" -> direct lookup -> matches acronym of "Facilities Survey Inc"
+    if acronym_lookup:
+        # Direction A: compute acronym of the CSV name
+        acronym = _get_acronym(customer_name)
+        if len(acronym) >= 2:
+            result = acronym_lookup.get(acronym)
+            if result is not None:
+                return result
+        # Direction B: CSV name itself might be an acronym — look it up directly
+        stripped = customer_name.strip()
+        if 2 <= len(stripped) <= 6 and stripped.isalpha():
+            result = acronym_lookup.get(stripped.upper())
+            if result is not None:
+                return result
+
+    return None
+
+
+class NameResolver:
+    """Indexed, memoized name resolver built once and reused for many lookups.
+
+    Gives the same answers as :func:`_resolve_customer_id` over the same
+    lookup structures, but tier 2 only scans candidates that share the
+    query's first word (every progressive prefix match requires equal
+    first words), and each distinct name is resolved once.
+
+    Args:
+        exact_lookup: Normalized name -> ID for tier 1
+        cleaned_names: (cleaned_name, ID) pairs in priority order for tier 2
+        acronym_lookup: Uppercase acronym -> ID for tier 3
+    """
+
+    def __init__(
+        self,
+        exact_lookup: dict[str, int],
+        cleaned_names: Iterable[tuple[str, int]] = (),
+        acronym_lookup: Optional[dict[str, int]] = None,
+    ):
+        self._exact = exact_lookup
+        self._acronyms = acronym_lookup or {}
+        self._memo: dict[str, Optional[int]] = {}
+
+        # Inverted index: first word -> [(cleaned_name, id), ...] in the
+        # original order, so the first hit matches the linear scan's answer
+        self._by_first_word: dict[str, list[tuple[str, int]]] = {}
+        for cleaned, record_id in cleaned_names:
+            words = cleaned.split()
+            if words:
+                self._by_first_word.setdefault(words[0], []).append((cleaned, record_id))
+
+    @classmethod
+    def for_customers(cls) -> 'NameResolver':
+        """Build a resolver over every customer's name and nickname."""
+        exact_lookup, cleaned_names, acronym_lookup = _build_customer_lookup()
+        return cls(exact_lookup, cleaned_names, acronym_lookup)
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Return the matching ID for ``name`` using all tiers, or None."""
+        if name in self._memo:
+            return self._memo[name]
+        result = self._resolve(name)
+        self._memo[name] = result
+        return result
+
+    def _resolve(self, name: str) -> Optional[int]:
+        # Tier 1: Exact match on name or nickname (case-insensitive)
+        result = self._exact.get(name.lower())
+        if result is not None:
+            return result
+
+        # Tier 2: Progressive prefix matching against same-first-word candidates
+        cleaned = _clean_for_matching(name)
+        if len(cleaned) >= _MIN_PREFIX_LEN:
+            first_word = cleaned.split()[0]
+            for cust_cleaned, record_id in self._by_first_word.get(first_word, ()):
+                if _progressive_word_prefix_match(cleaned, cust_cleaned):
+                    return record_id
+
+        # Tier 3: Acronym matching (both directions, see _resolve_customer_id)
+        if self._acronyms:
+            acronym = _get_acronym(name)
+            if len(acronym) >= 2:
+                result = self._acronyms.get(acronym)
+                if result is not None:
+                    return result
+            stripped = name.strip()
+            if 2 <= len(stripped) <= 6 and stripped.isalpha():
+                result = self._acronyms.get(stripped.upper())
+                if result is not None:
+                    return result
+
+        return None
@@ -134,23 +134,57 @@ def serialize_all_partners() -> list[dict]:
 # ---------------------------------------------------------------------------
 
 
-def _find_matching_partner(name: str, website: str) -> Partner | None:
-    """Find an existing partner by normalized name or normalized website."""
-    normalized = _normalize_company_name(name)
-    partners = Partner.query.all()
-    # Try name match (normalized — strips LLC, Inc, etc.)
-    for p in partners:
-        if _normalize_company_name(p.name) == normalized:
-            return p
-    # Try website match
-    if website:
+class PartnerImportIndex:
+    """Lookup tables for matching a batch of received partners, built once.
+
+    Loads every partner (with contacts and specialties) and every specialty
+    in three queries, then matches by normalized name or website domain in
+    O(1). Partners created during an import are added to the index, so a
+    later duplicate in the same payload updates the new record instead of
+    creating a second one. Preview and apply use the same matching rules.
+    """
+
+    def __init__(self):
+        partners = (
+            Partner.query
+            .options(db.selectinload(Partner.contacts), db.selectinload(Partner.specialties))
+            .order_by(Partner.id)
+            .all()
+        )
+        self._by_name: dict[str, Partner] = {}
+        self._by_domain: dict[str, Partner] = {}
         for p in partners:
-            if p.website and _extract_domain(p.website).lower() == website:
-                return p
-    return None
+            self.add(p)
+        self._specialties: dict[str, Specialty] = {
+            s.name.lower(): s for s in Specialty.query.all()
+        }
+
+    def add(self, partner: Partner) -> None:
+        """Index a partner by name and domain (the first one indexed wins)."""
+        self._by_name.setdefault(_normalize_company_name(partner.name), partner)
+        if partner.website:
+            self._by_domain.setdefault(_extract_domain(partner.website).lower(), partner)
+
+    def match(self, name: str, website: str) -> Partner | None:
+        """Find an existing partner by normalized name or normalized website."""
+        partner = self._by_name.get(_normalize_company_name(name))
+        if partner is None and website:
+            partner = self._by_domain.get(website)
+        return partner
+
+    def specialty(self, name: str) -> Specialty:
+        """Return the specialty with this name (case-insensitive), creating it if new."""
+        specialty = self._specialties.get(name.lower())
+        if specialty is None:
+            specialty = Specialty(name=name)
+            db.session.add(specialty)
+            self._specialties[name.lower()] = specialty
+        return specialty
 
 
-def upsert_partner(data: dict, sender_name: str) -> dict:
+def upsert_partner(
+    data: dict, sender_name: str, index: PartnerImportIndex | None = None,
+) -> dict:
     """Upsert a single partner from received share data.
 
     Matching: case-insensitive name OR website.
@@ -163,6 +197,9 @@ def upsert_partner(data: dict, sender_name: str) -> dict:
 
     For new partners: create as duplicate of sender's data.
 
+    Pass ``index`` when upserting several partners so the directory is
+    loaded once; changes are left in the session for the caller to commit.
+
     Returns: {action: "created"|"updated", name: str}
     """
     name = (data.get("name") or "").strip()
@@ -172,16 +209,21 @@ def upsert_partner(data: dict, sender_name: str) -> dict:
     if not name:
         return {"action": "skipped", "name": "(empty)"}
 
+    if index is None:
+        index = PartnerImportIndex()
+
     # Find existing match: normalized name OR normalized website
-    existing = _find_matching_partner(name, website)
+    existing = index.match(name, website)
 
     if existing:
-        return _update_existing_partner(existing, data, sender_name)
+        return _update_existing_partner(existing, data, sender_name, index)
     else:
-        return _create_new_partner(data)
+        return _create_new_partner(data, index)
 
 
-def _update_existing_partner(partner: Partner, data: dict, sender_name: str) -> dict:
+def _update_existing_partner(
+    partner: Partner, data: dict, sender_name: str, index: PartnerImportIndex,
+) -> dict:
     """Update an existing partner with data from the sender."""
 
     # 1. Contacts — add new ones by email (case-insensitive)
@@ -191,13 +233,11 @@ def _update_existing_partner(partner: Partner, data: dict, sender_name: str) ->
     for contact_data in data.get("contacts", []):
         email = (contact_data.get("email") or "").strip()
         if email and email.lower() not in existing_emails:
-            contact = PartnerContact(
-                partner_id=partner.id,
+            partner.contacts.append(PartnerContact(
                 name=contact_data.get("name", "Unknown"),
                 email=email,
                 is_primary=False,  # don't override existing primary
-            )
-            db.session.add(contact)
+            ))
             existing_emails.add(email.lower())
 
     # 2. Overview — append sender's review as a section
@@ -223,14 +263,7 @@ def _update_existing_partner(partner: Partner, data: dict, sender_name: str) ->
     existing_specialty_names = {s.name.lower() for s in partner.specialties}
     for specialty_name in data.get("specialties", []):
         if specialty_name.lower() not in existing_specialty_names:
-            specialty = Specialty.query.filter(
-                db.func.lower(Specialty.name) == specialty_name.lower()
-            ).first()
-            if not specialty:
-                specialty = Specialty(name=specialty_name)
-                db.session.add(specialty)
-                db.session.flush()
-            partner.specialties.append(specialty)
+            partner.specialties.append(index.specialty(specialty_name))
             existing_specialty_names.add(specialty_name.lower())
 
     # 4. Website/favicon — upsert (normalize through _extract_domain)
@@ -247,7 +280,7 @@ def _update_existing_partner(partner: Partner, data: dict, sender_name: str) ->
     return {"action": "updated", "name": partner.name}
 
 
-def _create_new_partner(data: dict) -> dict:
+def _create_new_partner(data: dict, index: PartnerImportIndex) -> dict:
     """Create a new partner from received share data."""
     website = (data.get("website") or "").strip()
     website = _extract_domain(website) if website else None
@@ -260,38 +293,34 @@ def _create_new_partner(data: dict) -> dict:
         favicon_b64=data.get("favicon_b64"),
     )
     db.session.add(partner)
-    db.session.flush()  # get partner.id
 
     # Add contacts
     for contact_data in data.get("contacts", []):
-        contact = PartnerContact(
-            partner_id=partner.id,
+        partner.contacts.append(PartnerContact(
             name=contact_data.get("name", "Unknown"),
             email=contact_data.get("email"),
             is_primary=contact_data.get("is_primary", False),
-        )
-        db.session.add(contact)
+        ))
 
     # Add specialties
     for specialty_name in data.get("specialties", []):
-        specialty = Specialty.query.filter(
-            db.func.lower(Specialty.name) == specialty_name.lower()
-        ).first()
-        if not specialty:
-            specialty = Specialty(name=specialty_name)
-            db.session.add(specialty)
-            db.session.flush()
-        partner.specialties.append(specialty)
+        partner.specialties.append(index.specialty(specialty_name))
+
+    index.add(partner)
 
     return {"action": "created", "name": partner.name}
 
 
-def preview_partners(partners_data: list[dict], sender_name: str) -> list[dict]:
+def preview_partners(
+    partners_data: list[dict], sender_name: str, index: PartnerImportIndex | None = None,
+) -> list[dict]:
     """Dry-run preview of what would happen if partners were imported.
 
     Returns a list of dicts with structured change data so the UI can render
     comprehensive detail for both new and updated partners.
     """
+    if index is None:
+        index = PartnerImportIndex()
     previews = []
     for data in partners_data:
         name = (data.get("name") or "").strip()
@@ -301,8 +330,8 @@ def preview_partners(partners_data: list[dict], sender_name: str) -> list[dict]:
         if not name:
             continue
 
-        # Find existing match (same logic as upsert_partner)
-        existing = _find_matching_partner(name, website)
+        # Find existing match (same index as upsert_partner)
+        existing = index.match(name, website)
 
         specialties = data.get("specialties", [])
         contacts = data.get("contacts", [])
@@ -396,11 +425,15 @@ def _preview_update(
 def upsert_partners(partners_data: list[dict], sender_name: str) -> dict:
     """Upsert a list of partners from received share data.
 
+    Matches against one :class:`PartnerImportIndex` and writes everything
+    in a single commit.
+
     Returns: {created: int, updated: int, skipped: int, details: [...]}
     """
     results = {"created": 0, "updated": 0, "skipped": 0, "details": []}
+    index = PartnerImportIndex()
     for p in partners_data:
-        result = upsert_partner(p, sender_name)
+        result = upsert_partner(p, sender_name, index)
         results[result["action"]] = results.get(result["action"], 0) + 1
         results["details"].append(result)
 
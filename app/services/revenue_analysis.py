@@ -22,15 +22,34 @@ Categories:
 """
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
 import statistics
-from datetime import datetime, timezone
-from typing import Optional
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timezone
+from typing import Any, Optional
+from dataclasses import asdict, dataclass, field
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore
+    HAS_NUMPY = False
+
+from sqlalchemy import insert, update
 
 from app.models import (
-    db, CustomerRevenueData, RevenueAnalysis, RevenueConfig, Customer,
-    SyncStatus
+    db, CustomerRevenueData, RevenueAnalysis, RevenueAnalysisRun, RevenueConfig,
+    RevenueImport, Customer, SyncStatus
 )
+from app.services.revenue_rollups import rebuild_revenue_rollups
+
+logger = logging.getLogger(__name__)
 
 
 # =============================================================================
@@ -78,6 +97,11 @@ class AnalysisConfig:
             expansion_growth_threshold=db_config.expansion_growth_threshold,
         )
 
+    def fingerprint(self) -> str:
+        """Stable hash of every threshold; changes whenever results could."""
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
 
 # =============================================================================
 # SIGNAL COMPUTATION
@@ -300,6 +324,169 @@ def compute_signals(
     return signals
 
 
+def compute_signals_batch(
+    customer_names: list[str],
+    buckets: list[str],
+    revenue_matrix: Any,
+    month_names: list[str],
+    tpids: Optional[list] = None,
+    seller_names: Optional[list] = None,
+    customer_ids: Optional[list] = None,
+) -> list[Optional[CustomerSignals]]:
+    """
+    Vectorized compute_signals() for many customer/bucket series at once.
+
+    Each row of ``revenue_matrix`` is one series over the shared months, with
+    NaN where the series has no data point. Rows are left-aligned so every
+    series is judged on its own months (as the per-row path sees them), then
+    slope, R², month-over-month changes, CV, drawdown and level-vs-history
+    are computed for all rows together. Only the rule-based categorization
+    runs per row.
+
+    Args:
+        customer_names: Customer name per row
+        buckets: Bucket per row
+        revenue_matrix: (rows, months) array-like of revenue, NaN = missing
+        month_names: Fiscal month name per column
+        tpids, seller_names, customer_ids: Optional per-row identifiers
+
+    Returns:
+        List aligned with the rows: CustomerSignals, or None where
+        compute_signals() would return None
+    """
+    values = np.asarray(revenue_matrix, dtype=float).reshape(len(customer_names), len(month_names))
+    rows, months = values.shape
+    if rows == 0:
+        return []
+
+    present = ~np.isnan(values)
+    n = present.sum(axis=1)
+    pos = np.arange(months)
+
+    # Left-align: column j holds each series' j-th data point
+    order = np.argsort(~present, axis=1, kind='stable')
+    valid = pos < n[:, None]
+    r = np.where(valid, np.take_along_axis(values, order, axis=1), 0.0)
+    safe_n = np.maximum(n, 1)
+
+    total = r.sum(axis=1)
+    mean = total / safe_n
+    positive = (r > 0) & valid
+    positive_count = positive.sum(axis=1)
+
+    non_zero = (r != 0) & valid
+    zeros_at_start = np.where(non_zero.any(axis=1), non_zero.argmax(axis=1), n)
+    zeros_at_end = n - 1 - np.where(non_zero, pos, -1).max(axis=1)
+
+    eligible = (total >= 500) & (n >= 3)
+    new_customer = eligible & (zeros_at_start >= 2) & (positive_count >= 2)
+    churned = eligible & ~new_customer & (zeros_at_end >= 2) & (positive_count >= 2)
+    scored = eligible & ~new_customer & ~churned & (positive_count >= n * 0.6)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Trend slope: least squares against x = 1..n
+        mean_x = (n + 1) / 2
+        dx = np.where(valid, pos + 1 - mean_x[:, None], 0.0)
+        dy = np.where(valid, r - mean[:, None], 0.0)
+        denom = (dx ** 2).sum(axis=1)
+        slope = np.where(denom > 0, (dx * dy).sum(axis=1) / denom, 0.0)
+        residual = np.where(valid, dy - slope[:, None] * dx, 0.0)
+        ss_tot = (dy ** 2).sum(axis=1)
+        r_squared = np.where(ss_tot > 0, 1 - (residual ** 2).sum(axis=1) / ss_tot, 0.0)
+
+        # Month-over-month changes (0 where the prior month isn't positive)
+        prev, cur = r[:, :-1], r[:, 1:]
+        mom_valid = valid[:, 1:]
+        mom = np.where(mom_valid & (prev > 0), (cur - prev) / prev, 0.0)
+
+        rows_idx = np.arange(rows)
+        last = r[rows_idx, np.maximum(n - 1, 0)]
+        back1 = r[rows_idx, np.maximum(n - 2, 0)]
+        back2 = r[rows_idx, np.maximum(n - 3, 0)]
+        last_month_change = np.where(back1 > 0, (last - back1) / back1, 0.0)
+        last_2month_change = np.where(back2 > 0, (last - back2) / back2, 0.0)
+
+        # Volatility: sample stdev of the changes over their mean magnitude
+        m = np.maximum(n - 1, 1)
+        abs_mean = np.abs(mom).sum(axis=1) / m
+        mom_mean = mom.sum(axis=1) / m
+        stdev = np.sqrt(
+            np.where(mom_valid, (mom - mom_mean[:, None]) ** 2, 0.0).sum(axis=1)
+            / np.maximum(m - 1, 1)
+        )
+        volatility_cv = np.where(n - 1 >= 2, np.where(abs_mean > 0, stdev / abs_mean, stdev), 0.0)
+
+        # Max drawdown from the running peak
+        peaks = np.maximum.accumulate(np.where(valid, r, -np.inf), axis=1)
+        drawdown = np.where(valid & (pos >= 1) & (peaks > 0), (peaks - r) / peaks, 0.0)
+        max_drawdown = np.maximum(drawdown.max(axis=1), 0.0)
+
+        # Current month vs the months before it
+        in_history = pos < (n - 1)[:, None]
+        history_max = np.where(in_history, r, -np.inf).max(axis=1)
+        history_avg = np.where(in_history, r, 0.0).sum(axis=1) / m
+        current_vs_max = np.where(history_max > 0, last / history_max, 0.0)
+        current_vs_avg = np.where(history_avg > 0, last / history_avg, 0.0)
+
+    results: list[Optional[CustomerSignals]] = [None] * rows
+    columns = {
+        name: arr.tolist() for name, arr in (
+            ('slope', slope),
+            ('r_squared', r_squared), ('last_month_change', last_month_change),
+            ('last_2month_change', last_2month_change), ('volatility_cv', volatility_cv),
+            ('max_drawdown', max_drawdown), ('current_vs_max', current_vs_max),
+            ('current_vs_avg', current_vs_avg),
+        )
+    }
+    n_list = n.tolist()
+    zeros_at_start_list = zeros_at_start.tolist()
+
+    for i in np.flatnonzero(new_customer | churned | scored).tolist():
+        k = n_list[i]
+        revenues = r[i, :k].tolist()
+        # statistics.mean, as compute_signals uses, so averages match it exactly
+        avg_revenue = statistics.mean(revenues)
+
+        signals = CustomerSignals(
+            customer_name=customer_names[i],
+            bucket=buckets[i],
+            revenues=revenues,
+            month_names=[month_names[j] for j in order[i, :k].tolist()],
+            tpid=tpids[i] if tpids is not None else None,
+            seller_name=seller_names[i] if seller_names is not None else None,
+            customer_id=customer_ids[i] if customer_ids is not None else None,
+            avg_revenue=avg_revenue,
+        )
+
+        if new_customer[i]:
+            active_avg = statistics.mean([v for v in revenues if v > 0])
+            signals.category = "NEW_CUSTOMER"
+            signals.confidence = "HIGH"
+            signals.avg_revenue = active_avg
+            signals.reason = f"Started generating revenue in {signals.month_names[zeros_at_start_list[i]]}. Active avg: ${active_avg:,.0f}"
+        elif churned[i]:
+            signals.category = "CHURNED"
+            signals.confidence = "HIGH"
+            previous_avg = statistics.mean([v for v in revenues if v > 0])
+            signals.reason = f"Revenue dropped to $0. Previous avg: ${previous_avg:,.0f}"
+        else:
+            if avg_revenue > 0:
+                signals.trend_slope = (columns['slope'][i] / avg_revenue) * 100
+            signals.trend_r_squared = columns['r_squared'][i]
+            signals.mom_changes = mom[i, :k - 1].tolist()
+            signals.last_month_change = columns['last_month_change'][i]
+            signals.last_2month_change = columns['last_2month_change'][i]
+            signals.volatility_cv = columns['volatility_cv'][i]
+            signals.max_drawdown = columns['max_drawdown'][i]
+            signals.current_vs_max = columns['current_vs_max'][i]
+            signals.current_vs_avg = columns['current_vs_avg'][i]
+            signals = categorize_customer(signals)
+
+        results[i] = signals
+
+    return results
+
+
 def categorize_customer(signals: CustomerSignals) -> CustomerSignals:
     """Apply decision rules to categorize customer based on signals."""
     
@@ -648,65 +835,185 @@ def build_expansion_rationale(signals: CustomerSignals) -> str:
 # =============================================================================
 
 def run_analysis_for_all(exclude_latest_month: bool = True,
-                        progress_callback: callable = None) -> dict:
+                        progress_callback: callable = None,
+                        incremental: bool = False,
+                        workers: Optional[int] = None) -> dict:
     """
     Run analysis on all customers in the database.
     
     Args:
         exclude_latest_month: Whether to exclude most recent month (usually partial)
         progress_callback: Optional callback(current, total) called after each customer/bucket
+        incremental: Only re-analyze series written by imports since the last
+            run or with data in months that entered or left the window
+            (falls back to a full run when that isn't safe)
+        workers: Worker processes for the signal computation (see
+            ``_analysis_workers``); 0 or 1 computes in-process
         
     Returns:
         Dict with stats about the analysis run
     """
     result = None
-    for update in _run_analysis_generator(exclude_latest_month):
-        if update.get('complete'):
-            result = update['stats']
+    for progress in _run_analysis_generator(exclude_latest_month, incremental, workers):
+        if progress.get('complete'):
+            result = progress['stats']
         elif progress_callback:
-            progress_callback(update['current'], update['total'])
-    return result or {'analyzed': 0, 'actionable': 0, 'skipped': 0}
+            progress_callback(progress['current'], progress['total'])
+    return result or {'analyzed': 0, 'actionable': 0, 'skipped': 0, 'mode': 'full'}
 
 
-def run_analysis_streaming(exclude_latest_month: bool = True):
+def run_analysis_streaming(exclude_latest_month: bool = True, incremental: bool = False,
+                           workers: Optional[int] = None):
     """
     Run analysis on all customers, yielding progress dicts for SSE streaming.
     
+    Args:
+        exclude_latest_month: Whether to exclude most recent month (usually partial)
+        incremental: Only re-analyze series written by imports since the last run
+        workers: Worker processes for the signal computation
+    
     Yields:
         Dicts with 'current', 'total', and 'progress' keys during analysis,
         then a final dict with 'complete' True and 'stats' keys.
     """
-    for update in _run_analysis_generator(exclude_latest_month):
-        if update.get('complete'):
-            yield update
+    for progress in _run_analysis_generator(exclude_latest_month, incremental, workers):
+        if progress.get('complete'):
+            yield progress
         else:
-            pct = round(update['current'] / update['total'] * 100) if update['total'] > 0 else 0
-            update['progress'] = pct
-            yield update
+            pct = round(progress['current'] / progress['total'] * 100) if progress['total'] > 0 else 0
+            progress['progress'] = pct
+            yield progress
+
+
+# Series per unit of work; progress is reported as each shard finishes
+_SHARD_SIZE = 2000
+
+# Below this many series a process pool costs more to start than it saves
+_PARALLEL_MIN_SERIES = 10000
+
+# Upper bound on automatically chosen worker processes
+_MAX_AUTO_WORKERS = 4
 
+# Customer names per IN (...) clause, under SQLite's bound-parameter limit
+_NAME_BATCH = 900
 
-def _run_analysis_generator(exclude_latest_month: bool = True):
+# RevenueAnalysis columns refreshed from CustomerSignals on every run
+_SIGNAL_COLUMNS = (
+    'avg_revenue', 'category', 'recommended_action', 'confidence',
+    'priority_score', 'dollars_at_risk', 'dollars_opportunity', 'trend_slope',
+    'last_month_change', 'last_2month_change', 'volatility_cv',
+    'max_drawdown', 'current_vs_max', 'current_vs_avg', 'engagement_rationale',
+)
+
+
+def _load_revenue_series(month_dates: list, only: Optional[set] = None) -> tuple[list, list, list[str]]:
     """
-    Core analysis generator. Yields progress dicts after each customer/bucket,
-    then a final dict with complete=True and stats.
+    Load every customer/bucket revenue series in one query.
+
+    Args:
+        month_dates: Months to analyze, oldest first
+        only: Optional set of (customer_name, bucket) pairs to restrict to
+
+    Returns:
+        Tuple of (series keys as (customer_name, bucket, tpid), rows of
+        revenue per month in ``month_dates`` with None where there is no
+        data point, fiscal month name per month)
     """
-    SyncStatus.mark_started('revenue_analysis')
-    config = AnalysisConfig.from_db()
-    
-    # Get all unique customer/bucket combinations
-    customer_buckets = db.session.query(
+    month_index = {d: i for i, d in enumerate(month_dates)}
+    month_names = [None] * len(month_dates)
+    series_index = {}
+    keys, rows = [], []
+
+    query = db.session.query(
         CustomerRevenueData.customer_name,
         CustomerRevenueData.bucket,
-        CustomerRevenueData.tpid
-    ).distinct().all()
-    
-    if not customer_buckets:
-        stats = {'analyzed': 0, 'actionable': 0, 'skipped': 0}
-        SyncStatus.mark_completed('revenue_analysis', success=True,
-                                  items_synced=0, details='No customer data to analyze')
-        yield {'complete': True, 'stats': stats}
-        return
-    
+        CustomerRevenueData.tpid,
+        CustomerRevenueData.month_date,
+        CustomerRevenueData.fiscal_month,
+        CustomerRevenueData.revenue,
+    )
+    if only is None:
+        history = query.all()
+    else:
+        names = sorted({name for name, _ in only})
+        history = []
+        for start in range(0, len(names), _NAME_BATCH):
+            history.extend(
+                row for row in query.filter(
+                    CustomerRevenueData.customer_name.in_(names[start:start + _NAME_BATCH])
+                ).all()
+                if (row[0], row[1]) in only
+            )
+
+    for customer_name, bucket, tpid, month_date, fiscal_month, revenue in history:
+        idx = series_index.get((customer_name, bucket))
+        if idx is None:
+            idx = series_index[(customer_name, bucket)] = len(keys)
+            keys.append([customer_name, bucket, tpid])
+            rows.append([None] * len(month_dates))
+        elif tpid and not keys[idx][2]:
+            keys[idx][2] = tpid
+        col = month_index.get(month_date)
+        if col is not None:
+            rows[idx][col] = revenue
+            month_names[col] = fiscal_month
+
+    return [tuple(k) for k in keys], rows, month_names
+
+
+def _months_fingerprint(month_dates: list) -> str:
+    """Stable hash of the analyzed month window."""
+    payload = ','.join(d.isoformat() for d in month_dates)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _series_touched_since_last_run(config_fingerprint: str, month_dates: list) -> Optional[set]:
+    """
+    Find the series an incremental run needs to re-analyze.
+
+    Signals are computed over each series' own data points, so when the
+    month window moves (a routine monthly import) only the series with data
+    in a month entering or leaving the window change, along with those
+    written by newer imports.
+
+    Returns:
+        Set of (customer_name, bucket) pairs to re-analyze, or None when a
+        full run is required: no previous run, different thresholds, or a
+        shifted window from a run that didn't record its months.
+    """
+    last_run = RevenueAnalysisRun.query.order_by(RevenueAnalysisRun.id.desc()).first()
+    if (
+        last_run is None
+        or last_run.through_import_id is None
+        or last_run.config_fingerprint != config_fingerprint
+    ):
+        return None
+
+    shifted = set()
+    if last_run.months_fingerprint != _months_fingerprint(month_dates):
+        if last_run.month_window is None:
+            return None
+        previous = {date.fromisoformat(d) for d in last_run.month_window.split(',') if d}
+        shifted = previous.symmetric_difference(month_dates)
+
+    touched_by = CustomerRevenueData.last_import_id > last_run.through_import_id
+    if shifted:
+        touched_by = db.or_(touched_by, CustomerRevenueData.month_date.in_(sorted(shifted)))
+    touched = db.session.query(
+        CustomerRevenueData.customer_name,
+        CustomerRevenueData.bucket,
+    ).filter(touched_by).distinct().all()
+    return {(name, bucket) for name, bucket in touched}
+
+
+def _customer_assignments() -> dict:
+    """
+    Linked customer, seller and TPID for each revenue customer name.
+
+    Returns:
+        Dict of customer_name -> (customer_id, seller_name, tpid) for names
+        the import linked to a Sales Buddy customer.
+    """
     # Build customer_id lookup from revenue data (set during import with fuzzy matching)
     # This is more accurate than name matching since import uses progressive word-prefix
     # and acronym matching to link CSV customer names to Sales Buddy customers
@@ -718,13 +1025,176 @@ def _run_analysis_generator(exclude_latest_month: bool = True):
     ).group_by(
         CustomerRevenueData.customer_name
     ).all()
-    customer_id_from_revenue = {name: cid for name, cid in customer_id_pairs}
-    
+
     # Build Customer lookup by ID for seller/tpid info
     all_customers = Customer.query.options(
         db.joinedload(Customer.seller)
     ).all()
     customer_by_id = {c.id: c for c in all_customers}
+
+    assignments = {}
+    for customer_name, customer_id in customer_id_pairs:
+        customer = customer_by_id.get(customer_id)
+        seller_name = customer.seller.name if customer and customer.seller else None
+        assignments[customer_name] = (customer_id, seller_name, customer.tpid if customer else None)
+    return assignments
+
+
+def _series_with_stale_assignments(assignments: dict) -> set:
+    """
+    Series whose stored customer link or seller no longer matches.
+
+    Reassigning a customer's seller (or renaming the seller) changes no
+    revenue rows, so an incremental run has to pick those series up here.
+
+    Returns:
+        Set of (customer_name, bucket) pairs to re-analyze.
+    """
+    stale = set()
+    for name, bucket, customer_id, seller_name in db.session.query(
+        RevenueAnalysis.customer_name,
+        RevenueAnalysis.bucket,
+        RevenueAnalysis.customer_id,
+        RevenueAnalysis.seller_name,
+    ):
+        expected_id, expected_seller, _ = assignments.get(name, (None, None, None))
+        if (customer_id, seller_name) != (expected_id, expected_seller):
+            stale.add((name, bucket))
+    return stale
+
+
+def _compute_all_signals(keys: list, rows: list, month_names: list[str],
+                         seller_names: list, customer_ids: list) -> list:
+    """Compute signals for every series, vectorized when NumPy is available."""
+    names = [k[0] for k in keys]
+    buckets = [k[1] for k in keys]
+    tpids = [k[2] for k in keys]
+    if HAS_NUMPY:
+        return compute_signals_batch(
+            names, buckets, np.array(rows, dtype=float), month_names,
+            tpids=tpids, seller_names=seller_names, customer_ids=customer_ids,
+        )
+
+    results = []
+    for i, row in enumerate(rows):
+        points = [(v, month_names[j]) for j, v in enumerate(row) if v is not None]
+        results.append(compute_signals(
+            customer_name=names[i],
+            bucket=buckets[i],
+            revenues=[v for v, _ in points],
+            month_names=[m for _, m in points],
+            tpid=tpids[i],
+            seller_name=seller_names[i],
+            customer_id=customer_ids[i],
+        ))
+    return results
+
+
+def _analyze_series(keys: list, rows: list, month_names: list[str], seller_names: list,
+                    customer_ids: list, config: AnalysisConfig) -> list[Optional[dict]]:
+    """
+    Signals, category and recommended action for a batch of series.
+
+    Pure data in, pure data out, so it can run in a worker process: one
+    dict of RevenueAnalysis column values per series, or None where the
+    series has too little history to analyze.
+    """
+    results = []
+    for signals in _compute_all_signals(keys, rows, month_names, seller_names, customer_ids):
+        if not signals:
+            results.append(None)
+            continue
+        signals = determine_action(signals, config)
+        values = {col: getattr(signals, col) for col in _SIGNAL_COLUMNS}
+        values.update(
+            customer_name=signals.customer_name,
+            bucket=signals.bucket,
+            customer_id=signals.customer_id,
+            tpid=signals.tpid,
+            seller_name=signals.seller_name,
+            months_analyzed=len(signals.revenues),
+            latest_revenue=signals.revenues[-1],
+        )
+        results.append(values)
+    return results
+
+
+def _analyze_shard(shard: tuple) -> list[Optional[dict]]:
+    """Process-pool entry point for ``_analyze_series``."""
+    return _analyze_series(*shard)
+
+
+def _analysis_workers(requested: Optional[int], series_count: int) -> int:
+    """
+    Number of worker processes to use for this run.
+
+    ``requested`` wins when given; otherwise the REVENUE_ANALYSIS_WORKERS
+    environment variable, otherwise one less than the CPU count (capped).
+    Small runs always stay in-process.
+    """
+    if requested is None:
+        env = os.environ.get('REVENUE_ANALYSIS_WORKERS', '').strip()
+        if env.isdigit():
+            requested = int(env)
+        else:
+            requested = min(max((os.cpu_count() or 1) - 1, 0), _MAX_AUTO_WORKERS)
+    if requested <= 1 or series_count < _PARALLEL_MIN_SERIES:
+        return 0
+    return requested
+
+
+def _iter_analyzed_shards(keys: list, rows: list, month_names: list[str], seller_names: list,
+                          customer_ids: list, config: AnalysisConfig, workers: int):
+    """
+    Analyze every series in shards of ``_SHARD_SIZE``.
+
+    Yields (shard start index, results) as each shard finishes, in
+    completion order when running on a process pool. Falls back to
+    in-process computation if the pool can't be started or dies.
+    """
+    starts = range(0, len(keys), _SHARD_SIZE)
+
+    def shard(start):
+        end = start + _SHARD_SIZE
+        return (keys[start:end], rows[start:end], month_names,
+                seller_names[start:end], customer_ids[start:end], config)
+
+    pending = list(starts)
+    if workers:
+        try:
+            # Spawned workers behave the same on every platform and don't
+            # inherit the server's threads or open database connections
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = {pool.submit(_analyze_shard, shard(start)): start for start in starts}
+                for future in as_completed(futures):
+                    start = futures[future]
+                    results = future.result()
+                    pending.remove(start)
+                    yield start, results
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning("Analysis process pool failed (%s); finishing in-process", e)
+
+    for start in pending:
+        yield start, _analyze_shard(shard(start))
+
+
+def _run_analysis_generator(exclude_latest_month: bool = True, incremental: bool = False,
+                            workers: Optional[int] = None):
+    """
+    Core analysis generator. Loads all revenue history in one query, computes
+    signals for every customer/bucket in shards (spread over a process pool
+    for large runs), then bulk-writes the RevenueAnalysis rows. Yields
+    progress dicts as shards finish, then a final dict with complete=True
+    and stats.
+
+    In incremental mode only the series written by imports since the last
+    completed run, with data in a month that entered or left the window,
+    or whose customer link or seller changed, are loaded and re-analyzed;
+    stats['mode'] reports which kind of run actually happened.
+    """
+    SyncStatus.mark_started('revenue_analysis')
+    config = AnalysisConfig.from_db()
     
     # Determine months to analyze
     all_months = db.session.query(
@@ -733,131 +1203,127 @@ def _run_analysis_generator(exclude_latest_month: bool = True):
     
     month_dates = [m[0] for m in all_months]
     
+    if not month_dates:
+        stats = {'analyzed': 0, 'actionable': 0, 'skipped': 0, 'mode': 'full'}
+        SyncStatus.mark_completed('revenue_analysis', success=True,
+                                  items_synced=0, details='No customer data to analyze')
+        yield {'complete': True, 'stats': stats}
+        return
+    
     if exclude_latest_month and len(month_dates) > 1:
         month_dates = month_dates[:-1]  # Exclude most recent
     
-    stats = {'analyzed': 0, 'actionable': 0, 'skipped': 0}
-    total_buckets = len(customer_buckets)
-    
-    for idx, cb in enumerate(customer_buckets):
-        customer_name, bucket, tpid = cb
-        
-        # Get customer_id from revenue data (set during import with fuzzy matching)
-        customer_id = customer_id_from_revenue.get(customer_name)
-        if customer_id:
-            existing_customer = customer_by_id.get(customer_id)
-            seller_name = existing_customer.seller.name if existing_customer and existing_customer.seller else None
-            # Use TPID from our database if not in revenue data
-            if not tpid and existing_customer and existing_customer.tpid:
-                tpid = existing_customer.tpid
-        else:
-            seller_name = None
-        
-        # Get revenue data for this customer/bucket
-        revenue_data = CustomerRevenueData.query.filter(
-            CustomerRevenueData.customer_name == customer_name,
-            CustomerRevenueData.bucket == bucket,
-            CustomerRevenueData.month_date.in_(month_dates)
-        ).order_by(CustomerRevenueData.month_date).all()
-        
-        if len(revenue_data) < 3:
+    config_fingerprint = config.fingerprint()
+    months_fingerprint = _months_fingerprint(month_dates)
+    through_import_id = db.session.query(db.func.max(RevenueImport.id)).scalar()
+    assignments = _customer_assignments()
+    only = None
+    if incremental:
+        only = _series_touched_since_last_run(config_fingerprint, month_dates)
+        if only is not None:
+            only |= _series_with_stale_assignments(assignments)
+    
+    keys, rows, month_names = _load_revenue_series(month_dates, only)
+    
+    customer_ids, seller_names = [], []
+    for idx, (customer_name, bucket, tpid) in enumerate(keys):
+        customer_id, seller_name, customer_tpid = assignments.get(customer_name, (None, None, None))
+        # Use TPID from our database if not in revenue data
+        if not tpid and customer_tpid:
+            keys[idx] = (customer_name, bucket, customer_tpid)
+        customer_ids.append(customer_id)
+        seller_names.append(seller_name)
+    
+    total_buckets = len(keys)
+    analyzed = [None] * total_buckets
+    done = 0
+    for start, results in _iter_analyzed_shards(
+        keys, rows, month_names, seller_names, customer_ids, config,
+        _analysis_workers(workers, total_buckets),
+    ):
+        analyzed[start:start + len(results)] = results
+        done += len(results)
+        yield {'current': done, 'total': total_buckets}
+    
+    # Prior analyses, for category-change tracking and review resets
+    existing = {
+        (a.customer_name, a.bucket): a for a in db.session.query(
+            RevenueAnalysis.id,
+            RevenueAnalysis.customer_name,
+            RevenueAnalysis.bucket,
+            RevenueAnalysis.category,
+            RevenueAnalysis.priority_score,
+            RevenueAnalysis.review_status,
+            RevenueAnalysis.review_notes,
+        ).all()
+    }
+    
+    stats = {'analyzed': 0, 'actionable': 0, 'skipped': 0,
+             'mode': 'full' if only is None else 'incremental'}
+    now = datetime.now(timezone.utc)
+    inserts, updates = [], []
+    
+    for values in analyzed:
+        if not values:
             stats['skipped'] += 1
-            yield {'current': idx + 1, 'total': total_buckets}
             continue
         
-        revenues = [rd.revenue for rd in revenue_data]
-        month_names = [rd.fiscal_month for rd in revenue_data]
-        
-        # Compute signals
-        signals = compute_signals(
-            customer_name=customer_name,
-            bucket=bucket,
-            revenues=revenues,
-            month_names=month_names,
-            tpid=tpid,
-            seller_name=seller_name,
-            customer_id=customer_id
-        )
-        
-        if not signals:
-            stats['skipped'] += 1
-            yield {'current': idx + 1, 'total': total_buckets}
-            continue
-        
-        # Determine action
-        signals = determine_action(signals, config)
-        
-        # Save to database (upsert)
-        analysis = RevenueAnalysis.query.filter_by(
-            customer_name=customer_name,
-            bucket=bucket
-        ).first()
-        
-        is_new = analysis is None
-        if is_new:
-            analysis = RevenueAnalysis(
-                customer_name=customer_name,
-                bucket=bucket
-            )
+        values['analyzed_at'] = now
+        prior = existing.get((values['customer_name'], values['bucket']))
+        if prior is None:
+            inserts.append(values)
         else:
+            # Name and bucket are the lookup key; leave them untouched
+            del values['customer_name'], values['bucket']
+            values['id'] = prior.id
+            category_changed = prior.category != values['category']
             # Track if category changed
-            if analysis.category != signals.category:
-                analysis.previous_category = analysis.category
-                analysis.previous_priority_score = analysis.priority_score
-                analysis.status_changed_at = datetime.now(timezone.utc)
+            if category_changed:
+                values.update(
+                    previous_category=prior.category,
+                    previous_priority_score=prior.priority_score,
+                    status_changed_at=now,
+                )
             
             # Auto-reset review if conditions changed significantly
             # Only reset alerts that were already reviewed/actioned/dismissed
-            if analysis.review_status in ('reviewed', 'actioned', 'dismissed'):
-                category_changed = analysis.category != signals.category
-                priority_jumped = (signals.priority_score - analysis.priority_score) >= 15
+            if prior.review_status in ('reviewed', 'actioned', 'dismissed'):
+                priority_jumped = (values['priority_score'] - prior.priority_score) >= 15
                 if category_changed or priority_jumped:
-                    # Snapshot prior review so user can reference it
-                    analysis.previous_review_status = analysis.review_status
-                    analysis.previous_review_notes = analysis.review_notes
-                    # Reset to re-review
-                    analysis.review_status = 'to_be_reviewed'
-                    analysis.review_notes = None
-                    analysis.reviewed_at = datetime.now(timezone.utc)
-        
-        # Update fields
-        analysis.customer_id = customer_id
-        analysis.tpid = tpid
-        analysis.seller_name = seller_name
-        analysis.analyzed_at = datetime.now(timezone.utc)
-        analysis.months_analyzed = len(revenues)
-        analysis.avg_revenue = signals.avg_revenue
-        analysis.latest_revenue = revenues[-1]
-        analysis.category = signals.category
-        analysis.recommended_action = signals.recommended_action
-        analysis.confidence = signals.confidence
-        analysis.priority_score = signals.priority_score
-        analysis.dollars_at_risk = signals.dollars_at_risk
-        analysis.dollars_opportunity = signals.dollars_opportunity
-        analysis.trend_slope = signals.trend_slope
-        analysis.last_month_change = signals.last_month_change
-        analysis.last_2month_change = signals.last_2month_change
-        analysis.volatility_cv = signals.volatility_cv
-        analysis.max_drawdown = signals.max_drawdown
-        analysis.current_vs_max = signals.current_vs_max
-        analysis.current_vs_avg = signals.current_vs_avg
-        analysis.engagement_rationale = signals.engagement_rationale
-        
-        if is_new:
-            db.session.add(analysis)
+                    # Snapshot prior review so user can reference it, then reset to re-review
+                    values.update(
+                        previous_review_status=prior.review_status,
+                        previous_review_notes=prior.review_notes,
+                        review_status='to_be_reviewed',
+                        review_notes=None,
+                        reviewed_at=now,
+                    )
+            updates.append(values)
         
         stats['analyzed'] += 1
-        if signals.recommended_action not in ["NO ACTION", "MONITOR"]:
+        if values['recommended_action'] not in ["NO ACTION", "MONITOR"]:
             stats['actionable'] += 1
-        
-        yield {'current': idx + 1, 'total': total_buckets}
     
+    if inserts:
+        db.session.execute(insert(RevenueAnalysis), inserts)
+    if updates:
+        db.session.execute(update(RevenueAnalysis), updates)
+    db.session.add(RevenueAnalysisRun(
+        incremental=only is not None,
+        config_fingerprint=config_fingerprint,
+        months_fingerprint=months_fingerprint,
+        month_window=','.join(d.isoformat() for d in month_dates),
+        through_import_id=through_import_id,
+        series_analyzed=total_buckets,
+    ))
     db.session.commit()
+    # Seller assignments feed the seller x product rollup
+    rebuild_revenue_rollups(sellers_only=True)
 
     SyncStatus.mark_completed(
         'revenue_analysis', success=True,
         items_synced=stats['analyzed'],
-        details=f"{stats['analyzed']} analyzed, {stats['actionable']} actionable, {stats['skipped']} skipped"
+        details=f"{stats['analyzed']} analyzed, {stats['actionable']} actionable, {stats['skipped']} skipped ({stats['mode']})"
     )
     
     yield {'complete': True, 'stats': stats}
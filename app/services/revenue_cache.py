@@ -0,0 +1,112 @@
+"""
+Import-versioned cache for revenue view models.
+
+Revenue pages are derived from the imported revenue rows and the analysis
+results, which only change when a CSV is imported or analysis re-runs.
+Each cache stores computed view models under a data version made of the
+latest RevenueImport and the ``revenue_analysis`` SyncStatus timestamps,
+so any import or analysis run retires every older entry without explicit
+invalidation. Hit/miss counters are kept per cache for the admin panel.
+
+Cached values are shared between requests: store plain data (dicts, lists,
+ids) rather than ORM instances, and never mutate what ``get_or_build``
+returns.
+"""
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from app.models import db, RevenueImport, SyncStatus
+
+
+def revenue_data_version(track_analysis: bool = True) -> tuple:
+    """Current version of the revenue data.
+
+    The latest import is identified by id and timestamp, so an id reused
+    after clearing revenue data still reads as a new version.
+
+    Args:
+        track_analysis: Include the analysis run timestamps (views built
+            from RevenueAnalysis rows); imports alone otherwise.
+    """
+    latest = db.session.query(
+        RevenueImport.id, RevenueImport.imported_at
+    ).order_by(RevenueImport.id.desc()).first()
+    version = (tuple(latest) if latest else None,)
+    if track_analysis:
+        analysis = db.session.query(
+            SyncStatus.started_at, SyncStatus.completed_at
+        ).filter_by(sync_type='revenue_analysis').first()
+        version += (tuple(analysis) if analysis else None,)
+    return version
+
+
+class RevenueViewCache:
+    """Bounded, thread-safe cache of view models for one kind of page."""
+
+    def __init__(self, name: str, max_entries: int = 256, track_analysis: bool = True):
+        self.name = name
+        self.max_entries = max_entries
+        self.track_analysis = track_analysis
+        self._entries: dict[Hashable, Any] = {}
+        self._version: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, building it on a miss."""
+        version = revenue_data_version(self.track_analysis)
+        with self._lock:
+            if version == self._version and key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            if version != self._version:
+                # Entries from an older version can never be hit again
+                self._entries.clear()
+                self._version = version
+            while len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = value
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else None,
+            }
+
+
+# Customer revenue grids only depend on imported rows
+customer_views = RevenueViewCache('Customer revenue', max_entries=128, track_analysis=False)
+dashboard_views = RevenueViewCache('Revenue dashboard', max_entries=16)
+seller_views = RevenueViewCache('Seller alerts', max_entries=128)
+seller_product_views = RevenueViewCache('Seller products', max_entries=256)
+
+_CACHES = (customer_views, dashboard_views, seller_views, seller_product_views)
+
+
+def revenue_cache_stats() -> list[dict]:
+    """Stats for every revenue view cache, for the admin panel."""
+    return [cache.stats() for cache in _CACHES]
+
+
+def clear_revenue_view_caches() -> None:
+    """Drop all cached revenue views (e.g. after clearing revenue data)."""
+    for cache in _CACHES:
+        cache.clear()
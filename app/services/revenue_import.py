@@ -18,11 +18,13 @@ Fiscal Month Format: "FY26-Jan" where FY26 = July 2025 - June 2026
 """
 from __future__ import annotations
 
+import codecs
+import csv
 import re
 from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Optional, Any
-from io import StringIO, BytesIO
+from typing import Callable, Optional, Any
+from io import StringIO, BytesIO, TextIOWrapper
 
 try:
     import pandas as pd
@@ -31,9 +33,26 @@ except ImportError:
     pd = None  # type: ignore
     HAS_PANDAS = False
 
+from sqlalchemy import case, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 from app.models import (
     db, RevenueImport, CustomerRevenueData, ProductRevenueData, Customer,
-    SyncStatus
+    SyncStatus, RevenueProductRollup, RevenueSellerProductRollup
+)
+from app.services.revenue_cache import customer_views
+from app.services.revenue_store import get_revenue_store, write_revenue_store
+from app.services.revenue_rollups import (
+    ensure_revenue_rollups, positive_product_pairs, rebuild_revenue_rollups,
+)
+# Name matching lives in name_matching; the helpers stay importable from here
+from app.services.name_matching import (  # noqa: F401
+    _clean_for_matching,
+    _progressive_word_prefix_match,
+    _get_acronym,
+    _build_customer_lookup,
+    _resolve_customer_id,
+    NameResolver,
 )
 
 
@@ -42,198 +61,6 @@ PRODUCT_CONSOLIDATION_PREFIXES = [
     'Azure Synapse Analytics',
 ]
 
-# Words too short or generic to match on when dropping trailing words
-_SKIP_WORDS = {
-    'a', 'an', 'the', 'of', 'and', 'for', 'in', 'at', 'by', 'to',
-    'american', 'national', 'global', 'united', 'general', 'international',
-}
-
-# Minimum number of words required for a prefix match
-_MIN_PREFIX_WORDS = 1
-
-# Minimum character length for a single-word prefix match
-_MIN_PREFIX_LEN = 4
-
-
-def _clean_for_matching(name: str) -> str:
-    """Clean a company name for prefix matching.
-
-    Lowercases, strips punctuation (commas, periods, etc.), and collapses
-    whitespace so "Azara Healthcare, LLC" becomes "azara healthcare llc".
-
-    Args:
-        name: Raw company name
-
-    Returns:
-        Cleaned lowercase string with punctuation removed
-    """
-    cleaned = re.sub(r'[^\w\s]', '', name.lower())
-    return ' '.join(cleaned.split())
-
-
-def _progressive_word_prefix_match(
-    name_a: str,
-    name_b: str,
-) -> bool:
-    """Check if one name's words match the leading words of the other,
-    progressively dropping trailing words.
-
-    Works at the WORD level, not character level. So "streamline health"
-    does NOT match "streamline healthcare" on the first try (because
-    "health" != "healthcare"), but after dropping "health", "streamline"
-    matches the first word of "streamline healthcare solutions".
-
-    Args:
-        name_a: First cleaned name (from _clean_for_matching)
-        name_b: Second cleaned name (from _clean_for_matching)
-
-    Returns:
-        True if a progressive word-level prefix match is found
-    """
-    if not name_a or not name_b:
-        return False
-
-    words_a = name_a.split()
-    words_b = name_b.split()
-
-    # Try both directions
-    for src_words, tgt_words in [(words_a, words_b), (words_b, words_a)]:
-        # Progressively drop trailing words from src and check if
-        # the remaining words match the leading words of tgt exactly
-        candidate = list(src_words)
-        while candidate:
-            if len(candidate) <= len(tgt_words):
-                # Check if candidate words match the first N words of target
-                if candidate == tgt_words[:len(candidate)]:
-                    # Ensure the match is meaningful
-                    match_str = ' '.join(candidate)
-                    if len(candidate) >= 2 or len(match_str) >= _MIN_PREFIX_LEN:
-                        return True
-            candidate.pop()
-            # Skip trailing stop words
-            while candidate and candidate[-1] in _SKIP_WORDS:
-                candidate.pop()
-
-    return False
-
-
-def _get_acronym(name: str) -> str:
-    """Get the acronym from a company name (first letter of each word).
-
-    Only uses words that are 2+ chars and not stop words.
-    E.g., "Facilities Survey Inc" -> "FSI"
-
-    Args:
-        name: Company name
-
-    Returns:
-        Uppercase acronym string, or empty string if too short
-    """
-    cleaned = re.sub(r'[^\w\s]', '', name)
-    words = [w for w in cleaned.split() if len(w) >= 2 and w.lower() not in _SKIP_WORDS]
-    return ''.join(w[0] for w in words).upper()
-
-
-def _build_customer_lookup() -> tuple[
-    dict[str, int],
-    list[tuple[str, int]],
-    dict[str, int],
-]:
-    """Build customer lookup structures for matching revenue data to customers.
-
-    Returns:
-        Tuple of:
-        - Quick lookup dict: lowercased exact name/nickname -> customer ID
-        - Cleaned names list: (cleaned_name, customer_id) for prefix matching
-        - Acronym lookup: uppercase acronym -> customer ID (for names/nicknames
-          that are 2-6 chars and look like acronyms)
-    """
-    exact_lookup: dict[str, int] = {}
-    cleaned_names: list[tuple[str, int]] = []
-    acronym_lookup: dict[str, int] = {}
-
-    for c in Customer.query.all():
-        exact_lookup[c.name.lower()] = c.id
-        cleaned_names.append((_clean_for_matching(c.name), c.id))
-        # Register acronym of long customer names so CSV short names can match
-        # e.g., customer "Facilities Survey Inc" -> acronym "FSI"
-        name_acronym = _get_acronym(c.name)
-        if len(name_acronym) >= 2 and name_acronym not in acronym_lookup:
-            acronym_lookup[name_acronym] = c.id
-        # If customer name itself looks like an acronym (2-6 chars, all alpha),
-        # register it so revenue names can match by their acronym
-        stripped = c.name.strip()
-        if 2 <= len(stripped) <= 6 and stripped.isalpha():
-            acronym_lookup[stripped.upper()] = c.id
-        if c.nickname:
-            exact_lookup[c.nickname.lower()] = c.id
-            cleaned_names.append((_clean_for_matching(c.nickname), c.id))
-            nick_acronym = _get_acronym(c.nickname)
-            if len(nick_acronym) >= 2 and nick_acronym not in acronym_lookup:
-                acronym_lookup[nick_acronym] = c.id
-            nick_stripped = c.nickname.strip()
-            if 2 <= len(nick_stripped) <= 6 and nick_stripped.isalpha():
-                acronym_lookup[nick_stripped.upper()] = c.id
-
-    return exact_lookup, cleaned_names, acronym_lookup
-
-
-def _resolve_customer_id(
-    exact_lookup: dict[str, int],
-    cleaned_names: list[tuple[str, int]],
-    customer_name: str,
-    acronym_lookup: dict[str, int] | None = None,
-) -> int | None:
-    """Look up a customer ID using exact match, prefix match, then acronym.
-
-    Matching tiers:
-    1. Exact match on name or nickname (case-insensitive)
-    2. Progressive word-prefix matching (drop trailing words)
-    3. Acronym matching ("Facilities Survey Inc" -> "FSI")
-
-    Args:
-        exact_lookup: Dict from _build_customer_lookup() for exact matches
-        cleaned_names: List from _build_customer_lookup() for prefix matches
-        customer_name: Raw customer name from revenue data
-        acronym_lookup: Optional dict from _build_customer_lookup() for acronyms
-
-    Returns:
-        Customer ID if found, None otherwise
-    """
-    # Tier 1: Exact match on name or nickname (case-insensitive)
-    result = exact_lookup.get(customer_name.lower())
-    if result is not None:
-        return result
-
-    # Tier 2: Progressive prefix matching
-    cleaned = _clean_for_matching(customer_name)
-    if len(cleaned) >= _MIN_PREFIX_LEN:
-        for cust_cleaned, cust_id in cleaned_names:
-            if _progressive_word_prefix_match(cleaned, cust_cleaned):
-                return cust_id
-
-    # Tier 3: Acronym matching
-    # Direction A: Revenue name is long, customer name is short acronym
-    #   e.g., CSV "Facilities Survey Inc" -> acronym "FSI" -> matches customer "FSI"
-    # Direction B: Revenue name is short acronym, customer name is long
-    #   e.g., CSV "FSI" -> direct lookup -> matches acronym of "Facilities Survey Inc"
-    if acronym_lookup:
-        # Direction A: compute acronym of the CSV name
-        acronym = _get_acronym(customer_name)
-        if len(acronym) >= 2:
-            result = acronym_lookup.get(acronym)
-            if result is not None:
-                return result
-        # Direction B: CSV name itself might be an acronym — look it up directly
-        stripped = customer_name.strip()
-        if 2 <= len(stripped) <= 6 and stripped.isalpha():
-            result = acronym_lookup.get(stripped.upper())
-            if result is not None:
-                return result
-
-    return None
-
-
 def consolidate_product_name(product: str) -> str:
     """Get the consolidated product name for display purposes.
     
@@ -385,6 +212,57 @@ def date_to_fiscal_month(d: date) -> str:
     return f"FY{fy:02d}-{month_abbrs[d.month - 1]}"
 
 
+# Encodings tried (in order) for MSXI exports
+_CSV_ENCODINGS = ['utf-8', 'cp1252', 'latin-1', 'iso-8859-1']
+
+# Bytes sampled from the start of an upload to pick its encoding
+_ENCODING_SAMPLE_BYTES = 256 * 1024
+
+# Body rows parsed, diffed and committed per transaction during import
+IMPORT_CHUNK_ROWS = 20000
+
+# The three name columns at the start of every body row
+_NAME_COLUMNS = ['TPAccountName', 'ServiceCompGrouping', 'ServiceLevel4']
+
+
+def _decode_stray_bytes(error: UnicodeError) -> tuple[str, int]:
+    """Codec error handler for bytes the sampled encoding can't decode.
+
+    The encoding is picked from the start of the file, so a stray cp1252
+    byte further down shouldn't abort a multi-megabyte import. Each bad
+    byte is decoded as cp1252, or latin-1 where cp1252 leaves it undefined.
+    """
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    chars = []
+    for byte in error.object[error.start:error.end]:
+        try:
+            chars.append(bytes([byte]).decode('cp1252'))
+        except UnicodeDecodeError:
+            chars.append(chr(byte))
+    return ''.join(chars), error.end
+
+
+codecs.register_error('revenue_csv_fallback', _decode_stray_bytes)
+
+
+def _detect_encoding(sample: bytes) -> str:
+    """Pick the first supported encoding that decodes a sample of the file.
+
+    The sample may end part-way through a multi-byte UTF-8 character, so
+    the trailing bytes are allowed to stay incomplete.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in _CSV_ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+
 def load_csv(file_content: bytes | str, filename: str = "upload.csv") -> Any:
     """Load CSV content into a DataFrame.
     
@@ -401,10 +279,8 @@ def load_csv(file_content: bytes | str, filename: str = "upload.csv") -> Any:
         raise RevenueImportError("pandas is required for revenue import. Install with: pip install pandas")
     
     # If bytes, try various encodings
-    encodings = ['utf-8', 'cp1252', 'latin-1', 'iso-8859-1']
-    
     if isinstance(file_content, bytes):
-        for encoding in encodings:
+        for encoding in _CSV_ENCODINGS:
             try:
                 content = file_content.decode(encoding)
                 return pd.read_csv(StringIO(content), header=None)
@@ -415,29 +291,19 @@ def load_csv(file_content: bytes | str, filename: str = "upload.csv") -> Any:
         return pd.read_csv(StringIO(file_content), header=None)
 
 
-def process_csv(df: Any) -> tuple[Any, list[str], dict[str, int]]:
-    """Process raw DataFrame to extract structured data.
-    
-    New format (ACR Details by Quarter Month SL4):
-    Row 0: FiscalMonth, , , FY26-Jul, FY26-Jul, FY26-Jul, FY26-Jul, FY26-Jul, FY26-Aug, ..., Total
-    Row 1: TPAccountName, ServiceCompGrouping, ServiceLevel4, $ ACR, $ ACR MoM, $ Average Daily ACR, ...
-    
-    Each month has 5 columns of metrics. We only want the first ($ ACR).
-    
+def _parse_header_rows(month_row: list, metric_row: list) -> tuple[list[str], dict[str, int]]:
+    """Validate the two header rows and locate each month's $ ACR column.
+
     Args:
-        df: Raw DataFrame (pandas) from CSV
-        
+        month_row: Row 0 values (FiscalMonth, , , FY26-Jul, ..., Total)
+        metric_row: Row 1 values (TPAccountName, ..., $ ACR, $ ACR MoM, ...)
+
     Returns:
-        Tuple of (processed DataFrame, list of unique month names, dict mapping month -> column index)
+        Tuple of (list of unique month names, dict mapping month -> column index)
     """
-    # Get month and metric rows
-    month_row = df.iloc[0].tolist()
-    metric_row = df.iloc[1].tolist() if len(df) > 1 else []
-    
     # Validate required columns exist in the header row
-    REQUIRED_COLUMNS = ['TPAccountName', 'ServiceCompGrouping', 'ServiceLevel4']
     header_values = [str(v).strip() for v in metric_row[:10] if pd.notna(v)]
-    missing = [col for col in REQUIRED_COLUMNS if col not in header_values]
+    missing = [col for col in _NAME_COLUMNS if col not in header_values]
     if missing:
         raise RevenueImportError(
             f"This doesn't look like the right CSV. "
@@ -466,26 +332,42 @@ def process_csv(df: Any) -> tuple[Any, list[str], dict[str, int]]:
             val_str = str(val).strip()
             if val_str.lower() == 'total':
                 break  # Stop at Total column
-            if 'FY' in val_str:
-                # Check if this is the first occurrence ($ ACR column)
-                # The metric row should say "$ ACR" for the first column of each month group
-                metric_label = str(metric_row[i]).strip() if i < len(metric_row) else ''
-                
-                if val_str not in month_to_col_idx:
-                    # First occurrence of this month - this is the $ ACR column
-                    month_to_col_idx[val_str] = i
-                    unique_months.append(val_str)
+            if 'FY' in val_str and val_str not in month_to_col_idx:
+                # First occurrence of this month - this is the $ ACR column
+                month_to_col_idx[val_str] = i
+                unique_months.append(val_str)
     
     if not unique_months:
         raise RevenueImportError("No fiscal month columns found")
+
+    return unique_months, month_to_col_idx
+
+
+def process_csv(df: Any) -> tuple[Any, list[str], dict[str, int]]:
+    """Process raw DataFrame to extract structured data.
+    
+    New format (ACR Details by Quarter Month SL4):
+    Row 0: FiscalMonth, , , FY26-Jul, FY26-Jul, FY26-Jul, FY26-Jul, FY26-Jul, FY26-Aug, ..., Total
+    Row 1: TPAccountName, ServiceCompGrouping, ServiceLevel4, $ ACR, $ ACR MoM, $ Average Daily ACR, ...
+    
+    Each month has 5 columns of metrics. We only want the first ($ ACR).
+    
+    Args:
+        df: Raw DataFrame (pandas) from CSV
+        
+    Returns:
+        Tuple of (processed DataFrame, list of unique month names, dict mapping month -> column index)
+    """
+    # Get month and metric rows
+    month_row = df.iloc[0].tolist()
+    metric_row = df.iloc[1].tolist() if len(df) > 1 else []
+    unique_months, month_to_col_idx = _parse_header_rows(month_row, metric_row)
     
     # Build new column names - use positional indexing instead of named columns
     # to avoid ambiguous column name issues
     num_cols = len(df.columns)
     col_names = [f'col_{i}' for i in range(num_cols)]
-    col_names[0] = 'TPAccountName'
-    col_names[1] = 'ServiceCompGrouping'
-    col_names[2] = 'ServiceLevel4'
+    col_names[:3] = _NAME_COLUMNS
     
     df.columns = col_names
     
@@ -500,52 +382,452 @@ def process_csv(df: Any) -> tuple[Any, list[str], dict[str, int]]:
     return df, unique_months, month_to_col_idx
 
 
-def _build_revenue_lookups(month_dates_values):
-    """Pre-fetch existing revenue records into lookup dicts for bulk upsert.
+def _open_csv_text(file_content: Any) -> tuple[Any, int, Callable[[], int]]:
+    """Wrap an upload in a text stream without reading it all into memory.
+
+    Args:
+        file_content: Raw bytes, decoded text, or a seekable binary file
+            object (e.g. the upload's ``FileStorage.stream``)
+
+    Returns:
+        Tuple of (text stream, total size, callable returning how far into
+        the source the parser has read). The caller must ``detach()`` a
+        TextIOWrapper when done so the source stream isn't closed.
+    """
+    if isinstance(file_content, str):
+        text = StringIO(file_content)
+        return text, len(file_content), text.tell
+
+    raw = BytesIO(file_content) if isinstance(file_content, (bytes, bytearray)) else file_content
+    if not (hasattr(raw, 'seekable') and raw.seekable()):
+        raw = BytesIO(raw.read())
+
+    start = raw.tell()
+    total = raw.seek(0, 2) - start
+    raw.seek(start)
+    sample = raw.read(_ENCODING_SAMPLE_BYTES)
+    raw.seek(start)
+
+    text = TextIOWrapper(
+        raw, encoding=_detect_encoding(sample),
+        errors='revenue_csv_fallback', newline='',
+    )
+    return text, total, lambda: raw.tell() - start
+
+
+def _read_csv_header(text: Any) -> tuple[list[str], dict[str, int], int]:
+    """Read and validate the two header rows from the front of a CSV stream.
 
-    Instead of issuing one SELECT per row (N+1 pattern), this loads all
-    existing records for the relevant months in two queries and indexes
-    them by their natural-key tuples for O(1) in-memory lookups.
+    Leaves the stream positioned at the first body row.
+
+    Returns:
+        Tuple of (unique month names, month -> column index, column count)
+    """
+    reader = csv.reader(text)
+    header = []
+    for row in reader:
+        if any(cell.strip() for cell in row):  # pandas skips blank lines too
+            header.append([cell if cell != '' else None for cell in row])
+            if len(header) == 2:
+                break
+    if not header:
+        raise RevenueImportError("CSV file is empty")
+
+    month_row = header[0]
+    metric_row = header[1] if len(header) > 1 else []
+    unique_months, month_to_col_idx = _parse_header_rows(month_row, metric_row)
+    return unique_months, month_to_col_idx, max(len(month_row), len(metric_row))
+
+
+def _iter_csv_chunks(
+    text: Any,
+    month_to_col_idx: dict[str, int],
+    num_cols: int,
+    chunk_rows: int,
+):
+    """Yield the CSV body in DataFrames of at most ``chunk_rows`` rows.
+
+    Only the name columns and each month's $ ACR column are parsed. Chunks
+    use the same column names as process_csv() and have empty rows dropped.
+    """
+    month_idx = sorted(set(month_to_col_idx.values()))
+    renames = dict(enumerate(_NAME_COLUMNS))
+    renames.update({i: f'col_{i}' for i in month_idx})
+    try:
+        reader = pd.read_csv(
+            text, header=None, names=list(range(num_cols)),
+            usecols=[0, 1, 2] + month_idx,
+            dtype={0: str, 1: str, 2: str},
+            chunksize=chunk_rows,
+        )
+        with reader:
+            for chunk in reader:
+                chunk = chunk.rename(columns=renames)
+                chunk = chunk[chunk['TPAccountName'].notna() & (chunk['TPAccountName'] != '')]
+                if not chunk.empty:
+                    yield chunk.reset_index(drop=True)
+    except pd.errors.EmptyDataError:
+        return
+    except pd.errors.ParserError as e:
+        raise RevenueImportError(f"Could not parse CSV: {e}") from e
+
+
+def _parse_currency_series(values: Any) -> Any:
+    """Vectorized :func:`parse_currency` for a whole column of cells.
+
+    Numeric columns pass straight through; text columns have currency
+    symbols, commas and whitespace stripped, "(x)" turned into "-x", and
+    anything unparseable coerced to 0.0 -- the same rules as the scalar
+    version, applied once per column instead of once per cell.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float).fillna(0.0)
+
+    text = values.astype('string').str.replace(r'[$,\s]', '', regex=True)
+    negative = (text.str.startswith('(') & text.str.endswith(')')).fillna(False).astype(bool)
+    text = text.where(~negative, '-' + text.str.slice(1, -1))
+    return pd.to_numeric(text, errors='coerce').fillna(0.0).astype(float)
+
+
+def _melt_revenue_rows(
+    df: Any,
+    month_dates: dict[str, date],
+    month_to_col_idx: dict[str, int],
+    territory_alignments: Optional[dict] = None,
+    resolver: Optional[NameResolver] = None,
+) -> tuple[Any, Any]:
+    """Reshape processed CSV rows into long-form bucket and product frames.
+
+    Each frame has one row per (customer, bucket[, product], month) with the
+    revenue already parsed, the matched Sales Buddy customer ID resolved
+    once per distinct name, and (for bucket rows) the seller from the
+    territory alignments.
 
     Args:
-        month_dates_values: Collection of date objects to filter by.
+        df: DataFrame returned by process_csv()
+        month_dates: Fiscal month label -> first-of-month date
+        month_to_col_idx: Fiscal month label -> $ ACR column index
+        territory_alignments: Optional (customer_name, bucket) -> seller_name
+        resolver: NameResolver to reuse across chunks (built if omitted)
 
     Returns:
-        Tuple of (customer_rev_lookup, product_rev_lookup, existing_month_dates)
-        - customer_rev_lookup: dict mapping (customer_name, bucket, month_date)
-          to the CustomerRevenueData instance
-        - product_rev_lookup: dict mapping (customer_name, bucket, product,
-          month_date) to the ProductRevenueData instance
-        - existing_month_dates: set of month_date values already stored
+        Tuple of (bucket_rows, product_rows) DataFrames
     """
-    dates_list = list(month_dates_values)
+    customer = df['TPAccountName'].astype(str).str.strip()
+    bucket = df['ServiceCompGrouping'].fillna('').astype(str).str.strip()
+    product = df['ServiceLevel4'].fillna('').astype(str).str.strip()
+
+    # Skip blank names and summary/total rows
+    keep = (
+        (customer != '')
+        & (bucket.str.lower() != 'total')
+        & (customer.str.lower() != 'total')
+    )
 
-    customer_records = CustomerRevenueData.query.filter(
-        CustomerRevenueData.month_date.in_(dates_list)
-    ).all()
-    customer_rev_lookup = {
-        (r.customer_name, r.bucket, r.month_date): r
-        for r in customer_records
+    wide = pd.DataFrame({
+        'customer_name': customer,
+        'bucket': bucket,
+        'product': product,
+    })
+    month_labels = [mc for mc in month_dates if mc in month_to_col_idx]
+    for mc in month_labels:
+        wide[mc] = _parse_currency_series(df[f'col_{month_to_col_idx[mc]}'])
+    wide = wide[keep]
+
+    # Resolve each distinct customer name once
+    if resolver is None:
+        resolver = NameResolver.for_customers()
+    name_to_id = {
+        name: resolver.resolve(name) for name in wide['customer_name'].unique()
     }
+    wide['customer_id'] = wide['customer_name'].map(name_to_id).astype('Int64')
 
-    product_records = ProductRevenueData.query.filter(
-        ProductRevenueData.month_date.in_(dates_list)
-    ).all()
-    product_rev_lookup = {
-        (r.customer_name, r.bucket, r.product, r.month_date): r
-        for r in product_records
+    is_bucket_total = (wide['product'].str.lower() == 'total') | (wide['product'] == '')
+
+    bucket_wide = wide[is_bucket_total].drop(columns='product')
+    if territory_alignments:
+        bucket_wide['seller_name'] = [
+            territory_alignments.get(key)
+            for key in zip(bucket_wide['customer_name'], bucket_wide['bucket'])
+        ]
+    else:
+        bucket_wide['seller_name'] = None
+    product_wide = wide[~is_bucket_total]
+
+    def _melt(frame: Any, id_vars: list[str]) -> Any:
+        long = frame.melt(
+            id_vars=id_vars, value_vars=month_labels,
+            var_name='fiscal_month', value_name='revenue',
+        )
+        long['month_date'] = long['fiscal_month'].map(month_dates)
+        # Duplicate keys in one file: the last row wins, as with row-by-row upserts
+        key = [c for c in id_vars if c not in ('customer_id', 'seller_name')]
+        return long.drop_duplicates(subset=key + ['month_date'], keep='last')
+
+    bucket_rows = _melt(bucket_wide, ['customer_name', 'bucket', 'customer_id', 'seller_name'])
+    product_rows = _melt(product_wide, ['customer_name', 'bucket', 'product', 'customer_id'])
+    return bucket_rows, product_rows
+
+
+# Customer names per IN (...) clause, under SQLite's bound-parameter limit
+_NAME_BATCH = 900
+
+
+def _diff_against_existing(
+    rows: Any,
+    model: Any,
+    key_cols: list[str],
+    fill_cols: list[str],
+) -> tuple[Any, int, int]:
+    """Compare incoming rows with stored revenue and keep only the ones to write.
+
+    Loads the existing (key, revenue, fill columns) tuples for the months and
+    customers in ``rows`` (a few batched queries) and merges them in memory.
+
+    Returns:
+        Tuple of (rows_to_write, created_count, updated_count). Rows to write
+        are new keys, keys whose revenue changed, and keys where a previously
+        empty fill column (customer_id / seller_name) can now be filled.
+    """
+    if rows.empty:
+        return rows, 0, 0
+
+    columns = [getattr(model, c) for c in key_cols + ['revenue'] + fill_cols]
+    dates = list(rows['month_date'].unique())
+    names = list(rows['customer_name'].unique())
+    found = []
+    for start in range(0, len(names), _NAME_BATCH):
+        found.extend(
+            db.session.query(*columns).filter(
+                model.month_date.in_(dates),
+                model.customer_name.in_(names[start:start + _NAME_BATCH]),
+            ).all()
+        )
+    existing = pd.DataFrame(found, columns=key_cols + ['revenue'] + fill_cols)
+    if existing.empty:
+        return rows, len(rows), 0
+
+    merged = rows.merge(
+        existing, on=key_cols, how='left', suffixes=('', '_old'), indicator=True,
+    )
+    is_new = (merged['_merge'] == 'left_only').to_numpy()
+    changed = ~is_new & (merged['revenue'] != merged['revenue_old']).to_numpy()
+    fillable = pd.Series(False, index=merged.index)
+    for col in fill_cols:
+        fillable |= merged[col].notna() & merged[f'{col}_old'].isna()
+    needs_write = is_new | changed | (~is_new & fillable.to_numpy())
+
+    return (
+        rows[needs_write],
+        int(is_new.sum()),
+        int(changed.sum()),
+    )
+
+
+def _upsert_revenue_rows(
+    model: Any,
+    rows: Any,
+    key_cols: list[str],
+    fill_cols: list[str],
+    import_id: int,
+    batch_size: int = 5000,
+):
+    """Bulk upsert revenue rows with INSERT ... ON CONFLICT DO UPDATE.
+
+    Revenue always takes the incoming value; ``last_updated_at`` and
+    ``last_import_id`` only move when the revenue actually changed; fill
+    columns are only set when the stored value is empty.
+
+    Yields the number of rows written after each batch.
+    """
+    if rows.empty:
+        return
+
+    now = datetime.now(timezone.utc)
+    table = model.__table__
+    stmt = sqlite_insert(table)
+    excluded = stmt.excluded
+    revenue_changed = table.c.revenue != excluded.revenue
+    set_ = {
+        'revenue': excluded.revenue,
+        'last_updated_at': case(
+            (revenue_changed, excluded.last_updated_at),
+            else_=table.c.last_updated_at,
+        ),
+        'last_import_id': case(
+            (revenue_changed, excluded.last_import_id),
+            else_=table.c.last_import_id,
+        ),
     }
+    for col in fill_cols:
+        set_[col] = func.coalesce(table.c[col], excluded[col])
+    stmt = stmt.on_conflict_do_update(index_elements=key_cols, set_=set_)
+
+    # Build plain-Python parameter dicts column by column (NA -> None)
+    names = list(rows.columns)
+    columns = [
+        [None if pd.isna(v) else v for v in rows[name].astype(object)]
+        if rows[name].hasnans else rows[name].tolist()
+        for name in names
+    ]
+    records = [
+        dict(zip(names, values), last_import_id=import_id,
+             last_updated_at=now, first_imported_at=now)
+        for values in zip(*columns)
+    ]
+
+    written = 0
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        db.session.execute(stmt, batch)
+        written += len(batch)
+        yield written
 
-    existing_month_rows = db.session.query(
-        CustomerRevenueData.month_date
-    ).distinct().all()
-    existing_month_dates = {row[0] for row in existing_month_rows}
 
-    return customer_rev_lookup, product_rev_lookup, existing_month_dates
+_BUCKET_KEY = ['customer_name', 'bucket', 'month_date']
+_PRODUCT_KEY = ['customer_name', 'bucket', 'product', 'month_date']
+
+
+def _import_revenue_chunk(
+    chunk: Any,
+    month_dates: dict[str, date],
+    month_to_col_idx: dict[str, int],
+    import_record: RevenueImport,
+    resolver: NameResolver,
+    territory_alignments: Optional[dict] = None,
+) -> tuple[int, int, set]:
+    """Diff and upsert one chunk of body rows (the caller commits).
+
+    Returns:
+        Tuple of (created_count, updated_count, bucket month dates written)
+    """
+    bucket_rows, product_rows = _melt_revenue_rows(
+        chunk, month_dates, month_to_col_idx, territory_alignments, resolver
+    )
+    bucket_rows, bucket_created, bucket_updated = _diff_against_existing(
+        bucket_rows, CustomerRevenueData, _BUCKET_KEY, ['customer_id', 'seller_name']
+    )
+    product_rows, product_created, product_updated = _diff_against_existing(
+        product_rows, ProductRevenueData, _PRODUCT_KEY, ['customer_id']
+    )
+    for model, rows, key, fill in (
+        (CustomerRevenueData, bucket_rows, _BUCKET_KEY, ['customer_id', 'seller_name']),
+        (ProductRevenueData, product_rows, _PRODUCT_KEY, ['customer_id']),
+    ):
+        for _ in _upsert_revenue_rows(model, rows, key, fill, import_record.id):
+            pass
+    return (
+        bucket_created + product_created,
+        bucket_updated + product_updated,
+        set(bucket_rows['month_date']),
+    )
+
+
+def _import_revenue_stream(
+    file_content: Any,
+    filename: str,
+    territory_alignments: Optional[dict] = None,
+):
+    """Shared import pipeline for import_revenue_csv and its streaming variant.
+
+    Memory stays bounded by the chunk size rather than the file size: the
+    encoding is picked from a sample, the two header rows are parsed once,
+    and the body is read IMPORT_CHUNK_ROWS rows at a time. Each chunk is
+    melted, diffed against stored revenue, bulk upserted and committed as
+    its own transaction, so a failure part-way keeps the earlier chunks.
+
+    Yields progress dicts ({"message": ..., "progress": ..., "rows_processed": ...})
+    and returns the committed RevenueImport via StopIteration.value.
+    """
+    if not HAS_PANDAS:
+        raise RevenueImportError("pandas is required for revenue import. Install with: pip install pandas")
+
+    text, total_size, position = _open_csv_text(file_content)
+    try:
+        month_cols, month_to_col_idx, num_cols = _read_csv_header(text)
+
+        # Convert month columns to dates
+        month_dates = {}
+        for mc in month_cols:
+            d = fiscal_month_to_date(mc)
+            if d:
+                month_dates[mc] = d
+
+        if not month_dates:
+            raise RevenueImportError("Could not parse any fiscal month columns")
+
+        yield {"message": f"Processing months: {', '.join(month_cols)}"}
+
+        yield {"message": "Loading customer database..."}
+        resolver = NameResolver.for_customers()
+
+        # Months that are new to the database (tracked for bucket rows only)
+        existing_month_dates = {
+            row[0] for row in
+            db.session.query(CustomerRevenueData.month_date).distinct().all()
+        }
+        new_months = set()
+
+        import_record = None
+        rows_processed = 0
+        for chunk in _iter_csv_chunks(text, month_to_col_idx, num_cols, IMPORT_CHUNK_ROWS):
+            if import_record is None:
+                import_record = RevenueImport(
+                    filename=filename,
+                    record_count=0,
+                    records_created=0,
+                    records_updated=0,
+                    new_months_added=0,
+                    earliest_month=min(month_dates.values()),
+                    latest_month=max(month_dates.values()),
+                )
+                db.session.add(import_record)
+                db.session.commit()
+
+            try:
+                created, updated, written_months = _import_revenue_chunk(
+                    chunk, month_dates, month_to_col_idx, import_record,
+                    resolver, territory_alignments,
+                )
+                new_months |= written_months - existing_month_dates
+                import_record.record_count += len(chunk)
+                import_record.records_created += created
+                import_record.records_updated += updated
+                import_record.new_months_added = len(new_months)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            rows_processed += len(chunk)
+            progress = int(position() / total_size * 95) if total_size else 0
+            yield {
+                "message": f"Imported {rows_processed:,} rows...",
+                "progress": min(progress, 95),
+                "rows_processed": rows_processed,
+            }
+    finally:
+        if isinstance(text, TextIOWrapper):
+            text.detach()  # leave the caller's stream open
+
+    if import_record is None:
+        raise RevenueImportError("No data rows found in CSV")
+
+    yield {"message": "Updating revenue rollups...", "progress": 97}
+    rebuild_revenue_rollups()
+    write_revenue_store()
+
+    total_records = import_record.records_created + import_record.records_updated
+    SyncStatus.mark_completed(
+        'revenue_import', success=True,
+        items_synced=total_records,
+        details=f'{import_record.records_created} created, {import_record.records_updated} updated'
+    )
+    return import_record
 
 
 def import_revenue_csv(
-    file_content: bytes | str,
+    file_content: Any,
     filename: str,
     territory_alignments: Optional[dict] = None
 ) -> RevenueImport:
@@ -560,7 +842,7 @@ def import_revenue_csv(
     - Customer totals (ServiceCompGrouping = "Total") -> skipped (can be calculated)
     
     Args:
-        file_content: Raw CSV content
+        file_content: Raw CSV content, or a seekable binary file object
         filename: Original filename
         territory_alignments: Optional dict mapping (customer_name, bucket) -> seller_name
         
@@ -569,167 +851,16 @@ def import_revenue_csv(
     """
     SyncStatus.mark_started('revenue_import')
 
-    # Load and process CSV
-    df = load_csv(file_content, filename)
-    df, month_cols, month_to_col_idx = process_csv(df)
-    
-    if df.empty:
-        raise RevenueImportError("No data rows found in CSV")
-    
-    # Convert month columns to dates
-    month_dates = {}
-    for mc in month_cols:
-        d = fiscal_month_to_date(mc)
-        if d:
-            month_dates[mc] = d
-    
-    if not month_dates:
-        raise RevenueImportError("Could not parse any fiscal month columns")
-    
-    # Create import record
-    earliest = min(month_dates.values())
-    latest = max(month_dates.values())
-    
-    import_record = RevenueImport(
-        filename=filename,
-        record_count=len(df),
-        earliest_month=earliest,
-        latest_month=latest
-    )
-    db.session.add(import_record)
-    db.session.flush()  # Get the ID
-    
-    # Track stats
-    bucket_records_created = 0
-    bucket_records_updated = 0
-    product_records_created = 0
-    product_records_updated = 0
-    new_months = set()
-    
-    # Build customer lookup (exact + prefix + acronym matching)
-    exact_lookup, cleaned_names, acronym_lookup = _build_customer_lookup()
-    
-    # Bulk pre-fetch existing revenue records (eliminates N+1 queries)
-    customer_rev_lookup, product_rev_lookup, existing_month_dates = \
-        _build_revenue_lookups(month_dates.values())
-    
-    # Process each row
-    for _, row in df.iterrows():
-        customer_name = str(row['TPAccountName']).strip()
-        bucket = str(row['ServiceCompGrouping']).strip() if pd.notna(row.get('ServiceCompGrouping')) else ''
-        product = str(row['ServiceLevel4']).strip() if pd.notna(row.get('ServiceLevel4')) else ''
-        
-        if not customer_name:
-            continue
-        
-        # Skip summary/total rows
-        if bucket.lower() == 'total':
-            continue
-        if customer_name.lower() == 'total':
-            continue
-        
-        # Try to match to existing Sales Buddy customer
-        customer_id = _resolve_customer_id(exact_lookup, cleaned_names, customer_name, acronym_lookup)
-        
-        # Get seller from territory alignments if provided
-        seller_name = None
-        if territory_alignments:
-            seller_name = territory_alignments.get((customer_name, bucket))
-        
-        # Process each month column using column index
-        for month_col, month_date in month_dates.items():
-            col_idx = month_to_col_idx.get(month_col)
-            if col_idx is None:
-                continue
-            # Access by column index (col_N format)
-            col_name = f'col_{col_idx}'
-            revenue = parse_currency(row.get(col_name, 0))
-            fiscal_month = month_col
-            
-            # Determine if this is a bucket total or product detail
-            is_bucket_total = (product.lower() == 'total' or product == '')
-            
-            if is_bucket_total:
-                # Store in CustomerRevenueData (for analysis)
-                crev_key = (customer_name, bucket, month_date)
-                existing = customer_rev_lookup.get(crev_key)
-                
-                if existing:
-                    if existing.revenue != revenue:
-                        existing.revenue = revenue
-                        existing.last_updated_at = datetime.now(timezone.utc)
-                        existing.last_import_id = import_record.id
-                        bucket_records_updated += 1
-                    if customer_id and not existing.customer_id:
-                        existing.customer_id = customer_id
-                    if seller_name and not existing.seller_name:
-                        existing.seller_name = seller_name
-                else:
-                    new_record = CustomerRevenueData(
-                        customer_name=customer_name,
-                        bucket=bucket,
-                        customer_id=customer_id,
-                        seller_name=seller_name,
-                        fiscal_month=fiscal_month,
-                        month_date=month_date,
-                        revenue=revenue,
-                        last_import_id=import_record.id
-                    )
-                    db.session.add(new_record)
-                    customer_rev_lookup[crev_key] = new_record
-                    bucket_records_created += 1
-                    
-                    # Track new months (from pre-fetched set)
-                    if month_date not in existing_month_dates:
-                        new_months.add(month_date)
-                        existing_month_dates.add(month_date)
-            else:
-                # Store in ProductRevenueData (for drill-down)
-                prev_key = (customer_name, bucket, product, month_date)
-                existing = product_rev_lookup.get(prev_key)
-                
-                if existing:
-                    if existing.revenue != revenue:
-                        existing.revenue = revenue
-                        existing.last_updated_at = datetime.now(timezone.utc)
-                        existing.last_import_id = import_record.id
-                        product_records_updated += 1
-                    if customer_id and not existing.customer_id:
-                        existing.customer_id = customer_id
-                else:
-                    new_record = ProductRevenueData(
-                        customer_name=customer_name,
-                        bucket=bucket,
-                        product=product,
-                        customer_id=customer_id,
-                        fiscal_month=fiscal_month,
-                        month_date=month_date,
-                        revenue=revenue,
-                        last_import_id=import_record.id
-                    )
-                    db.session.add(new_record)
-                    product_rev_lookup[prev_key] = new_record
-                    product_records_created += 1
-    
-    # Update import stats
-    import_record.records_created = bucket_records_created + product_records_created
-    import_record.records_updated = bucket_records_updated + product_records_updated
-    import_record.new_months_added = len(new_months)
-    
-    db.session.commit()
-
-    total_records = import_record.records_created + import_record.records_updated
-    SyncStatus.mark_completed(
-        'revenue_import', success=True,
-        items_synced=total_records,
-        details=f'{import_record.records_created} created, {import_record.records_updated} updated'
-    )
-    
-    return import_record
+    gen = _import_revenue_stream(file_content, filename, territory_alignments)
+    try:
+        while True:
+            next(gen)
+    except StopIteration as stop:
+        return stop.value
 
 
 def import_revenue_csv_streaming(
-    file_content: bytes | str,
+    file_content: Any,
     filename: str,
     territory_alignments: Optional[dict] = None
 ):
@@ -738,7 +869,7 @@ def import_revenue_csv_streaming(
     Yields progress dicts and finally a completion dict with the result.
     
     Args:
-        file_content: Raw CSV content
+        file_content: Raw CSV content, or a seekable binary file object
         filename: Original filename
         territory_alignments: Optional dict mapping (customer_name, bucket) -> seller_name
         
@@ -747,179 +878,17 @@ def import_revenue_csv_streaming(
     """
     SyncStatus.mark_started('revenue_import')
     yield {"message": "Reading CSV file..."}
-    
-    # Load and process CSV
-    df = load_csv(file_content, filename)
-    df, month_cols, month_to_col_idx = process_csv(df)
-    
-    if df.empty:
-        yield {"error": "No data rows found in CSV"}
-        return
-    
-    yield {"message": f"Found {len(df)} rows with {len(month_cols)} months of data"}
-    
-    # Convert month columns to dates
-    month_dates = {}
-    for mc in month_cols:
-        d = fiscal_month_to_date(mc)
-        if d:
-            month_dates[mc] = d
-    
-    if not month_dates:
-        yield {"error": "Could not parse any fiscal month columns"}
-        return
-    
-    yield {"message": f"Processing months: {', '.join(month_cols)}"}
-    
-    # Create import record
-    earliest = min(month_dates.values())
-    latest = max(month_dates.values())
-    
-    import_record = RevenueImport(
-        filename=filename,
-        record_count=len(df),
-        earliest_month=earliest,
-        latest_month=latest
-    )
-    db.session.add(import_record)
-    db.session.flush()
-    
-    # Track stats
-    bucket_records_created = 0
-    bucket_records_updated = 0
-    product_records_created = 0
-    product_records_updated = 0
-    new_months = set()
-    
-    # Build customer lookup (exact + prefix + acronym matching)
-    yield {"message": "Loading customer database..."}
-    exact_lookup, cleaned_names, acronym_lookup = _build_customer_lookup()
-    
-    # Bulk pre-fetch existing revenue records (eliminates N+1 queries)
-    yield {"message": "Pre-loading existing revenue records..."}
-    customer_rev_lookup, product_rev_lookup, existing_month_dates = \
-        _build_revenue_lookups(month_dates.values())
-    
-    # Process rows with progress updates
-    total_rows = len(df)
-    last_progress = 0
-    
-    yield {"message": f"Processing {total_rows} revenue records...", "progress": 0}
-    
-    for idx, (_, row) in enumerate(df.iterrows()):
-        # Update progress every 10% (use idx+1 since we calculate after starting to process)
-        progress = int(((idx + 1) / total_rows) * 100)
-        if progress >= last_progress + 10:
-            yield {"message": f"Processing records... ({progress}%)", "progress": progress}
-            last_progress = progress
-        
-        customer_name = str(row['TPAccountName']).strip()
-        bucket = str(row['ServiceCompGrouping']).strip() if pd.notna(row.get('ServiceCompGrouping')) else ''
-        product = str(row['ServiceLevel4']).strip() if pd.notna(row.get('ServiceLevel4')) else ''
-        
-        if not customer_name:
-            continue
-        
-        # Skip summary/total rows
-        if bucket.lower() == 'total':
-            continue
-        if customer_name.lower() == 'total':
-            continue
-        
-        # Try to match to existing Sales Buddy customer
-        customer_id = _resolve_customer_id(exact_lookup, cleaned_names, customer_name, acronym_lookup)
-        
-        # Get seller from territory alignments if provided
-        seller_name = None
-        if territory_alignments:
-            seller_name = territory_alignments.get((customer_name, bucket))
-        
-        # Process each month column using column index
-        for month_col, month_date in month_dates.items():
-            col_idx = month_to_col_idx.get(month_col)
-            if col_idx is None:
-                continue
-            # Access by column index (col_N format)
-            col_name = f'col_{col_idx}'
-            revenue = parse_currency(row.get(col_name, 0))
-            fiscal_month = month_col
-            
-            is_bucket_total = (product.lower() == 'total' or product == '')
-            
-            if is_bucket_total:
-                crev_key = (customer_name, bucket, month_date)
-                existing = customer_rev_lookup.get(crev_key)
-                
-                if existing:
-                    if existing.revenue != revenue:
-                        existing.revenue = revenue
-                        existing.last_updated_at = datetime.now(timezone.utc)
-                        existing.last_import_id = import_record.id
-                        bucket_records_updated += 1
-                    if customer_id and not existing.customer_id:
-                        existing.customer_id = customer_id
-                    if seller_name and not existing.seller_name:
-                        existing.seller_name = seller_name
-                else:
-                    new_record = CustomerRevenueData(
-                        customer_name=customer_name,
-                        bucket=bucket,
-                        customer_id=customer_id,
-                        seller_name=seller_name,
-                        fiscal_month=fiscal_month,
-                        month_date=month_date,
-                        revenue=revenue,
-                        last_import_id=import_record.id
-                    )
-                    db.session.add(new_record)
-                    customer_rev_lookup[crev_key] = new_record
-                    bucket_records_created += 1
-                    
-                    if month_date not in existing_month_dates:
-                        new_months.add(month_date)
-                        existing_month_dates.add(month_date)
-            else:
-                prev_key = (customer_name, bucket, product, month_date)
-                existing = product_rev_lookup.get(prev_key)
-                
-                if existing:
-                    if existing.revenue != revenue:
-                        existing.revenue = revenue
-                        existing.last_updated_at = datetime.now(timezone.utc)
-                        existing.last_import_id = import_record.id
-                        product_records_updated += 1
-                    if customer_id and not existing.customer_id:
-                        existing.customer_id = customer_id
-                else:
-                    new_record = ProductRevenueData(
-                        customer_name=customer_name,
-                        bucket=bucket,
-                        product=product,
-                        customer_id=customer_id,
-                        fiscal_month=fiscal_month,
-                        month_date=month_date,
-                        revenue=revenue,
-                        last_import_id=import_record.id
-                    )
-                    db.session.add(new_record)
-                    product_rev_lookup[prev_key] = new_record
-                    product_records_created += 1
-    
-    yield {"message": "Saving to database...", "progress": 95}
-    
-    # Update import stats
-    import_record.records_created = bucket_records_created + product_records_created
-    import_record.records_updated = bucket_records_updated + product_records_updated
-    import_record.new_months_added = len(new_months)
-    
-    db.session.commit()
 
-    total_records = import_record.records_created + import_record.records_updated
-    SyncStatus.mark_completed(
-        'revenue_import', success=True,
-        items_synced=total_records,
-        details=f'{import_record.records_created} created, {import_record.records_updated} updated'
-    )
+    gen = _import_revenue_stream(file_content, filename, territory_alignments)
+    try:
+        while True:
+            yield next(gen)
+    except RevenueImportError as e:
+        SyncStatus.mark_completed('revenue_import', success=False, details=str(e))
+        yield {"error": str(e)}
+        return
+    except StopIteration as stop:
+        import_record = stop.value
     
     yield {"message": f"Import complete: {import_record.records_created} created, {import_record.records_updated} updated", "progress": 100}
     yield {"complete": True, "result": import_record}
@@ -1109,6 +1078,219 @@ def get_products_for_bucket(
     ]
 
 
+# Months shown in the per-bucket and total grids
+_VIEW_RECENT_MONTHS = 7
+
+
+def _recent_months(month_dates: dict) -> list[str]:
+    """The newest fiscal months from a {fiscal_month: month_date} mapping, oldest first."""
+    ordered = sorted(month_dates.items(), key=lambda x: x[1])
+    return [m[0] for m in ordered[-_VIEW_RECENT_MONTHS:]]
+
+
+# Default for the ``store`` arguments below: look up the current store
+_CURRENT_STORE = object()
+
+
+def load_revenue_series(
+    *,
+    customer_id: Optional[int] = None,
+    customer_name: Optional[str] = None,
+    bucket: Optional[str] = None,
+    store=_CURRENT_STORE,
+) -> tuple[list[tuple], list[tuple]]:
+    """Load a customer's bucket and product revenue series as plain tuples.
+    
+    Reads the memory-mapped history store when it is current, otherwise
+    runs one query per level.
+    
+    Args:
+        customer_id: Sales Buddy customer ID (preferred over customer_name)
+        customer_name: Customer name (from CSV)
+        bucket: Optional bucket filter
+        store: History store already resolved by a caller reading many
+            series (None to use the database); looked up when omitted
+        
+    Returns:
+        (bucket_rows, product_rows): (bucket, fiscal_month, month_date, revenue)
+        and (bucket, product, fiscal_month, month_date, revenue), each series
+        in month order.
+    """
+    if not customer_id and not customer_name:
+        return [], []
+    
+    if store is _CURRENT_STORE:
+        store = get_revenue_store()
+    if store is not None:
+        lookup = {'customer_id': customer_id, 'customer_name': customer_name, 'bucket': bucket}
+        return store.bucket_points(**lookup), store.product_points(**lookup)
+    
+    def series(model, *columns):
+        query = db.session.query(
+            *columns, model.fiscal_month, model.month_date, model.revenue,
+        )
+        if customer_id:
+            query = query.filter(model.customer_id == customer_id)
+        else:
+            query = query.filter(model.customer_name == customer_name)
+        if bucket:
+            query = query.filter(model.bucket == bucket)
+        return [tuple(r) for r in query.order_by(model.month_date)]
+    
+    return (
+        series(CustomerRevenueData, CustomerRevenueData.bucket),
+        series(ProductRevenueData, ProductRevenueData.bucket, ProductRevenueData.product),
+    )
+
+
+def _pivot_bucket(history: list[dict], series: dict[str, list]) -> tuple[list[dict], dict]:
+    """Products (by total revenue) and the grid data for one bucket."""
+    products = sorted(
+        (
+            {
+                'product': product,
+                'total_revenue': sum(r for _, _, r in rows) or 0,
+                'month_count': len(rows),
+            }
+            for product, rows in series.items()
+        ),
+        key=lambda p: p['total_revenue'],
+        reverse=True,
+    )
+    
+    month_dates = {}
+    for rows in series.values():
+        for fiscal_month, month_date, _ in rows:
+            month_dates[fiscal_month] = month_date
+    for rd in history:
+        month_dates[rd['fiscal_month']] = rd['month_date']
+    
+    return products, {
+        'recent_months': _recent_months(month_dates),
+        'product_summary': [
+            {
+                'product': p['product'],
+                'total_revenue': p['total_revenue'],
+                'month_revenues': {fm: r for fm, _, r in series[p['product']]},
+            }
+            for p in products
+        ],
+        'bucket_month_revenues': {rd['fiscal_month']: rd['revenue'] for rd in history},
+        'bucket_total': sum(rd['revenue'] for rd in history),
+    }
+
+
+def _group_revenue_series(bucket_rows: list[tuple], product_rows: list[tuple]) -> tuple[dict, dict]:
+    """bucket -> month dicts, and bucket -> product -> (fiscal_month, month_date, revenue)."""
+    history_by_bucket: dict[str, list[dict]] = {}
+    for bucket, fiscal_month, month_date, revenue in bucket_rows:
+        if bucket:
+            history_by_bucket.setdefault(bucket, []).append({
+                'fiscal_month': fiscal_month,
+                'month_date': month_date,
+                'revenue': revenue,
+            })
+    
+    product_series: dict[str, dict[str, list]] = {}
+    for bucket, product, fiscal_month, month_date, revenue in product_rows:
+        product_series.setdefault(bucket, {}).setdefault(product, []).append(
+            (fiscal_month, month_date, revenue)
+        )
+    return history_by_bucket, product_series
+
+
+def get_bucket_revenue_grid(
+    bucket: str,
+    *,
+    customer_id: Optional[int] = None,
+    customer_name: Optional[str] = None,
+    store=_CURRENT_STORE,
+) -> dict:
+    """Product revenue grid for one customer/bucket.
+    
+    Args:
+        bucket: Bucket name
+        customer_id: Sales Buddy customer ID (preferred over customer_name)
+        customer_name: Customer name (from CSV)
+        store: As for load_revenue_series
+        
+    Returns:
+        Dict with recent_months, product_summary, bucket_month_revenues and
+        bucket_total (as in bucket_product_data of the customer view), plus
+        products (product, total_revenue, month_count) and product_history
+        (product -> month dicts).
+    """
+    history_by_bucket, product_series = _group_revenue_series(*load_revenue_series(
+        customer_id=customer_id, customer_name=customer_name, bucket=bucket, store=store,
+    ))
+    series = product_series.get(bucket, {})
+    products, grid = _pivot_bucket(history_by_bucket.get(bucket, []), series)
+    grid['products'] = products
+    grid['product_history'] = {
+        p['product']: [
+            {'fiscal_month': fm, 'month_date': md, 'revenue': r}
+            for fm, md, r in series[p['product']]
+        ]
+        for p in products
+    }
+    return grid
+
+
+def _build_customer_revenue_view(customer_id: int) -> dict:
+    """Load a customer's bucket and product series and pivot them."""
+    history_by_bucket, product_series = _group_revenue_series(
+        *load_revenue_series(customer_id=customer_id)
+    )
+    
+    revenue_by_bucket = {}
+    products_by_bucket = {}
+    bucket_product_data = {}
+    for bucket in sorted(history_by_bucket):
+        history = history_by_bucket[bucket]
+        revenue_by_bucket[bucket] = history
+        products_by_bucket[bucket], bucket_product_data[bucket] = _pivot_bucket(
+            history, product_series.get(bucket, {})
+        )
+    
+    # Grand total across all buckets (month-by-month)
+    grand_month_revenues = {}
+    grand_month_dates = {}
+    for bucket, bdata in bucket_product_data.items():
+        for month, rev in bdata['bucket_month_revenues'].items():
+            grand_month_revenues[month] = grand_month_revenues.get(month, 0) + rev
+        recent = set(bdata['recent_months'])
+        for rd in revenue_by_bucket[bucket]:
+            if rd['fiscal_month'] in recent:
+                grand_month_dates[rd['fiscal_month']] = rd['month_date']
+    
+    return {
+        'revenue_by_bucket': revenue_by_bucket,
+        'products_by_bucket': products_by_bucket,
+        'bucket_product_data': bucket_product_data,
+        'grand_month_revenues': grand_month_revenues,
+        'grand_recent_months': _recent_months(grand_month_dates),
+        'grand_total': sum(grand_month_revenues.values()),
+    }
+
+
+def get_customer_revenue_view(customer_id: int) -> dict:
+    """Get a customer's revenue history by bucket and product, pivoted for display.
+    
+    Cached per customer until the next import. The returned dict is shared
+    between callers and must not be modified.
+    
+    Args:
+        customer_id: Sales Buddy customer ID
+        
+    Returns:
+        Dict with revenue_by_bucket, products_by_bucket, bucket_product_data,
+        grand_month_revenues, grand_recent_months and grand_total
+    """
+    return customer_views.get_or_build(
+        customer_id, lambda: _build_customer_revenue_view(customer_id)
+    )
+
+
 def get_all_products() -> list[dict]:
     """Get all unique products in the database with usage stats.
     
@@ -1118,17 +1300,10 @@ def get_all_products() -> list[dict]:
     Returns:
         List of dicts with product name, customer count, total revenue
     """
-    # Subquery: customer+bucket pairs with positive revenue per product
-    positive_pairs = db.session.query(
-        ProductRevenueData.product,
-        db.func.sum(ProductRevenueData.revenue).label('pair_revenue')
-    ).group_by(
-        ProductRevenueData.product,
-        ProductRevenueData.customer_name,
-        ProductRevenueData.bucket
-    ).having(
-        db.func.sum(ProductRevenueData.revenue) > 0
-    ).subquery()
+    ensure_revenue_rollups()
+    
+    # Customer+bucket pairs with positive revenue per product
+    positive_pairs = positive_product_pairs().subquery()
     
     results = db.session.query(
         positive_pairs.c.product,
@@ -1159,21 +1334,23 @@ def get_customers_using_product(product: str) -> list[dict]:
     Returns:
         List of dicts with customer info and revenue data
     """
+    ensure_revenue_rollups()
+    
     results = db.session.query(
-        ProductRevenueData.customer_name,
-        ProductRevenueData.bucket,
-        db.func.max(ProductRevenueData.customer_id).label('customer_id'),
-        db.func.sum(ProductRevenueData.revenue).label('total_revenue'),
-        db.func.max(ProductRevenueData.month_date).label('latest_month')
+        RevenueProductRollup.customer_name,
+        RevenueProductRollup.bucket,
+        db.func.max(RevenueProductRollup.customer_id).label('customer_id'),
+        db.func.sum(RevenueProductRollup.total_revenue).label('total_revenue'),
+        db.func.max(RevenueProductRollup.latest_month).label('latest_month')
     ).filter_by(
         product=product
     ).group_by(
-        ProductRevenueData.customer_name,
-        ProductRevenueData.bucket
+        RevenueProductRollup.customer_name,
+        RevenueProductRollup.bucket
     ).having(
-        db.func.sum(ProductRevenueData.revenue) > 0
+        db.func.sum(RevenueProductRollup.total_revenue) > 0
     ).order_by(
-        db.func.sum(ProductRevenueData.revenue).desc()
+        db.func.sum(RevenueProductRollup.total_revenue).desc()
     ).all()
     
     return [
@@ -1197,34 +1374,12 @@ def get_seller_products(seller_name: str) -> list[dict]:
     Returns:
         List of dicts with product name, customer count, total revenue
     """
-    # Get customer names for this seller from analyses
-    from app.models import RevenueAnalysis
-    seller_customers = db.session.query(
-        db.distinct(RevenueAnalysis.customer_name)
-    ).filter_by(seller_name=seller_name).scalar_subquery()
+    ensure_revenue_rollups()
     
-    # Subquery: customer+bucket pairs with positive revenue per product
-    positive_pairs = db.session.query(
-        ProductRevenueData.product,
-        db.func.sum(ProductRevenueData.revenue).label('pair_revenue')
-    ).filter(
-        ProductRevenueData.customer_name.in_(seller_customers)
-    ).group_by(
-        ProductRevenueData.product,
-        ProductRevenueData.customer_name,
-        ProductRevenueData.bucket
-    ).having(
-        db.func.sum(ProductRevenueData.revenue) > 0
-    ).subquery()
-    
-    results = db.session.query(
-        positive_pairs.c.product,
-        db.func.count().label('customer_count'),
-        db.func.sum(positive_pairs.c.pair_revenue).label('total_revenue')
-    ).group_by(
-        positive_pairs.c.product
+    results = RevenueSellerProductRollup.query.filter_by(
+        seller_name=seller_name
     ).order_by(
-        db.func.sum(positive_pairs.c.pair_revenue).desc()
+        RevenueSellerProductRollup.total_revenue.desc()
     ).all()
     
     return [
@@ -1254,20 +1409,22 @@ def get_seller_customers_using_product(seller_name: str, product: str) -> list[d
         db.distinct(RevenueAnalysis.customer_name)
     ).filter_by(seller_name=seller_name).scalar_subquery()
     
+    ensure_revenue_rollups()
+    
     results = db.session.query(
-        ProductRevenueData.customer_name,
-        ProductRevenueData.bucket,
-        db.func.max(ProductRevenueData.customer_id).label('customer_id'),
-        db.func.sum(ProductRevenueData.revenue).label('total_revenue'),
-        db.func.max(ProductRevenueData.month_date).label('latest_month')
+        RevenueProductRollup.customer_name,
+        RevenueProductRollup.bucket,
+        db.func.max(RevenueProductRollup.customer_id).label('customer_id'),
+        db.func.sum(RevenueProductRollup.total_revenue).label('total_revenue'),
+        db.func.max(RevenueProductRollup.latest_month).label('latest_month')
     ).filter(
-        ProductRevenueData.product == product,
-        ProductRevenueData.customer_name.in_(seller_customers)
+        RevenueProductRollup.product == product,
+        RevenueProductRollup.customer_name.in_(seller_customers)
     ).group_by(
-        ProductRevenueData.customer_name,
-        ProductRevenueData.bucket
+        RevenueProductRollup.customer_name,
+        RevenueProductRollup.bucket
     ).order_by(
-        db.func.sum(ProductRevenueData.revenue).desc()
+        db.func.sum(RevenueProductRollup.total_revenue).desc()
     ).all()
     
     return [
@@ -1315,15 +1472,17 @@ def get_new_product_users(consolidated_product: str, months_lookback: int = 6) -
         # Not enough history - include everyone
         oldest_allowed_first_usage = months_chrono[0]['month_date']
     
+    ensure_revenue_rollups()
+    
     # Find all products that belong to this consolidated group
     matching_products = []
     for prefix in PRODUCT_CONSOLIDATION_PREFIXES:
         if consolidated_product == prefix:
             # Get all products starting with this prefix
             product_rows = db.session.query(
-                db.distinct(ProductRevenueData.product)
+                db.distinct(RevenueProductRollup.product)
             ).filter(
-                ProductRevenueData.product.like(f"{prefix}%")
+                RevenueProductRollup.product.like(f"{prefix}%")
             ).all()
             matching_products.extend([p[0] for p in product_rows])
             break
@@ -1332,92 +1491,53 @@ def get_new_product_users(consolidated_product: str, months_lookback: int = 6) -
         # Not a consolidated product, just use exact match
         matching_products = [consolidated_product]
     
-    # For each customer, find their first month with non-zero revenue for these products
-    # Subquery to get first usage month per customer
-    first_usage_subq = db.session.query(
-        ProductRevenueData.customer_name,
-        db.func.min(ProductRevenueData.month_date).label('first_usage_date')
+    # First non-zero month, totals and latest-month revenue per customer, in one pass
+    # over the rollup (latest_month_revenue is for months_chrono[-1], the newest month)
+    first_usage = db.func.min(RevenueProductRollup.first_usage_month)
+    new_users = db.session.query(
+        RevenueProductRollup.customer_name,
+        first_usage.label('first_usage_date'),
+        db.func.sum(RevenueProductRollup.total_revenue).label('total_revenue'),
+        db.func.sum(RevenueProductRollup.latest_month_revenue).label('latest_revenue'),
+        db.func.max(RevenueProductRollup.customer_id).label('customer_id'),
     ).filter(
-        ProductRevenueData.product.in_(matching_products),
-        ProductRevenueData.revenue > 0
+        RevenueProductRollup.product.in_(matching_products)
     ).group_by(
-        ProductRevenueData.customer_name
-    ).subquery()
-    
-    # Get customers whose first usage is within the lookback period
-    new_users_query = db.session.query(
-        first_usage_subq.c.customer_name,
-        first_usage_subq.c.first_usage_date
-    ).filter(
-        first_usage_subq.c.first_usage_date >= oldest_allowed_first_usage
+        RevenueProductRollup.customer_name
+    ).having(
+        first_usage >= oldest_allowed_first_usage
     ).all()
     
-    if not new_users_query:
+    if not new_users:
         return []
     
-    new_user_names = {r.customer_name: r.first_usage_date for r in new_users_query}
-    
-    # Get customer_id mapping from revenue data (set during import)
-    customer_id_map = dict(
-        db.session.query(
-            ProductRevenueData.customer_name,
-            db.func.max(ProductRevenueData.customer_id)
-        ).filter(
-            ProductRevenueData.product.in_(matching_products),
-            ProductRevenueData.customer_id.isnot(None)
-        ).group_by(
-            ProductRevenueData.customer_name
-        ).all()
-    )
+    # Seller from each customer's first RevenueAnalysis row
+    seller_by_name = {}
+    for customer_name, seller_name in db.session.query(
+        RevenueAnalysis.customer_name, RevenueAnalysis.seller_name
+    ).filter(
+        RevenueAnalysis.customer_name.in_([r.customer_name for r in new_users])
+    ).order_by(RevenueAnalysis.id):
+        seller_by_name.setdefault(customer_name, seller_name)
+    
+    customer_ids = {r.customer_id for r in new_users if r.customer_id}
+    customers_by_id = {
+        c.id: c for c in Customer.query.filter(Customer.id.in_(customer_ids))
+    } if customer_ids else {}
+    fiscal_by_date = {m['month_date']: m['fiscal_month'] for m in months_chrono}
     
-    # Get seller info and total revenue for these customers
     results = []
-    for customer_name, first_usage_date in new_user_names.items():
-        # Get seller from RevenueAnalysis
-        analysis = RevenueAnalysis.query.filter_by(customer_name=customer_name).first()
-        seller_name = analysis.seller_name if analysis else None
-        
-        # Get total revenue for this customer on these products
-        total_rev = db.session.query(
-            db.func.sum(ProductRevenueData.revenue)
-        ).filter(
-            ProductRevenueData.customer_name == customer_name,
-            ProductRevenueData.product.in_(matching_products)
-        ).scalar() or 0
-        
-        # Get the most recent month's revenue (months_chrono[-1] is newest)
-        latest_month = months_chrono[-1]['month_date']
-        latest_rev = db.session.query(
-            db.func.sum(ProductRevenueData.revenue)
-        ).filter(
-            ProductRevenueData.customer_name == customer_name,
-            ProductRevenueData.product.in_(matching_products),
-            ProductRevenueData.month_date == latest_month
-        ).scalar() or 0
-        
-        # Get the fiscal month string for the first usage
-        first_usage_fiscal = None
-        for m in months_chrono:
-            if m['month_date'] == first_usage_date:
-                first_usage_fiscal = m['fiscal_month']
-                break
-        
-        cust_id = customer_id_map.get(customer_name)
-        tpid_url = None
-        if cust_id:
-            cust_obj = Customer.query.get(cust_id)
-            if cust_obj:
-                tpid_url = cust_obj.tpid_url
-
+    for r in new_users:
+        cust_obj = customers_by_id.get(r.customer_id)
         results.append({
-            'customer_name': customer_name,
-            'seller_name': seller_name,
-            'first_usage_date': first_usage_date,
-            'first_usage_fiscal': first_usage_fiscal,
-            'total_revenue': total_rev,
-            'latest_month_revenue': latest_rev,
-            'customer_id': cust_id,
-            'tpid_url': tpid_url,
+            'customer_name': r.customer_name,
+            'seller_name': seller_by_name.get(r.customer_name),
+            'first_usage_date': r.first_usage_date,
+            'first_usage_fiscal': fiscal_by_date.get(r.first_usage_date),
+            'total_revenue': r.total_revenue or 0,
+            'latest_month_revenue': r.latest_revenue or 0,
+            'customer_id': r.customer_id,
+            'tpid_url': cust_obj.tpid_url if cust_obj else None,
         })
     
     # Sort by seller name (None last), then by customer name
@@ -0,0 +1,229 @@
+"""
+Revenue rollups for Sales Buddy.
+
+Maintains three materialized tables derived from the raw monthly revenue
+rows so the whitespace and product reports don't re-run GROUP BYs over
+``customer_revenue_data`` / ``product_revenue_data`` on every request:
+
+- ``revenue_bucket_rollups``: customer x bucket totals, trailing 3-month
+  sum/count and whether the bucket ever had spend
+- ``revenue_product_rollups``: customer x bucket x product totals, latest
+  month revenue and first month with spend
+- ``revenue_seller_product_rollups``: seller x product customer counts and
+  revenue (seller assignment comes from RevenueAnalysis)
+
+Each table is rebuilt wholesale with a single INSERT ... SELECT. Imports
+call ``rebuild_revenue_rollups()`` when they commit and analysis runs
+rebuild the seller rollup. The last rebuild records the newest
+``RevenueImport`` id; read paths call ``ensure_revenue_rollups()``, which
+rebuilds when a newer import exists or when ORM writes to the source
+tables were flushed outside an import (backups, admin tools). Seller
+reassignments only rebuild the seller rollup. Raw SQL writers call
+``mark_revenue_rollups_stale()``.
+"""
+import json
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import case, delete, func, insert, select
+
+from app.models import (
+    db, CustomerRevenueData, ProductRevenueData, RevenueAnalysis,
+    RevenueBucketRollup, RevenueImport, RevenueProductRollup,
+    RevenueSellerProductRollup, SyncStatus,
+)
+from app.services.change_tracking import watch_model_changes
+
+logger = logging.getLogger(__name__)
+
+# SyncStatus row that records what the rollups were built from
+ROLLUP_SYNC_TYPE = 'revenue_rollups'
+
+# Source models and which part of the rollups they feed
+_SOURCE_KINDS = {
+    CustomerRevenueData: 'revenue',
+    ProductRevenueData: 'revenue',
+    RevenueAnalysis: 'sellers',
+}
+
+# Kinds changed outside an import since the last rebuild; the next read
+# rebuilds the affected rollups.
+_pending = set()
+
+
+def _mark_pending(model) -> None:
+    _pending.add(_SOURCE_KINDS[model])
+
+
+# The seller rollup only reads who owns which customer from the analyses
+watch_model_changes(_SOURCE_KINDS, _mark_pending,
+                    columns={RevenueAnalysis: ('seller_name', 'customer_name')})
+
+
+def mark_revenue_rollups_stale() -> None:
+    """Flag the rollups for rebuild after raw SQL writes to the source tables."""
+    _pending.update(('revenue', 'sellers'))
+
+
+def trailing_window_start(latest_month):
+    """First month of the trailing 3-month window ending at ``latest_month``."""
+    return latest_month - timedelta(days=62)  # ~2 months back
+
+
+def _source_stamps() -> dict:
+    """The newest import id (a primary-key lookup, no source table scans).
+
+    Every import gets a new id, including ones that only update rows in
+    place, so the id changes whenever an import touched the revenue rows.
+    """
+    return {'import_id': db.session.query(func.max(RevenueImport.id)).scalar()}
+
+
+def _recorded_stamps() -> Optional[dict]:
+    """Stamps saved by the last successful rebuild, or None."""
+    status = SyncStatus.query.filter_by(sync_type=ROLLUP_SYNC_TYPE).first()
+    if not status or not status.success or not status.details:
+        return None
+    try:
+        return json.loads(status.details)
+    except ValueError:
+        return None
+
+
+def positive_product_pairs():
+    """Select of (product, customer_name, bucket, pair_revenue) with spend > 0.
+
+    Mirrors the detail pages: a customer/bucket counts as using a product
+    when its total revenue on that product is positive.
+    """
+    rollup = RevenueProductRollup
+    return select(
+        rollup.product,
+        rollup.customer_name,
+        rollup.bucket,
+        func.sum(rollup.total_revenue).label('pair_revenue'),
+    ).group_by(
+        rollup.product, rollup.customer_name, rollup.bucket,
+    ).having(func.sum(rollup.total_revenue) > 0)
+
+
+def _rebuild_bucket_rollup() -> None:
+    db.session.execute(delete(RevenueBucketRollup))
+    latest_month = db.session.query(func.max(CustomerRevenueData.month_date)).scalar()
+    if latest_month is None:
+        return
+
+    crd = CustomerRevenueData
+    in_window = crd.month_date >= trailing_window_start(latest_month)
+    source = select(
+        crd.customer_name,
+        crd.bucket,
+        crd.customer_id,
+        func.sum(crd.revenue),
+        func.sum(case((in_window, crd.revenue), else_=0.0)),
+        func.sum(case((in_window, 1), else_=0)),
+        func.max(case((crd.revenue > 0, 1), else_=0)),
+    ).group_by(crd.customer_name, crd.bucket, crd.customer_id)
+    db.session.execute(insert(RevenueBucketRollup).from_select(
+        ['customer_name', 'bucket', 'customer_id', 'total_revenue',
+         'trailing_revenue', 'trailing_months', 'has_spend'],
+        source,
+    ))
+
+
+def _rebuild_product_rollup() -> None:
+    db.session.execute(delete(RevenueProductRollup))
+    # "Latest month" is the newest month of the import as a whole
+    latest_month = db.session.query(func.max(CustomerRevenueData.month_date)).scalar()
+
+    prd = ProductRevenueData
+    source = select(
+        prd.customer_name,
+        prd.bucket,
+        prd.product,
+        prd.customer_id,
+        func.sum(prd.revenue),
+        func.max(prd.month_date),
+        func.sum(case((prd.month_date == latest_month, prd.revenue), else_=0.0)),
+        func.min(case((prd.revenue > 0, prd.month_date), else_=None)),
+        func.max(case((prd.revenue > 0, 1), else_=0)),
+    ).group_by(prd.customer_name, prd.bucket, prd.product, prd.customer_id)
+    db.session.execute(insert(RevenueProductRollup).from_select(
+        ['customer_name', 'bucket', 'product', 'customer_id', 'total_revenue',
+         'latest_month', 'latest_month_revenue', 'first_usage_month', 'has_spend'],
+        source,
+    ))
+
+
+def _rebuild_seller_product_rollup() -> None:
+    db.session.execute(delete(RevenueSellerProductRollup))
+
+    seller_customers = select(
+        RevenueAnalysis.seller_name, RevenueAnalysis.customer_name,
+    ).where(RevenueAnalysis.seller_name.isnot(None)).distinct().subquery()
+    positive_pairs = positive_product_pairs().subquery()
+
+    source = select(
+        seller_customers.c.seller_name,
+        positive_pairs.c.product,
+        func.count(),
+        func.sum(positive_pairs.c.pair_revenue),
+    ).join(
+        positive_pairs,
+        positive_pairs.c.customer_name == seller_customers.c.customer_name,
+    ).group_by(seller_customers.c.seller_name, positive_pairs.c.product)
+    db.session.execute(insert(RevenueSellerProductRollup).from_select(
+        ['seller_name', 'product', 'customer_count', 'total_revenue'],
+        source,
+    ))
+
+
+def _record(stamps: dict) -> None:
+    SyncStatus.mark_completed(
+        ROLLUP_SYNC_TYPE, success=True,
+        items_synced=RevenueBucketRollup.query.count() + RevenueProductRollup.query.count(),
+        details=json.dumps(stamps),
+    )
+
+
+def rebuild_revenue_rollups(sellers_only: bool = False) -> None:
+    """Rebuild the rollup tables from the raw revenue rows and commit.
+
+    Args:
+        sellers_only: Only the seller rollup needs refreshing (after an
+            analysis run). Falls back to a full rebuild when the revenue
+            rollups are themselves out of date.
+    """
+    stamps = _source_stamps()
+    revenue_current = 'revenue' not in _pending and _recorded_stamps() == stamps
+    pending = set(_pending)
+    _pending.clear()
+
+    SyncStatus.mark_started(ROLLUP_SYNC_TYPE)
+    try:
+        if not (sellers_only and revenue_current):
+            _rebuild_bucket_rollup()
+            _rebuild_product_rollup()
+        _rebuild_seller_product_rollup()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        _pending.update(pending)
+        SyncStatus.mark_completed(ROLLUP_SYNC_TYPE, success=False, details=None)
+        raise
+    _record(stamps)
+
+
+def ensure_revenue_rollups() -> None:
+    """Rebuild the rollups if the source tables changed since the last build.
+
+    Only the seller rollup is rebuilt when nothing but seller assignments
+    changed.
+    """
+    if 'revenue' in _pending or _recorded_stamps() != _source_stamps():
+        logger.info("Revenue rollups out of date; rebuilding")
+        rebuild_revenue_rollups()
+    elif _pending:
+        logger.info("Seller assignments changed; rebuilding seller rollup")
+        rebuild_revenue_rollups(sellers_only=True)
@@ -0,0 +1,372 @@
+"""
+Columnar revenue history sidecar for Sales Buddy.
+
+After each import the bucket and product revenue rows are written next to
+the database as NumPy ``.npy`` files: one float64 matrix per level
+(series x month, NaN where a month has no data point) plus interned code
+columns for customer, bucket and product, and the month table. Series are
+sorted by customer, bucket and product code, so one customer's rows are a
+contiguous slice.
+
+Readers memory-map the files read-only. Serving a history grid slices the
+mapped matrices instead of loading ORM objects, and nothing is copied
+until a value is read. The store is optional: it needs NumPy, can be
+switched off with ``REVENUE_HISTORY_STORE=0``, and is only used while it
+matches the latest import. Revenue rows written outside an import remove
+the manifest, so readers use the database until the next import. Callers fall back to the database whenever
+``get_revenue_store()`` returns None.
+
+Layout::
+
+    salesbuddy.db.revenue/
+        current.json            # {"dir": "v12-...", "version": [12, "...", ...]}
+        v12-20260101T120000/    # one directory per import (Windows can't
+            customers.npy       # replace a file that is still mapped)
+            ...
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore
+    HAS_NUMPY = False
+
+from sqlalchemy import select
+
+from app.models import db, CustomerRevenueData, ProductRevenueData
+from app.services.change_tracking import watch_model_changes
+from app.services.revenue_cache import revenue_data_version
+
+logger = logging.getLogger(__name__)
+
+_MANIFEST = 'current.json'
+
+# Revenue rows fetched per chunk while writing, matching the import's chunking
+STORE_CHUNK_ROWS = 20000
+
+# Level name -> (model, key columns after customer name)
+_LEVELS = {
+    'bucket': (CustomerRevenueData, ('bucket',)),
+    'product': (ProductRevenueData, ('bucket', 'product')),
+}
+
+_open_store: Optional['RevenueHistoryStore'] = None
+_store_lock = threading.Lock()
+
+# Set when revenue rows change outside an import; the next read drops the
+# manifest so the database is used until an import writes a new store.
+_stale = False
+
+
+def store_enabled() -> bool:
+    """Whether the sidecar should be written and read at all."""
+    return HAS_NUMPY and os.environ.get('REVENUE_HISTORY_STORE', '1').lower() not in ('0', 'false', 'no')
+
+
+def _store_root() -> Optional[Path]:
+    """Sidecar directory next to the SQLite file (None for in-memory databases)."""
+    database = db.engine.url.database
+    if not database or database == ':memory:':
+        return None
+    db_path = Path(database)
+    return db_path.with_name(db_path.name + '.revenue')
+
+
+def _current_version() -> Optional[list]:
+    """The revenue cache's data version (latest import), JSON-comparable."""
+    (latest,) = revenue_data_version(track_analysis=False)
+    if latest is None:
+        return None
+    import_id, imported_at = latest
+    return [import_id, imported_at.isoformat()]
+
+
+def _mark_stale(model) -> None:
+    global _stale
+    _stale = True
+
+
+# Rows written outside an import (restores, admin tools) would otherwise be
+# served from the older sidecar until the next import rewrites it
+watch_model_changes((CustomerRevenueData, ProductRevenueData), _mark_stale)
+
+
+def _level_chunks(level: str, month_codes_of, tables: dict):
+    """Stream one level's rows as NumPy chunks of at most STORE_CHUNK_ROWS.
+
+    Yields (series_key, month_code, customer_id, revenue) arrays, where the
+    series key combines the customer, bucket and product codes.
+    """
+    model, key_columns = _LEVELS[level]
+    result = db.session.execute(select(
+        model.customer_name,
+        *(getattr(model, c) for c in key_columns),
+        model.customer_id,
+        model.month_date,
+        model.revenue,
+    ).execution_options(yield_per=STORE_CHUNK_ROWS))
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        names, keys = columns[0], columns[1:1 + len(key_columns)]
+        customer_ids, month_dates, revenues = columns[-3:]
+
+        # Combined series key: customer, then bucket, then product code
+        series_key = np.searchsorted(tables['customers'], np.array(names, dtype=str)).astype(np.int64)
+        for column, name in zip(keys, key_columns):
+            table = tables[name + 's']
+            codes = np.searchsorted(table, np.array(column, dtype=str))
+            series_key = series_key * len(table) + codes
+        yield (
+            series_key,
+            month_codes_of(month_dates),
+            np.array([-1 if c is None else c for c in customer_ids], dtype=np.int64),
+            np.array(revenues, dtype=float),
+        )
+
+
+def _write_level(out: Path, level: str, month_table, month_codes_of, tables: dict) -> int:
+    """Write one level's code columns and revenue matrix; returns series count.
+
+    Reads the level twice in chunks (once for the series, once for the
+    values) so memory holds the output arrays, not every revenue row.
+    """
+    key_columns = _LEVELS[level][1]
+    series = np.array([], dtype=np.int64)
+    for series_key, _, _, _ in _level_chunks(level, month_codes_of, tables):
+        series = np.union1d(series, series_key)
+
+    revenue = np.full((len(series), len(month_table)), np.nan)
+    ids = np.full(len(series), -1, dtype=np.int64)
+    for series_key, month_codes, id_values, revenues in _level_chunks(level, month_codes_of, tables):
+        row_series = np.searchsorted(series, series_key)
+        revenue[row_series, month_codes] = revenues
+        np.maximum.at(ids, row_series, id_values)
+
+    # Unpack the combined key back into per-column codes (last column first)
+    remaining = series
+    code_columns = {}
+    for name in reversed(key_columns):
+        size = len(tables[name + 's'])
+        code_columns[name] = (remaining % size).astype(np.int32)
+        remaining = remaining // size
+    code_columns['customer'] = remaining.astype(np.int32)
+
+    for name, codes in code_columns.items():
+        np.save(out / f'{level}_{name}.npy', codes)
+    np.save(out / f'{level}_customer_id.npy', ids)
+    np.save(out / f'{level}_revenue.npy', revenue)
+    return len(series)
+
+
+def write_revenue_store() -> bool:
+    """Write the sidecar for the current revenue data.
+
+    Returns:
+        True if a store was written. Failures are logged, never raised:
+        the database remains the source of truth.
+    """
+    global _stale
+    if not store_enabled():
+        return False
+    root = _store_root()
+    if root is None:
+        return False
+    version = _current_version()
+    if version is None:
+        return False
+    _stale = False
+
+    try:
+        stamp = version[1].replace('-', '').replace(':', '').split('.')[0]
+        name = f"v{version[0]}-{stamp}"
+        out = root / name
+        if out.exists():
+            shutil.rmtree(out)
+        out.mkdir(parents=True)
+
+        # Interned string tables, sorted so codes can be found by searchsorted
+        tables = {}
+        for table_name, columns in (
+            ('customers', [CustomerRevenueData.customer_name, ProductRevenueData.customer_name]),
+            ('buckets', [CustomerRevenueData.bucket, ProductRevenueData.bucket]),
+            ('products', [ProductRevenueData.product]),
+        ):
+            values = set()
+            for column in columns:
+                values.update(v or '' for (v,) in db.session.execute(select(column).distinct()))
+            tables[table_name] = np.array(sorted(values), dtype=str)
+            np.save(out / f'{table_name}.npy', tables[table_name])
+
+        month_rows = db.session.execute(select(
+            CustomerRevenueData.month_date, CustomerRevenueData.fiscal_month,
+        ).union(select(
+            ProductRevenueData.month_date, ProductRevenueData.fiscal_month,
+        ))).all()
+        fiscal_by_month = {}
+        for month_date, fiscal_month in month_rows:
+            fiscal_by_month.setdefault(month_date, fiscal_month)
+        month_dates = sorted(fiscal_by_month)
+        month_table = np.array(month_dates, dtype='datetime64[D]')
+        np.save(out / 'months.npy', month_table)
+        np.save(out / 'fiscal_months.npy', np.array(
+            [fiscal_by_month[d] for d in month_dates], dtype=str))
+
+        def month_codes_of(values):
+            return np.searchsorted(month_table, np.array(values, dtype='datetime64[D]'))
+
+        counts = {
+            level: _write_level(out, level, month_table, month_codes_of, tables)
+            for level in _LEVELS
+        }
+
+        manifest = root / _MANIFEST
+        tmp = root / (_MANIFEST + '.tmp')
+        tmp.write_text(json.dumps({'dir': name, 'version': version, 'series': counts}))
+        os.replace(tmp, manifest)
+    except Exception:
+        logger.exception("Failed to write revenue history store")
+        return False
+
+    _remove_old_versions(root, keep=name)
+    return True
+
+
+def _remove_old_versions(root: Path, keep: str) -> None:
+    """Best-effort cleanup of superseded versions (mapped files may be locked)."""
+    global _open_store
+    with _store_lock:
+        if _open_store is not None and _open_store.path.name != keep:
+            _open_store = None
+    for path in root.glob('v*'):
+        if path.is_dir() and path.name != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def clear_revenue_store() -> None:
+    """Delete the sidecar (e.g. after clearing revenue data)."""
+    global _open_store
+    with _store_lock:
+        _open_store = None
+    root = _store_root()
+    if root is not None and root.exists():
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def get_revenue_store() -> Optional['RevenueHistoryStore']:
+    """The memory-mapped store if it matches the latest import, else None."""
+    global _open_store, _stale
+    if not store_enabled():
+        return None
+    root = _store_root()
+    if root is None:
+        return None
+    if _stale:
+        with _store_lock:
+            _stale = False
+            _open_store = None
+            (root / _MANIFEST).unlink(missing_ok=True)
+        return None
+    version = _current_version()
+    if version is None:
+        return None
+
+    with _store_lock:
+        if (_open_store is not None and _open_store.version == version
+                and _open_store.path.parent == root):
+            return _open_store
+        try:
+            manifest = json.loads((root / _MANIFEST).read_text())
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != version:
+            return None
+        try:
+            _open_store = RevenueHistoryStore(root / manifest['dir'], version)
+        except (OSError, ValueError) as e:
+            logger.warning("Revenue history store unreadable, using database: %s", e)
+            return None
+        return _open_store
+
+
+class RevenueHistoryStore:
+    """Read-only, memory-mapped view of one version of the sidecar."""
+
+    def __init__(self, path: Path, version: list):
+        self.path = path
+        self.version = version
+
+        def load(name):
+            return np.load(path / f'{name}.npy', mmap_mode='r')
+
+        self.customers = load('customers')
+        self.buckets = load('buckets')
+        self.products = load('products')
+        self.fiscal_months = [str(m) for m in load('fiscal_months')]
+        self.month_dates = [d.item() for d in load('months')]
+        self.levels = {
+            level: {
+                name: load(f'{level}_{name}')
+                for name in ('customer', 'customer_id', 'revenue', *key_columns)
+            }
+            for level, (_, key_columns) in _LEVELS.items()
+        }
+
+    @staticmethod
+    def _code(table, value: str) -> Optional[int]:
+        idx = int(np.searchsorted(table, value))
+        return idx if idx < len(table) and table[idx] == value else None
+
+    def _rows(self, level: str, customer_id: Optional[int], customer_name: Optional[str]):
+        """Row indices of a customer's series: a slice by name, a mask by id."""
+        columns = self.levels[level]
+        if customer_id:
+            return np.flatnonzero(columns['customer_id'] == customer_id)
+        code = self._code(self.customers, customer_name or '')
+        if code is None:
+            return slice(0, 0)
+        customer = columns['customer']
+        return slice(int(np.searchsorted(customer, code, 'left')),
+                     int(np.searchsorted(customer, code, 'right')))
+
+    def _points(self, level: str, customer_id, customer_name, filters: dict):
+        columns = self.levels[level]
+        rows = self._rows(level, customer_id, customer_name)
+        revenue = columns['revenue'][rows]
+        keys = {name: columns[name][rows] for name in _LEVELS[level][1]}
+
+        keep = np.ones(len(revenue), dtype=bool)
+        for name, value in filters.items():
+            if value is None:
+                continue
+            code = self._code(getattr(self, name + 's'), value)
+            keep &= keys[name] == (-1 if code is None else code)
+
+        for i in np.flatnonzero(keep):
+            labels = tuple(str(getattr(self, name + 's')[keys[name][i]])
+                           for name in _LEVELS[level][1])
+            series = revenue[i]
+            for m in np.flatnonzero(~np.isnan(series)):
+                yield labels + (self.fiscal_months[m], self.month_dates[m], float(series[m]))
+
+    def bucket_points(self, *, customer_id: Optional[int] = None,
+                      customer_name: Optional[str] = None,
+                      bucket: Optional[str] = None) -> list[tuple[str, str, date, float]]:
+        """(bucket, fiscal_month, month_date, revenue) per data point, month order per series."""
+        return list(self._points('bucket', customer_id, customer_name, {'bucket': bucket}))
+
+    def product_points(self, *, customer_id: Optional[int] = None,
+                       customer_name: Optional[str] = None,
+                       bucket: Optional[str] = None,
+                       product: Optional[str] = None) -> list[tuple[str, str, str, date, float]]:
+        """(bucket, product, fiscal_month, month_date, revenue) per data point."""
+        return list(self._points('product', customer_id, customer_name,
+                                 {'bucket': bucket, 'product': product}))
@@ -4,9 +4,14 @@ Tools are registered via the @tool decorator. Each tool is a thin wrapper
 over existing service/query code - never duplicate business logic here.
 
 Consumers:
-    - Chat endpoint (Phase 2): get_openai_tools() + execute_tool()
+    - Chat endpoint (Phase 2): get_openai_tools() + execute_tool(),
+      then shape_tool_result() to fit the result into the tool's token budget
     - MCP server (Phase 5): get_mcp_tools() + execute_tool()
 """
+import base64
+import html
+import json
+import re
 from typing import Any
 
 # ---------------------------------------------------------------------------
@@ -15,14 +20,24 @@ from typing import Any
 
 TOOLS: list[dict] = []
 
+# Rough chars-per-token ratio, as used for Connect summaries
+CHARS_PER_TOKEN = 4
 
-def tool(name: str, description: str, parameters: dict):
+# Prompt tokens a tool result may use in chat unless the tool says otherwise
+# (about the 8000 characters chat used to cut results at).
+DEFAULT_TOKEN_BUDGET = 2000
+
+
+def tool(name: str, description: str, parameters: dict,
+         budget: int = DEFAULT_TOKEN_BUDGET):
     """Register a function as a SalesIQ/MCP tool.
 
     Args:
         name: Unique tool name (snake_case).
         description: One-line description for the LLM.
         parameters: JSON Schema object describing accepted parameters.
+        budget: Approximate prompt tokens the result may use in chat; see
+            shape_tool_result().
     """
     def decorator(func):
         TOOLS.append({
@@ -30,20 +45,37 @@ def tool(name: str, description: str, parameters: dict):
             'description': description,
             'parameters': parameters,
             'handler': func,
+            'budget': budget,
         })
         return func
     return decorator
 
 
+_CURSOR_PARAM = {
+    'type': 'string',
+    'description': (
+        'Pagination handle: pass a next_cursor from a previous '
+        "result's _pagination to get the next page of that list."
+    ),
+}
+
+
 def get_openai_tools() -> list[dict]:
-    """Convert registry to OpenAI function-calling format."""
+    """Convert registry to OpenAI function-calling format.
+
+    Every tool also accepts ``cursor``, which the chat endpoint consumes
+    when shaping results (see shape_tool_result()).
+    """
     return [
         {
             'type': 'function',
             'function': {
                 'name': t['name'],
                 'description': t['description'],
-                'parameters': t['parameters'],
+                'parameters': {
+                    **t['parameters'],
+                    'properties': {**t['parameters']['properties'], 'cursor': _CURSOR_PARAM},
+                },
             },
         }
         for t in TOOLS
@@ -81,6 +113,158 @@ def execute_tool(name: str, params: dict) -> Any:
     raise ValueError(f'Unknown tool: {name}')
 
 
+# ---------------------------------------------------------------------------
+# Result shaping (chat)
+# ---------------------------------------------------------------------------
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_HTML_RE = re.compile(r'</?[a-zA-Z][^>]*>')
+
+# Successively tighter caps applied to every string until the result fits
+_STRING_CAPS = (600, 300, 150, 80)
+
+
+def _strip_html(text: str) -> str:
+    """Remove HTML tags and entities and collapse whitespace."""
+    return ' '.join(html.unescape(_TAG_RE.sub(' ', text)).split())
+
+
+def _snippet(content: str | None, length: int) -> str:
+    """Plain-text preview of a (Quill HTML) note body."""
+    return _strip_html(content or '')[:length]
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate prompt tokens ``value`` uses once serialized as JSON."""
+    return -(-len(json.dumps(value, default=str)) // CHARS_PER_TOKEN)
+
+
+def encode_cursor(path: tuple, offset: int) -> str:
+    """Opaque pagination handle for the list at ``path``, starting at ``offset``."""
+    raw = json.dumps([list(path), offset], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[tuple, int]:
+    """Inverse of encode_cursor(). Raises ValueError if the handle is invalid."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        path, offset = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return tuple(path), int(offset)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f'Invalid cursor: {cursor!r}') from exc
+
+
+def _map_strings(value: Any, func) -> Any:
+    """Copy of ``value`` with ``func`` applied to every string."""
+    if isinstance(value, str):
+        return func(value)
+    if isinstance(value, dict):
+        return {k: _map_strings(v, func) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_map_strings(v, func) for v in value]
+    return value
+
+
+def _cap(length: int):
+    def cap(text: str) -> str:
+        return text if len(text) <= length else text[:length - 1].rstrip() + '\u2026'
+    return cap
+
+
+def _list_paths(value: Any, path: tuple = ()):
+    """Yield (path, list) for the result itself and lists nested in dicts."""
+    if isinstance(value, list):
+        yield path, value
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            if not str(key).startswith('_'):
+                yield from _list_paths(child, path + (key,))
+
+
+def _get_path(value: Any, path: tuple) -> Any:
+    for key in path:
+        value = value[key] if isinstance(value, dict) else None
+    return value
+
+
+def _set_path(value: Any, path: tuple, new: Any) -> Any:
+    """Return ``value`` with the item at ``path`` replaced (the root if empty)."""
+    if not path:
+        return new
+    _get_path(value, path[:-1])[path[-1]] = new
+    return value
+
+
+def shape_tool_result(name: str, result: Any, cursor: str | None = None) -> tuple[Any, int]:
+    """Fit a tool result into the tool's token budget for the chat prompt.
+
+    Field by field: HTML is stripped from every string, strings are capped
+    at progressively shorter lengths, and then the largest list is halved
+    until the result fits. Cut lists are described under ``_pagination``
+    with a ``next_cursor`` the model can pass back as the tool's ``cursor``
+    argument to continue where this page stopped. A result that is a bare
+    list is wrapped as ``{"items": [...], "_pagination": [...]}`` when paged.
+
+    Args:
+        name: Registered tool name (unknown tools get the default budget).
+        result: The handler's return value.
+        cursor: Pagination handle from an earlier call, if any.
+
+    Returns:
+        (shaped result, estimated tokens saved versus the raw result).
+
+    Raises:
+        ValueError: If ``cursor`` is invalid or doesn't match the result.
+    """
+    budget = next((t['budget'] for t in TOOLS if t['name'] == name), DEFAULT_TOKEN_BUDGET)
+    raw_tokens = estimate_tokens(result)
+
+    shaped = _map_strings(result, lambda text: _strip_html(text) if _HTML_RE.search(text) else text)
+
+    pages: dict[tuple, dict] = {}
+    if cursor:
+        path, offset = decode_cursor(cursor)
+        items = _get_path(shaped, path)
+        if not isinstance(items, list) or offset < 0:
+            raise ValueError(f'Cursor does not match a list in {name} results')
+        shaped = _set_path(shaped, path, items[offset:])
+        pages[path] = {'offset': offset, 'total': len(items), 'returned': len(items) - offset}
+
+    for length in _STRING_CAPS:
+        if estimate_tokens(shaped) <= budget:
+            break
+        shaped = _map_strings(shaped, _cap(length))
+
+    while estimate_tokens(shaped) > budget:
+        candidates = [(estimate_tokens(items), path) for path, items in _list_paths(shaped)
+                      if len(items) > 1]
+        if not candidates:
+            break
+        _, path = max(candidates, key=lambda c: c[0])
+        items = _get_path(shaped, path)
+        page = pages.setdefault(path, {'offset': 0, 'total': len(items), 'returned': len(items)})
+        page['returned'] = len(items) // 2
+        shaped = _set_path(shaped, path, items[:page['returned']])
+
+    if pages:
+        pagination = []
+        for path, page in pages.items():
+            end = page['offset'] + page['returned']
+            pagination.append({
+                'field': '.'.join(map(str, path)) or 'items',
+                'offset': page['offset'],
+                'returned': page['returned'],
+                'total': page['total'],
+                'next_cursor': encode_cursor(path, end) if end < page['total'] else None,
+            })
+        if not isinstance(shaped, dict):
+            shaped = {'items': shaped}
+        shaped['_pagination'] = pagination
+
+    return shaped, max(raw_tokens - estimate_tokens(shaped), 0)
+
+
 # ============================================================================
 # Entity tools
 # ============================================================================
@@ -156,6 +340,7 @@ def search_customers(
         },
         'required': ['customer_id'],
     },
+    budget=1200,
 )
 def get_customer_summary(customer_id: int) -> dict:
     """Return a summary of a customer's activity."""
@@ -215,7 +400,7 @@ def get_customer_summary(customer_id: int) -> dict:
             {
                 'id': n.id,
                 'call_date': n.call_date.strftime('%Y-%m-%d') if n.call_date else None,
-                'snippet': (n.content or '')[:200],
+                'snippet': _snippet(n.content, 200),
             }
             for n in recent_notes
         ],
@@ -252,6 +437,7 @@ def get_customer_summary(customer_id: int) -> dict:
             },
         },
     },
+    budget=1200,
 )
 def search_notes(
     query: str = '',
@@ -280,7 +466,7 @@ def search_notes(
             'id': n.id,
             'customer': n.customer.name if n.customer else None,
             'call_date': n.call_date.strftime('%Y-%m-%d') if n.call_date else None,
-            'snippet': (n.content or '')[:200],
+            'snippet': _snippet(n.content, 200),
             'topics': [t.name for t in n.topics],
         }
         for n in notes
@@ -731,6 +917,7 @@ def report_workload(seller_id: int | None = None) -> dict:
             },
         },
     },
+    budget=1500,
 )
 def report_whats_new(days: int = 14) -> dict:
     """Return recently created/updated milestones."""
@@ -1192,6 +1379,7 @@ def get_analytics_summary(days: int = 30) -> dict:
             },
         },
     },
+    budget=1500,
 )
 def report_one_on_one(days: int = 14, seller_id: int | None = None) -> dict:
     """Return 1:1 prep data."""
@@ -1215,7 +1403,7 @@ def report_one_on_one(days: int = 14, seller_id: int | None = None) -> dict:
         customer_notes.setdefault(cname, []).append({
             'id': n.id,
             'call_date': n.call_date.strftime('%Y-%m-%d') if n.call_date else None,
-            'snippet': (n.content or '')[:150],
+            'snippet': _snippet(n.content, 150),
             'topics': [t.name for t in n.topics],
         })
 
@@ -0,0 +1,136 @@
+"""
+Share transfers — compressed, chunked payloads for the sharing hub.
+
+A partner directory or a note with inline images can exceed the gateway's
+Socket.IO message limit (1 MB by default), and a single message is lost
+entirely if either side drops mid-send. Peers that both support it send
+the share as a *transfer* instead:
+
+1. The recipient accepts with ``chunked: true``; the hub passes it on in
+   ``share_accepted`` so the sender knows it may use chunks.
+2. The sender fetches its share with ``?packed=1`` (``pack_payload``) and
+   emits ``share_data`` carrying only the ``transfer`` header.
+3. The sender emits numbered ``share_chunk`` events, a few ahead of the
+   last acknowledgement. The recipient checks each chunk's SHA-256 and
+   replies ``share_chunk_ack`` with the next index it needs.
+4. After a reconnect the sender emits ``share_resume`` and continues from
+   the last index the recipient acknowledged.
+5. The recipient posts all chunks to ``/api/share/unpack``
+   (``unpack_chunks``) and imports the result as a normal share.
+
+Peers that don't opt in keep using the single ``share_data`` message.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import uuid
+import zlib
+
+ENCODING = "zlib+base64"
+
+# Compressed bytes per chunk; about 256 KB once base64-encoded, well under
+# the gateway's message limit even with the event envelope.
+CHUNK_SIZE = 192 * 1024
+
+# Refuse to inflate payloads beyond this (guards against a zlib bomb).
+MAX_PAYLOAD_BYTES = 64 * 1024 * 1024
+
+
+class ShareTransferError(ValueError):
+    """A transfer could not be reassembled.
+
+    ``bad_chunks`` lists the chunk indexes that are missing or failed their
+    checksum, so the recipient can ask the sender to resend from the first.
+    """
+
+    def __init__(self, message: str, bad_chunks: list[int] | None = None):
+        super().__init__(message)
+        self.bad_chunks = bad_chunks or []
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def pack_payload(payload: dict, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Compress a share payload and split it into checksummed chunks.
+
+    Returns ``{"transfer": {...header}, "chunks": [{index, data, sha256}]}``.
+    ``data`` is base64 of the compressed bytes; each chunk's ``sha256`` is
+    over those bytes and the header's ``sha256`` over the whole stream.
+    """
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    compressed = zlib.compress(raw, 6)
+    pieces = [compressed[i:i + chunk_size] for i in range(0, len(compressed), chunk_size)]
+    return {
+        "transfer": {
+            "id": uuid.uuid4().hex,
+            "encoding": ENCODING,
+            "total": len(pieces),
+            "size": len(raw),
+            "compressed_size": len(compressed),
+            "sha256": _sha256(compressed),
+        },
+        "chunks": [
+            {
+                "index": i,
+                "data": base64.b64encode(piece).decode("ascii"),
+                "sha256": _sha256(piece),
+            }
+            for i, piece in enumerate(pieces)
+        ],
+    }
+
+
+def unpack_chunks(transfer: dict, chunks: list[dict]) -> dict:
+    """Verify and reassemble a transfer's chunks into the original payload.
+
+    Raises ShareTransferError if the encoding is unknown, a chunk is missing
+    or corrupt, the reassembled stream doesn't match the header, or it
+    doesn't decode to JSON.
+    """
+    if transfer.get("encoding") != ENCODING:
+        raise ShareTransferError(f"Unsupported encoding: {transfer.get('encoding')!r}")
+    total = transfer.get("total")
+    if not isinstance(total, int) or total < 1:
+        raise ShareTransferError("Transfer header has no chunk count")
+
+    pieces: dict[int, bytes] = {}
+    bad: set[int] = set()
+    for chunk in chunks:
+        index = chunk.get("index")
+        if not isinstance(index, int) or not 0 <= index < total:
+            continue
+        try:
+            piece = base64.b64decode(chunk.get("data") or "", validate=True)
+        except (binascii.Error, ValueError):
+            bad.add(index)
+            continue
+        if _sha256(piece) != chunk.get("sha256"):
+            bad.add(index)
+            continue
+        pieces[index] = piece
+        bad.discard(index)
+
+    bad.update(i for i in range(total) if i not in pieces)
+    if bad:
+        raise ShareTransferError(
+            f"{len(bad)} of {total} chunks missing or corrupt", sorted(bad)
+        )
+
+    compressed = b"".join(pieces[i] for i in range(total))
+    if _sha256(compressed) != transfer.get("sha256"):
+        raise ShareTransferError("Transfer checksum mismatch", list(range(total)))
+
+    inflater = zlib.decompressobj()
+    try:
+        raw = inflater.decompress(compressed, MAX_PAYLOAD_BYTES)
+    except zlib.error as e:
+        raise ShareTransferError(f"Could not decompress transfer: {e}") from e
+    if inflater.unconsumed_tail:
+        raise ShareTransferError("Transfer exceeds the maximum payload size")
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise ShareTransferError(f"Transfer is not valid JSON: {e}") from e
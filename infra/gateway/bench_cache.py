@@ -0,0 +1,70 @@
+"""
+Benchmark the gateway response cache against a local gateway.
+
+Fires concurrent ``suggest-topics`` requests where many share the same call
+notes (as when several people tag the same meeting) and reports latency and
+how each was served: ``miss`` (called the model), ``shared`` (waited on an
+identical in-flight call) or ``hit`` (answered from the cache).
+
+Usage:
+    python infra/gateway/run_local.py --stub &
+    python infra/gateway/bench_cache.py --requests 200 --distinct 10 --concurrency 20
+    GATEWAY_CACHE=0 python infra/gateway/run_local.py --stub   # baseline
+"""
+import argparse
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _notes(i: int) -> str:
+    return (f"Meeting {i}: reviewed the AKS upgrade plan, discussed cost "
+            f"optimization and next steps for the landing zone.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the gateway response cache")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=10,
+                        help="Number of distinct payloads the requests cycle through")
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def one(i: int) -> tuple[float, str]:
+        started = time.perf_counter()
+        resp = session.post(f"{args.url}/v1/suggest-topics",
+                            json={"call_notes": _notes(i % args.distinct)}, timeout=120)
+        resp.raise_for_status()
+        return time.perf_counter() - started, resp.headers.get("X-Gateway-Cache", "none")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] for r in results)
+    sources = Counter(r[1] for r in results)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{args.requests} requests, {args.distinct} distinct, "
+          f"concurrency {args.concurrency}: {elapsed:.2f}s "
+          f"({args.requests / elapsed:.1f} req/s)")
+    print(f"latency p50={statistics.median(latencies) * 1000:.0f}ms "
+          f"p95={p95 * 1000:.0f}ms max={latencies[-1] * 1000:.0f}ms")
+    print("served: " + ", ".join(f"{k}={v}" for k, v in sorted(sources.items())))
+
+    stats = session.get(f"{args.url}/v1/cache-stats", timeout=10)
+    if stats.ok:
+        print(f"gateway cache: {stats.json().get('cache')}")
+
+
+if __name__ == "__main__":
+    main()
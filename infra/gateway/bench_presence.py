@@ -0,0 +1,133 @@
+"""
+Benchmark sharing-hub presence with thousands of simulated clients.
+
+Drives ``ShareNamespace`` connect/disconnect and relay handlers in-process
+with Socket.IO's ``emit``/``join_room`` replaced by a counting fan-out, so
+it measures the hub's own work and the messages and bytes it would send
+(not socket I/O). Compare delta clients with legacy full-list clients:
+
+    python infra/gateway/bench_presence.py --clients 3000
+    python infra/gateway/bench_presence.py --clients 300 --legacy
+
+Every client connects (some users with two tabs), each sends a
+``share_request`` to a random online user, then all disconnect. Legacy
+mode is quadratic per change, so keep its client count small.
+``--snapshot-interval 0`` sends a full snapshot on every change (worst case).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, request  # noqa: E402
+
+import sharing_hub  # noqa: E402
+
+
+class FanOut:
+    """Stands in for Socket.IO: tracks rooms and counts delivered messages."""
+
+    def __init__(self):
+        self.rooms: dict[str, set[str]] = defaultdict(set)
+        self.sids: set[str] = set()
+        self.messages = 0
+        self.bytes = 0
+        self.by_event: dict[str, int] = defaultdict(int)
+
+    def join_room(self, room: str):
+        self.sids.add(request.sid)
+        self.rooms[room].add(request.sid)
+
+    def leave_all(self, sid: str):
+        self.sids.discard(sid)
+        for members in self.rooms.values():
+            members.discard(sid)
+
+    def emit(self, event: str, data: dict, to: str | None = None, **kwargs):
+        if to is None or to in self.sids:
+            recipients = 1
+        else:
+            recipients = len(self.rooms.get(to, ()))
+        size = len(json.dumps(data))
+        self.messages += recipients
+        self.bytes += size * recipients
+        self.by_event[event] += recipients
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharing-hub presence")
+    parser.add_argument("--clients", type=int, default=3000)
+    parser.add_argument("--legacy", action="store_true",
+                        help="Simulate old clients that receive full online_users lists")
+    parser.add_argument("--second-tab-ratio", type=float, default=0.2,
+                        help="Share of users with a second tab open")
+    parser.add_argument("--snapshot-interval", type=float, default=None,
+                        help="Override the hub's snapshot interval (seconds)")
+    args = parser.parse_args()
+
+    if args.snapshot_interval is not None:
+        sharing_hub.SNAPSHOT_INTERVAL_SECONDS = args.snapshot_interval
+    fanout = FanOut()
+    sharing_hub.emit = fanout.emit
+    sharing_hub.join_room = fanout.join_room
+    claims: dict[str, dict] = {}
+    sharing_hub._decode_jwt_claims = lambda token: claims[token]
+
+    rng = random.Random(42)
+    users = max(1, int(args.clients / (1 + args.second_tab_ratio)))
+    sids = []
+    for i in range(args.clients):
+        n = i if i < users else rng.randrange(users)
+        token = f"t{i}"
+        claims[token] = {"name": f"User {n}", "preferred_username": f"user{n}@example.com"}
+        sids.append((f"sid{i}", token, n))
+
+    app = Flask(__name__)
+    ns = sharing_hub.ShareNamespace("/share")
+    presence = None if args.legacy else "delta"
+
+    def call(sid: str, handler, *handler_args):
+        with app.test_request_context("/"):
+            request.sid = sid
+            request.namespace = "/share"
+            handler(*handler_args)
+
+    started = time.perf_counter()
+    for sid, token, _ in sids:
+        call(sid, ns.on_connect, {"token": token, "presence": presence})
+        if presence:
+            call(sid, ns.on_get_online_users)
+    connect_s = time.perf_counter() - started
+    connect_msgs, connect_bytes = fanout.messages, fanout.bytes
+
+    started = time.perf_counter()
+    for sid, _, _ in sids:
+        call(sid, ns.on_share_request, {
+            "recipient_email": f"user{rng.randrange(users)}@example.com",
+            "share_type": "partner",
+        })
+    relay_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for sid, _, _ in sids:
+        call(sid, ns.on_disconnect)
+        fanout.leave_all(sid)
+    disconnect_s = time.perf_counter() - started
+
+    mode = "legacy full lists" if args.legacy else "delta events"
+    print(f"{args.clients} clients ({users} users), {mode}")
+    print(f"  connect     {connect_s:7.2f}s  {connect_s / args.clients * 1000:.3f} ms/client  "
+          f"{connect_msgs:,} msgs  {connect_bytes / 1e6:,.1f} MB")
+    print(f"  relay       {relay_s:7.2f}s  {relay_s / args.clients * 1000:.3f} ms/request")
+    print(f"  disconnect  {disconnect_s:7.2f}s  {disconnect_s / args.clients * 1000:.3f} ms/client")
+    print(f"  total {fanout.messages:,} messages, {fanout.bytes / 1e6:,.1f} MB")
+    print("  by event: " + ", ".join(f"{k}={v:,}" for k, v in sorted(fanout.by_event.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,15 @@ import logging
 import os
 import re
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_socketio import SocketIO
 
-from openai_client import chat_completion, chat_completion_with_tools, get_connect_deployment
+from openai_client import (
+    chat_completion,
+    chat_completion_stream,
+    chat_completion_with_tools,
+    get_connect_deployment,
+)
 from prompts import (
     TOPIC_SUGGESTION_PROMPT,
     AZURE_ABBREVIATION_MAP,
@@ -30,10 +35,14 @@ from prompts import (
     CONNECT_USER_PROMPT_SINGLE,
     CONNECT_USER_PROMPT_CHUNK,
     CONNECT_USER_PROMPT_SYNTHESIS,
+    CONNECT_UNITS_INSTRUCTION,
     ENGAGEMENT_STORY_PROMPT,
     PARTNER_RECOMMENDATION_PROMPT,
     CHAT_SYSTEM_PROMPT,
 )
+from response_cache import cached_route, responses as response_cache
+import upstream_pool
+from upstream_pool import UpstreamBusy
 
 # ---------------------------------------------------------------------------
 # App setup
@@ -102,6 +111,44 @@ def _error(msg: str, status: int = 400):
     return jsonify({"success": False, "error": msg}), status
 
 
+def _busy(exc: UpstreamBusy):
+    """503 when every upstream worker in the call's lane stayed busy."""
+    logger.warning("upstream queue timeout: %s", exc)
+    response, status = _error(f"Gateway busy: {exc}", 503)
+    response.headers["Retry-After"] = "10"
+    return response, status
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_response(stream, finish, label: str) -> Response:
+    """Relay a chat_completion_stream as server-sent events.
+
+    Emits ``delta`` events ({"text"}) as tokens arrive, then one ``done``
+    event carrying the same body the non-streaming endpoint would return
+    (built by ``finish`` from the final stream item), or an ``error`` event.
+    """
+    def generate():
+        try:
+            for item in stream:
+                if "delta" in item:
+                    yield _sse("delta", {"text": item["delta"]})
+                else:
+                    yield _sse("done", {"success": True, **finish(item)})
+        except Exception as exc:
+            logger.exception("%s stream error", label)
+            yield _sse("error", {"success": False, "error": f"Internal error: {exc}"})
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ---------------------------------------------------------------------------
 # APIM Gateway Secret validation
 # ---------------------------------------------------------------------------
@@ -190,10 +237,20 @@ def _dedup_topics_against_existing(topics: list, existing_topics: list) -> list:
     return result
 
 
+# ---------------------------------------------------------------------------
+# Response cache TTLs (see response_cache.py). Topic extraction depends only
+# on the notes; matches and comment summaries also depend on milestone and
+# comment lists that change, so they expire sooner.
+# ---------------------------------------------------------------------------
+TOPICS_CACHE_TTL = 7 * 24 * 3600
+MATCH_CACHE_TTL = 24 * 3600
+
+
 # ---------------------------------------------------------------------------
 # POST /v1/suggest-topics
 # ---------------------------------------------------------------------------
 @app.route("/v1/suggest-topics", methods=["POST"])
+@cached_route(TOPICS_CACHE_TTL, TOPIC_SUGGESTION_PROMPT, repr(AZURE_ABBREVIATION_MAP))
 def suggest_topics():
     """Suggest topic tags from call notes."""
     try:
@@ -233,6 +290,8 @@ def suggest_topics():
     except json.JSONDecodeError:
         logger.warning("suggest-topics: could not parse AI response as JSON")
         return _error("AI returned invalid response format", 502)
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("suggest-topics error")
         return _error(f"Internal error: {exc}", 500)
@@ -284,6 +343,7 @@ def _try_match_milestones(call_notes: str, milestones: list) -> dict | None:
 # POST /v1/match-milestone
 # ---------------------------------------------------------------------------
 @app.route("/v1/match-milestone", methods=["POST"])
+@cached_route(MATCH_CACHE_TTL, MILESTONE_MATCH_PROMPT)
 def match_milestone():
     """Match call notes to the best milestone, preferring active statuses.
 
@@ -330,6 +390,8 @@ def match_milestone():
             "usage": aggregated_usage,
         })
 
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("match-milestone error")
         return _error(f"Internal error: {exc}", 500)
@@ -339,6 +401,7 @@ def match_milestone():
 # POST /v1/match-opportunity
 # ---------------------------------------------------------------------------
 @app.route("/v1/match-opportunity", methods=["POST"])
+@cached_route(MATCH_CACHE_TTL, OPPORTUNITY_MATCH_PROMPT)
 def match_opportunity():
     """Match call notes to the best opportunity.
 
@@ -380,6 +443,8 @@ def match_opportunity():
             "usage": result["usage"],
         })
 
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("match-opportunity error")
         return _error(f"Internal error: {exc}", 500)
@@ -389,6 +454,7 @@ def match_opportunity():
 # POST /v1/analyze-call
 # ---------------------------------------------------------------------------
 @app.route("/v1/analyze-call", methods=["POST"])
+@cached_route(TOPICS_CACHE_TTL, ANALYZE_CALL_PROMPT)
 def analyze_call():
     """Extract topic tags from call notes (auto-fill flow)."""
     try:
@@ -416,6 +482,8 @@ def analyze_call():
     except json.JSONDecodeError:
         logger.warning("analyze-call: could not parse AI response as JSON")
         return _error("AI returned invalid response format", 502)
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("analyze-call error")
         return _error(f"Internal error: {exc}", 500)
@@ -450,6 +518,8 @@ def engagement_story():
     except json.JSONDecodeError:
         logger.warning("engagement-story: could not parse AI response as JSON")
         return _error("AI returned invalid response format", 502)
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("engagement-story error")
         return _error(f"Internal error: {exc}", 500)
@@ -484,6 +554,8 @@ def recommend_partners():
     except json.JSONDecodeError:
         logger.warning("recommend-partners: could not parse AI response as JSON")
         return _error("AI returned invalid response format", 502)
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("recommend-partners error")
         return _error(f"Internal error: {exc}", 500)
@@ -493,6 +565,7 @@ def recommend_partners():
 # POST /v1/summarize-note
 # ---------------------------------------------------------------------------
 @app.route("/v1/summarize-note", methods=["POST"])
+@cached_route(MATCH_CACHE_TTL, MILESTONE_COMMENT_PROMPT)
 def summarize_note():
     """Summarize a note for a milestone comment.
 
@@ -539,6 +612,8 @@ def summarize_note():
             "usage": result["usage"],
         })
 
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("summarize-note error")
         return _error(f"Internal error: {exc}", 500)
@@ -547,6 +622,24 @@ def summarize_note():
 # ---------------------------------------------------------------------------
 # POST /v1/connect-summary
 # ---------------------------------------------------------------------------
+_UNIT_MARKER = re.compile(r"^\s*=== UNIT (\d+) ===\s*$", re.MULTILINE)
+
+
+def split_unit_summaries(text: str, count: int) -> list[str]:
+    """Split a per-unit chunk summary on its ``=== UNIT n ===`` lines.
+
+    Returns one summary per unit, "" for any unit the model skipped.
+    """
+    summaries = [""] * count
+    markers = list(_UNIT_MARKER.finditer(text))
+    for marker, following in zip(markers, markers[1:] + [None]):
+        n = int(marker.group(1))
+        if 1 <= n <= count:
+            end = following.start() if following else len(text)
+            summaries[n - 1] = text[marker.end():end].strip()
+    return summaries
+
+
 @app.route("/v1/connect-summary", methods=["POST"])
 def connect_summary():
     """Generate Connect self-evaluation narrative using GPT-5.3-chat.
@@ -555,33 +648,38 @@ def connect_summary():
 
     Supports three modes:
       - single:    Full export → single summary
-      - chunk:     Per-customer-group evidence extraction
+      - chunk:     Per-customer-group evidence extraction. With ``units``
+                   (a list of customer text blocks) the evidence is
+                   returned per customer as ``summaries``.
       - synthesis: Combine chunk evidence into final output
+
+    With ``"stream": true`` the summary is relayed as server-sent events.
     """
     try:
         body = request.get_json(force=True)
         mode = body.get("mode", "single")
+        units = body.get("units") if mode == "chunk" else None
         deployment = get_connect_deployment()
 
         if mode == "single":
             text_export = body.get("text_export", "")
+            system_prompt = CONNECT_SUMMARY_SYSTEM_PROMPT
             user_prompt = CONNECT_USER_PROMPT_SINGLE.format(
                 text_export=text_export,
             )
-            result = chat_completion(
-                CONNECT_SUMMARY_SYSTEM_PROMPT,
-                user_prompt,
-                max_tokens=3000,
-                deployment=deployment,
-                temperature=0.2,
-            )
+            max_tokens = 3000
 
         elif mode == "chunk":
             header = body.get("header", "")
             customer_text = body.get("customer_text", "")
+            if units:
+                customer_text = "\n\n".join(
+                    f"=== UNIT {n} ===\n{text}" for n, text in enumerate(units, 1)
+                )
             general_notes_text = body.get("general_notes_text", "")
             chunk_index = body.get("chunk_index", 1)
             chunk_count = body.get("chunk_count", 1)
+            system_prompt = CONNECT_CHUNK_SYSTEM_PROMPT
             user_prompt = CONNECT_USER_PROMPT_CHUNK.format(
                 header=header,
                 customer_text=customer_text,
@@ -589,13 +687,11 @@ def connect_summary():
                 chunk_index=chunk_index,
                 chunk_count=chunk_count,
             )
-            result = chat_completion(
-                CONNECT_CHUNK_SYSTEM_PROMPT,
-                user_prompt,
-                max_tokens=2000,
-                deployment=deployment,
-                temperature=0.2,
-            )
+            max_tokens = 2000
+            if units:
+                user_prompt += CONNECT_UNITS_INSTRUCTION
+                # Room for a short summary per customer
+                max_tokens = min(2000 + 300 * (len(units) - 1), 8000)
 
         elif mode == "synthesis":
             header = body.get("header", "")
@@ -605,28 +701,56 @@ def connect_summary():
                 f"### Chunk {i + 1}\n{s}"
                 for i, s in enumerate(partial_summaries)
             )
+            system_prompt = CONNECT_SYNTHESIS_SYSTEM_PROMPT
             user_prompt = CONNECT_USER_PROMPT_SYNTHESIS.format(
                 header=header,
                 chunk_count=chunk_count,
                 combined=combined,
             )
-            result = chat_completion(
-                CONNECT_SYNTHESIS_SYSTEM_PROMPT,
-                user_prompt,
-                max_tokens=3000,
-                deployment=deployment,
-                temperature=0.2,
-            )
+            max_tokens = 3000
 
         else:
             return _error(f"Invalid mode: {mode}")
 
-        return jsonify({
+        if body.get("stream"):
+            return _stream_response(
+                chat_completion_stream(
+                    [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    max_tokens=max_tokens,
+                    deployment=deployment,
+                    temperature=0.2,
+                    lane="connect",
+                ),
+                lambda final: {
+                    "summary": final["message"]["content"].strip(),
+                    "usage": final["usage"],
+                },
+                "connect-summary",
+            )
+
+        result = chat_completion(
+            system_prompt,
+            user_prompt,
+            max_tokens=max_tokens,
+            deployment=deployment,
+            temperature=0.2,
+            lane="connect",
+        )
+
+        response = {
             "success": True,
             "summary": result["text"],
             "usage": result["usage"],
-        })
+        }
+        if units:
+            response["summaries"] = split_unit_summaries(result["text"], len(units))
+        return jsonify(response)
 
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("connect-summary error")
         return _error(f"Internal error: {exc}", 500)
@@ -658,6 +782,7 @@ def chat():
     override it). Tool definitions are passed through from the Flask app.
     The gateway does NOT execute tools - it returns tool_calls for the
     Flask app to execute, then accepts tool results in follow-up requests.
+    With ``"stream": true`` the reply is relayed as server-sent events.
     """
     try:
         body = request.get_json(force=True)
@@ -719,6 +844,19 @@ def chat():
         # --- Tools ---
         tools = body.get("tools")
 
+        # --- Stream token deltas when asked (same final body as below) ---
+        if body.get("stream"):
+            return _stream_response(
+                chat_completion_stream(
+                    messages=messages,
+                    tools=tools if tools else None,
+                    max_tokens=2000,
+                    temperature=0.3,
+                ),
+                lambda final: {"message": final["message"], "usage": final["usage"]},
+                "chat",
+            )
+
         # --- Call Azure OpenAI ---
         result = chat_completion_with_tools(
             messages=messages,
@@ -733,6 +871,8 @@ def chat():
             "usage": result["usage"],
         })
 
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("chat error")
         return _error(f"Internal error: {exc}", 500)
@@ -755,11 +895,31 @@ def ping():
             "status": "ok",
             "response": result["text"],
         })
+    except UpstreamBusy as exc:
+        return _busy(exc)
     except Exception as exc:
         logger.exception("ping error")
         return _error(f"OpenAI unreachable: {exc}", 502)
 
 
+# ---------------------------------------------------------------------------
+# GET /v1/cache-stats
+# ---------------------------------------------------------------------------
+@app.route("/v1/cache-stats", methods=["GET"])
+def cache_stats():
+    """Response cache counters (hits, coalesced requests, misses, size)."""
+    return jsonify({"success": True, "cache": response_cache.stats()})
+
+
+# ---------------------------------------------------------------------------
+# GET /v1/upstream-stats
+# ---------------------------------------------------------------------------
+@app.route("/v1/upstream-stats", methods=["GET"])
+def upstream_stats():
+    """Upstream worker lanes: slots, active and waiting calls, rejections."""
+    return jsonify({"success": True, "lanes": upstream_pool.stats()})
+
+
 # ---------------------------------------------------------------------------
 # GET / — basic liveness probe
 # ---------------------------------------------------------------------------
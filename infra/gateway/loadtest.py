@@ -0,0 +1,104 @@
+"""
+Load-test the gateway with concurrent Connect summaries and chat turns.
+
+Simulates the mix that used to starve the gateway: a few users generating
+Connect summaries (long calls, ``connect`` lane) while others chat
+(short calls, ``interactive`` lane). Reports throughput and latency per
+request type, how many were rejected as busy (503), and the gateway's
+upstream lane counters.
+
+Usage:
+    python infra/gateway/run_local.py --stub --stub-latency-ms 800 &
+    python infra/gateway/loadtest.py --connect-users 6 --chat-users 20 --duration 30
+
+Requests are non-streaming, so each holds an upstream slot for the full
+stub latency; use a few seconds of latency for a synthesis-like load.
+"""
+import argparse
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+CONNECT_TEXT = "\n".join(
+    f"--- Customer {i} (3 notes) ---\n  [2025-03-0{i % 9 + 1}]\n    Reviewed migration plan."
+    for i in range(200)
+)
+
+
+def _connect_request(session: requests.Session, url: str, i: int) -> requests.Response:
+    return session.post(f"{url}/v1/connect-summary", json={
+        "mode": "single",
+        "text_export": f"Load test run {i}\n{CONNECT_TEXT}",
+    }, timeout=300)
+
+
+def _chat_request(session: requests.Session, url: str, i: int) -> requests.Response:
+    return session.post(f"{url}/v1/chat", json={
+        "context": {"page": "index"},
+        "messages": [{"role": "user", "content": f"What's new this week? ({i})"}],
+    }, timeout=120)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the AI gateway")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--connect-users", type=int, default=6)
+    parser.add_argument("--chat-users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to keep sending")
+    args = parser.parse_args()
+
+    results: dict[str, list[tuple[float, int]]] = defaultdict(list)
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def user(kind: str, send, n: int):
+        session = requests.Session()
+        i = 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = send(session, args.url, n * 100_000 + i).status_code
+            except requests.RequestException:
+                status = 0
+            with lock:
+                results[kind].append((time.perf_counter() - started, status))
+            i += 1
+
+    threads = [threading.Thread(target=user, args=("connect", _connect_request, n))
+               for n in range(args.connect_users)]
+    threads += [threading.Thread(target=user, args=("chat", _chat_request, n))
+                for n in range(args.chat_users)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.connect_users} Connect users + {args.chat_users} chat users "
+          f"for {elapsed:.1f}s")
+    for kind in ("connect", "chat"):
+        rows = results[kind]
+        ok = sorted(t for t, status in rows if status == 200)
+        busy = sum(1 for _, status in rows if status == 503)
+        failed = len(rows) - len(ok) - busy
+        if ok:
+            p95 = ok[max(0, int(len(ok) * 0.95) - 1)]
+            latency = (f"p50={statistics.median(ok) * 1000:.0f}ms "
+                       f"p95={p95 * 1000:.0f}ms max={ok[-1] * 1000:.0f}ms")
+        else:
+            latency = "no successful requests"
+        print(f"  {kind:8} {len(ok) / elapsed:6.2f} req/s  ok={len(ok)} busy={busy} "
+              f"failed={failed}  {latency}")
+
+    stats = requests.get(f"{args.url}/v1/upstream-stats", timeout=10)
+    if stats.ok:
+        for name, lane in stats.json().get("lanes", {}).items():
+            print(f"  lane {name}: {lane}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,55 @@
 Azure OpenAI client for the NoteHelper AI Gateway.
 
 Uses DefaultAzureCredential (→ system-assigned Managed Identity in Azure,
-falls back to az-login / VS Code creds locally).
+falls back to az-login / VS Code creds locally). ``GATEWAY_STUB_OPENAI=1``
+swaps in the offline stub from ``stub_openai.py``.
 """
 import os
+
+import httpx
 from openai import AzureOpenAI
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
+import upstream_pool
+
+# HTTP pool sized to the upstream worker slots (upstream_pool.py) so every
+# worker reuses a warm connection. The SDK defaults (1000 connections, 5s
+# keep-alive, 600s timeout) suit a many-tenant service, not one B1 instance.
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get("GATEWAY_HTTP_KEEPALIVE", "120"))
+UPSTREAM_TIMEOUT_SECONDS = float(os.environ.get("GATEWAY_UPSTREAM_TIMEOUT", "180"))
+MAX_RETRIES = 2
+
 _client: AzureOpenAI | None = None
 
 
 def get_client() -> AzureOpenAI:
     """Return a cached Azure OpenAI client authenticated via Managed Identity."""
     global _client
+    if _client is None and os.environ.get("GATEWAY_STUB_OPENAI", "").lower() in ("1", "true", "yes"):
+        from stub_openai import StubOpenAI
+        _client = StubOpenAI()
     if _client is None:
         credential = DefaultAzureCredential()
         token_provider = get_bearer_token_provider(
             credential, "https://cognitiveservices.azure.com/.default"
         )
+        workers = upstream_pool.total_workers()
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=workers + 2,
+                max_keepalive_connections=workers,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(UPSTREAM_TIMEOUT_SECONDS, connect=10.0),
+        )
         _client = AzureOpenAI(
             api_version=os.environ.get(
                 "AZURE_OPENAI_API_VERSION", "2025-01-01-preview"
             ),
             azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
             azure_ad_token_provider=token_provider,
+            http_client=http_client,
+            max_retries=MAX_RETRIES,
         )
     return _client
 
@@ -48,6 +74,7 @@ def chat_completion(
     max_tokens: int = 2000,
     deployment: str | None = None,
     temperature: float | None = None,
+    lane: str = "interactive",
 ) -> dict:
     """Make a chat completion call and return structured result.
 
@@ -57,6 +84,7 @@ def chat_completion(
         max_tokens: Maximum tokens for the completion.
         deployment: Override deployment name (defaults to AZURE_OPENAI_DEPLOYMENT).
         temperature: Override temperature (omitted if None, letting API use default).
+        lane: Upstream worker lane (``interactive`` or ``connect``).
 
     Returns:
         dict with keys `text` (str) and `usage` (dict with model/token counts).
@@ -75,7 +103,8 @@ def chat_completion(
     if temperature is not None:
         kwargs["temperature"] = temperature
 
-    response = client.chat.completions.create(**kwargs)
+    with upstream_pool.lanes[lane].slot():
+        response = client.chat.completions.create(**kwargs)
 
     text = response.choices[0].message.content or ""
     usage = {
@@ -93,6 +122,7 @@ def chat_completion_with_tools(
     max_tokens: int = 2000,
     deployment: str | None = None,
     temperature: float | None = None,
+    lane: str = "interactive",
 ) -> dict:
     """Make a chat completion call with tool-calling support.
 
@@ -102,6 +132,7 @@ def chat_completion_with_tools(
         max_tokens: Maximum tokens for the completion.
         deployment: Override deployment name.
         temperature: Override temperature.
+        lane: Upstream worker lane (``interactive`` or ``connect``).
 
     Returns:
         dict with keys:
@@ -122,7 +153,8 @@ def chat_completion_with_tools(
     if temperature is not None:
         kwargs["temperature"] = temperature
 
-    response = client.chat.completions.create(**kwargs)
+    with upstream_pool.lanes[lane].slot():
+        response = client.chat.completions.create(**kwargs)
 
     msg = response.choices[0].message
     result_message: dict = {"role": "assistant", "content": msg.content or ""}
@@ -149,3 +181,79 @@ def chat_completion_with_tools(
         "total_tokens": response.usage.total_tokens if response.usage else 0,
     }
     return {"message": result_message, "usage": usage}
+
+
+def chat_completion_stream(
+    messages: list[dict],
+    tools: list[dict] | None = None,
+    max_tokens: int = 2000,
+    deployment: str | None = None,
+    temperature: float | None = None,
+    lane: str = "interactive",
+):
+    """Stream a chat completion, yielding content deltas as they arrive.
+
+    Args:
+        messages: Full messages array (system, user, assistant, tool).
+        tools: OpenAI function-calling tool definitions.
+        max_tokens: Maximum tokens for the completion.
+        deployment: Override deployment name.
+        temperature: Override temperature.
+        lane: Upstream worker lane (``interactive`` or ``connect``).
+
+    Yields:
+        ``{"delta": str}`` for each content fragment, then one final
+        ``{"message": dict, "usage": dict}`` shaped like the return value
+        of :func:`chat_completion_with_tools`.
+    """
+    client = get_client()
+    model = deployment or get_deployment()
+
+    kwargs: dict = {
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "model": model,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+    if tools:
+        kwargs["tools"] = tools
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+
+    content: list[str] = []
+    tool_calls: dict[int, dict] = {}
+    usage = {"model": model, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+    # The slot is held until the whole stream has been relayed
+    with upstream_pool.lanes[lane].slot():
+        for chunk in client.chat.completions.create(**kwargs):
+            if chunk.model:
+                usage["model"] = chunk.model
+            if chunk.usage:
+                usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                usage["completion_tokens"] = chunk.usage.completion_tokens
+                usage["total_tokens"] = chunk.usage.total_tokens
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                yield {"delta": delta.content}
+            # Tool call fragments arrive keyed by index; names/ids come first
+            for tc in delta.tool_calls or []:
+                call = tool_calls.setdefault(tc.index, {
+                    "id": "", "type": "function",
+                    "function": {"name": "", "arguments": ""},
+                })
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function and tc.function.name:
+                    call["function"]["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["function"]["arguments"] += tc.function.arguments
+
+    message: dict = {"role": "assistant", "content": "".join(content)}
+    if tool_calls:
+        message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+    yield {"message": message, "usage": usage}
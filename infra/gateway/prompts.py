@@ -257,6 +257,15 @@ CONNECT_USER_PROMPT_CHUNK = (
     "{customer_text}{general_notes_text}"
 )
 
+# Appended to the chunk prompt when the customers are sent as numbered units,
+# so each customer's evidence comes back separately and can be cached alone.
+CONNECT_UNITS_INSTRUCTION = (
+    "\n\nThe customer details above are split into numbered sections, each "
+    "starting with a line like \"=== UNIT 1 ===\". Summarize each section on "
+    "its own, using only that section's notes, and start each section's "
+    "summary with the same marker line."
+)
+
 CONNECT_USER_PROMPT_SYNTHESIS = (
     "You will combine multiple partial evidence summaries into a single "
     "Connect self-evaluation.\n\n"
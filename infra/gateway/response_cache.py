@@ -0,0 +1,252 @@
+"""Response cache and in-flight request coalescing for the AI gateway.
+
+Many NoteHelper instances send byte-identical ``suggest-topics`` or
+``match-milestone`` payloads (the same shared meeting summary, the same
+customer's milestone list). Routes decorated with :func:`cached_route`
+answer those from memory instead of calling Azure OpenAI again:
+
+- Key: endpoint, prompt version (a hash of the route's system prompt, so a
+  prompt edit invalidates old answers) and a hash of the normalized body.
+- Only successful JSON responses are stored, for the route's TTL.
+- Memory is bounded by ``GATEWAY_CACHE_MAX_BYTES`` of serialized bodies,
+  evicting least-recently-used entries first.
+- Concurrent identical requests share one upstream call: the first request
+  computes, the rest wait for its result (``X-Gateway-Cache: shared``).
+- Hit and shared responses carry ``cached: true``, zeroed ``usage`` token
+  counts and ``tokens_saved`` (the tokens the original call used).
+- Streaming requests (``"stream": true``) bypass the cache.
+- ``Cache-Control: no-cache`` ("regenerate") skips the lookup and the
+  in-flight wait; the fresh answer replaces the cached one.
+
+The process is one gunicorn worker with threads, so one in-memory cache
+serves every request. ``GATEWAY_CACHE=0`` disables caching and coalescing.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable
+
+from flask import jsonify, request
+
+logger = logging.getLogger("gateway.cache")
+
+MAX_BYTES = int(os.environ.get("GATEWAY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# How long a follower waits on the leader before calling upstream itself
+WAIT_TIMEOUT_SECONDS = 120
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("GATEWAY_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+def prompt_version(*prompts: str) -> str:
+    """Short hash of the prompts a route's answers depend on."""
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(prompt.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def _normalize(value: Any) -> Any:
+    """Trim strings and unify line endings so trivially different bodies match."""
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n").strip()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(endpoint: str, version: str, body: dict) -> str:
+    """Cache key for one request body."""
+    canonical = json.dumps(_normalize(body), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"{endpoint}|{version}|{digest}"
+
+
+class _InFlight:
+    """A computation other requests with the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.body: dict | None = None
+
+
+class ResponseCache:
+    """Thread-safe TTL cache of JSON bodies, bounded by serialized size."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, dict, int]] = OrderedDict()
+        self._inflight: dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached body, or None if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, body: dict, ttl: float) -> None:
+        """Store a successful response body for ``ttl`` seconds."""
+        size = len(json.dumps(body, separators=(",", ":")))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, body, size)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def get_or_compute(self, key: str, ttl: float, compute: Callable[[], dict | None],
+                       refresh: bool = False) -> tuple[dict | None, str]:
+        """Return ``(body, source)`` where source is hit, shared or miss.
+
+        ``compute`` returns the body to cache, or None when the upstream
+        call failed (nothing is stored; waiting requests compute their own).
+        With ``refresh`` the body is always computed and replaces the entry.
+        """
+        if refresh:
+            with self._lock:
+                self.misses += 1
+            body = compute()
+            if body is not None:
+                self.put(key, body, ttl)
+            return body, "miss"
+
+        body = self.get(key)
+        if body is not None:
+            with self._lock:
+                self.hits += 1
+            return body, "hit"
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+
+        if not leader:
+            if flight.done.wait(WAIT_TIMEOUT_SECONDS) and flight.body is not None:
+                with self._lock:
+                    self.shared += 1
+                return flight.body, "shared"
+            with self._lock:
+                self.misses += 1
+            return compute(), "miss"
+
+        with self._lock:
+            self.misses += 1
+        try:
+            body = compute()
+            if body is not None:
+                self.put(key, body, ttl)
+            flight.body = body
+            return body, "miss"
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "shared": self.shared,
+                "misses": self.misses,
+                "inflight": len(self._inflight),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+
+responses = ResponseCache()
+
+
+def served_from_cache(data: dict) -> dict:
+    """A cached body as returned to a caller that spent no tokens on it."""
+    usage = data.get("usage")
+    if not isinstance(usage, dict):
+        return {**data, "cached": True}
+    return {
+        **data,
+        "usage": {**usage, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        "cached": True,
+        "tokens_saved": usage.get("total_tokens") or 0,
+    }
+
+
+def cached_route(ttl: float, *prompts: str):
+    """Serve a JSON route from the response cache.
+
+    ``prompts`` are the prompt constants the route's answers depend on;
+    their hash is part of the key. The wrapped view's response is stored
+    only when it is a 200 with ``"success": true``. A request with
+    ``Cache-Control: no-cache`` is always computed and replaces the entry.
+    """
+    version = prompt_version(*prompts)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            body = request.get_json(force=True, silent=True)
+            if not cache_enabled() or not isinstance(body, dict) or body.get("stream"):
+                return view(*args, **kwargs)
+
+            response = None
+
+            def compute() -> dict | None:
+                nonlocal response
+                response = view(*args, **kwargs)
+                resp = response[0] if isinstance(response, tuple) else response
+                status = response[1] if isinstance(response, tuple) else resp.status_code
+                data = resp.get_json(silent=True) if status == 200 else None
+                return data if isinstance(data, dict) and data.get("success") else None
+
+            refresh = "no-cache" in request.headers.get("Cache-Control", "").lower()
+            key = request_key(request.path, version, body)
+            data, source = responses.get_or_compute(key, ttl, compute, refresh=refresh)
+            if source == "miss":
+                # This request made the upstream call; return its response
+                resp = response[0] if isinstance(response, tuple) else response
+                resp.headers["X-Gateway-Cache"] = "miss"
+                return response
+            logger.info("cache %s %s", source, request.path)
+            result = jsonify(served_from_cache(data))
+            result.headers["X-Gateway-Cache"] = source
+            return result
+
+        return wrapper
+
+    return decorator
@@ -4,9 +4,13 @@ Run the AI gateway locally against real Azure OpenAI.
 Loads config from the ARM template defaults so you don't have to set
 env vars manually. Uses your local `az login` credential.
 
+With ``--stub`` the gateway answers from a canned stand-in model instead
+(no Azure login needed), for benchmarking the gateway itself.
+
 Usage:
     python infra/gateway/run_local.py          # port 8000
     python infra/gateway/run_local.py --port 8080
+    python infra/gateway/run_local.py --stub --stub-latency-ms 800
 """
 import json
 import os
@@ -33,8 +37,17 @@ def main():
     import argparse
     parser = argparse.ArgumentParser(description="Run NoteHelper AI gateway locally")
     parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--stub", action="store_true",
+                        help="Use the offline stub model instead of Azure OpenAI")
+    parser.add_argument("--stub-latency-ms", type=int, default=500,
+                        help="Simulated model latency per call with --stub")
     args = parser.parse_args()
 
+    if args.stub:
+        os.environ["GATEWAY_STUB_OPENAI"] = "1"
+        os.environ["GATEWAY_STUB_LATENCY_MS"] = str(args.stub_latency_ms)
+        print(f"  Stub model, {args.stub_latency_ms} ms per call")
+
     # Set env vars from ARM defaults (don't overwrite if already set)
     defaults = _load_arm_defaults()
     for key, value in defaults.items():
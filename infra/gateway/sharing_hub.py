@@ -7,11 +7,29 @@ using the same JWT for authentication.
 
 Flow:
 1. Client connects with JWT in auth header → gateway validates → user joins
-2. Other clients see updated online list via ``online_users`` event
+2. Other clients see the change: ``user_joined`` / ``user_left`` deltas
+   (plus a periodic ``online_snapshot``) for clients that connect with
+   ``presence: "delta"``, or a full ``online_users`` list for older clients
 3. Sender emits ``share_request`` → gateway relays to recipient
 4. Recipient accepts → emits ``share_accept`` → gateway relays to sender
 5. Sender emits ``share_data`` with payload → gateway relays to recipient
 6. Recipient processes data locally (upsert) → done
+
+Large shares go as a chunked *transfer* when the recipient accepted with
+``chunked: true``: ``share_data`` carries only a ``transfer`` header, then
+the sender emits ``share_chunk`` events and the recipient answers each with
+``share_chunk_ack`` (the next index it needs). The gateway remembers the
+last acknowledged index per transfer, so a sender that reconnects emits
+``share_resume`` and carries on from there. Chunks are relayed, never
+stored. Clients that don't opt in keep sending one ``share_data`` message.
+
+Presence is indexed by email (``_sids_by_email``), so relays and
+connect/disconnect are O(1) in the number of online users (plus one full
+list per legacy client, which are tracked apart). Each delta and
+snapshot carries a sequence number; a client that sees a gap asks for the
+list again with ``get_online_users``. Fan-out uses Socket.IO rooms: one
+``user:<email>`` room per user (all their tabs) and one room per presence
+mode, so a broadcast is a single emit.
 """
 import logging
 import os
@@ -22,7 +40,7 @@ import jwt
 import requests
 from jwt import PyJWKClient
 from flask import request
-from flask_socketio import Namespace, emit, disconnect
+from flask_socketio import Namespace, emit, disconnect, join_room
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +51,27 @@ _AUDIENCE = "https://management.azure.com"
 # Microsoft OIDC JWKS endpoint for key rotation (v1 - matches management tokens)
 _JWKS_URL = f"https://login.microsoftonline.com/{_MS_TENANT}/discovery/keys"
 
-# Online users: sid → {name, email, connected_at}
+# Online users: sid → {name, email, connected_at, presence}
 _online_users: dict[str, dict] = {}
+# Index: lowercased email → SIDs (one per open tab)
+_sids_by_email: dict[str, set[str]] = {}
+# Lowercased email → {name, email} for each online user (the shared list)
+_users_by_email: dict[str, dict] = {}
+# SIDs of legacy clients, which still get a full list on every change
+_legacy_sids: set[str] = set()
+# Guards the four structures above and the presence sequence number
+_presence_lock = threading.Lock()
+_presence_seq = 0
+_last_snapshot_at = time.time()
+
+# Full snapshot to delta clients at most this often (on the next change),
+# so a client that missed an event converges without asking. Time-based
+# only: a burst of connects must not turn into a burst of full lists.
+SNAPSHOT_INTERVAL_SECONDS = 300
+
+# Rooms: every delta-mode client, every legacy (full-list) client
+_DELTA_ROOM = "online:delta"
+_LEGACY_ROOM = "online:legacy"
 
 # Allow users to see/share with themselves (for staging/dev testing).
 # Set ALLOW_SELF_SHARE=true on the staging slot's app settings.
@@ -44,6 +81,13 @@ _ALLOW_SELF_SHARE = os.environ.get("ALLOW_SELF_SHARE", "").strip().lower() == "t
 # Gateway tracks both sides so the client never needs to handle SIDs.
 _pending_shares: dict[tuple[str, str], dict] = {}
 
+# Chunked transfers in flight: transfer_id → {sender_email, recipient_email,
+# sender_sid, recipient_sid, total, next_index, updated_at}. Routing and the
+# last acknowledgement only; chunk data is never kept.
+_transfers: dict[str, dict] = {}
+# Forget a transfer when neither side has touched it for this long
+TRANSFER_IDLE_SECONDS = 600
+
 # Sharing allowlist — if set, only these emails can connect.
 # Env var: comma-separated emails. Empty/unset = everyone allowed.
 _ALLOWED_EMAILS: set[str] = set(
@@ -103,19 +147,20 @@ class ShareNamespace(Namespace):
 
     # ── Helpers ──────────────────────────────────────────────────────────
 
+    @staticmethod
+    def _user_room(email: str) -> str:
+        return f"user:{email.lower()}"
+
     @staticmethod
     def _sids_for_email(email: str) -> list[str]:
         """Return all SIDs belonging to a given email address."""
-        return [
-            sid for sid, u in _online_users.items()
-            if u["email"].lower() == email.lower()
-        ]
+        with _presence_lock:
+            return list(_sids_by_email.get(email.lower(), ()))
 
     @staticmethod
     def _emit_to_user(event: str, data: dict, email: str):
-        """Emit an event to ALL SIDs for a given email."""
-        for sid in ShareNamespace._sids_for_email(email):
-            emit(event, data, to=sid)
+        """Emit an event to ALL SIDs for a given email (their user room)."""
+        emit(event, data, to=ShareNamespace._user_room(email))
 
     @staticmethod
     def _unique_online_users(exclude_email: str) -> list[dict]:
@@ -124,24 +169,69 @@ class ShareNamespace(Namespace):
         When ALLOW_SELF_SHARE is true (staging/dev), the requesting user
         is included in the list so they can test sharing with themselves.
         """
-        seen = set()
-        users = []
-        skip_self = not _ALLOW_SELF_SHARE
-        for u in _online_users.values():
-            email_lower = u["email"].lower()
-            if skip_self and email_lower == exclude_email.lower():
-                continue
-            if email_lower in seen:
-                continue
-            seen.add(email_lower)
-            users.append({"name": u["name"], "email": u["email"]})
-        return users
-
-    def _broadcast_online(self):
-        """Send updated online list to all connected clients."""
-        for sid, me in _online_users.items():
-            users = self._unique_online_users(me["email"])
-            emit("online_users", {"users": users}, to=sid)
+        skip = "" if _ALLOW_SELF_SHARE else exclude_email.lower()
+        with _presence_lock:
+            return [dict(u) for email, u in _users_by_email.items() if email != skip]
+
+    @staticmethod
+    def _add_presence(sid: str, user: dict) -> tuple[bool, int]:
+        """Track a new SID; return (first tab for this email, sequence number)."""
+        global _presence_seq
+        email = user["email"].lower()
+        with _presence_lock:
+            _online_users[sid] = user
+            if user.get("presence") != "delta":
+                _legacy_sids.add(sid)
+            sids = _sids_by_email.setdefault(email, set())
+            first = not sids
+            sids.add(sid)
+            if first:
+                _users_by_email[email] = {"name": user["name"], "email": user["email"]}
+                _presence_seq += 1
+            return first, _presence_seq
+
+    @staticmethod
+    def _remove_presence(sid: str) -> tuple[dict | None, bool, int]:
+        """Forget a SID; return (user, last tab for this email, sequence number)."""
+        global _presence_seq
+        with _presence_lock:
+            user = _online_users.pop(sid, None)
+            if user is None:
+                return None, False, _presence_seq
+            _legacy_sids.discard(sid)
+            email = user["email"].lower()
+            sids = _sids_by_email.get(email, set())
+            sids.discard(sid)
+            last = not sids
+            if last:
+                _sids_by_email.pop(email, None)
+                _users_by_email.pop(email, None)
+                _presence_seq += 1
+            return user, last, _presence_seq
+
+    def _broadcast_presence(self, event: str, user: dict, seq: int):
+        """Tell everyone a user came online or went offline.
+
+        Delta clients get one small event via their shared room (plus a
+        full snapshot every so often); legacy clients still get their own
+        full list, as before.
+        """
+        global _last_snapshot_at
+        emit(event, {"name": user["name"], "email": user["email"], "seq": seq},
+             to=_DELTA_ROOM)
+
+        now = time.time()
+        with _presence_lock:
+            snapshot_due = now - _last_snapshot_at >= SNAPSHOT_INTERVAL_SECONDS
+            if snapshot_due:
+                _last_snapshot_at = now
+                users = [dict(u) for u in _users_by_email.values()]
+                snapshot_seq = _presence_seq
+            legacy = [(sid, _online_users[sid]["email"]) for sid in _legacy_sids]
+        if snapshot_due:
+            emit("online_snapshot", {"users": users, "seq": snapshot_seq}, to=_DELTA_ROOM)
+        for sid, email in legacy:
+            emit("online_users", {"users": self._unique_online_users(email)}, to=sid)
 
     # ── Connection lifecycle ─────────────────────────────────────────────
 
@@ -177,28 +267,50 @@ class ShareNamespace(Namespace):
             disconnect()
             return False
 
-        _online_users[request.sid] = {
+        # Clients that handle user_joined/user_left say so; older ones get
+        # the full online_users list on every change
+        presence = "delta" if auth.get("presence") == "delta" else "legacy"
+        user = {
             "name": name,
             "email": email,
             "connected_at": time.time(),
+            "presence": presence,
         }
-        logger.info(f"share: {name} ({email}) connected — sid {request.sid}")
-        logger.info(f"share: online_users keys = {list(_online_users.keys())}")
-        self._broadcast_online()
+        join_room(self._user_room(email))
+        join_room(_DELTA_ROOM if presence == "delta" else _LEGACY_ROOM)
+        first, seq = self._add_presence(request.sid, user)
+        logger.info(f"share: {name} ({email}) connected — sid {request.sid}, "
+                    f"{len(_online_users)} online")
+        if first:
+            self._broadcast_presence("user_joined", user, seq)
+        elif presence == "legacy":
+            # Another tab: only this tab needs the list
+            self.on_get_online_users()
 
     def on_disconnect(self):
-        """Remove user from online list and broadcast."""
-        user = _online_users.pop(request.sid, None)
+        """Remove user from online list and broadcast if their last tab closed."""
+        user, last, seq = self._remove_presence(request.sid)
         if user:
-            logger.info(f"share: {user['name']} disconnected — sid {request.sid}")
-            logger.info(f"share: online_users keys after disconnect = {list(_online_users.keys())}")
-        self._broadcast_online()
+            logger.info(f"share: {user['name']} disconnected — sid {request.sid}, "
+                        f"{len(_online_users)} online")
+            if last:
+                self._broadcast_presence("user_left", user, seq)
 
     def on_get_online_users(self):
-        """Client requests the current online user list."""
+        """Client requests the current online user list.
+
+        ``self_email`` lets delta clients drop their own user_joined events;
+        it is empty when ALLOW_SELF_SHARE lets users share with themselves.
+        """
         my_email = _online_users.get(request.sid, {}).get("email", "")
+        with _presence_lock:
+            seq = _presence_seq
         users = self._unique_online_users(my_email)
-        emit("online_users", {"users": users})
+        emit("online_users", {
+            "users": users,
+            "seq": seq,
+            "self_email": "" if _ALLOW_SELF_SHARE else my_email,
+        })
 
     # ── Share flow (all email-based) ─────────────────────────────────────
 
@@ -231,7 +343,11 @@ class ShareNamespace(Namespace):
         }, recipient_email)
 
     def on_share_accept(self, data):
-        """Recipient accepts a share offer."""
+        """Recipient accepts a share offer.
+
+        data: {sender_email, chunked?: bool} — ``chunked`` means the
+        recipient can receive a chunked transfer.
+        """
         sender_email = data.get("sender_email", "")
         recipient = _online_users.get(request.sid, {})
         recipient_email = recipient.get("email", "")
@@ -251,6 +367,7 @@ class ShareNamespace(Namespace):
 
         # Store recipient's accepting SID for when sender sends data
         pending["recipient_sid"] = request.sid
+        pending["chunked"] = bool(data.get("chunked"))
         logger.info(f"share: accept — key={key}, sender_sid={sender_sid}, "
                     f"recipient_sid={request.sid}")
 
@@ -258,6 +375,7 @@ class ShareNamespace(Namespace):
         emit("share_accepted", {
             "recipient_email": recipient_email,
             "recipient_name": recipient.get("name", "Unknown"),
+            "chunked": pending["chunked"],
         }, to=sender_sid)
 
         # Dismiss the offer on other recipient tabs
@@ -290,9 +408,10 @@ class ShareNamespace(Namespace):
     def on_share_data(self, data):
         """Sender transmits share payload to the recipient.
 
-        data: {recipient_email, share_type, ...payload fields}
-        The gateway looks up the recipient SID from the pending share
-        session — the client never handles SIDs.
+        data: {recipient_email, share_type, ...payload fields}, or
+        {recipient_email, share_type, transfer: {id, total, ...}} to start
+        a chunked transfer. The gateway looks up the recipient SID from
+        the pending share session — the client never handles SIDs.
         """
         sender = _online_users.get(request.sid, {})
         sender_email = sender.get("email", "")
@@ -301,8 +420,7 @@ class ShareNamespace(Namespace):
         # Look up the pending share to find the recipient's accepting SID
         key = (sender_email.lower(), recipient_email.lower())
         pending = _pending_shares.pop(key, None)
-        logger.info(f"share: share_data — key={key}, pending={pending}, "
-                    f"online={list(_online_users.keys())}")
+        logger.info(f"share: share_data — key={key}, pending={pending}")
 
         if not pending or "recipient_sid" not in pending:
             emit("share_error", {"error": "Share session expired or not accepted"})
@@ -313,6 +431,22 @@ class ShareNamespace(Namespace):
             emit("share_error", {"error": "Recipient is no longer online"})
             return
 
+        transfer = data.get("transfer")
+        if transfer is not None:
+            if not pending.get("chunked") or not transfer.get("id"):
+                emit("share_error", {"error": "Recipient can't receive chunked shares"})
+                return
+            self._expire_transfers()
+            _transfers[transfer["id"]] = {
+                "sender_email": sender_email.lower(),
+                "recipient_email": recipient_email.lower(),
+                "sender_sid": request.sid,
+                "recipient_sid": recipient_sid,
+                "total": int(transfer.get("total") or 0),
+                "next_index": 0,
+                "updated_at": time.time(),
+            }
+
         # Forward everything except routing field, add sender info
         payload = {k: v for k, v in data.items() if k != "recipient_email"}
         payload["sender_name"] = sender.get("name", "Unknown")
@@ -321,3 +455,89 @@ class ShareNamespace(Namespace):
         # Send ONLY to the tab that accepted
         emit("share_payload", payload, to=recipient_sid)
         logger.info(f"share: payload delivered to {recipient_sid}")
+
+    # ── Chunked transfers ────────────────────────────────────────────────
+
+    @staticmethod
+    def _expire_transfers():
+        """Drop transfers neither side has touched for TRANSFER_IDLE_SECONDS."""
+        cutoff = time.time() - TRANSFER_IDLE_SECONDS
+        for transfer_id, t in list(_transfers.items()):
+            if t["updated_at"] < cutoff:
+                _transfers.pop(transfer_id, None)
+                logger.info(f"share: transfer {transfer_id} expired at "
+                            f"chunk {t['next_index']}/{t['total']}")
+
+    @staticmethod
+    def _transfer_for(data, role: str) -> dict | None:
+        """Look up a transfer and bind the caller's SID to its side.
+
+        ``role`` is "sender" or "recipient"; the caller's email must match
+        that side. Rebinding the SID is what lets a reconnected tab resume.
+        Idle transfers are expired first, so a stale one is never resumed.
+        """
+        ShareNamespace._expire_transfers()
+        t = _transfers.get(data.get("transfer_id", ""))
+        me = _online_users.get(request.sid, {}).get("email", "").lower()
+        if not t or t[f"{role}_email"] != me:
+            emit("share_error", {"error": "Share transfer expired or not found",
+                                 "transfer_id": data.get("transfer_id")})
+            return None
+        t[f"{role}_sid"] = request.sid
+        t["updated_at"] = time.time()
+        return t
+
+    def on_share_chunk(self, data):
+        """Sender relays one chunk: {transfer_id, index, data, sha256}.
+
+        If the recipient is offline the chunk is dropped; the sender
+        resends from the recipient's acknowledgement once it reconnects.
+        """
+        t = self._transfer_for(data, "sender")
+        if not t:
+            return
+        if t["recipient_sid"] in _online_users:
+            emit("share_chunk", {
+                "transfer_id": data.get("transfer_id"),
+                "index": data.get("index"),
+                "data": data.get("data"),
+                "sha256": data.get("sha256"),
+            }, to=t["recipient_sid"])
+
+    def on_share_chunk_ack(self, data):
+        """Recipient acknowledges chunks: {transfer_id, next_index, resend?}.
+
+        ``next_index`` is the first chunk the recipient still needs;
+        ``resend`` asks the sender to go back to it (bad checksum, gap, or
+        the recipient reconnected). All chunks acknowledged ends the transfer.
+        """
+        t = self._transfer_for(data, "recipient")
+        if not t:
+            return
+        t["next_index"] = int(data.get("next_index") or 0)
+        ack = {
+            "transfer_id": data.get("transfer_id"),
+            "next_index": t["next_index"],
+            "resend": bool(data.get("resend")),
+        }
+        if t["next_index"] >= t["total"]:
+            _transfers.pop(data.get("transfer_id"), None)
+            logger.info(f"share: transfer {ack['transfer_id']} delivered "
+                        f"({t['total']} chunks)")
+        if t["sender_sid"] in _online_users:
+            emit("share_chunk_ack", ack, to=t["sender_sid"])
+
+    def on_share_resume(self, data):
+        """Sender reconnected mid-transfer: {transfer_id}.
+
+        Replies with the last acknowledged index so the sender resends
+        from there.
+        """
+        t = self._transfer_for(data, "sender")
+        if not t:
+            return
+        emit("share_chunk_ack", {
+            "transfer_id": data.get("transfer_id"),
+            "next_index": t["next_index"],
+            "resend": True,
+        })
@@ -0,0 +1,93 @@
+"""Stand-in for the Azure OpenAI client, for running the gateway offline.
+
+``openai_client.get_client()`` returns :class:`StubOpenAI` when
+``GATEWAY_STUB_OPENAI=1`` (``run_local.py --stub`` sets it). Responses are
+canned but shaped like the real endpoints expect (a JSON topic array, a
+milestone match, plain text for Connect summaries and chat), and each call
+sleeps ``GATEWAY_STUB_LATENCY_MS`` to stand in for model latency, so the
+gateway's caching and concurrency can be benchmarked without Azure.
+"""
+import json
+import os
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from prompts import (
+    ANALYZE_CALL_PROMPT,
+    ENGAGEMENT_STORY_PROMPT,
+    MILESTONE_MATCH_PROMPT,
+    OPPORTUNITY_MATCH_PROMPT,
+    PARTNER_RECOMMENDATION_PROMPT,
+    TOPIC_SUGGESTION_PROMPT,
+)
+
+_ID_RE = re.compile(r"- ID: ([^,]+),")
+
+
+def _latency_seconds() -> float:
+    return float(os.environ.get("GATEWAY_STUB_LATENCY_MS", "500")) / 1000
+
+
+def _reply(system_prompt: str, user_prompt: str) -> str:
+    """Canned completion text for the prompt the gateway sent."""
+    if system_prompt == TOPIC_SUGGESTION_PROMPT:
+        return json.dumps(["Azure Kubernetes Service", "Cost Optimization"])
+    if system_prompt == ANALYZE_CALL_PROMPT:
+        return json.dumps({"topics": ["Azure Kubernetes Service"]})
+    if system_prompt in (MILESTONE_MATCH_PROMPT, OPPORTUNITY_MATCH_PROMPT):
+        ids = _ID_RE.findall(user_prompt)
+        key = "milestone_id" if system_prompt == MILESTONE_MATCH_PROMPT else "opportunity_id"
+        return json.dumps({key: ids[0].strip() if ids else None, "reason": "Stub match"})
+    if system_prompt == ENGAGEMENT_STORY_PROMPT:
+        return json.dumps({"key_individuals": "", "technical_problem": "",
+                           "business_impact": "", "solution_resources": ""})
+    if system_prompt == PARTNER_RECOMMENDATION_PROMPT:
+        return "[]"
+    return f"Stub response ({len(user_prompt)} chars of input)."
+
+
+def _usage(prompt_chars: int, text: str) -> SimpleNamespace:
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(text) // 4
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                           total_tokens=prompt_tokens + completion_tokens)
+
+
+class _Completions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def create(self, messages: list[dict], model: str, stream: bool = False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        user = next((m.get("content") or "" for m in reversed(messages)
+                     if m.get("role") == "user"), "")
+        text = _reply(system, user)
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+        if stream:
+            return self._stream(text, model, prompt_chars)
+        time.sleep(_latency_seconds())
+        message = SimpleNamespace(content=text, tool_calls=None)
+        return SimpleNamespace(model=model, usage=_usage(prompt_chars, text),
+                               choices=[SimpleNamespace(message=message)])
+
+    @staticmethod
+    def _stream(text: str, model: str, prompt_chars: int):
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(_latency_seconds() / len(words))
+            delta = SimpleNamespace(content=word if i == 0 else " " + word, tool_calls=None)
+            yield SimpleNamespace(model=model, usage=None,
+                                  choices=[SimpleNamespace(delta=delta)])
+        yield SimpleNamespace(model=model, usage=_usage(prompt_chars, text), choices=[])
+
+
+class StubOpenAI:
+    """Just enough of ``AzureOpenAI`` for ``openai_client``: ``chat.completions.create``."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=_Completions())
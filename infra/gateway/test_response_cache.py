@@ -0,0 +1,200 @@
+"""
+Unit tests for the gateway response cache: hits, coalescing of identical
+in-flight requests, failure fall-through, the LRU byte bound, and the
+``cached_route`` decorator's bypass and usage handling.
+
+    python -m pytest infra/gateway/test_response_cache.py
+"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify  # noqa: E402
+
+import response_cache  # noqa: E402
+from response_cache import ResponseCache, cached_route  # noqa: E402
+
+
+def _body(i: int = 0, total_tokens: int = 100) -> dict:
+    return {"success": True, "topics": [f"T{i}"],
+            "usage": {"prompt_tokens": total_tokens - 20, "completion_tokens": 20,
+                      "total_tokens": total_tokens}}
+
+
+class TestResponseCache:
+
+    def test_hit_after_miss(self):
+        cache = ResponseCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return _body()
+
+        assert cache.get_or_compute("k", 60, compute) == (_body(), "miss")
+        assert cache.get_or_compute("k", 60, compute) == (_body(), "hit")
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_expired_entry_recomputed(self, monkeypatch):
+        cache = ResponseCache()
+        cache.put("k", _body(), ttl=10)
+        now = response_cache.time.monotonic()
+        monkeypatch.setattr(response_cache.time, "monotonic", lambda: now + 11)
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_concurrent_identical_requests_share_one_call(self):
+        cache = ResponseCache()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return _body()
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", 60, compute)))
+        leader.start()
+        while not cache.stats()["inflight"]:
+            pass
+        followers = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", 60, compute)))
+            for _ in range(4)
+        ]
+        for t in followers:
+            t.start()
+        release.set()
+        for t in [leader, *followers]:
+            t.join(5)
+
+        assert len(calls) == 1
+        sources = sorted(source for _, source in results)
+        assert sources.count("miss") == 1
+        # Followers either waited on the leader or arrived after it stored
+        assert set(sources) - {"miss"} <= {"shared", "hit"} and len(sources) == 5
+        assert all(body == _body() for body, _ in results)
+
+    def test_failed_leader_lets_followers_compute(self):
+        cache = ResponseCache()
+        release = threading.Event()
+        calls = []
+
+        def failing():
+            calls.append("leader")
+            release.wait(5)
+            return None
+
+        def succeeding():
+            calls.append("follower")
+            return _body(1)
+
+        results = {}
+        leader = threading.Thread(target=lambda: results.update(
+            leader=cache.get_or_compute("k", 60, failing)))
+        leader.start()
+        while not cache.stats()["inflight"]:
+            pass
+        follower = threading.Thread(target=lambda: results.update(
+            follower=cache.get_or_compute("k", 60, succeeding)))
+        follower.start()
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        assert results["leader"] == (None, "miss")
+        assert results["follower"] == (_body(1), "miss")
+        assert calls == ["leader", "follower"]
+        # Nothing was cached for the failed call, and no shared answer was given
+        assert cache.stats()["shared"] == 0
+        assert cache.get("k") is None
+
+    def test_refresh_recomputes_and_replaces(self):
+        cache = ResponseCache()
+        cache.get_or_compute("k", 60, lambda: _body(0))
+        assert cache.get_or_compute("k", 60, lambda: _body(1), refresh=True) == (_body(1), "miss")
+        assert cache.get("k") == _body(1)
+
+        # A failed refresh keeps the previous answer
+        assert cache.get_or_compute("k", 60, lambda: None, refresh=True) == (None, "miss")
+        assert cache.get("k") == _body(1)
+
+    def test_evicts_least_recently_used_over_byte_bound(self):
+        size = len(response_cache.json.dumps(_body(0), separators=(",", ":")))
+        cache = ResponseCache(max_bytes=size * 2)
+        cache.put("a", _body(0), 60)
+        cache.put("b", _body(0), 60)
+        assert cache.get("a") is not None  # a is now the most recently used
+        cache.put("c", _body(0), 60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["size_bytes"] == size * 2
+
+    def test_body_larger_than_bound_not_stored(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.put("k", _body(), 60)
+        assert cache.stats()["entries"] == 0
+
+
+class TestCachedRoute:
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(response_cache, "responses", ResponseCache())
+        monkeypatch.delenv("GATEWAY_CACHE", raising=False)
+        app = Flask(__name__)
+        calls = []
+
+        @app.route("/v1/topics", methods=["POST"])
+        @cached_route(60, "prompt")
+        def topics():
+            calls.append(1)
+            return jsonify(_body(len(calls)))
+
+        @app.route("/v1/fails", methods=["POST"])
+        @cached_route(60, "prompt")
+        def fails():
+            calls.append(1)
+            return jsonify({"success": False, "error": "boom"}), 500
+
+        client = app.test_client()
+        client.calls = calls
+        return client
+
+    def test_hit_is_flagged_with_zeroed_usage(self, client):
+        first = client.post("/v1/topics", json={"call_notes": "AKS"})
+        second = client.post("/v1/topics", json={"call_notes": "AKS \r\n"})
+        assert first.headers["X-Gateway-Cache"] == "miss"
+        assert "cached" not in first.get_json()
+        assert second.headers["X-Gateway-Cache"] == "hit"
+
+        data = second.get_json()
+        assert data["cached"] is True
+        assert data["tokens_saved"] == 100
+        assert data["usage"]["total_tokens"] == data["usage"]["prompt_tokens"] == 0
+        assert data["topics"] == ["T1"]
+        assert len(client.calls) == 1
+
+    def test_no_cache_header_recomputes_and_replaces(self, client):
+        client.post("/v1/topics", json={"call_notes": "AKS"})
+        fresh = client.post("/v1/topics", json={"call_notes": "AKS"},
+                            headers={"Cache-Control": "no-cache"})
+        assert fresh.headers["X-Gateway-Cache"] == "miss"
+        assert fresh.get_json()["topics"] == ["T2"]
+
+        again = client.post("/v1/topics", json={"call_notes": "AKS"})
+        assert again.get_json()["topics"] == ["T2"]
+        assert len(client.calls) == 2
+
+    def test_errors_and_streams_not_cached(self, client):
+        for _ in range(2):
+            assert client.post("/v1/fails", json={"call_notes": "AKS"}).status_code == 500
+        for _ in range(2):
+            client.post("/v1/topics", json={"call_notes": "AKS", "stream": True})
+        assert len(client.calls) == 4
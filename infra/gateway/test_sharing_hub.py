@@ -0,0 +1,360 @@
+"""
+Unit tests for the sharing hub: presence (the email index, join/leave
+deltas, sequence numbers and legacy full-list clients) and the relay of
+chunked share transfers.
+
+Runs ``ShareNamespace`` in-process with Socket.IO's ``emit``/``join_room``
+replaced by the benchmark's fan-out stand-in, recording each emit:
+
+    python -m pytest infra/gateway/test_sharing_hub.py
+"""
+import hashlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask_socketio")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, request  # noqa: E402
+
+import bench_presence  # noqa: E402
+import sharing_hub  # noqa: E402
+
+
+class RecordingFanOut(bench_presence.FanOut):
+    """Fan-out stand-in that also keeps every emit as (event, data, to)."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent: list[tuple[str, dict, str | None]] = []
+
+    def emit(self, event, data, to=None, **kwargs):
+        super().emit(event, data, to=to, **kwargs)
+        self.sent.append((event, data, to if to is not None else request.sid))
+
+    def events(self, name: str) -> list[tuple[dict, str]]:
+        return [(data, to) for event, data, to in self.sent if event == name]
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    """A fresh hub with fake auth; yields a small driver for its handlers."""
+    for name, value in (("_online_users", {}), ("_sids_by_email", {}),
+                        ("_users_by_email", {}), ("_legacy_sids", set()),
+                        ("_pending_shares", {}), ("_transfers", {}), ("_presence_seq", 0),
+                        ("_ALLOW_SELF_SHARE", False)):
+        monkeypatch.setattr(sharing_hub, name, value)
+    monkeypatch.setattr(sharing_hub, "_last_snapshot_at", sharing_hub.time.time())
+    fanout = RecordingFanOut()
+    monkeypatch.setattr(sharing_hub, "emit", fanout.emit)
+    monkeypatch.setattr(sharing_hub, "join_room", fanout.join_room)
+    monkeypatch.setattr(sharing_hub, "_decode_jwt_claims",
+                        lambda token: {"name": token.title(), "preferred_username": f"{token}@example.com"})
+
+    app = Flask(__name__)
+    ns = sharing_hub.ShareNamespace("/share")
+
+    class Driver:
+        def __init__(self):
+            self.fanout = fanout
+            self.ns = ns
+
+        def call(self, sid, handler, *args):
+            with app.test_request_context("/"):
+                request.sid = sid
+                request.namespace = "/share"
+                return handler(*args)
+
+        def connect(self, sid, user, presence="delta"):
+            return self.call(sid, ns.on_connect, {"token": user, "presence": presence})
+
+        def disconnect(self, sid):
+            self.call(sid, ns.on_disconnect)
+            fanout.leave_all(sid)
+
+        def share_request(self, sid, recipient_email):
+            self.call(sid, ns.on_share_request, {"recipient_email": recipient_email})
+
+        def accept(self, sid, sender_email, chunked=True):
+            self.call(sid, ns.on_share_accept, {"sender_email": sender_email, "chunked": chunked})
+
+        def share_data(self, sid, data):
+            self.call(sid, ns.on_share_data, data)
+
+    return Driver()
+
+
+class TestEmailIndex:
+
+    def test_tabs_share_one_user_entry(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "ann")
+        assert sharing_hub._sids_by_email == {"ann@example.com": {"s1", "s2"}}
+        assert list(sharing_hub._users_by_email) == ["ann@example.com"]
+
+        hub.disconnect("s1")
+        assert sharing_hub._sids_by_email == {"ann@example.com": {"s2"}}
+        hub.disconnect("s2")
+        assert sharing_hub._sids_by_email == {}
+        assert sharing_hub._users_by_email == {}
+
+    def test_lookup_is_case_insensitive(self, hub):
+        hub.connect("s1", "ann")
+        assert hub.call("s1", sharing_hub.ShareNamespace._sids_for_email,
+                        "ANN@Example.com") == ["s1"]
+
+    def test_share_request_reaches_every_tab_of_the_recipient(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "ann")
+        hub.connect("s3", "bob")
+        hub.share_request("s3", "ann@example.com")
+        [(offer, to)] = hub.fanout.events("share_offer")
+        assert to == "user:ann@example.com"
+        assert offer["sender_email"] == "bob@example.com"
+        assert hub.fanout.rooms[to] == {"s1", "s2"}
+
+    def test_share_request_to_offline_user_errors(self, hub):
+        hub.connect("s1", "ann")
+        hub.share_request("s1", "nobody@example.com")
+        [(error, to)] = hub.fanout.events("share_error")
+        assert to == "s1"
+        assert "no longer online" in error["error"]
+
+
+class TestDeltas:
+
+    def test_join_and_leave_are_single_delta_emits(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "bob")
+        hub.disconnect("s2")
+
+        joined = hub.fanout.events("user_joined")
+        left = hub.fanout.events("user_left")
+        assert [(d["email"], to) for d, to in joined] == [
+            ("ann@example.com", sharing_hub._DELTA_ROOM),
+            ("bob@example.com", sharing_hub._DELTA_ROOM),
+        ]
+        assert [(d["email"], to) for d, to in left] == [("bob@example.com", sharing_hub._DELTA_ROOM)]
+        assert hub.fanout.events("online_users") == []
+
+    def test_second_tab_and_other_tab_close_send_nothing(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "ann")
+        hub.disconnect("s1")
+        assert len(hub.fanout.events("user_joined")) == 1
+        assert hub.fanout.events("user_left") == []
+
+    def test_snapshot_only_after_interval(self, hub, monkeypatch):
+        hub.connect("s1", "ann")
+        assert hub.fanout.events("online_snapshot") == []
+
+        monkeypatch.setattr(sharing_hub, "_last_snapshot_at", 0)
+        hub.connect("s2", "bob")
+        [(snapshot, to)] = hub.fanout.events("online_snapshot")
+        assert to == sharing_hub._DELTA_ROOM
+        assert {u["email"] for u in snapshot["users"]} == {"ann@example.com", "bob@example.com"}
+        assert snapshot["seq"] == 2
+
+        hub.connect("s3", "cid")
+        assert len(hub.fanout.events("online_snapshot")) == 1
+
+
+class TestSequenceNumbers:
+
+    def test_seq_counts_user_changes_only(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "ann")
+        hub.connect("s3", "bob")
+        hub.disconnect("s2")
+        hub.disconnect("s1")
+
+        seqs = [d["seq"] for event, d, _ in hub.fanout.sent if event in ("user_joined", "user_left")]
+        assert seqs == [1, 2, 3]
+        assert sharing_hub._presence_seq == 3
+
+    def test_get_online_users_reports_current_seq(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "bob")
+        hub.call("s1", sharing_hub.ShareNamespace("/share").on_get_online_users)
+        [(listing, to)] = hub.fanout.events("online_users")
+        assert to == "s1"
+        assert listing["seq"] == 2
+        assert listing["self_email"] == "ann@example.com"
+        assert [u["email"] for u in listing["users"]] == ["bob@example.com"]
+
+    def test_unknown_sid_disconnect_keeps_seq(self, hub):
+        hub.connect("s1", "ann")
+        hub.disconnect("ghost")
+        assert sharing_hub._presence_seq == 1
+        assert hub.fanout.events("user_left") == []
+
+
+class TestLegacyClients:
+
+    def test_only_legacy_sids_are_tracked(self, hub):
+        hub.connect("s1", "ann", presence=None)
+        hub.connect("s2", "bob")
+        assert sharing_hub._legacy_sids == {"s1"}
+        hub.disconnect("s1")
+        assert sharing_hub._legacy_sids == set()
+
+    def test_legacy_clients_get_their_own_full_list(self, hub):
+        hub.connect("s1", "ann", presence=None)
+        hub.connect("s2", "bob", presence=None)
+        hub.connect("s3", "cid")
+
+        # The last change (cid joining) sent each legacy tab a list without itself
+        last_lists = {to: [u["email"] for u in d["users"]]
+                      for d, to in hub.fanout.events("online_users")[-2:]}
+        assert last_lists == {
+            "s1": ["bob@example.com", "cid@example.com"],
+            "s2": ["ann@example.com", "cid@example.com"],
+        }
+
+    def test_delta_only_hub_sends_no_full_lists(self, hub):
+        for i in range(20):
+            hub.connect(f"s{i}", f"user{i}")
+        for i in range(20):
+            hub.disconnect(f"s{i}")
+        assert hub.fanout.events("online_users") == []
+        assert len(hub.fanout.events("user_joined")) == len(hub.fanout.events("user_left")) == 20
+
+
+class TestChunkedTransfers:
+    """share_chunk / share_chunk_ack / share_resume through the real handlers.
+
+    ann (s1) sends a four-chunk transfer to bob (s2). The hub only routes:
+    ordering and checksums are checked by the recipient, which answers
+    with the next index it needs.
+    """
+
+    TOTAL = 4
+
+    @staticmethod
+    def _chunk(index, data="abc"):
+        return {"transfer_id": "t1", "index": index, "data": data,
+                "sha256": hashlib.sha256(data.encode()).hexdigest()}
+
+    @pytest.fixture
+    def transfer(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "bob")
+        hub.share_request("s1", "bob@example.com")
+        hub.accept("s2", "ann@example.com")
+        hub.share_data("s1", {"recipient_email": "bob@example.com", "share_type": "partner",
+                              "transfer": {"id": "t1", "total": self.TOTAL}})
+        return hub
+
+    def send(self, hub, sid, index, data="abc"):
+        hub.call(sid, hub.ns.on_share_chunk, self._chunk(index, data))
+
+    def ack(self, hub, sid, next_index, resend=False):
+        hub.call(sid, hub.ns.on_share_chunk_ack,
+                 {"transfer_id": "t1", "next_index": next_index, "resend": resend})
+
+    def test_start_routes_header_to_accepting_tab(self, transfer):
+        [(payload, to)] = transfer.fanout.events("share_payload")
+        assert to == "s2"
+        assert payload["transfer"] == {"id": "t1", "total": self.TOTAL}
+        assert payload["sender_email"] == "ann@example.com"
+        assert sharing_hub._transfers["t1"]["next_index"] == 0
+
+    def test_non_chunked_recipient_refuses_transfer(self, hub):
+        hub.connect("s1", "ann")
+        hub.connect("s2", "bob")
+        hub.share_request("s1", "bob@example.com")
+        hub.accept("s2", "ann@example.com", chunked=False)
+        hub.share_data("s1", {"recipient_email": "bob@example.com",
+                              "transfer": {"id": "t1", "total": 2}})
+        [(error, to)] = hub.fanout.events("share_error")
+        assert to == "s1" and "chunked" in error["error"]
+        assert sharing_hub._transfers == {}
+
+    def test_out_of_order_chunks_relayed_as_sent_and_gap_resent(self, transfer):
+        for index in (0, 2, 1):
+            self.send(transfer, "s1", index)
+        relayed = transfer.fanout.events("share_chunk")
+        assert [(c["index"], to) for c, to in relayed] == [(0, "s2"), (2, "s2"), (1, "s2")]
+        assert relayed[1][0] == self._chunk(2)
+
+        # Chunk 2 arrived before 1: the recipient asks for 1 again
+        self.ack(transfer, "s2", 1, resend=True)
+        [(ack, to)] = transfer.fanout.events("share_chunk_ack")
+        assert to == "s1"
+        assert ack == {"transfer_id": "t1", "next_index": 1, "resend": True}
+        assert sharing_hub._transfers["t1"]["next_index"] == 1
+
+    def test_bad_checksum_resend_then_completion(self, transfer):
+        bad = dict(self._chunk(0), data="garbled")
+        transfer.call("s1", transfer.ns.on_share_chunk, bad)
+        # The hub relays chunks untouched; the recipient checks the digest
+        [(relayed, _)] = transfer.fanout.events("share_chunk")
+        assert relayed["data"] == "garbled" and relayed["sha256"] == bad["sha256"]
+
+        self.ack(transfer, "s2", 0, resend=True)
+        for index in range(self.TOTAL):
+            self.send(transfer, "s1", index)
+        self.ack(transfer, "s2", self.TOTAL)
+
+        acks = [a for a, _ in transfer.fanout.events("share_chunk_ack")]
+        assert [(a["next_index"], a["resend"]) for a in acks] == [(0, True), (self.TOTAL, False)]
+        assert "t1" not in sharing_hub._transfers
+
+        # A delivered transfer is forgotten
+        self.send(transfer, "s1", 0)
+        [(error, to)] = transfer.fanout.events("share_error")
+        assert to == "s1" and error["transfer_id"] == "t1"
+
+    def test_recipient_reconnect_resumes_on_new_tab(self, transfer):
+        self.send(transfer, "s1", 0)
+        self.ack(transfer, "s2", 1)
+        transfer.disconnect("s2")
+
+        # Sent while bob is offline: dropped, not queued
+        self.send(transfer, "s1", 1)
+        assert len(transfer.fanout.events("share_chunk")) == 1
+
+        transfer.connect("s3", "bob")
+        self.ack(transfer, "s3", 1, resend=True)
+        assert sharing_hub._transfers["t1"]["recipient_sid"] == "s3"
+        assert transfer.fanout.events("share_chunk_ack")[-1] == (
+            {"transfer_id": "t1", "next_index": 1, "resend": True}, "s1")
+
+        self.send(transfer, "s1", 1)
+        assert transfer.fanout.events("share_chunk")[-1][1] == "s3"
+
+    def test_sender_reconnect_resumes_from_last_ack(self, transfer):
+        self.send(transfer, "s1", 0)
+        self.send(transfer, "s1", 1)
+        transfer.disconnect("s1")
+        self.ack(transfer, "s2", 2)
+        assert transfer.fanout.events("share_chunk_ack") == []
+
+        transfer.connect("s4", "ann")
+        transfer.call("s4", transfer.ns.on_share_resume, {"transfer_id": "t1"})
+        assert transfer.fanout.events("share_chunk_ack") == [
+            ({"transfer_id": "t1", "next_index": 2, "resend": True}, "s4")]
+
+        self.ack(transfer, "s2", 3)
+        assert transfer.fanout.events("share_chunk_ack")[-1][1] == "s4"
+
+    def test_other_user_cannot_drive_transfer(self, transfer):
+        transfer.connect("s5", "eve")
+        self.ack(transfer, "s5", self.TOTAL)
+        [(error, to)] = transfer.fanout.events("share_error")
+        assert to == "s5"
+        assert sharing_hub._transfers["t1"]["next_index"] == 0
+
+    def test_stale_transfer_expires(self, transfer, monkeypatch):
+        self.send(transfer, "s1", 0)
+        later = sharing_hub.time.time() + sharing_hub.TRANSFER_IDLE_SECONDS + 1
+        monkeypatch.setattr(sharing_hub.time, "time", lambda: later)
+
+        self.ack(transfer, "s2", 1)
+        [(error, to)] = transfer.fanout.events("share_error")
+        assert to == "s2" and "expired" in error["error"]
+        assert "t1" not in sharing_hub._transfers
+        assert transfer.fanout.events("share_chunk_ack") == []
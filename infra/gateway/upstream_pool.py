@@ -0,0 +1,144 @@
+"""Bounded concurrency for upstream Azure OpenAI calls.
+
+gunicorn runs the gateway as one process with a fixed number of request
+threads. Without a limit, a few long Connect synthesis calls (up to 180s
+each) can hold every thread and starve quick calls like topic suggestions
+and chat turns. Upstream calls therefore run in one of two lanes, each
+with a fixed number of worker slots:
+
+- ``connect``: Connect summaries (``GATEWAY_CONNECT_WORKERS``, default 2)
+- ``interactive``: everything else (``GATEWAY_INTERACTIVE_WORKERS``, default 6)
+
+A request waits for a slot in its lane for up to ``GATEWAY_QUEUE_TIMEOUT``
+seconds, then fails with :class:`UpstreamBusy`. Streaming calls hold their
+slot until the last token has been relayed.
+
+Every ``GATEWAY_METRICS_INTERVAL`` seconds each busy lane logs an
+``upstream_pool`` record whose ``custom_dimensions`` (queue depth, wait
+times, calls, rejections) land in App Insights ``traces``.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("gateway.upstream")
+
+CONNECT_WORKERS = int(os.environ.get("GATEWAY_CONNECT_WORKERS", "2"))
+INTERACTIVE_WORKERS = int(os.environ.get("GATEWAY_INTERACTIVE_WORKERS", "6"))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get("GATEWAY_QUEUE_TIMEOUT", "60"))
+METRICS_INTERVAL_SECONDS = float(os.environ.get("GATEWAY_METRICS_INTERVAL", "60"))
+
+
+class UpstreamBusy(RuntimeError):
+    """No upstream worker slot became free within the queue timeout."""
+
+
+class Lane:
+    """A fixed number of upstream worker slots with queue metrics."""
+
+    def __init__(self, name: str, workers: int, queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.name = name
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.active = 0
+        # Totals since start
+        self.calls = 0
+        self.rejected = 0
+        # Current reporting window
+        self._window_started = time.monotonic()
+        self._window_waits: list[float] = []
+        self._window_max_depth = 0
+        self._window_rejected = 0
+
+    @contextmanager
+    def slot(self):
+        """Hold one worker slot for the duration of an upstream call."""
+        with self._lock:
+            self.waiting += 1
+            self._window_max_depth = max(self._window_max_depth, self.waiting)
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.active += 1
+                self.calls += 1
+                self._window_waits.append(wait_ms)
+            else:
+                self.rejected += 1
+                self._window_rejected += 1
+        if not acquired:
+            self._maybe_report()
+            raise UpstreamBusy(
+                f"All {self.workers} {self.name} workers busy for {self.queue_timeout:.0f}s"
+            )
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._slots.release()
+            self._maybe_report()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "active": self.active,
+                "waiting": self.waiting,
+                "calls": self.calls,
+                "rejected": self.rejected,
+            }
+
+    def _maybe_report(self) -> None:
+        """Log the window's queue metrics once per interval."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_started < METRICS_INTERVAL_SECONDS:
+                return
+            waits = sorted(self._window_waits)
+            metrics = {
+                "lane": self.name,
+                "workers": self.workers,
+                "calls": len(waits),
+                "rejected": self._window_rejected,
+                "queue_depth_max": self._window_max_depth,
+                "queue_depth": self.waiting,
+                "active": self.active,
+                "wait_ms_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+                "wait_ms_p95": round(waits[max(0, math.ceil(len(waits) * 0.95) - 1)], 1)
+                if waits else 0.0,
+                "wait_ms_max": round(waits[-1], 1) if waits else 0.0,
+                "interval_s": round(now - self._window_started, 1),
+            }
+            self._window_started = now
+            self._window_waits = []
+            self._window_max_depth = self.waiting
+            self._window_rejected = 0
+        logger.info(
+            "upstream_pool lane=%s calls=%d wait_p95=%.0fms depth_max=%d rejected=%d",
+            metrics["lane"], metrics["calls"], metrics["wait_ms_p95"],
+            metrics["queue_depth_max"], metrics["rejected"],
+            extra={"custom_dimensions": metrics},
+        )
+
+
+lanes = {
+    "connect": Lane("connect", CONNECT_WORKERS),
+    "interactive": Lane("interactive", INTERACTIVE_WORKERS),
+}
+
+
+def total_workers() -> int:
+    return sum(lane.workers for lane in lanes.values())
+
+
+def stats() -> dict:
+    return {name: lane.snapshot() for name, lane in lanes.items()}
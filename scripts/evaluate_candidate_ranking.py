@@ -0,0 +1,43 @@
+"""
+Evaluate BM25 candidate pre-ranking against recorded match cases.
+
+Reports, per K, how often the full-list match is among the top K (the model
+can only agree with its full-list answer if it still sees it). ``--gateway``
+re-runs each case against the gateway with the top-K list and reports how
+often the returned match is the same.
+
+Record cases first by running the app with ``AI_MATCH_RECORD=1``.
+
+Usage:
+    python scripts/evaluate_candidate_ranking.py logs/match_cases.jsonl --k 5 10 15 25
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.candidate_ranking import RECORD_FILE, evaluate, load_cases  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description='Evaluate BM25 candidate pre-ranking.')
+    parser.add_argument('cases', nargs='?', default=RECORD_FILE,
+                        help='Recorded cases (JSON Lines, see AI_MATCH_RECORD).')
+    parser.add_argument('--k', type=int, nargs='+', default=[5, 10, 15, 25])
+    parser.add_argument('--gateway', action='store_true',
+                        help='Also re-run each case against the gateway with the top-K list.')
+    args = parser.parse_args(argv)
+
+    cases = load_cases(args.cases)
+    print(f'{len(cases)} recorded cases from {args.cases}')
+    for row in evaluate(cases, args.k, gateway=args.gateway):
+        line = (f"K={row['k']:>3}  recall={row['recall']:.3f}  "
+                f"candidates sent {row['avg_sent']:.1f} of {row['avg_full']:.1f}")
+        if 'agreement' in row:
+            line += f"  agreement={row['agreement']:.3f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,10 +14,17 @@ const Share = (function () {
   let connected = false;
   let shareEnabled = false;  // true only after successful connect (passes allowlist)
   let onlineUsers = [];
+  let presenceSeq = null;        // last presence sequence number applied
+  let selfEmail = '';            // our email, to skip our own join events
   let pendingShareType = null;   // "directory", "partner", or "note"
   let pendingItemId = null;      // set when sharing a single partner or note
   let pendingRecipientEmail = null;
   let _pendingImport = null;     // {partners: [...], sender_name: str} awaiting user review
+  let outgoingTransfer = null;   // chunked share we're sending (see app/services/share_transfer.py)
+  const incomingTransfers = {};  // transfer_id → chunked share we're receiving
+
+  // Chunks sent ahead of the recipient's last acknowledgement
+  const CHUNK_WINDOW = 4;
 
   // ── Connection ──────────────────────────────────────────────────────
 
@@ -29,7 +36,7 @@ const Share = (function () {
       if (!info.success) return;
 
       socket = io(info.gateway_url + '/share', {
-        auth: { token: info.token },
+        auth: { token: info.token, presence: 'delta' },
         transports: ['polling', 'websocket'],
         reconnection: true,
         reconnectionDelay: 5000,
@@ -41,11 +48,13 @@ const Share = (function () {
         shareEnabled = true;
         _updateBadges();
         socket.emit('get_online_users');
+        _resumeTransfers();
       });
 
       socket.on('disconnect', () => {
         connected = false;
         onlineUsers = [];
+        presenceSeq = null;
         _updateBadges();
       });
 
@@ -56,7 +65,31 @@ const Share = (function () {
       });
 
       socket.on('online_users', (data) => {
-        onlineUsers = data.users || [];
+        if (data.self_email !== undefined) selfEmail = (data.self_email || '').toLowerCase();
+        _setOnlineUsers(data.users || [], data.seq);
+      });
+
+      // Periodic full list from the gateway (includes us; filter ourselves out)
+      socket.on('online_snapshot', (data) => {
+        if (presenceSeq !== null && data.seq < presenceSeq) return;
+        const users = (data.users || []).filter(u => u.email.toLowerCase() !== selfEmail);
+        _setOnlineUsers(users, data.seq);
+      });
+
+      // Presence deltas; a gap in seq means we missed one, so re-fetch
+      socket.on('user_joined', (data) => {
+        if (!_applyPresenceSeq(data.seq)) return;
+        const email = data.email.toLowerCase();
+        if (email === selfEmail || onlineUsers.some(u => u.email.toLowerCase() === email)) return;
+        onlineUsers.push({ name: data.name, email: data.email });
+        _updateBadges();
+        _renderOnlineList();
+      });
+
+      socket.on('user_left', (data) => {
+        if (!_applyPresenceSeq(data.seq)) return;
+        const email = data.email.toLowerCase();
+        onlineUsers = onlineUsers.filter(u => u.email.toLowerCase() !== email);
         _updateBadges();
         _renderOnlineList();
       });
@@ -68,7 +101,7 @@ const Share = (function () {
 
       // Our share was accepted — send the data
       socket.on('share_accepted', async (data) => {
-        await _sendShareData(data.recipient_email);
+        await _sendShareData(data.recipient_email, data.chunked);
       });
 
       // Our share was declined
@@ -77,11 +110,26 @@ const Share = (function () {
         _resetShareState();
       });
 
-      // Incoming shared data
+      // Incoming shared data (or the header of a chunked transfer)
       socket.on('share_payload', async (data) => {
+        if (data.transfer) {
+          _startIncomingTransfer(data);
+          return;
+        }
         await _receiveShareData(data);
       });
 
+      socket.on('share_chunk', (data) => {
+        const t = incomingTransfers[data.transfer_id];
+        if (!t) return;
+        // Checksums are async; keep chunks in arrival order
+        t.queue = t.queue.then(() => _acceptChunk(t, data));
+      });
+
+      socket.on('share_chunk_ack', (data) => {
+        _onChunkAck(data);
+      });
+
       // Another tab already handled the offer
       socket.on('share_offer_handled', () => {
         const container = document.getElementById('shareOfferContainer');
@@ -91,6 +139,10 @@ const Share = (function () {
       socket.on('share_error', (data) => {
         _showToast(data.error || 'Share error', 'danger');
         _resetShareState();
+        if (data.transfer_id) {
+          if (outgoingTransfer?.id === data.transfer_id) outgoingTransfer = null;
+          delete incomingTransfers[data.transfer_id];
+        }
       });
 
     } catch (e) {
@@ -98,6 +150,27 @@ const Share = (function () {
     }
   }
 
+  // ── Presence ────────────────────────────────────────────────────────
+
+  function _setOnlineUsers(users, seq) {
+    onlineUsers = users;
+    if (seq !== undefined) presenceSeq = seq;
+    _updateBadges();
+    _renderOnlineList();
+  }
+
+  // True if a delta follows the last one we applied; otherwise resync
+  function _applyPresenceSeq(seq) {
+    if (presenceSeq === null) return false;  // list not loaded yet
+    if (seq <= presenceSeq) return false;    // already reflected in a snapshot
+    if (seq !== presenceSeq + 1) {
+      socket.emit('get_online_users');
+      return false;
+    }
+    presenceSeq = seq;
+    return true;
+  }
+
   // ── Share initiation ────────────────────────────────────────────────
 
   function openShareModal(type, itemId) {
@@ -144,7 +217,7 @@ const Share = (function () {
 
   // ── Sending data ────────────────────────────────────────────────────
 
-  async function _sendShareData(recipientEmail) {
+  async function _sendShareData(recipientEmail, chunked) {
     // Capture and clear state atomically to prevent duplicate sends.
     const shareType = pendingShareType;
     const itemId = pendingItemId;
@@ -153,7 +226,9 @@ const Share = (function () {
     if (!shareType) return;
 
     try {
-      if (shareType === 'note' && itemId) {
+      if (chunked) {
+        await _sendChunkedShare(recipientEmail, shareType, itemId);
+      } else if (shareType === 'note' && itemId) {
         const resp = await fetch(`/api/share/note/${itemId}`);
         const data = await resp.json();
         socket.emit('share_data', {
@@ -189,8 +264,169 @@ const Share = (function () {
     bootstrap.Modal.getInstance(document.getElementById('shareModal'))?.hide();
   }
 
+  // Recipient accepted with chunked: true — send a compressed, chunked transfer
+  async function _sendChunkedShare(recipientEmail, shareType, itemId) {
+    let url, doneMsg;
+    if (shareType === 'note' && itemId) {
+      url = `/api/share/note/${itemId}?packed=1`;
+      doneMsg = () => 'Note shared successfully!';
+    } else if (shareType === 'partner' && itemId) {
+      url = `/api/share/partner/${itemId}?packed=1`;
+      doneMsg = () => 'Sent 1 partner successfully!';
+    } else if (shareType === 'directory') {
+      url = '/api/share/directory?packed=1';
+      doneMsg = (pkg) => `Sent ${pkg.count} partner${pkg.count !== 1 ? 's' : ''} successfully!`;
+    } else {
+      return;
+    }
+    const resp = await fetch(url);
+    const pkg = await resp.json();
+    if (!pkg.success) throw new Error(pkg.error || 'could not package share');
+
+    outgoingTransfer = {
+      id: pkg.transfer.id,
+      chunks: pkg.chunks,
+      nextToSend: 0,
+      acked: 0,
+      doneMsg: doneMsg(pkg),
+    };
+    socket.emit('share_data', {
+      recipient_email: recipientEmail,
+      share_type: shareType,
+      transfer: pkg.transfer,
+    });
+    if (pkg.transfer.total > CHUNK_WINDOW) {
+      _showToast(`Sending ${pkg.transfer.total} chunks...`, 'info');
+    }
+    _pumpChunks();
+  }
+
+  // Send chunks up to CHUNK_WINDOW ahead of the last acknowledgement
+  function _pumpChunks() {
+    const t = outgoingTransfer;
+    if (!t || !connected) return;
+    while (t.nextToSend < t.chunks.length && t.nextToSend < t.acked + CHUNK_WINDOW) {
+      const chunk = t.chunks[t.nextToSend];
+      socket.emit('share_chunk', {
+        transfer_id: t.id,
+        index: chunk.index,
+        data: chunk.data,
+        sha256: chunk.sha256,
+      });
+      t.nextToSend += 1;
+    }
+  }
+
+  function _onChunkAck(data) {
+    const t = outgoingTransfer;
+    if (!t || t.id !== data.transfer_id) return;
+    t.acked = Math.max(t.acked, data.next_index);
+    // Resend from the recipient's position (bad chunk, gap, or a reconnect)
+    if (data.resend) {
+      t.acked = data.next_index;
+      t.nextToSend = data.next_index;
+    }
+    if (t.acked >= t.chunks.length) {
+      outgoingTransfer = null;
+      _showToast(t.doneMsg, 'success');
+      return;
+    }
+    _pumpChunks();
+  }
+
+  // After a reconnect, pick up transfers where the other side left off
+  function _resumeTransfers() {
+    if (outgoingTransfer) {
+      socket.emit('share_resume', { transfer_id: outgoingTransfer.id });
+    }
+    Object.values(incomingTransfers).forEach(t => {
+      socket.emit('share_chunk_ack', {
+        transfer_id: t.transfer.id,
+        next_index: t.chunks.length,
+        resend: true,
+      });
+    });
+  }
+
   // ── Receiving data ──────────────────────────────────────────────────
 
+  function _startIncomingTransfer(data) {
+    incomingTransfers[data.transfer.id] = {
+      transfer: data.transfer,
+      share_type: data.share_type,
+      sender_name: data.sender_name,
+      chunks: [],
+      resendFrom: null,   // index we've asked the sender to go back to
+      queue: Promise.resolve(),
+    };
+  }
+
+  async function _acceptChunk(t, chunk) {
+    if (!incomingTransfers[t.transfer.id]) return;
+    if (chunk.index < t.chunks.length) return;  // duplicate after a resend
+    if (chunk.index > t.chunks.length || !(await _chunkChecksumOk(chunk))) {
+      _requestResend(t, t.chunks.length);
+      return;
+    }
+    t.chunks.push(chunk);
+    t.resendFrom = null;
+    if (t.chunks.length < t.transfer.total) {
+      socket.emit('share_chunk_ack', { transfer_id: t.transfer.id, next_index: t.chunks.length });
+      return;
+    }
+    await _finishIncomingTransfer(t);
+  }
+
+  // Ask once per position; later chunks in the window would repeat the request
+  function _requestResend(t, index) {
+    if (t.resendFrom === index) return;
+    t.resendFrom = index;
+    socket.emit('share_chunk_ack', { transfer_id: t.transfer.id, next_index: index, resend: true });
+  }
+
+  async function _chunkChecksumOk(chunk) {
+    if (!window.crypto?.subtle) return true;  // insecure context; /api/share/unpack still verifies
+    try {
+      const bytes = Uint8Array.from(atob(chunk.data), c => c.charCodeAt(0));
+      const digest = await crypto.subtle.digest('SHA-256', bytes);
+      const hex = Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+      return hex === chunk.sha256;
+    } catch (e) {
+      return false;
+    }
+  }
+
+  // All chunks in: reassemble server-side, then acknowledge the last chunk
+  async function _finishIncomingTransfer(t) {
+    try {
+      const resp = await fetch('/api/share/unpack', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ transfer: t.transfer, chunks: t.chunks }),
+      });
+      const result = await resp.json();
+      if (!result.success) {
+        if (result.bad_chunks?.length) {
+          const from = Math.min(...result.bad_chunks);
+          t.chunks = t.chunks.slice(0, from);
+          _requestResend(t, from);
+          return;
+        }
+        throw new Error(result.error || 'unknown error');
+      }
+      delete incomingTransfers[t.transfer.id];
+      socket.emit('share_chunk_ack', { transfer_id: t.transfer.id, next_index: t.transfer.total });
+      await _receiveShareData({
+        ...result.payload,
+        share_type: t.share_type,
+        sender_name: t.sender_name,
+      });
+    } catch (e) {
+      delete incomingTransfers[t.transfer.id];
+      _showToast('Failed to receive share: ' + e.message, 'danger');
+    }
+  }
+
   async function _receiveShareData(data) {
     if (data.share_type === 'note' && data.note) {
       // Note import
@@ -313,7 +549,7 @@ const Share = (function () {
   }
 
   function acceptOffer(senderEmail, offerId) {
-    socket.emit('share_accept', { sender_email: senderEmail });
+    socket.emit('share_accept', { sender_email: senderEmail, chunked: true });
     document.getElementById(offerId)?.remove();
     _showToast('Accepted — waiting for data...', 'info');
   }
@@ -43,6 +43,15 @@ def _clear_vpn_state():
     clear_vpn_block()
 
 
+@pytest.fixture(autouse=True)
+def _isolate_diagnostic_log(tmp_path, monkeypatch):
+    """Send diagnostic log entries to a temp dir instead of the repo's logs/."""
+    log_dir = tmp_path / 'logs'
+    monkeypatch.setattr('app.services.diagnostic_log.LOG_DIR', str(log_dir))
+    monkeypatch.setattr('app.services.diagnostic_log.LOG_FILE',
+                        str(log_dir / 'diagnostic.jsonl'))
+
+
 @pytest.fixture(scope='session')
 def app():
     """Create application for testing with isolated database."""
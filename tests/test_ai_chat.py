@@ -4,6 +4,9 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
+from app.models import db, AIQueryLog, Customer
+from app.services.diagnostic_log import set_suppressed
+
 
 @pytest.fixture(autouse=True)
 def _enable_debug(app):
@@ -13,6 +16,14 @@ def _enable_debug(app):
     app.debug = False
 
 
+@pytest.fixture(autouse=True)
+def _suppress_diagnostic_log():
+    """Keep chat_tool entries out of the real logs/diagnostic.jsonl."""
+    set_suppressed(True)
+    yield
+    set_suppressed(False)
+
+
 class TestChatEndpointDevGate:
     """Test the development-only gate on the chat endpoint."""
 
@@ -335,3 +346,217 @@ class TestChatEndpointFlow:
         assert data['usage']['prompt_tokens'] == 300
         assert data['usage']['completion_tokens'] == 30
         assert data['usage']['total_tokens'] == 330
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    """Split an SSE response body into (event, data) pairs."""
+    import json
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class TestChatEndpointStreaming:
+    """Test the server-sent event variant of the chat endpoint."""
+
+    @patch('app.routes.ai.gateway_stream')
+    def test_streams_deltas_and_tool_events(self, mock_stream, client):
+        mock_stream.side_effect = [
+            iter([{
+                'type': 'done', 'success': True,
+                'message': {
+                    'role': 'assistant', 'content': None,
+                    'tool_calls': [{
+                        'id': 'c1', 'type': 'function',
+                        'function': {'name': 'search_customers', 'arguments': '{}'},
+                    }],
+                },
+                'usage': {'model': 'gpt-4o', 'prompt_tokens': 100,
+                          'completion_tokens': 20, 'total_tokens': 120},
+            }]),
+            iter([
+                {'type': 'delta', 'text': 'Found '},
+                {'type': 'delta', 'text': 'it.'},
+                {'type': 'done', 'success': True,
+                 'message': {'role': 'assistant', 'content': 'Found it.'},
+                 'usage': {'model': 'gpt-4o', 'prompt_tokens': 200,
+                           'completion_tokens': 10, 'total_tokens': 210}},
+            ]),
+        ]
+        with patch('app.routes.ai.execute_tool', return_value=[]):
+            resp = client.post('/api/ai/chat', json={
+                'message': 'find contoso',
+                'context': {'page': 'index'},
+            }, headers={'Accept': 'text/event-stream'})
+
+        assert resp.mimetype == 'text/event-stream'
+        events = _parse_sse(resp.get_data(as_text=True))
+        assert [e for e, _ in events] == ['tool', 'delta', 'delta', 'done']
+        assert events[0][1] == {'name': 'search_customers'}
+        done = events[-1][1]
+        assert done['reply'] == 'Found it.'
+        assert done['tools_used'] == ['search_customers']
+        assert done['usage']['total_tokens'] == 330
+
+    @patch('app.routes.ai.gateway_stream')
+    def test_gateway_error_becomes_error_event(self, mock_stream, client):
+        from app.gateway_client import GatewayError
+        mock_stream.side_effect = GatewayError("Service unavailable", status_code=503)
+
+        resp = client.post('/api/ai/chat', json={
+            'message': 'Hello',
+            'context': {'page': 'index'},
+        }, headers={'Accept': 'text/event-stream'})
+
+        events = _parse_sse(resp.get_data(as_text=True))
+        assert events[-1][0] == 'error'
+        assert events[-1][1]['success'] is False
+
+
+def _tool_round(*calls):
+    """Gateway response asking for the given (id, name, arguments) tool calls."""
+    return {
+        'success': True,
+        'message': {
+            'role': 'assistant', 'content': '',
+            'tool_calls': [{
+                'id': call_id, 'type': 'function',
+                'function': {'name': name, 'arguments': arguments},
+            } for call_id, name, arguments in calls],
+        },
+        'usage': {'model': 'gpt-4o', 'prompt_tokens': 10,
+                  'completion_tokens': 5, 'total_tokens': 15},
+    }
+
+
+_FINAL = {
+    'success': True,
+    'message': {'role': 'assistant', 'content': 'Done.'},
+    'usage': {'model': 'gpt-4o', 'prompt_tokens': 10,
+              'completion_tokens': 5, 'total_tokens': 15},
+}
+
+
+class TestChatToolExecution:
+    """Concurrent tool execution and the per-conversation result memo."""
+
+    @pytest.fixture(autouse=True)
+    def clear_memo(self):
+        from app.services.chat_tool_cache import tool_results
+        tool_results.clear()
+        yield
+        tool_results.clear()
+
+    @patch('app.routes.ai.gateway_call')
+    def test_round_runs_tools_concurrently_in_order(self, mock_gw, client):
+        import threading
+        import time
+        mock_gw.side_effect = [
+            _tool_round(('a', 'search_customers', '{"query": "slow"}'),
+                        ('b', 'search_customers', '{"query": "fast"}')),
+            _FINAL,
+        ]
+        threads = set()
+
+        def fake_exec(name, args):
+            threads.add(threading.get_ident())
+            if args['query'] == 'slow':
+                time.sleep(0.2)
+            return {'query': args['query']}
+
+        with patch('app.routes.ai.execute_tool', side_effect=fake_exec):
+            resp = client.post('/api/ai/chat', json={
+                'message': 'Compare', 'context': {'page': 'index'},
+            })
+        assert resp.get_json()['tools_used'] == ['search_customers', 'search_customers']
+        assert len(threads) == 2
+
+        tool_msgs = [m for m in mock_gw.call_args_list[1][0][1]['messages']
+                     if m.get('role') == 'tool']
+        assert [m['tool_call_id'] for m in tool_msgs] == ['a', 'b']
+        assert 'slow' in tool_msgs[0]['content']
+
+    @patch('app.routes.ai.gateway_call')
+    def test_real_tools_query_database_from_workers(self, mock_gw, app, client):
+        with app.app_context():
+            db.session.add(Customer(name='Threaded Tools Co', tpid=99887766))
+            db.session.commit()
+        mock_gw.side_effect = [
+            _tool_round(('a', 'search_customers', '{"query": "Threaded Tools"}'),
+                        ('b', 'report_workload', '{}')),
+            _FINAL,
+        ]
+        resp = client.post('/api/ai/chat', json={
+            'message': 'Find it', 'context': {'page': 'index'},
+        })
+        assert resp.status_code == 200
+        tool_msgs = [m for m in mock_gw.call_args_list[1][0][1]['messages']
+                     if m.get('role') == 'tool']
+        assert 'Threaded Tools Co' in tool_msgs[0]['content']
+        assert 'Tool failed' not in tool_msgs[1]['content']
+
+    @patch('app.routes.ai.gateway_call')
+    def test_results_memoized_per_conversation(self, mock_gw, client):
+        call = ('c1', 'get_customer_summary', '{"customer_id": 1}')
+        mock_gw.side_effect = [_tool_round(call), _FINAL] * 3
+
+        with patch('app.routes.ai.execute_tool', return_value={'name': 'Contoso'}) as mock_exec, \
+                patch('app.routes.ai.diag_log') as mock_diag:
+            for conversation_id in ('conv-1', 'conv-1', 'conv-2'):
+                client.post('/api/ai/chat', json={
+                    'message': 'Summary please',
+                    'context': {'page': 'index'},
+                    'conversation_id': conversation_id,
+                })
+
+        assert mock_exec.call_count == 2
+        entries = [c.kwargs for c in mock_diag.call_args_list if c.args == ('chat_tool',)]
+        assert [e['cached'] for e in entries] == [False, True, False]
+        assert all(e['tool'] == 'get_customer_summary' for e in entries)
+        assert all(e['duration_ms'] >= 0 for e in entries)
+
+    @patch('app.routes.ai.gateway_call')
+    def test_failed_tool_not_memoized(self, mock_gw, client):
+        call = ('c1', 'get_customer_summary', '{"customer_id": 1}')
+        mock_gw.side_effect = [_tool_round(call), _FINAL] * 2
+
+        with patch('app.routes.ai.execute_tool',
+                   side_effect=[ValueError('locked'), {'name': 'Contoso'}]) as mock_exec:
+            for _ in range(2):
+                client.post('/api/ai/chat', json={
+                    'message': 'Summary please',
+                    'context': {'page': 'index'},
+                    'conversation_id': 'conv-retry',
+                })
+        assert mock_exec.call_count == 2
+
+    @patch('app.routes.ai.gateway_call')
+    def test_large_results_shaped_and_savings_reported(self, mock_gw, client):
+        mock_gw.side_effect = [
+            _tool_round(('a', 'search_notes', '{"query": "aks"}')),
+            _FINAL,
+        ]
+        notes = [{'id': i, 'snippet': '<p>' + 'AKS upgrade planning ' * 10 + '</p>'}
+                 for i in range(100)]
+        with patch('app.routes.ai.execute_tool', return_value=notes):
+            resp = client.post('/api/ai/chat', json={
+                'message': 'AKS notes', 'context': {'page': 'index'},
+            })
+        saved = resp.get_json()['tokens_saved']
+        assert saved > 0
+
+        # Logged apart from response-cache savings, and shown in the admin log
+        log = AIQueryLog.query.order_by(AIQueryLog.id.desc()).first()
+        assert log.tool_tokens_saved == saved
+        assert log.tokens_saved is None and log.cache_hit is False
+        page = client.get('/admin/ai-logs')
+        assert b'Tool result budgets' in page.data
+        assert f'{saved} tool tokens saved'.encode() in page.data
+
+        tool_msg = [m for m in mock_gw.call_args_list[1][0][1]['messages']
+                    if m.get('role') == 'tool'][0]
+        content = json.loads(tool_msg['content'])
+        assert content['_pagination'][0]['next_cursor']
+        assert '<p>' not in tool_msg['content']
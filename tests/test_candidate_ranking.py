@@ -0,0 +1,150 @@
+"""Tests for BM25 candidate pre-ranking before AI milestone/opportunity matching."""
+import importlib.util
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.services import candidate_ranking
+from app.services.candidate_ranking import (
+    MILESTONE_FIELDS, bm25_scores, evaluate, load_cases, top_candidates,
+)
+
+NOTES = (
+    "Reviewed the AKS cluster upgrade plan with the platform team and "
+    "discussed moving container workloads off on-prem Kubernetes."
+)
+
+
+def _milestones(count):
+    filler = ['SQL Migration', 'Power BI Rollout', 'Fabric Pilot', 'Defender Onboarding']
+    milestones = [
+        {'id': f'MS-{i}', 'name': f'{filler[i % len(filler)]} phase {i}',
+         'status': 'On Track', 'opportunity': 'Contoso FY26', 'workload': 'Data & AI'}
+        for i in range(count)
+    ]
+    milestones[count - 2] = {
+        'id': 'MS-AKS', 'name': 'AKS cluster upgrade', 'status': 'On Track',
+        'opportunity': 'Contoso App Modernization', 'workload': 'Containers - Kubernetes',
+    }
+    return milestones
+
+
+@pytest.fixture(autouse=True)
+def no_recording(monkeypatch):
+    monkeypatch.delenv('AI_MATCH_RECORD', raising=False)
+
+
+class TestBM25:
+    """Lexical scoring and top-K selection."""
+
+    def test_relevant_document_scores_highest(self):
+        scores = bm25_scores('kubernetes upgrade', [
+            'SQL Server migration', 'AKS Kubernetes upgrade', 'Kubernetes training',
+        ])
+        assert scores[1] == max(scores)
+        assert scores[0] == 0
+
+    def test_top_candidates_puts_match_first(self):
+        ranked = top_candidates(NOTES, _milestones(40), MILESTONE_FIELDS, k=5)
+        assert len(ranked) == 5
+        assert ranked[0]['id'] == 'MS-AKS'
+
+    def test_short_lists_and_k_zero_unchanged(self):
+        milestones = _milestones(5)
+        assert top_candidates(NOTES, milestones, MILESTONE_FIELDS, k=5) is milestones
+        assert top_candidates(NOTES, _milestones(40), MILESTONE_FIELDS, k=0) == _milestones(40)
+
+    def test_html_and_stopwords_ignored(self):
+        assert candidate_ranking.tokenize('<p>The <b>AKS</b> plan</p>') == ['aks', 'plan']
+
+
+class TestMatchRoutes:
+    """The match endpoints send only the top K candidates."""
+
+    @patch('app.routes.ai.gateway_call')
+    def test_match_milestone_sends_top_k(self, mock_gw, client, monkeypatch):
+        monkeypatch.setattr(candidate_ranking, 'MATCH_TOP_K', 3)
+        mock_gw.return_value = {'success': True, 'milestone_id': 'MS-AKS', 'reason': 'AKS'}
+
+        resp = client.post('/api/ai/match-milestone', json={
+            'call_notes': NOTES, 'milestones': _milestones(50),
+        })
+        assert resp.get_json()['matched_milestone_id'] == 'MS-AKS'
+        sent = mock_gw.call_args[0][1]['milestones']
+        assert len(sent) == 3
+        assert sent[0]['id'] == 'MS-AKS'
+
+    @patch('app.routes.ai.gateway_call')
+    def test_match_opportunity_sends_top_k(self, mock_gw, client, monkeypatch):
+        monkeypatch.setattr(candidate_ranking, 'MATCH_TOP_K', 2)
+        mock_gw.return_value = {'success': True, 'opportunity_id': 'OPP-2', 'reason': ''}
+        opportunities = [{'id': f'OPP-{i}', 'name': f'Deal {i}'} for i in range(10)]
+        opportunities[2]['name'] = 'AKS platform modernization'
+
+        client.post('/api/ai/match-opportunity', json={
+            'call_notes': NOTES, 'opportunities': opportunities,
+        })
+        sent = mock_gw.call_args[0][1]['opportunities']
+        assert [o['id'] for o in sent][0] == 'OPP-2'
+        assert len(sent) == 2
+
+    @patch('app.routes.ai.gateway_call')
+    def test_recording_sends_full_list_and_writes_case(self, mock_gw, client,
+                                                        monkeypatch, tmp_path):
+        monkeypatch.setenv('AI_MATCH_RECORD', '1')
+        monkeypatch.setattr(candidate_ranking, 'MATCH_TOP_K', 3)
+        monkeypatch.setattr(candidate_ranking, 'LOG_DIR', str(tmp_path))
+        monkeypatch.setattr(candidate_ranking, 'RECORD_FILE', str(tmp_path / 'cases.jsonl'))
+        mock_gw.return_value = {'success': True, 'milestone_id': 'MS-AKS', 'reason': ''}
+
+        client.post('/api/ai/match-milestone', json={
+            'call_notes': NOTES, 'milestones': _milestones(20),
+        })
+        assert len(mock_gw.call_args[0][1]['milestones']) == 20
+        cases = load_cases(str(tmp_path / 'cases.jsonl'))
+        assert len(cases) == 1
+        assert cases[0]['matched_id'] == 'MS-AKS'
+        assert len(cases[0]['candidates']) == 20
+
+
+class TestEvaluation:
+    """Offline harness comparing top-K lists with recorded full-list matches."""
+
+    @staticmethod
+    def _cases():
+        milestones = _milestones(30)
+        return [
+            {'endpoint': '/v1/match-milestone', 'call_notes': NOTES,
+             'candidates': milestones, 'matched_id': 'MS-AKS'},
+            # A match with no lexical overlap is lost at small K
+            {'endpoint': '/v1/match-milestone', 'call_notes': NOTES,
+             'candidates': milestones, 'matched_id': 'MS-29'},
+        ]
+
+    def test_recall_by_k(self):
+        rows = evaluate(self._cases(), [1, 30])
+        assert rows[0] == {'k': 1, 'cases': 2, 'recall': 0.5, 'avg_sent': 1.0, 'avg_full': 30.0}
+        assert rows[1]['recall'] == 1.0
+
+    def test_gateway_agreement(self):
+        with patch('app.gateway_client.gateway_call',
+                   return_value={'success': True, 'milestone_id': 'MS-AKS'}) as mock_gw:
+            rows = evaluate(self._cases(), [5], gateway=True)
+        assert mock_gw.call_count == 2
+        assert len(mock_gw.call_args[0][1]['milestones']) == 5
+        assert rows[0]['agreement'] == 0.5
+
+    def test_cli_reports_each_k(self, tmp_path, capsys):
+        path = tmp_path / 'cases.jsonl'
+        path.write_text('\n'.join(json.dumps(c) for c in self._cases()) + '\n')
+        script = Path(__file__).resolve().parent.parent / 'scripts' / 'evaluate_candidate_ranking.py'
+        spec = importlib.util.spec_from_file_location('evaluate_candidate_ranking', script)
+        cli = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cli)
+        cli.main([str(path), '--k', '1', '10'])
+        out = capsys.readouterr().out
+        assert '2 recorded cases' in out
+        assert 'K=  1  recall=0.500' in out
+        assert 'K= 10' in out
@@ -11,10 +11,22 @@ Tests cover:
 """
 import json
 from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
 
 import pytest
 
 
+def _download(client, export_id, fmt):
+    """Body of a streamed export download."""
+    response = client.get(f'/api/connect-export/{export_id}/download/{fmt}')
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def _download_json(client, export_id):
+    return json.loads(_download(client, export_id, 'json'))
+
+
 class TestConnectExportPage:
     """Tests for the Connect Export page route."""
 
@@ -161,29 +173,70 @@ class TestGenerateExport:
         assert data['summary']['unique_customers'] == 2
 
     def test_export_returns_text(self, client, app, sample_data):
-        """Should return a text export string."""
+        """The text export is served by the download endpoint."""
         response = client.post('/api/connect-export/generate',
                                json={'name': 'Text Test',
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        assert 'text_export' in data
-        assert 'Text Test' in data['text_export']
-        assert 'Acme Corp' in data['text_export'] or 'Globex' in data['text_export']
+        text = _download(client, data['export_id'], 'text')
+        assert 'Text Test' in text
+        assert 'Acme Corp' in text or 'Globex' in text
+
+    def test_generate_response_omits_export_bodies(self, client, app, sample_data):
+        """Generate returns the summary only; exports are streamed on demand."""
+        response = client.post('/api/connect-export/generate',
+                               json={'name': 'Small Response',
+                                     'start_date': '2020-01-01',
+                                     'end_date': '2030-12-31'})
+        data = response.get_json()
+        assert data['summary']['total_notes'] == 2
+        for key in ('text_export', 'json_export', 'markdown_export'):
+            assert key not in data
 
     def test_export_returns_json_structure(self, client, app, sample_data):
-        """Should return proper JSON export structure."""
+        """The JSON download has the export structure, with each note's HTML."""
         response = client.post('/api/connect-export/generate',
                                json={'name': 'JSON Test',
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        assert 'json_export' in data
-        json_export = data['json_export']
+        download = client.get(f"/api/connect-export/{data['export_id']}/download/json")
+        assert download.mimetype == 'application/json'
+        json_export = json.loads(download.get_data(as_text=True))
         assert json_export['export_name'] == 'JSON Test'
         assert 'exported_at' in json_export
         assert 'summary' in json_export
         assert 'customers' in json_export
+        for cust in json_export['customers']:
+            for note in cust['notes']:
+                assert note['content']
+                assert note['content_text']
+
+    def test_text_exports_leave_note_html_out(self, app, sample_data):
+        """Only the JSON download loads note HTML; other exports use the stored text."""
+        with app.app_context():
+            from app.routes.connect_export import _build_export_data
+            data = _build_export_data(date(2020, 1, 1), date(2030, 12, 31))
+            notes = [n for cust in data['customers'] for n in cust['notes']]
+            assert notes
+            assert all('content' not in n and n['content_text'] for n in notes)
+
+    def test_note_content_text_follows_edits(self, app, sample_data):
+        """Note.content_text is derived on insert and re-derived when content changes."""
+        with app.app_context():
+            from app.models import Note, db
+            note = Note(customer_id=sample_data['customer1_id'],
+                        call_date=datetime(2025, 3, 1), content='<p>Kickoff <b>call</b></p>')
+            db.session.add(note)
+            db.session.commit()
+            assert note.content_text == 'Kickoff call'
+            note.content = '<p>Edited</p>'
+            db.session.commit()
+            assert note.content_text == 'Edited'
+            note.call_date = datetime(2025, 3, 2)
+            db.session.commit()
+            assert note.content_text == 'Edited'
 
     def test_export_saves_record(self, client, app):
         """Should save a ConnectExport record to the database."""
@@ -225,7 +278,7 @@ class TestGenerateExport:
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        customers = data['json_export']['customers']
+        customers = _download_json(client, data['export_id'])['customers']
         assert len(customers) == 2
         # Each customer should have notes list
         for cust in customers:
@@ -287,7 +340,7 @@ class TestExportWithMilestones:
         assert data['summary']['total_milestone_count'] == 1
 
         # Check per-customer
-        customers = data['json_export']['customers']
+        customers = _download_json(client, data['export_id'])['customers']
         assert len(customers) == 1
         assert customers[0]['milestone_revenue'] == 500000.0
 
@@ -384,6 +437,41 @@ class TestExportWithMilestones:
         data = response.get_json()
         assert data['summary']['total_milestone_revenue'] == 0
 
+    def test_milestone_revenue_grouped_per_customer(self, client, app):
+        """Revenue is summed per customer, excluding milestones updated outside the period."""
+        with app.app_context():
+            from app.models import Note, Customer, Milestone, db
+            for i, values in enumerate([(100.0, 250.0), (75.0,)]):
+                customer = Customer(name=f'Grouped Co {i}', tpid=9100 + i)
+                db.session.add(customer)
+                db.session.flush()
+                for j, value in enumerate(values):
+                    db.session.add(Milestone(
+                        url=f'https://example.com/grouped-{i}-{j}',
+                        msx_status='Completed', dollar_value=value, on_my_team=True,
+                        customer_id=customer.id, updated_at=datetime(2025, 4, 1),
+                    ))
+                # Completed before the period: excluded
+                db.session.add(Milestone(
+                    url=f'https://example.com/grouped-{i}-old',
+                    msx_status='Completed', dollar_value=1000.0, on_my_team=True,
+                    customer_id=customer.id, updated_at=datetime(2024, 4, 1),
+                ))
+                db.session.add(Note(customer_id=customer.id,
+                                    call_date=datetime(2025, 3, 1), content='Sync'))
+            db.session.commit()
+
+        response = client.post('/api/connect-export/generate',
+                               json={'name': 'Grouped', 'start_date': '2025-01-01',
+                                     'end_date': '2025-06-30'})
+        data = response.get_json()
+        by_name = {c['name']: c for c in _download_json(client, data['export_id'])['customers']}
+        assert by_name['Grouped Co 0']['milestone_revenue'] == 350.0
+        assert by_name['Grouped Co 0']['milestone_count'] == 2
+        assert by_name['Grouped Co 1']['milestone_revenue'] == 75.0
+        assert data['summary']['total_milestone_revenue'] == 425.0
+        assert data['summary']['total_milestone_count'] == 3
+
 
 class TestExportTextFormat:
     """Tests for the plain-text export format."""
@@ -395,7 +483,7 @@ class TestExportTextFormat:
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        text = data['text_export']
+        text = _download(client, data['export_id'], 'text')
         assert 'My Connect' in text
         assert '2020-01-01' in text
         assert '2030-12-31' in text
@@ -407,7 +495,7 @@ class TestExportTextFormat:
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        text = data['text_export']
+        text = _download(client, data['export_id'], 'text')
         assert 'CUSTOMER DETAIL' in text
         # Should include one of the customer names
         assert 'Acme Corp' in text or 'Globex Inc' in text
@@ -456,7 +544,7 @@ class TestExportTextFormat:
                                      'start_date': '2025-01-01',
                                      'end_date': '2025-12-31'})
         data = response.get_json()
-        text = data['text_export']
+        text = _download(client, data['export_id'], 'text')
         assert 'committed milestone revenue' in text
         assert '$1.5M' in text
 
@@ -464,18 +552,8 @@ class TestExportTextFormat:
 class TestExportMarkdownFormat:
     """Tests for the Markdown export format."""
 
-    def test_markdown_included_in_generate(self, client, app, sample_data):
-        """Generate response should include markdown_export."""
-        response = client.post('/api/connect-export/generate',
-                               json={'name': 'MD Test',
-                                     'start_date': '2020-01-01',
-                                     'end_date': '2030-12-31'})
-        data = response.get_json()
-        assert 'markdown_export' in data
-        assert data['markdown_export'] is not None
-
-    def test_markdown_included_in_view(self, client, app):
-        """View response should include markdown_export."""
+    def test_markdown_not_in_view(self, client, app):
+        """View response leaves Markdown to the download endpoint."""
         with app.app_context():
             from app.models import ConnectExport, User, db
             user = User.query.first()
@@ -492,7 +570,8 @@ class TestExportMarkdownFormat:
 
         response = client.get(f'/api/connect-export/{export_id}/view')
         data = response.get_json()
-        assert 'markdown_export' in data
+        assert data['success'] is True
+        assert 'markdown_export' not in data
 
     def test_markdown_has_heading(self, client, app, sample_data):
         """Markdown should start with an H1 heading of the export name."""
@@ -501,7 +580,7 @@ class TestExportMarkdownFormat:
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        md = data['markdown_export']
+        md = _download(client, data['export_id'], 'markdown')
         assert md.startswith('# FY25 Connect')
 
     def test_markdown_has_customer_headings(self, client, app, sample_data):
@@ -511,7 +590,7 @@ class TestExportMarkdownFormat:
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        md = data['markdown_export']
+        md = _download(client, data['export_id'], 'markdown')
         assert '### Acme Corp' in md or '### Globex Inc' in md
 
     def test_markdown_has_topic_list(self, client, app, sample_data):
@@ -521,7 +600,7 @@ class TestExportMarkdownFormat:
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        md = data['markdown_export']
+        md = _download(client, data['export_id'], 'markdown')
         assert '## Topics' in md
         assert '- **' in md  # bullet list with bold topic names
 
@@ -532,11 +611,55 @@ class TestExportMarkdownFormat:
                                      'start_date': '2020-01-01',
                                      'end_date': '2030-12-31'})
         data = response.get_json()
-        md = data['markdown_export']
+        md = _download(client, data['export_id'], 'markdown')
         # Should have **YYYY-MM-DD** pattern
         assert '**20' in md
 
 
+class TestExportDownload:
+    """Tests for the streamed text/Markdown/JSON download endpoint."""
+
+    def _generate(self, client, name):
+        response = client.post('/api/connect-export/generate',
+                               json={'name': name,
+                                     'start_date': '2020-01-01',
+                                     'end_date': '2030-12-31'})
+        return response.get_json()
+
+    def test_markdown_download_matches_built_export(self, client, app, sample_data):
+        """The streamed file should match the Markdown built in one piece."""
+        data = self._generate(client, 'Download MD')
+        response = client.get(f"/api/connect-export/{data['export_id']}/download/markdown")
+        assert response.status_code == 200
+        assert response.mimetype == 'text/markdown'
+        assert 'attachment; filename="connect_export_2020-01-01_2030-12-31.md"' == \
+            response.headers['Content-Disposition']
+        with app.app_context():
+            from app.routes.connect_export import _build_export_data, _build_markdown_export
+            expected = _build_markdown_export(
+                _build_export_data(date(2020, 1, 1), date(2030, 12, 31)), 'Download MD')
+        assert response.get_data(as_text=True) == expected + '\n'
+
+    def test_text_download(self, client, app, sample_data):
+        """Text downloads stream the copy-pastable export."""
+        data = self._generate(client, 'Download Text')
+        response = client.get(f"/api/connect-export/{data['export_id']}/download/text")
+        assert response.mimetype == 'text/plain'
+        with app.app_context():
+            from app.routes.connect_export import _build_export_data, _build_text_export
+            expected = _build_text_export(
+                _build_export_data(date(2020, 1, 1), date(2030, 12, 31)), 'Download Text')
+        assert response.get_data(as_text=True) == expected + '\n'
+
+    def test_unknown_format_and_export(self, client, app, sample_data):
+        """Unknown formats are rejected; unknown exports are 404."""
+        data = self._generate(client, 'Download Bad')
+        response = client.get(f"/api/connect-export/{data['export_id']}/download/pdf")
+        assert response.status_code == 400
+        response = client.get('/api/connect-export/99999/download/text')
+        assert response.status_code == 404
+
+
 class TestExportView:
     """Tests for the view export endpoint."""
 
@@ -561,9 +684,9 @@ class TestExportView:
         data = response.get_json()
         assert data['success'] is True
         assert data['name'] == 'View Test'
-        assert 'text_export' in data
-        assert 'json_export' in data
         assert 'summary' in data
+        assert 'text_export' not in data
+        assert 'json_export' not in data
 
     def test_view_nonexistent_export(self, client):
         """Should return 404 for nonexistent export."""
@@ -626,10 +749,10 @@ class TestHelperFunctions:
 
     def test_strip_html(self):
         """Should strip HTML tags from content."""
-        from app.routes.connect_export import _strip_html
-        assert _strip_html('<p>Hello <b>World</b></p>') == 'Hello World'
-        assert _strip_html('') == ''
-        assert _strip_html(None) == ''
+        from app.models import note_plain_text
+        assert note_plain_text('<p>Hello <b>World</b></p>') == 'Hello World'
+        assert note_plain_text('') == ''
+        assert note_plain_text(None) == ''
 
     def test_format_currency(self):
         """Should format currency values correctly."""
@@ -705,76 +828,63 @@ class TestHelperFunctions:
         assert 'Discussed migration.' in block
         assert '$100.0K' in block
 
-    def test_chunk_customers_single_chunk(self):
-        """Small dataset should produce a single chunk."""
-        from app.routes.connect_export import _chunk_customers
+    def test_iter_json_export_streams_records(self):
+        """The JSON stream matches json.dumps and sends one piece per customer."""
+        from app.routes.connect_export import _build_json_export, _iter_json_export
         data = {
-            'summary': {
-                'start_date': '2025-01-01',
-                'end_date': '2025-06-30',
-                'total_notes': 2,
-                'unique_customers': 1,
-                'unique_topics': 1,
-                'total_milestone_revenue': 0,
-                'total_milestone_count': 0,
-                'topics': [],
-            },
+            'summary': {'start_date': '2025-01-01', 'topics': []},
             'customers': [
-                {
-                    'name': 'Small Co',
-                    'seller': None,
-                    'territory': None,
-                    'topics': ['Azure'],
-                    'milestone_revenue': 0,
-                    'milestone_count': 0,
-                    'notes': [
-                        {'date': '2025-03-01', 'topics': [], 'content_text': 'Short call.'},
-                    ],
-                },
+                {'name': f'Co {i}', 'notes': [{'content': '<p>a</p>\n', 'content_text': 'a'}]}
+                for i in range(3)
             ],
+            'general_notes': [{'date': '2025-03-02', 'topics': [], 'content_text': 'Team sync.'}],
         }
-        chunks = _chunk_customers(data)
-        assert len(chunks) == 1
-        assert len(chunks[0]) == 1
-
-    def test_chunk_customers_multiple_chunks(self):
-        """Large dataset should be split into multiple chunks."""
-        from app.routes.connect_export import _chunk_customers
-        # Create customers with enough text to force chunking at a low threshold
-        big_content = 'x' * 50000  # 50K chars ~ 12.5K tokens
-        customers = []
-        for i in range(10):
-            customers.append({
-                'name': f'Customer {i}',
-                'seller': None,
-                'territory': None,
-                'topics': [],
-                'milestone_revenue': 0,
-                'milestone_count': 0,
-                'notes': [
-                    {'date': '2025-03-01', 'topics': [], 'content_text': big_content},
-                ],
-            })
+        with patch('app.routes.connect_export.datetime') as fake_dt:
+            fake_dt.now.return_value.isoformat.return_value = '2025-07-01T00:00:00'
+            pieces = list(_iter_json_export(data, 'Stream'))
+            expected = json.dumps(_build_json_export(data, 'Stream'), indent=2)
+        assert ''.join(pieces) == expected
+        assert sum('"Co ' in piece for piece in pieces) == 3
+
+    def test_iter_text_export_yields_lines(self):
+        """The text builder is the joined output of the line generator."""
+        from app.routes.connect_export import _build_text_export, _iter_text_export
         data = {
             'summary': {
-                'start_date': '2025-01-01',
-                'end_date': '2025-06-30',
-                'total_notes': 10,
-                'unique_customers': 10,
-                'unique_topics': 0,
-                'total_milestone_revenue': 0,
-                'total_milestone_count': 0,
-                'topics': [],
+                'start_date': '2025-01-01', 'end_date': '2025-06-30', 'total_notes': 1,
+                'unique_customers': 1, 'unique_topics': 0, 'total_milestone_revenue': 0,
+                'total_milestone_count': 0, 'topics': [],
             },
-            'customers': customers,
+            'customers': [{
+                'name': 'Gen Co', 'seller': None, 'territory': None, 'topics': [],
+                'milestone_revenue': 0, 'milestone_count': 0,
+                'notes': [{'date': '2025-03-01', 'topics': [], 'content_text': 'Line 1\nLine 2'}],
+            }],
+        }
+        lines = _iter_text_export(data, 'Gen')
+        assert not isinstance(lines, (list, str))
+        lines = list(lines)
+        assert '    Line 2' in lines
+        assert '\n'.join(lines) == _build_text_export(data, 'Gen')
+
+    def test_partial_units_per_customer_and_general_notes(self):
+        """Each customer is one partial unit; general notes are the last one."""
+        from app.routes.connect_export import _partial_key, _partial_units
+        data = {
+            'customers': [
+                {'name': f'Customer {i}', 'topics': [], 'milestone_revenue': 0,
+                 'notes': [{'date': '2025-03-01', 'topics': [], 'content_text': f'Call {i}.'}]}
+                for i in range(3)
+            ],
+            'general_notes': [{'date': '2025-03-02', 'topics': [], 'content_text': 'Team sync.'}],
         }
-        # With 10 customers at ~12.5K tokens each = ~125K total,
-        # should be multiple chunks at 80K target
-        chunks = _chunk_customers(data)
-        assert len(chunks) > 1
-        # All customers should still be present
-        total = sum(len(c) for c in chunks)
-        assert total == 10
+        units = _partial_units(data)
+        assert [label for label, _ in units] == [
+            'Customer 0', 'Customer 1', 'Customer 2', 'General Notes',
+        ]
+        assert 'Call 1.' in units[1][1]
+        keys = {_partial_key(text) for _, text in units}
+        assert len(keys) == 4
 
 
 class TestAiSummaryEndpoint:
@@ -964,6 +1074,275 @@ class TestAiSummaryEndpoint:
             assert log.model == 'gpt-4o-mini'
             assert log.total_tokens == 1300
 
+    def test_ai_summary_streams_events(self, client, app, sample_data, monkeypatch):
+        """With Accept: text/event-stream the summary is streamed, then saved."""
+        streamed = iter([
+            {'type': 'delta', 'text': '## Results\n'},
+            {'type': 'delta', 'text': '- Shipped'},
+            {'type': 'done', 'success': True, 'summary': '## Results\n- Shipped',
+             'usage': {'model': 'gpt-4o-mini', 'prompt_tokens': 90,
+                       'completion_tokens': 10, 'total_tokens': 100}},
+        ])
+        calls = []
+
+        def fake_stream(endpoint, payload, timeout=180):
+            calls.append((endpoint, payload))
+            return streamed
+
+        monkeypatch.setattr('app.routes.connect_export.gateway_stream', fake_stream)
+
+        with app.app_context():
+            from app.models import ConnectExport, db
+            export = ConnectExport(
+                name='AI Stream Test',
+                start_date=date(2020, 1, 1),
+                end_date=date(2030, 12, 31),
+                note_count=2,
+                customer_count=2,
+            )
+            db.session.add(export)
+            db.session.commit()
+            export_id = export.id
+
+        response = client.post(f'/api/connect-export/{export_id}/ai-summary',
+                               content_type='application/json',
+                               headers={'Accept': 'text/event-stream'})
+        assert response.mimetype == 'text/event-stream'
+        blocks = response.get_data(as_text=True).strip().split('\n\n')
+        events = [
+            (b.split('\n')[0][len('event: '):], json.loads(b.split('\n')[1][len('data: '):]))
+            for b in blocks
+        ]
+        assert [e for e, _ in events] == ['delta', 'delta', 'done']
+        assert events[-1][1]['ai_summary'] == '## Results\n- Shipped'
+        assert events[-1][1]['usage']['total_tokens'] == 100
+        assert calls[0][0] == '/v1/connect-summary'
+        assert calls[0][1]['mode'] == 'single'
+
+        with app.app_context():
+            from app.models import ConnectExport
+            assert ConnectExport.query.get(export_id).ai_summary == '## Results\n- Shipped'
+
+    def test_ai_summary_stream_persists_without_outer_context(self, client, app, sample_data,
+                                                              monkeypatch):
+        """The streamed summary is saved even when the generator gets its own session.
+
+        pytest-flask keeps an app context pushed for the whole test, which
+        lets the generator share the view's session. Running the request in
+        an empty contextvars context reproduces a real server, where
+        stream_with_context pushes a fresh app context and session.
+        """
+        import contextvars
+        streamed = [
+            {'type': 'delta', 'text': 'Done'},
+            {'type': 'done', 'success': True, 'summary': 'Done',
+             'usage': {'model': 'gpt-4o-mini', 'total_tokens': 5}},
+        ]
+        monkeypatch.setattr('app.routes.connect_export.gateway_stream',
+                            lambda endpoint, payload, timeout=180: iter(streamed))
+
+        with app.app_context():
+            from app.models import ConnectExport, db
+            export = ConnectExport(
+                name='AI Stream Session Test',
+                start_date=date(2020, 1, 1),
+                end_date=date(2030, 12, 31),
+                note_count=2,
+                customer_count=2,
+            )
+            db.session.add(export)
+            db.session.commit()
+            export_id = export.id
+
+        def _post():
+            response = client.post(f'/api/connect-export/{export_id}/ai-summary',
+                                   content_type='application/json',
+                                   headers={'Accept': 'text/event-stream'})
+            return response.get_data(as_text=True)
+
+        body = contextvars.Context().run(_post)
+        assert 'event: done' in body
+        assert 'event: error' not in body
+
+        with app.app_context():
+            from app.models import ConnectExport, db
+            db.session.expire_all()
+            assert db.session.get(ConnectExport, export_id).ai_summary == 'Done'
+
+
+class TestIncrementalAiSummary:
+    """Chunked summaries reuse cached per-customer partials."""
+
+    @staticmethod
+    def _data(notes_by_customer):
+        return {
+            'summary': {
+                'start_date': '2025-01-01', 'end_date': '2025-06-30',
+                'total_notes': sum(len(n) for n in notes_by_customer.values()),
+                'unique_customers': len(notes_by_customer), 'unique_topics': 0,
+                'total_milestone_revenue': 0, 'total_milestone_count': 0, 'topics': [],
+            },
+            'customers': [
+                {'name': name, 'topics': [], 'milestone_revenue': 0,
+                 'notes': [{'date': '2025-03-01', 'topics': [], 'content_text': text}
+                           for text in notes]}
+                for name, notes in notes_by_customer.items()
+            ],
+            'general_notes': [],
+        }
+
+    def test_regeneration_recomputes_only_changed_customers(self, app, monkeypatch):
+        from app.routes import connect_export
+
+        calls = []
+
+        def fake_gateway(endpoint, payload, timeout=120):
+            calls.append(payload)
+            if payload['mode'] == 'synthesis':
+                return {'summary': 'Final', 'usage': {'total_tokens': 50}}
+            summaries = [f"Evidence for {unit.splitlines()[0]}" for unit in payload['units']]
+            return {'summary': '\n'.join(summaries), 'summaries': summaries,
+                    'usage': {'total_tokens': 10}}
+
+        monkeypatch.setattr(connect_export, 'MAX_INPUT_TOKENS', 0)
+        # No room for a second customer in a chunk: one partial per customer
+        monkeypatch.setattr(connect_export, 'CHUNK_TARGET_TOKENS', 0)
+        monkeypatch.setattr(connect_export, 'gateway_call', fake_gateway)
+
+        notes = {'Partial Co A': ['Kickoff.'], 'Partial Co B': ['Design review.'],
+                 'Partial Co C': ['Pilot.']}
+        with app.app_context():
+            summary, usage = connect_export.generate_ai_summary(self._data(notes), 'x' * 400)
+            assert summary == 'Final'
+            assert usage['partials'] == {'reused': 0, 'total': 3}
+            assert [c['mode'] for c in calls].count('chunk') == 3
+            assert calls[-1]['mode'] == 'synthesis'
+
+            # One customer gets a new note: only that partial is recomputed
+            calls.clear()
+            notes['Partial Co B'].append('Follow-up workshop.')
+            summary, usage = connect_export.generate_ai_summary(self._data(notes), 'x' * 400)
+            assert usage['partials'] == {'reused': 2, 'total': 3}
+            chunk_calls = [c for c in calls if c['mode'] == 'chunk']
+            assert len(chunk_calls) == 1
+            assert 'Follow-up workshop.' in chunk_calls[0]['units'][0]
+            synthesis = calls[-1]
+            assert synthesis['mode'] == 'synthesis'
+            assert len(synthesis['partial_summaries']) == 3
+            assert 'Evidence for --- Partial Co A' in synthesis['partial_summaries'][0]
+
+            # A prompt version bump invalidates everything
+            calls.clear()
+            monkeypatch.setattr(connect_export, 'PARTIAL_PROMPT_VERSION', 2)
+            _, usage = connect_export.generate_ai_summary(self._data(notes), 'x' * 400)
+            assert usage['partials'] == {'reused': 0, 'total': 3}
+
+    def test_many_customers_are_packed_and_synthesis_input_bounded(self, app, monkeypatch):
+        from app.routes import connect_export
+
+        calls = []
+
+        def fake_gateway(endpoint, payload, timeout=120):
+            calls.append(payload)
+            if payload['mode'] == 'synthesis':
+                return {'summary': 'Final', 'usage': {'total_tokens': 50}}
+            if 'units' in payload:
+                return {'summary': 'Evidence', 'summaries': ['Evidence ' * 4] * len(payload['units']),
+                        'usage': {'total_tokens': 10}}
+            return {'summary': 'Evidence ' * 40, 'usage': {'total_tokens': 10}}
+
+        monkeypatch.setattr(connect_export, 'MAX_INPUT_TOKENS', 2000)
+        monkeypatch.setattr(connect_export, 'CHUNK_TARGET_TOKENS', 1500)
+        monkeypatch.setattr(connect_export, 'gateway_call', fake_gateway)
+
+        notes = {f'Many Co {i:03d}': [f'Workshop {i}. ' + 'Details. ' * 25] for i in range(300)}
+        data = self._data(notes)
+        with app.app_context():
+            summary, usage = connect_export.generate_ai_summary(data, 'x' * 40_000)
+            assert summary == 'Final'
+            assert usage['partials'] == {'reused': 0, 'total': 300}
+
+            partial_calls = [c for c in calls if c['header'] == connect_export.PARTIAL_HEADER]
+            assert len(partial_calls) < 40
+            sent = ''.join(''.join(c['units']) for c in partial_calls)
+            assert all(sent.count(f'--- {name} (') == 1 for name in notes)
+            # The partials were condensed before synthesis, which fits the limit
+            assert any(c['header'] == connect_export.REDUCE_HEADER for c in calls)
+            synthesis = calls[-1]
+            assert synthesis['mode'] == 'synthesis'
+            synthesis_tokens = connect_export._estimate_tokens(
+                synthesis['header'] + '\n'.join(synthesis['partial_summaries']))
+            assert synthesis_tokens <= connect_export.MAX_INPUT_TOKENS
+
+            # Unchanged regeneration reuses every cached chunk
+            calls.clear()
+            _, usage = connect_export.generate_ai_summary(data, 'x' * 40_000)
+            assert usage['partials'] == {'reused': 300, 'total': 300}
+            assert not [c for c in calls if c['header'] == connect_export.PARTIAL_HEADER]
+
+    def test_edit_in_packed_chunk_resends_only_that_customer(self, app, monkeypatch):
+        from app.routes import connect_export
+
+        calls = []
+
+        def fake_gateway(endpoint, payload, timeout=120):
+            calls.append(payload)
+            if payload['mode'] == 'synthesis':
+                return {'summary': 'Final', 'usage': {'total_tokens': 50}}
+            summaries = [f"Evidence for {unit.splitlines()[0]}" for unit in payload['units']]
+            return {'summary': '\n'.join(summaries), 'summaries': summaries,
+                    'usage': {'total_tokens': 30}}
+
+        monkeypatch.setattr(connect_export, 'MAX_INPUT_TOKENS', 0)
+        monkeypatch.setattr(connect_export, 'gateway_call', fake_gateway)
+
+        notes = {'Packed Co A': ['Kickoff.'], 'Packed Co B': ['Design review.'],
+                 'Packed Co C': ['Pilot.']}
+        with app.app_context():
+            from app.models import ConnectSummaryPartial
+
+            connect_export.generate_ai_summary(self._data(notes), 'x' * 400)
+            [chunk] = [c for c in calls if c['mode'] == 'chunk']
+            assert len(chunk['units']) == 3
+            assert ConnectSummaryPartial.query.filter(
+                ConnectSummaryPartial.label.like('Packed Co %')).count() == 3
+
+            calls.clear()
+            notes['Packed Co B'].append('Follow-up workshop.')
+            _, usage = connect_export.generate_ai_summary(self._data(notes), 'x' * 400)
+            assert usage['partials'] == {'reused': 2, 'total': 3}
+            [chunk] = [c for c in calls if c['mode'] == 'chunk']
+            assert len(chunk['units']) == 1
+            assert chunk['units'][0].startswith('--- Packed Co B (2 notes)')
+            synthesis = calls[-1]
+            assert [s.split('**')[1] for s in synthesis['partial_summaries']] == [
+                'Packed Co A', 'Packed Co B', 'Packed Co C']
+            assert 'Evidence for --- Packed Co B (2 notes)' in synthesis['partial_summaries'][1]
+
+    def test_chunk_without_per_customer_summaries_is_not_cached(self, app, monkeypatch):
+        from app.routes import connect_export
+
+        def fake_gateway(endpoint, payload, timeout=120):
+            if payload['mode'] == 'synthesis':
+                return {'summary': 'Final', 'usage': {'total_tokens': 50}}
+            # The model ran the sections together: one summary, no split
+            return {'summary': 'Joint evidence', 'summaries': ['Joint evidence', ''],
+                    'usage': {'total_tokens': 30}}
+
+        monkeypatch.setattr(connect_export, 'MAX_INPUT_TOKENS', 0)
+        monkeypatch.setattr(connect_export, 'gateway_call', fake_gateway)
+
+        notes = {'Unsplit Co A': ['Kickoff.'], 'Unsplit Co B': ['Pilot.']}
+        with app.app_context():
+            from app.models import ConnectSummaryPartial
+
+            partials, usage = connect_export._complete_partials(
+                connect_export._plan_partials(self._data(notes)))
+            assert partials == ['**Unsplit Co A, Unsplit Co B**\nJoint evidence']
+            assert usage['total_tokens'] == 30
+            assert ConnectSummaryPartial.query.filter(
+                ConnectSummaryPartial.label.like('Unsplit Co %')).count() == 0
+
 
 class TestAiEnabledInTemplate:
     """Tests for AI button visibility in the template."""
@@ -319,3 +319,73 @@ class TestResolveCustomerId:
                 exact, cleaned, "Facilities Survey Inc", acronyms
             )
             assert result == customer.id
+
+
+class TestNameResolver:
+    """NameResolver must agree with _resolve_customer_id."""
+
+    CUSTOMERS = [
+        ("Azara Healthcare", None),
+        ("LTC Consulting Services", None),
+        ("Streamline Healthcare Solutions", None),
+        ("Facilities Survey Inc", None),
+        ("NOVOPATH", None),
+        ("Long Name Here", "LNH"),
+        ("FSI Holdings", None),
+        ("Streamline Logistics", None),
+        ("Bank of America", None),
+        ("AB", None),
+    ]
+
+    QUERIES = [
+        "Azara Healthcare", "Azara Healthcare, LLC", "LTC CONSULTING",
+        "STREAMLINE HEALTH", "Streamline Logistics Group", "Novopath", "LNH",
+        "lnh", "FSI", "fsi", "Facilities Survey Inc", "Bank of America Corp",
+        "BA", "ab", "Totally Different Company XYZ", "", "   ", "The",
+    ]
+
+    def _seed(self):
+        from app.models import db, Customer
+        for i, (name, nickname) in enumerate(self.CUSTOMERS):
+            db.session.add(Customer(name=name, nickname=nickname, tpid=70000 + i))
+        db.session.commit()
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_matches_linear_resolver(self, app, query):
+        from app.services.name_matching import NameResolver
+        with app.app_context():
+            self._seed()
+            exact, cleaned, acronyms = _build_customer_lookup()
+            resolver = NameResolver.for_customers()
+            assert resolver.resolve(query) == _resolve_customer_id(
+                exact, cleaned, query, acronyms
+            )
+
+    def test_memoizes_results(self, app):
+        from unittest.mock import patch
+        from app.services.name_matching import NameResolver
+        with app.app_context():
+            self._seed()
+            resolver = NameResolver.for_customers()
+            with patch.object(resolver, '_resolve', wraps=resolver._resolve) as spy:
+                first = resolver.resolve("STREAMLINE HEALTH")
+                assert resolver.resolve("STREAMLINE HEALTH") == first
+                assert resolver.resolve("Nobody Inc") is None
+                assert resolver.resolve("Nobody Inc") is None
+                assert spy.call_count == 2
+
+    def test_prefix_candidates_share_first_word(self, app):
+        """Only customers with the same first word are prefix-checked."""
+        from unittest.mock import patch
+        from app.services import name_matching
+        with app.app_context():
+            self._seed()
+            resolver = name_matching.NameResolver.for_customers()
+            with patch.object(
+                name_matching, '_progressive_word_prefix_match',
+                wraps=name_matching._progressive_word_prefix_match,
+            ) as spy:
+                resolver.resolve("Streamline Logistics Group")
+                assert all(
+                    call.args[1].startswith('streamline') for call in spy.call_args_list
+                )
@@ -88,6 +88,7 @@ class TestSuggestTopicsGateway:
             "/v1/suggest-topics",
             {"call_notes": "We discussed Azure OpenAI and RAG patterns.",
              "existing_topics": []},
+            refresh=False,
         )
 
         # Check audit log
@@ -198,3 +199,217 @@ class TestAdminAITestGateway:
         assert resp.status_code == 400
         assert data["success"] is False
         assert "Gateway test failed" in data["error"]
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+class TestGatewayResponseCache:
+    """Tests for the persistent gateway response cache."""
+
+    @pytest.fixture(autouse=True)
+    def cache_file(self, tmp_path, monkeypatch):
+        from app.services import gateway_cache
+        monkeypatch.setattr(gateway_cache, "_cache_path", str(tmp_path / "ai_cache.db"))
+        monkeypatch.setattr("app.gateway_client._get_token", lambda: "token")
+        monkeypatch.delenv("AI_RESPONSE_CACHE", raising=False)
+
+    @staticmethod
+    def _response(status=200, body=None):
+        resp = MagicMock()
+        resp.status_code = status
+        body = body if body is not None else {
+            "success": True, "topics": ["AKS"],
+            "usage": {"model": "gpt-4o-mini", "prompt_tokens": 80,
+                      "completion_tokens": 20, "total_tokens": 100},
+        }
+        resp.headers = {"Content-Type": "application/json"}
+        resp.json.return_value = body
+        resp.text = json.dumps(body)
+        return resp
+
+    def test_repeat_request_served_from_cache(self):
+        from app.gateway_client import gateway_call
+        payload = {"call_notes": "AKS upgrade planning", "existing_topics": ["AKS"]}
+        with patch("app.gateway_client._session.post", return_value=self._response()) as post:
+            first = gateway_call("/v1/suggest-topics", payload)
+            # Whitespace/line-ending differences normalize to the same key
+            second = gateway_call("/v1/suggest-topics", {
+                "existing_topics": ["AKS"], "call_notes": "AKS upgrade planning\r\n",
+            })
+        assert post.call_count == 1
+        assert "cache_hit" not in first
+        assert second["cache_hit"] is True
+        assert second["tokens_saved"] == 100
+        assert second["topics"] == ["AKS"]
+        assert second["usage"]["total_tokens"] == 0
+
+    def test_refresh_bypasses_lookup_and_updates_entry(self):
+        from app.gateway_client import gateway_call
+        payload = {"call_notes": "AKS upgrade planning"}
+        newer = self._response(body={"success": True, "topics": ["Kubernetes"], "usage": {}})
+        with patch("app.gateway_client._session.post",
+                   side_effect=[self._response(), newer]) as post:
+            gateway_call("/v1/analyze-call", payload)
+            fresh = gateway_call("/v1/analyze-call", payload, refresh=True)
+            cached = gateway_call("/v1/analyze-call", payload)
+        assert post.call_count == 2
+        assert "cache_hit" not in fresh
+        assert cached["topics"] == ["Kubernetes"]
+
+    def test_refresh_asks_gateway_to_skip_its_cache(self):
+        from app.gateway_client import gateway_call
+        payload = {"call_notes": "AKS upgrade planning"}
+        with patch("app.gateway_client._session.post", return_value=self._response()) as post:
+            gateway_call("/v1/suggest-topics", payload)
+            gateway_call("/v1/suggest-topics", payload, refresh=True)
+        first, second = (c.kwargs["headers"] for c in post.call_args_list)
+        assert "Cache-Control" not in first
+        assert second["Cache-Control"] == "no-cache"
+
+    def test_gateway_cache_hit_logged_as_saved_tokens(self):
+        from app.gateway_client import gateway_call
+        from app.services.gateway_cache import log_fields
+        gateway_hit = self._response(body={
+            "success": True, "topics": ["AKS"], "cached": True, "tokens_saved": 100,
+            "usage": {"model": "gpt-4o-mini", "prompt_tokens": 0,
+                      "completion_tokens": 0, "total_tokens": 0},
+        })
+        payload = {"call_notes": "Shared meeting summary"}
+        with patch("app.gateway_client._session.post", return_value=gateway_hit):
+            result = gateway_call("/v1/suggest-topics", payload)
+        assert log_fields(result) == {"cache_hit": True, "tokens_saved": 100}
+
+        # A later local hit still credits what the original call cost
+        local = gateway_call("/v1/suggest-topics", payload)
+        assert local["cache_hit"] is True
+        assert local["tokens_saved"] == 100
+
+    def test_chat_and_errors_not_cached(self):
+        from app.gateway_client import gateway_call, GatewayError
+        with patch("app.gateway_client._session.post", return_value=self._response()) as post:
+            gateway_call("/v1/chat", {"messages": []})
+            gateway_call("/v1/chat", {"messages": []})
+        assert post.call_count == 2
+
+        payload = {"call_notes": "Milestone review", "milestones": []}
+        with patch("app.gateway_client._session.post",
+                   side_effect=[self._response(500, {"error": "boom"}), self._response()]) as post:
+            with pytest.raises(GatewayError):
+                gateway_call("/v1/match-milestone", payload)
+            result = gateway_call("/v1/match-milestone", payload)
+        assert post.call_count == 2
+        assert "cache_hit" not in result
+
+    def test_key_includes_gateway_url(self):
+        from app.services.gateway_cache import cache_key
+        payload = {"call_notes": "x"}
+        assert cache_key("/v1/suggest-topics", payload, "https://a/ai") != \
+            cache_key("/v1/suggest-topics", payload, "https://a/ai-staging")
+        assert cache_key("/v1/suggest-topics", payload, "https://a/ai") != \
+            cache_key("/v1/analyze-call", payload, "https://a/ai")
+
+    def test_ttl_and_lru_eviction(self, monkeypatch):
+        from app.services import gateway_cache
+        url = "https://gw/ai"
+        body = {"success": True, "usage": {"total_tokens": 5}}
+        monkeypatch.setattr(gateway_cache, "MAX_ENTRIES", 2)
+        for notes in ("a", "b"):
+            gateway_cache.store("/v1/suggest-topics", {"call_notes": notes}, url, body)
+        assert gateway_cache.lookup("/v1/suggest-topics", {"call_notes": "a"}, url)  # a is now newer
+        gateway_cache.store("/v1/suggest-topics", {"call_notes": "c"}, url, body)
+        assert gateway_cache.lookup("/v1/suggest-topics", {"call_notes": "b"}, url) is None
+        assert gateway_cache.lookup("/v1/suggest-topics", {"call_notes": "a"}, url)
+
+        now = gateway_cache.time.time()
+        monkeypatch.setattr(gateway_cache.time, "time",
+                            lambda: now + gateway_cache.ENDPOINT_TTLS["/v1/suggest-topics"] + 1)
+        assert gateway_cache.lookup("/v1/suggest-topics", {"call_notes": "a"}, url) is None
+
+    def test_route_logs_cache_hit(self, app, client):
+        with patch("app.gateway_client._session.post", return_value=self._response()) as post:
+            for _ in range(2):
+                resp = client.post("/api/ai/suggest-topics",
+                                   json={"call_notes": "Cache route test about AKS"})
+                assert resp.status_code == 200
+            resp = client.post("/api/ai/suggest-topics",
+                               json={"call_notes": "Cache route test about AKS", "regenerate": True})
+        assert post.call_count == 2
+
+        with app.app_context():
+            logs = AIQueryLog.query.order_by(AIQueryLog.id.desc()).limit(3).all()
+            hit = logs[1]
+            assert [log.cache_hit for log in logs] == [False, True, False]
+            assert hit.tokens_saved == 100
+            assert hit.total_tokens == 0
+
+        page = client.get("/admin/ai-logs")
+        assert b"Response cache" in page.data
+        assert b"Cached" in page.data
+
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+class TestGatewayStream:
+    """Tests for gateway_stream's server-sent event parsing."""
+
+    @pytest.fixture(autouse=True)
+    def token(self, monkeypatch):
+        monkeypatch.setattr("app.gateway_client._get_token", lambda: "token")
+
+    @staticmethod
+    def _stream_response(lines):
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.headers = {"Content-Type": "text/event-stream; charset=utf-8"}
+        resp.iter_lines.return_value = iter(lines)
+        return resp
+
+    def test_yields_deltas_then_done(self):
+        from app.gateway_client import gateway_stream
+        resp = self._stream_response([
+            "event: delta", 'data: {"text": "Hel"}', "",
+            "event: delta", 'data: {"text": "lo"}', "",
+            "event: done",
+            'data: {"success": true, "message": {"role": "assistant", "content": "Hello"}}',
+            "",
+        ])
+        with patch("app.gateway_client._session.post", return_value=resp) as post:
+            events = list(gateway_stream("/v1/chat", {"messages": []}))
+
+        assert [e["type"] for e in events] == ["delta", "delta", "done"]
+        assert "".join(e["text"] for e in events[:2]) == "Hello"
+        assert events[-1]["message"]["content"] == "Hello"
+        kwargs = post.call_args.kwargs
+        assert kwargs["json"]["stream"] is True
+        assert kwargs["stream"] is True
+        assert kwargs["headers"]["Accept"] == "text/event-stream"
+        resp.close.assert_called()
+
+    def test_json_response_becomes_single_done_event(self):
+        """A gateway without streaming support answers with plain JSON."""
+        from app.gateway_client import gateway_stream
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.headers = {"Content-Type": "application/json"}
+        resp.json.return_value = {"success": True, "summary": "All done"}
+        resp.text = '{"success": true, "summary": "All done"}'
+        with patch("app.gateway_client._session.post", return_value=resp):
+            events = list(gateway_stream("/v1/connect-summary", {"mode": "single"}))
+        assert events == [{"type": "done", "success": True, "summary": "All done"}]
+
+    def test_error_event_and_truncated_stream_raise(self):
+        from app.gateway_client import gateway_stream, GatewayError
+        resp = self._stream_response([
+            "event: delta", 'data: {"text": "Hi"}', "",
+            "event: error", 'data: {"error": "content filtered"}', "",
+        ])
+        with patch("app.gateway_client._session.post", return_value=resp):
+            with pytest.raises(GatewayError, match="content filtered"):
+                list(gateway_stream("/v1/chat", {"messages": []}))
+
+        resp = self._stream_response(["event: delta", 'data: {"text": "Hi"}', ""])
+        with patch("app.gateway_client._session.post", return_value=resp):
+            with pytest.raises(GatewayError, match="without a final response"):
+                list(gateway_stream("/v1/chat", {"messages": []}))
@@ -329,7 +329,8 @@ class TestGeneralNotesInConnectExport:
         assert data['success'] is True
         # Total should include the general note
         assert data['summary']['total_notes'] == 3  # 2 customer + 1 general
-        assert 'GENERAL NOTES' in data['text_export']
+        text = client.get(f"/api/connect-export/{data['export_id']}/download/text")
+        assert 'GENERAL NOTES' in text.get_data(as_text=True)
 
 
 class TestGeneralNoteModel:
@@ -2184,6 +2184,100 @@ class TestSyncTeamMilestoneComments:
             assert result['comments_synced'] == 1
             assert result['comments_failed'] == 1
 
+    def test_unchanged_comments_skip_write(self, app, sample_data):
+        """Should not rewrite the cache when fetched comments hash the same."""
+        import json
+        with app.app_context():
+            from app.models import db, Milestone, Customer
+            from app.services.milestone_sync import _sync_team_milestone_comments
+
+            comments = [{"userId": "u", "modifiedOn": "d", "comment": "same"}]
+            customer = Customer.query.first()
+            ms = Milestone(
+                url='https://example.com/hash-test',
+                title='Hash Test',
+                msx_milestone_id='hash-guid-1',
+                msx_status='On Track',
+                customer_id=customer.id,
+                on_my_team=True,
+            )
+            ms.set_cached_comments(json.dumps(comments))
+            db.session.add(ms)
+            db.session.commit()
+            original_hash = ms.cached_comments_hash
+            assert original_hash
+
+            with patch(
+                'app.services.milestone_sync.get_milestone_comments',
+                return_value={'success': True, 'comments': comments},
+            ):
+                gen = _sync_team_milestone_comments()
+                try:
+                    while True:
+                        next(gen)
+                except StopIteration as stop:
+                    result = stop.value
+
+            assert result['comments_synced'] == 0
+            assert result['comments_unchanged'] == 1
+            db.session.refresh(ms)
+            assert ms.cached_comments_hash == original_hash
+            assert ms.details_fetched_at is None
+
+    def test_skips_milestones_not_modified_since_cache(self, app, sample_data):
+        """Should only fetch comments when msx_modified_on has advanced."""
+        from datetime import datetime
+        with app.app_context():
+            from app.models import db, Milestone, Customer
+            from app.services.milestone_sync import _sync_team_milestone_comments
+
+            customer = Customer.query.first()
+            cached_at = datetime(2026, 3, 1, 12, 0, 0)
+            unchanged = Milestone(
+                url='https://example.com/modon-1',
+                title='Not Modified',
+                msx_milestone_id='modon-guid-1',
+                msx_status='On Track',
+                customer_id=customer.id,
+                on_my_team=True,
+                msx_modified_on=cached_at,
+            )
+            advanced = Milestone(
+                url='https://example.com/modon-2',
+                title='Modified',
+                msx_milestone_id='modon-guid-2',
+                msx_status='On Track',
+                customer_id=customer.id,
+                on_my_team=True,
+                msx_modified_on=cached_at,
+            )
+            for ms in (unchanged, advanced):
+                ms.set_cached_comments('[]')
+            advanced.msx_modified_on = datetime(2026, 3, 5, 9, 0, 0)
+            db.session.add_all([unchanged, advanced])
+            db.session.commit()
+
+            with patch(
+                'app.services.milestone_sync.get_milestone_comments',
+                return_value={
+                    'success': True,
+                    'comments': [{"userId": "u", "modifiedOn": "d", "comment": "new"}],
+                },
+            ) as mock_get:
+                gen = _sync_team_milestone_comments()
+                try:
+                    while True:
+                        next(gen)
+                except StopIteration as stop:
+                    result = stop.value
+
+            mock_get.assert_called_once_with('modon-guid-2')
+            assert result['comments_synced'] == 1
+            assert result['comments_skipped'] == 1
+            db.session.refresh(advanced)
+            assert advanced.comments_modified_on == datetime(2026, 3, 5, 9, 0, 0)
+            assert not advanced.comments_stale
+
     def test_stream_includes_comment_sync_events(self, app, sample_data):
         """Streaming sync should emit comment_sync_start and comment_sync_end events."""
         import json
@@ -2249,3 +2343,334 @@ class TestSyncTeamMilestoneComments:
             complete_idx = event_types.index('complete')
             complete_data = event_data[complete_idx]
             assert 'comments_synced' in complete_data
+
+
+# ---------------------------------------------------------------------------
+# Tracker snapshot + server-side query API
+# ---------------------------------------------------------------------------
+
+class TestMilestoneTrackerSnapshot:
+    """Test the denormalized tracker snapshot and /api/milestone-tracker."""
+
+    def _create_milestones(self, app, sample_data):
+        with app.app_context():
+            from app.models import db, Milestone
+            now = datetime.now(timezone.utc)
+            rows = [
+                ('snap-1', 'Alpha', 'On Track', 5000.0, now - timedelta(days=2),
+                 'Infra: Windows', sample_data['customer1_id'], True),
+                ('snap-2', 'Bravo', 'At Risk', 1000.0, now + timedelta(days=3),
+                 'Data: SQL', sample_data['customer1_id'], False),
+                ('snap-3', 'Charlie', 'Blocked', 3000.0, now + timedelta(days=60),
+                 'Infra: Linux', sample_data['customer2_id'], True),
+            ]
+            for msx_id, title, status, usage, due, workload, cust_id, team in rows:
+                db.session.add(Milestone(
+                    msx_milestone_id=msx_id, url=f'https://{msx_id}.com',
+                    title=title, msx_status=status, monthly_usage=usage,
+                    due_date=due, workload=workload, customer_id=cust_id,
+                    on_my_team=team,
+                ))
+            db.session.commit()
+
+    def test_commit_refreshes_rows_incrementally(self, app, sample_data):
+        """The commit that writes milestones builds their rows; later ones rebuild changes."""
+        self._create_milestones(app, sample_data)
+        with app.app_context():
+            from app.models import db, Milestone, MilestoneTrackerRow
+            from app.services.milestone_tracker_snapshot import refresh_tracker_snapshot
+
+            assert MilestoneTrackerRow.query.count() == 3
+            assert refresh_tracker_snapshot() == 0
+
+            ms = Milestone.query.filter_by(msx_milestone_id='snap-2').first()
+            ms.title = 'Bravo Renamed'
+            db.session.commit()
+            assert refresh_tracker_snapshot() == 0
+            row = MilestoneTrackerRow.query.filter_by(milestone_id=ms.id).first()
+            assert row.title == 'Bravo Renamed'
+            assert row.workload_area == 'Data'
+            assert row.seller_name == 'Alice Smith'
+            assert refresh_tracker_snapshot([ms.id]) == 1
+
+    def test_rollback_leaves_rows_alone(self, app, sample_data):
+        """A rolled-back write neither changes rows nor refreshes on a later commit."""
+        self._create_milestones(app, sample_data)
+        with app.app_context():
+            from app.models import db, Milestone, MilestoneTrackerRow
+            ms = Milestone.query.filter_by(msx_milestone_id='snap-1').first()
+            ms.title = 'Never Saved'
+            db.session.flush()
+            db.session.rollback()
+            db.session.commit()
+            row = MilestoneTrackerRow.query.filter_by(milestone_id=ms.id).first()
+            assert row.title == 'Alpha'
+
+    def test_customer_change_marks_rows_stale(self, app, sample_data):
+        """Renaming a customer or reassigning its seller refreshes its rows on commit."""
+        self._create_milestones(app, sample_data)
+        with app.app_context():
+            from app.models import db, Customer, MilestoneTrackerRow
+            from app.services.milestone_tracker_snapshot import refresh_tracker_snapshot
+
+            customer = db.session.get(Customer, sample_data['customer1_id'])
+            customer.nickname = 'Acme'
+            customer.seller_id = sample_data['seller2_id']
+            db.session.commit()
+
+            assert refresh_tracker_snapshot() == 0
+            rows = MilestoneTrackerRow.query.filter_by(customer_id=customer.id).all()
+            assert {r.customer_name for r in rows} == {'Acme'}
+            assert {r.seller_name for r in rows} == {'Bob Jones'}
+
+    def test_deleted_milestone_row_removed(self, app, sample_data):
+        """Rows for deleted milestones are dropped by the deleting commit."""
+        self._create_milestones(app, sample_data)
+        with app.app_context():
+            from app.models import db, Milestone, MilestoneTrackerRow
+            from app.services.milestone_tracker_snapshot import refresh_tracker_snapshot
+
+            db.session.delete(Milestone.query.filter_by(msx_milestone_id='snap-3').first())
+            db.session.commit()
+            assert MilestoneTrackerRow.query.count() == 2
+
+    def test_api_filters_sorts_and_paginates(self, client, app, sample_data):
+        """The API should filter, sort and paginate server-side."""
+        self._create_milestones(app, sample_data)
+
+        resp = client.get('/api/milestone-tracker?per_page=2')
+        data = resp.get_json()
+        assert resp.status_code == 200
+        assert data['total'] == 3
+        assert data['pages'] == 2
+        assert [m['title'] for m in data['milestones']] == ['Alpha', 'Charlie']
+        assert data['summary']['past_due_count'] == 1
+        assert data['summary']['this_week_count'] == 1
+
+        data = client.get('/api/milestone-tracker?per_page=2&page=2').get_json()
+        assert [m['title'] for m in data['milestones']] == ['Bravo']
+
+        data = client.get('/api/milestone-tracker?area=Infra&sort=due_date&dir=asc').get_json()
+        assert [m['title'] for m in data['milestones']] == ['Alpha', 'Charlie']
+
+        data = client.get(
+            f"/api/milestone-tracker?seller_id={sample_data['seller2_id']}"
+        ).get_json()
+        assert [m['title'] for m in data['milestones']] == ['Charlie']
+
+        data = client.get('/api/milestone-tracker?status=At Risk,Blocked&team_only=1').get_json()
+        assert [m['title'] for m in data['milestones']] == ['Charlie']
+
+        data = client.get('/api/milestone-tracker?urgency=past_due').get_json()
+        assert [m['urgency'] for m in data['milestones']] == ['past_due']
+        assert 'Infra' in data['filters']['areas']
+
+    def test_api_team_commitment_and_favorite_filters(self, client, app, sample_data):
+        """The tracker's team, commitment and favorites filters run server-side."""
+        self._create_milestones(app, sample_data)
+        with app.app_context():
+            from app.models import db, Favorite, Milestone
+            alpha = Milestone.query.filter_by(msx_milestone_id='snap-1').first()
+            alpha.customer_commitment = 'Committed'
+            db.session.add(Favorite(object_type='milestone', object_id=alpha.id))
+            db.session.commit()
+
+        data = client.get('/api/milestone-tracker?team=off').get_json()
+        assert [m['title'] for m in data['milestones']] == ['Bravo']
+
+        data = client.get('/api/milestone-tracker?team=on&commitment=Committed').get_json()
+        assert [m['title'] for m in data['milestones']] == ['Alpha']
+
+        data = client.get('/api/milestone-tracker?favorites=1').get_json()
+        assert [(m['title'], m['favorited']) for m in data['milestones']] == [('Alpha', True)]
+        assert data['summary']['total_count'] == 1
+
+    def test_api_renders_table_rows(self, client, app, sample_data):
+        """html=1 returns the page's rows rendered by the tracker row partial."""
+        self._create_milestones(app, sample_data)
+
+        data = client.get('/api/milestone-tracker?per_page=2&page=2&html=1').get_json()
+        assert data['rows_html'].count('class="milestone-row"') == 1
+        assert 'Bravo' in data['rows_html']
+        assert 'Alice Smith' in data['rows_html']
+
+        data = client.get('/api/milestone-tracker?html=1&locked=1').get_json()
+        assert 'Alice Smith' not in data['rows_html']
+        assert 'rows_html' not in client.get('/api/milestone-tracker').get_json()
+
+    def test_page_renders_only_first_page(self, client, app, sample_data, monkeypatch):
+        """The tracker page renders one page of rows; the rest come from the API."""
+        from app.services import milestone_tracker_snapshot
+        monkeypatch.setattr(milestone_tracker_snapshot, 'PAGE_SIZE', 2)
+        self._create_milestones(app, sample_data)
+
+        html = client.get('/reports/milestone-tracker').data.decode()
+        assert html.count('class="milestone-row"') == 2
+        assert 'Alpha' in html and 'Charlie' in html
+        assert 'Bravo' not in html
+        assert 'data-total="3"' in html
+        assert 'data-page-size="2"' in html
+        assert 'Page 1 of 2' in html
+        assert '/api/milestone-tracker?' in html
+
+    def test_favicons_referenced_by_url(self, client, app, sample_data):
+        """Tracker rows carry a favicon URL that serves the cached PNG."""
+        import base64
+        png = b'\x89PNG\r\n\x1a\nfake'
+        self._create_milestones(app, sample_data)
+        with app.app_context():
+            from app.models import db, Customer
+            customer = db.session.get(Customer, sample_data['customer1_id'])
+            customer.favicon_b64 = base64.b64encode(png).decode()
+            db.session.commit()
+
+        data = client.get('/api/milestone-tracker').get_json()
+        acme = [m for m in data['milestones']
+                if m['customer']['id'] == sample_data['customer1_id']]
+        url = acme[0]['customer']['favicon_url']
+        assert url.startswith(f"/api/customer/{sample_data['customer1_id']}/favicon")
+        assert 'favicon_b64' not in acme[0]['customer']
+
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.mimetype == 'image/png'
+        assert resp.data == png
+
+        page = client.get('/reports/milestone-tracker')
+        assert b'data:image/png;base64' not in page.data
+        assert url.encode() in page.data
+
+        # A new favicon of the same size gets a new URL
+        with app.app_context():
+            from app.models import db, Customer
+            customer = db.session.get(Customer, sample_data['customer1_id'])
+            customer.favicon_b64 = base64.b64encode(png[:-4] + b'FAKE').decode()
+            db.session.commit()
+        data = client.get('/api/milestone-tracker').get_json()
+        acme = [m for m in data['milestones']
+                if m['customer']['id'] == sample_data['customer1_id']]
+        assert acme[0]['customer']['favicon_url'] != url
+
+    def test_reads_never_write_the_snapshot(self, client, app, sample_data):
+        """Tracker reads are plain SELECTs, even right after a source table changed."""
+        from sqlalchemy import event
+        self._create_milestones(app, sample_data)
+
+        with app.app_context():
+            from app.models import db, Customer
+            customer = db.session.get(Customer, sample_data['customer1_id'])
+            customer.nickname = 'Renamed Co'
+            db.session.commit()
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                response = client.get('/api/milestone-tracker')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            assert response.status_code == 200
+            assert statements
+            # Only the request's usage log writes; the snapshot is left alone
+            writes = [s for s in statements if not s.lstrip().upper().startswith('SELECT')]
+            assert all('usage_events' in s for s in writes)
+            assert not any('favicon_b64' in s for s in statements)
+
+        names = {m['customer']['name'] for m in response.get_json()['milestones']
+                 if m['customer']['id'] == sample_data['customer1_id']}
+        assert names == {'Renamed Co'}
+
+
+# ---------------------------------------------------------------------------
+# Priority-ordered sync queue
+# ---------------------------------------------------------------------------
+
+class TestSyncPriority:
+    """Test that high-value customers are synced first."""
+
+    def _setup_customers(self, app):
+        """Create four linked customers: plain, favorite, my-team, recent note."""
+        with app.app_context():
+            from app.models import db, Customer, Favorite, Milestone, Note
+            Note.query.delete()
+            Customer.query.update({Customer.tpid_url: None})
+            ids = {}
+            for i, name in enumerate(['Aardvark', 'Favco', 'Teamco', 'Noteco']):
+                c = Customer(
+                    name=name, tpid=90000 + i,
+                    tpid_url=(
+                        'https://microsoftsales.crm.dynamics.com/main.aspx'
+                        f'?etn=account&id=aaaabbbb-1111-2222-3333-00000000000{i}'
+                    ),
+                )
+                db.session.add(c)
+                db.session.flush()
+                ids[name] = c.id
+            fav_ms = Milestone(url='https://fav.com', title='Fav', customer_id=ids['Favco'])
+            team_ms = Milestone(url='https://team.com', title='Team',
+                                customer_id=ids['Teamco'], on_my_team=True)
+            db.session.add_all([fav_ms, team_ms])
+            db.session.add(Note(customer_id=ids['Noteco'], call_date=datetime.now(),
+                                content='This week'))
+            db.session.flush()
+            db.session.add(Favorite(object_type='milestone', object_id=fav_ms.id))
+            db.session.commit()
+            return ids
+
+    def test_customers_ordered_by_priority(self, app):
+        """Favorites, then my-team, then recent notes, then everyone else."""
+        self._setup_customers(app)
+        with app.app_context():
+            from app.services.milestone_sync import _prioritized_sync_customers
+            customers, scores = _prioritized_sync_customers()
+            assert [c.name for c in customers] == ['Favco', 'Teamco', 'Noteco', 'Aardvark']
+            assert scores[customers[0].id] == 100
+
+    def test_weight_overrides_change_order(self, client, app):
+        """Saved weight overrides should reorder the queue."""
+        self._setup_customers(app)
+        resp = client.post('/api/preferences/milestone-sync-priority',
+                           json={'recent_notes': 500, 'favorite': 0})
+        assert resp.status_code == 200
+        assert resp.get_json()['weights']['recent_notes'] == 500
+
+        with app.app_context():
+            from app.services.milestone_sync import _prioritized_sync_customers
+            customers, _ = _prioritized_sync_customers()
+            assert [c.name for c in customers] == ['Noteco', 'Teamco', 'Aardvark', 'Favco']
+
+        data = client.get('/api/preferences/milestone-sync-priority').get_json()
+        assert data['weights']['favorite'] == 0
+        assert data['defaults']['favorite'] == 100
+
+    def test_rejects_unknown_weight(self, client, app):
+        """Unknown weight names are rejected."""
+        resp = client.post('/api/preferences/milestone-sync-priority', json={'bogus': 1})
+        assert resp.status_code == 400
+
+    @patch('app.services.milestone_sync._update_team_memberships')
+    @patch('app.services.milestone_sync._MILESTONE_WORKERS', 1)
+    def test_stream_fetches_and_commits_in_priority_order(self, mock_teams, app):
+        """The stream should fetch and write high-priority customers first."""
+        import json
+        self._setup_customers(app)
+        calls = []
+
+        def _fake_fetch(account_id, **kwargs):
+            calls.append(account_id)
+            return {'success': True, 'milestones': [], 'count': 0}
+
+        with app.app_context():
+            from app.services.milestone_sync import sync_all_customer_milestones_stream
+            with patch('app.services.milestone_sync.get_milestones_by_account',
+                       side_effect=_fake_fetch):
+                events = list(sync_all_customer_milestones_stream())
+
+        assert [a[-1] for a in calls] == ['1', '2', '3', '0']
+        start = json.loads(events[0].split('data: ')[1])
+        assert start['prioritized'] == 3
+        written = [
+            json.loads(e.split('data: ')[1])['customer'] for e in events
+            if e.startswith('event: progress') and '"status": "ok"' in e
+        ][:4]
+        assert written == ['Favco', 'Teamco', 'Noteco', 'Aardvark']
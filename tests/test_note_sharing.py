@@ -392,6 +392,43 @@ class TestImportSharedNote:
             customer = Customer.query.filter_by(tpid=222222).first()
             assert customer.seller_id == seller_id
 
+    def test_same_name_different_tpid_creates_customer(self, app):
+        """Customers are matched by TPID only; a same-named one isn't reused."""
+        with app.app_context():
+            existing = Customer(name='Realigned Co', tpid=333333)
+            db.session.add(existing)
+            db.session.commit()
+            existing_id = existing.id
+
+            note_data = {
+                'content': 'Note after realignment',
+                'call_date': '2026-03-14T10:30:00',
+                'customer': {'name': 'realigned co', 'tpid': 444444},
+            }
+
+            result = import_shared_note(note_data, 'Ivy')
+            assert result['success'] is True
+            created = Customer.query.filter_by(tpid=444444).first()
+            assert created is not None and created.id != existing_id
+            note = Note.query.get(result['note_id'])
+            assert note.customer_id == created.id
+
+    def test_links_partners_by_case_insensitive_name(self, app):
+        """Partner names match exactly, ignoring case only."""
+        with app.app_context():
+            partner = Partner(name='Contoso Consulting')
+            db.session.add(partner)
+            db.session.commit()
+
+            note_data = {
+                'content': 'Note with partner',
+                'call_date': '2026-03-14T10:30:00',
+                'partners': ['contoso consulting', 'Contoso Consulting, LLC'],
+            }
+
+            result = import_shared_note(note_data, 'Jack')
+            note = Note.query.get(result['note_id'])
+            assert [p.name for p in note.partners] == ['Contoso Consulting']
 
 # ── API endpoint tests ───────────────────────────────────────────────────────
 
@@ -348,6 +348,64 @@ class TestUpsertPartners:
             assert results['updated'] == 1
             assert len(results['details']) == 2
 
+    def test_bulk_upsert_query_count_independent_of_size(self, app):
+        """The directory is loaded once, not once per incoming partner."""
+        from sqlalchemy import event
+        with app.app_context():
+            kubernetes = Specialty(name='Kubernetes')
+            for i in range(20):
+                partner = Partner(name=f'Partner {i} LLC', website=f'partner{i}.com')
+                partner.contacts.append(PartnerContact(name='Pat', email=f'pat@partner{i}.com'))
+                partner.specialties.append(kubernetes)
+                db.session.add(partner)
+            db.session.commit()
+
+            partners_data = [
+                {'name': f'Partner {i}', 'specialties': ['kubernetes', 'AI'],
+                 'contacts': [{'name': 'Sam', 'email': f'sam@partner{i}.com'}]}
+                for i in range(20)
+            ] + [
+                {'name': f'New {i}', 'website': f'new{i}.com', 'specialties': ['AI'],
+                 'contacts': [{'name': 'Lee', 'email': f'lee@new{i}.com'}]}
+                for i in range(30)
+            ]
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                results = upsert_partners(partners_data, 'Alice')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+
+            assert results['created'] == 30
+            assert results['updated'] == 20
+            reads = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+            # Partners, their contacts and specialties, and all specialties
+            assert len(reads) == 4
+            assert Specialty.query.filter_by(name='AI').count() == 1
+            assert all(len(p.contacts) == 2 for p in Partner.query.filter(
+                Partner.name.like('Partner %')))
+
+    def test_duplicate_in_payload_updates_partner_created_earlier(self, app):
+        """A second entry for the same partner (by name or domain) is an update."""
+        with app.app_context():
+            partners_data = [
+                {'name': 'Fabrikam', 'website': 'https://www.fabrikam.com',
+                 'contacts': [{'name': 'Ann', 'email': 'ann@fabrikam.com'}]},
+                {'name': 'Fabrikam, Inc.',
+                 'contacts': [{'name': 'Bob', 'email': 'bob@fabrikam.com'}]},
+                {'name': 'Fabrikam Consulting', 'website': 'fabrikam.com'},
+            ]
+
+            results = upsert_partners(partners_data, 'Alice')
+
+            assert results['created'] == 1
+            assert results['updated'] == 2
+            partner = Partner.query.one()
+            assert sorted(c.email for c in partner.contacts) == [
+                'ann@fabrikam.com', 'bob@fabrikam.com']
+
 
 # ── API endpoint tests ──────────────────────────────────────────────────────
 
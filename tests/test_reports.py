@@ -667,6 +667,43 @@ class TestWhitespacePenetrationCustomers:
             assert len(data['without_spend']) == 1
 
 
+class TestWhitespaceGrid:
+    """Tests for /api/reports/whitespace served from the bucket rollup."""
+
+    def test_trailing_average_and_rollup_refresh(self, client, app, sample_data):
+        """Grid shows the trailing 3-month average and tracks new revenue rows."""
+        from datetime import date
+        with app.app_context():
+            cid = sample_data['customer1_id']
+            imp = RevenueImport(filename='test.csv', record_count=4)
+            db.session.add(imp)
+            db.session.flush()
+            # Jul falls outside the Aug-Oct trailing window
+            for month, revenue in ((7, 9000.0), (8, 100.0), (9, 200.0), (10, 300.0)):
+                db.session.add(CustomerRevenueData(
+                    customer_name='Customer', tpid='1', bucket='SAP', customer_id=cid,
+                    fiscal_month='FY26', month_date=date(2025, month, 1),
+                    revenue=revenue, last_import_id=imp.id,
+                ))
+            db.session.commit()
+
+            resp = client.get('/api/reports/whitespace?buckets=SAP,Analytics')
+            data = json.loads(resp.data)
+            assert [c['id'] for c in data['customers']] == [cid]
+            assert data['customers'][0]['buckets'] == {'SAP': 200.0}
+
+            db.session.add(CustomerRevenueData(
+                customer_name='Customer', tpid='1', bucket='Analytics', customer_id=cid,
+                fiscal_month='FY26', month_date=date(2025, 10, 1),
+                revenue=50.0, last_import_id=imp.id,
+            ))
+            db.session.commit()
+
+            resp = client.get('/api/reports/whitespace?buckets=SAP,Analytics&show_all=1')
+            data = json.loads(resp.data)
+            assert data['customers'][0]['buckets'] == {'SAP': 200.0, 'Analytics': 50.0}
+
+
 class TestReportRoutes:
     """Tests for report page routes and redirects."""
 
@@ -1,6 +1,8 @@
 """
 Tests for revenue import and analysis functionality.
 """
+import os
+
 import pytest
 from datetime import date, datetime
 from io import BytesIO
@@ -18,6 +20,36 @@ from app.services.revenue_analysis import (
     run_analysis_for_all, get_actionable_analyses, AnalysisConfig
 )
 
+# Large-volume scenarios take several seconds; run them with RUN_BENCHMARKS=1
+benchmark = pytest.mark.skipif(
+    not os.environ.get('RUN_BENCHMARKS'),
+    reason="set RUN_BENCHMARKS=1 to run large-volume tests",
+)
+
+
+def _count_writes(tables):
+    """Context manager collecting INSERT/UPDATE/DELETE statements into *tables*."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counting():
+        writes = []
+
+        def listener(conn, cursor, statement, *args):
+            words = statement.split(None, 3)
+            target = words[2] if words[:2] in (['INSERT', 'INTO'], ['DELETE', 'FROM']) else \
+                words[1] if words[:1] == ['UPDATE'] else None
+            if target in tables:
+                writes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            yield writes
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    return counting()
+
 
 class TestParseCurrency:
     """Test currency string parsing."""
@@ -788,3 +820,1049 @@ class TestCompensatedBucketsAPI:
                            data=json.dumps({'not': 'an array'}),
                            content_type='application/json')
         assert resp.status_code == 400
+
+
+class TestVectorizedImport:
+    """Tests for the column-wise import pipeline."""
+
+    def test_parse_currency_series_matches_scalar(self):
+        """Vectorized parsing should agree with parse_currency cell by cell."""
+        import pandas as pd
+        from app.services.revenue_import import _parse_currency_series
+        cells = ["$1,234.56", "$1234", "1,234", "($1,234)", "", None,
+                 "n/a", " $ 12 ", float('nan'), "(5)"]
+        parsed = _parse_currency_series(pd.Series(cells, dtype=object))
+        assert parsed.tolist() == [parse_currency(c) for c in cells]
+
+        numeric = pd.Series([1.5, None, 3.0])
+        assert _parse_currency_series(numeric).tolist() == [1.5, 0.0, 3.0]
+
+    def test_reimport_fills_customer_and_seller(self, app, test_user):
+        """Unchanged rows pick up a newly matched customer and seller without counting as updates."""
+        from app.models import ProductRevenueData
+        csv_content = b"""FiscalMonth,,,FY26-Jul,FY26-Aug,Total
+TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR,$ ACR
+Fabrikam,Core DBs,Total,"$1,000","$2,000","$3,000"
+Fabrikam,Core DBs,SQL DB,"$500","$600","$1,100"
+Total,Total,Total,"$1,000","$2,000","$3,000"
+"""
+        with app.app_context():
+            first = import_revenue_csv(csv_content, "first.csv")
+            assert first.records_created == 4
+            assert first.new_months_added == 2
+
+            db.session.add(Customer(name='Fabrikam', tpid=424242))
+            db.session.commit()
+            second = import_revenue_csv(
+                csv_content, "second.csv",
+                territory_alignments={('Fabrikam', 'Core DBs'): 'Alice Smith'},
+            )
+            assert second.records_created == 0
+            assert second.records_updated == 0
+            assert second.new_months_added == 0
+
+            customer_id = Customer.query.filter_by(name='Fabrikam').first().id
+            rows = CustomerRevenueData.query.filter_by(customer_name='Fabrikam').all()
+            assert {r.customer_id for r in rows} == {customer_id}
+            assert {r.seller_name for r in rows} == {'Alice Smith'}
+            assert {r.last_import_id for r in rows} == {first.id}
+            products = ProductRevenueData.query.filter_by(customer_name='Fabrikam').all()
+            assert {p.customer_id for p in products} == {customer_id}
+
+    def test_duplicate_rows_last_wins(self, app, test_user):
+        """A key repeated in one file keeps the last row's revenue."""
+        csv_content = b"""FiscalMonth,,,FY26-Jul,Total
+TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR
+Dupe Co,Core DBs,Total,"$100","$100"
+Dupe Co,Core DBs,Total,"$250","$250"
+"""
+        with app.app_context():
+            record = import_revenue_csv(csv_content, "dupes.csv")
+            assert record.records_created == 1
+            row = CustomerRevenueData.query.filter_by(customer_name='Dupe Co').one()
+            assert row.revenue == 250.0
+
+    @benchmark
+    def test_benchmark_200k_cells(self, app, test_user):
+        """A 10,000-row x 20-month export (200k cells) imports; re-importing it writes no rows."""
+        from app.models import ProductRevenueData
+
+        months = [f"FY{fy}-{m}" for fy in (25, 26) for m in
+                  ('Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan', 'Feb', 'Mar', 'Apr')]
+        lines = [
+            "FiscalMonth,,," + ",".join(months) + ",Total",
+            "TPAccountName,ServiceCompGrouping,ServiceLevel4," + ",".join(["$ ACR"] * 21),
+        ]
+        for c in range(2000):
+            for bucket, product in (('Core DBs', 'Total'), ('Core DBs', 'SQL DB'),
+                                    ('Analytics', 'Total'), ('Analytics', 'Fabric'),
+                                    ('Analytics', 'Synapse')):
+                cells = [f'"${(c * 7 + i * 13) % 50000:,}"' for i in range(20)]
+                lines.append(f"Customer {c},{bucket},{product}," + ",".join(cells) + ",$0")
+        csv_content = ("\n".join(lines) + "\n").encode()
+
+        with app.app_context():
+            record = import_revenue_csv(csv_content, "bench.csv")
+            assert record.record_count == 10000
+            assert record.records_created == 200000
+            assert CustomerRevenueData.query.count() == 80000
+            assert ProductRevenueData.query.count() == 120000
+
+            with _count_writes((CustomerRevenueData.__tablename__,
+                                ProductRevenueData.__tablename__)) as writes:
+                again = import_revenue_csv(csv_content, "bench-again.csv")
+            assert again.records_created == 0
+            assert again.records_updated == 0
+            assert writes == []
+
+
+class TestChunkedImport:
+    """Tests for bounded-memory chunked CSV ingestion."""
+
+    CSV = b"""FiscalMonth,,,FY26-Jul,FY26-Aug,Total
+TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR,$ ACR
+Alpha,Core DBs,Total,"$1,000","$2,000","$3,000"
+Alpha,Core DBs,SQL DB,"$500","$600","$1,100"
+Beta,Analytics,Total,"$300","$400","$700"
+Beta,Analytics,Fabric,"$300","$400","$700"
+Gamma,Core DBs,Total,"$50","$60","$110"
+Total,Total,Total,"$1,350","$2,460","$3,810"
+"""
+
+    def _snapshot(self):
+        from app.models import ProductRevenueData
+        buckets = sorted(
+            (r.customer_name, r.bucket, r.month_date, r.revenue)
+            for r in CustomerRevenueData.query.all()
+        )
+        products = sorted(
+            (r.customer_name, r.product, r.month_date, r.revenue)
+            for r in ProductRevenueData.query.all()
+        )
+        return buckets, products
+
+    def test_small_chunks_match_single_chunk(self, app, test_user, monkeypatch):
+        """Splitting the body into 2-row chunks stores the same rows and stats."""
+        import app.services.revenue_import as revenue_import
+
+        with app.app_context():
+            whole = import_revenue_csv(self.CSV, "whole.csv")
+            whole_stats = (whole.record_count, whole.records_created, whole.new_months_added)
+            expected = self._snapshot()
+
+            CustomerRevenueData.query.delete()
+            from app.models import ProductRevenueData
+            ProductRevenueData.query.delete()
+            db.session.commit()
+
+            monkeypatch.setattr(revenue_import, 'IMPORT_CHUNK_ROWS', 2)
+            chunked = import_revenue_csv(self.CSV, "chunked.csv")
+            assert (chunked.record_count, chunked.records_created,
+                    chunked.new_months_added) == whole_stats
+            assert self._snapshot() == expected
+
+    def test_accepts_file_stream_and_leaves_it_open(self, app, test_user):
+        """A binary upload stream is read in place and not closed."""
+        stream = BytesIO(self.CSV)
+        with app.app_context():
+            record = import_revenue_csv(stream, "stream.csv")
+            assert record.records_created == 10
+        assert not stream.closed
+
+    def test_cp1252_bytes_beyond_sample(self, app, test_user, monkeypatch):
+        """Encoding comes from a sample; stray cp1252 bytes later still decode."""
+        import app.services.revenue_import as revenue_import
+        from app.services.revenue_import import _detect_encoding
+
+        assert _detect_encoding('Café Ltd'.encode('cp1252')) == 'cp1252'
+        # A UTF-8 character split by the end of the sample is still UTF-8
+        assert _detect_encoding("Café".encode('utf-8')[:-1]) == 'utf-8'
+
+        content = self.CSV + "Café Ltd,Core DBs,Total,$10,$20,$30\n".encode('cp1252')
+        monkeypatch.setattr(revenue_import, '_ENCODING_SAMPLE_BYTES', 64)
+        with app.app_context():
+            import_revenue_csv(content, "mixed.csv")
+            assert CustomerRevenueData.query.filter_by(
+                customer_name="Café Ltd").count() == 2
+
+    def test_streaming_reports_row_counts(self, app, test_user, monkeypatch):
+        """Progress events carry real row counts as chunks are committed."""
+        import app.services.revenue_import as revenue_import
+        from app.services.revenue_import import import_revenue_csv_streaming
+
+        monkeypatch.setattr(revenue_import, 'IMPORT_CHUNK_ROWS', 2)
+        with app.app_context():
+            events = list(import_revenue_csv_streaming(self.CSV, "progress.csv"))
+        counts = [e['rows_processed'] for e in events if 'rows_processed' in e]
+        assert counts == [2, 4, 6]
+        progress = [e['progress'] for e in events if 'rows_processed' in e]
+        assert progress == sorted(progress) and progress[-1] <= 95
+        assert events[-1]['complete'] is True
+
+    def test_header_only_file_reports_error(self, app, test_user):
+        """A file with headers but no body rows fails without an import record."""
+        from app.models import SyncStatus
+        from app.services.revenue_import import import_revenue_csv_streaming
+
+        header_only = b"FiscalMonth,,,FY26-Jul,Total\nTPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR\n"
+        with app.app_context():
+            with pytest.raises(RevenueImportError, match="No data rows"):
+                import_revenue_csv(header_only, "empty.csv")
+
+            events = list(import_revenue_csv_streaming(header_only, "empty.csv"))
+            assert events[-1] == {"error": "No data rows found in CSV"}
+            assert RevenueImport.query.count() == 0
+            assert SyncStatus.query.filter_by(sync_type='revenue_import').first().success is False
+
+
+class TestVectorizedSignals:
+    """Tests for the NumPy signal engine against the per-row path."""
+
+    def test_averages_match_statistics_mean_where_float_sum_drifts(self):
+        """Averages equal statistics.mean() even where a plain float sum is an ulp off."""
+        import statistics
+        from app.services.revenue_analysis import compute_signals_batch
+        # The float sum of the active months averages to 35644.50000000001;
+        # statistics.mean() gives exactly 35644.5, printed as $35,644
+        revenues = [57963.07, 10857.02, 55322.3, 77045.19, 28232.76, 16589.53, 3501.63, 0.0, 0.0]
+        months = [f"M{i}" for i in range(len(revenues))]
+
+        row = compute_signals('Cents Co', 'Core DBs', revenues, months)
+        [batch] = compute_signals_batch(['Cents Co'], ['Core DBs'], [revenues], months)
+        assert row.category == batch.category == 'CHURNED'
+        assert row.reason == batch.reason == "Revenue dropped to $0. Previous avg: $35,644"
+        assert row.avg_revenue == batch.avg_revenue == statistics.mean(revenues)
+
+    NUMERIC_FIELDS = (
+        'avg_revenue', 'trend_slope', 'trend_r_squared', 'last_month_change',
+        'last_2month_change', 'volatility_cv', 'max_drawdown',
+        'current_vs_max', 'current_vs_avg', 'dollars_at_risk', 'dollars_opportunity',
+    )
+    EXACT_FIELDS = (
+        'customer_name', 'bucket', 'revenues', 'month_names', 'category',
+        'confidence', 'reason', 'recommended_action', 'engagement_rationale',
+        'priority_score',
+    )
+
+    @staticmethod
+    def _random_series(count, months, seed=7):
+        """Series covering growth, decline, dips, gaps, ramps, churn and noise."""
+        import random
+        rng = random.Random(seed)
+        rows = []
+        for _ in range(count):
+            base = rng.choice([200, 2000, 8000, 30000, 90000])
+            drift = rng.uniform(-0.15, 0.15)
+            noise = rng.choice([0.0, 0.05, 0.4])
+            row = []
+            for m in range(months):
+                value = base * (1 + drift) ** m * (1 + rng.uniform(-noise, noise))
+                row.append(round(max(value, 0), 2))
+            shape = rng.random()
+            if shape < 0.1:
+                row[:rng.randint(2, 4)] = [0.0] * 2  # ramp-up
+                row = row[:months]
+            elif shape < 0.2:
+                row[-rng.randint(2, 3):] = [0.0] * 3
+                row = row[:months]
+            elif shape < 0.3:
+                for j in rng.sample(range(months), rng.randint(1, months // 2)):
+                    row[j] = 0.0
+            elif shape < 0.4:
+                for j in rng.sample(range(months), rng.randint(1, months - 2)):
+                    row[j] = None  # months with no data point
+            elif shape < 0.45:
+                row[-1] = -abs(row[-1])  # credits
+            rows.append(row + [None] * (months - len(row)))
+        return rows
+
+    def test_parity_with_per_row_path(self):
+        """compute_signals_batch matches compute_signals + determine_action row for row."""
+        import math
+        from app.services.revenue_analysis import compute_signals_batch
+
+        months = 14
+        month_names = [f"FY26-M{m:02d}" for m in range(months)]
+        rows = self._random_series(3000, months)
+        names = [f"Customer {i}" for i in range(len(rows))]
+        buckets = ['Core DBs'] * len(rows)
+        config = AnalysisConfig()
+
+        batch = compute_signals_batch(
+            names, buckets, [[math.nan if v is None else v for v in row] for row in rows],
+            month_names, customer_ids=list(range(len(rows))),
+        )
+
+        compared = 0
+        for i, row in enumerate(rows):
+            points = [(v, month_names[j]) for j, v in enumerate(row) if v is not None]
+            expected = compute_signals(
+                names[i], buckets[i], [v for v, _ in points], [m for _, m in points],
+                customer_id=i,
+            )
+            actual = batch[i]
+            assert (actual is None) == (expected is None), i
+            if expected is None:
+                continue
+            expected = determine_action(expected, config)
+            actual = determine_action(actual, config)
+            for name in self.EXACT_FIELDS:
+                assert getattr(actual, name) == getattr(expected, name), (i, name)
+            for name in self.NUMERIC_FIELDS:
+                assert getattr(actual, name) == pytest.approx(
+                    getattr(expected, name), rel=1e-9, abs=1e-9), (i, name)
+            assert actual.mom_changes == pytest.approx(expected.mom_changes, rel=1e-9, abs=1e-12)
+            compared += 1
+
+        # Every category the rules can produce shows up in the sample
+        assert compared > 1500
+        assert {s.category for s in batch if s} >= {
+            'NEW_CUSTOMER', 'CHURNED', 'CHURN_RISK', 'RECENT_DIP',
+            'EXPANSION_OPPORTUNITY', 'VOLATILE', 'HEALTHY',
+        }
+
+    @benchmark
+    def test_benchmark_20k_series(self, app, test_user):
+        """A full analysis run covers 20,000 series; an incremental re-run writes nothing."""
+        from sqlalchemy import insert
+        from app.services.revenue_import import date_to_fiscal_month
+
+        months = [date(2024 + (7 + m - 1) // 12, (7 + m - 1) % 12 + 1, 1) for m in range(13)]
+        rows = self._random_series(20000, len(months), seed=11)
+
+        with app.app_context():
+            record = RevenueImport(filename="bench.csv")
+            db.session.add(record)
+            db.session.commit()
+            import_id = record.id
+
+        records = []
+        for i, row in enumerate(rows):
+            for d, value in zip(months, row):
+                if value is not None:
+                    records.append({
+                        'customer_name': f"Customer {i // 4}",
+                        'bucket': ('Core DBs', 'Analytics', 'Modern Work', 'Infra')[i % 4],
+                        'fiscal_month': date_to_fiscal_month(d),
+                        'month_date': d,
+                        'revenue': value,
+                        'last_import_id': import_id,
+                    })
+
+        with app.app_context():
+            db.session.execute(insert(CustomerRevenueData), records)
+            db.session.commit()
+
+            stats = run_analysis_for_all()
+            assert stats['analyzed'] + stats['skipped'] == 20000
+            assert RevenueAnalysis.query.count() == stats['analyzed']
+
+            assert run_analysis_for_all() == stats
+
+            # Nothing was imported since: an incremental run has nothing to write
+            with _count_writes((RevenueAnalysis.__tablename__,)) as writes:
+                again = run_analysis_for_all(incremental=True)
+            assert again['mode'] == 'incremental'
+            assert again['analyzed'] == 0
+            assert writes == []
+
+
+class TestIncrementalAnalysis:
+    """Tests for re-analyzing only the series touched by recent imports."""
+
+    HEADER = ("FiscalMonth,,,FY26-Jul,FY26-Aug,FY26-Sep,FY26-Oct,FY26-Nov,Total\n"
+              "TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR,$ ACR,$ ACR,$ ACR,$ ACR\n")
+
+    def _csv(self, alpha_nov=5000):
+        rows = [
+            f"Alpha,Core DBs,Total,$9000,$8000,$7000,$6000,${alpha_nov},$0",
+            "Beta,Core DBs,Total,$4000,$4100,$4200,$4300,$4400,$0",
+            "Gamma,Analytics,Total,$10000,$10000,$10000,$10000,$10000,$0",
+        ]
+        return (self.HEADER + "\n".join(rows) + "\n").encode()
+
+    def test_reanalyzes_only_touched_series(self, app, test_user):
+        """After a routine import only the changed customer/bucket is re-analyzed."""
+        from app.models import RevenueAnalysisRun
+        with app.app_context():
+            import_revenue_csv(self._csv(), "first.csv")
+            full = run_analysis_for_all(incremental=True)
+            assert full['mode'] == 'full'  # nothing to be incremental against
+            analyzed_at = {a.customer_name: a.analyzed_at for a in RevenueAnalysis.query.all()}
+
+            # Re-import with one customer's (partial, excluded) latest month changed
+            import_revenue_csv(self._csv(alpha_nov=5500), "second.csv")
+            stats = run_analysis_for_all(incremental=True)
+            assert stats['mode'] == 'incremental'
+            assert stats['analyzed'] + stats['skipped'] == 1
+
+            after = {a.customer_name: a.analyzed_at for a in RevenueAnalysis.query.all()}
+            assert after['Beta'] == analyzed_at['Beta']
+            assert after['Gamma'] == analyzed_at['Gamma']
+            assert after['Alpha'] > analyzed_at['Alpha']
+
+            # An unchanged re-import leaves nothing to do
+            import_revenue_csv(self._csv(alpha_nov=5500), "third.csv")
+            assert run_analysis_for_all(incremental=True)['analyzed'] == 0
+            assert RevenueAnalysisRun.query.count() == 3
+
+    def test_seller_reassignment_reanalyzes_customer(self, app, test_user):
+        """Moving a customer to another seller re-analyzes it without a new import."""
+        from app.models import Seller
+        with app.app_context():
+            first = Seller(name='First Seller')
+            second = Seller(name='Second Seller')
+            db.session.add_all([first, second])
+            db.session.flush()
+            alpha = Customer(name='Alpha', tpid=70001, seller_id=first.id)
+            db.session.add(alpha)
+            db.session.commit()
+
+            import_revenue_csv(self._csv(), "first.csv")
+            run_analysis_for_all()
+            assert RevenueAnalysis.query.filter_by(customer_name='Alpha').one().seller_name == 'First Seller'
+            beta_at = RevenueAnalysis.query.filter_by(customer_name='Beta').one().analyzed_at
+
+            alpha.seller_id = second.id
+            db.session.commit()
+            stats = run_analysis_for_all(incremental=True)
+            assert stats['mode'] == 'incremental'
+            assert stats['analyzed'] + stats['skipped'] == 1
+            assert RevenueAnalysis.query.filter_by(customer_name='Alpha').one().seller_name == 'Second Seller'
+            assert RevenueAnalysis.query.filter_by(customer_name='Beta').one().analyzed_at == beta_at
+
+            # Renaming the seller changes the stored name too
+            second.name = 'Renamed Seller'
+            db.session.commit()
+            assert run_analysis_for_all(incremental=True)['analyzed'] == 1
+            assert RevenueAnalysis.query.filter_by(customer_name='Alpha').one().seller_name == 'Renamed Seller'
+            assert run_analysis_for_all(incremental=True)['analyzed'] == 0
+
+    def test_incremental_matches_full_results(self, app, test_user):
+        """An incremental pass leaves the same results as a full one."""
+        with app.app_context():
+            import_revenue_csv(self._csv(), "first.csv")
+            run_analysis_for_all()
+            # Same months, but Alpha's analyzed history changes
+            changed = self._csv().replace(b"$9000,$8000,$7000,$6000", b"$6000,$7000,$8000,$9000")
+            import_revenue_csv(changed, "second.csv")
+            run_analysis_for_all(incremental=True)
+            incremental = {(a.customer_name, a.category, a.priority_score, a.trend_slope)
+                           for a in RevenueAnalysis.query.all()}
+
+            run_analysis_for_all()
+            full = {(a.customer_name, a.category, a.priority_score, a.trend_slope)
+                    for a in RevenueAnalysis.query.all()}
+            assert incremental == full
+
+    def test_config_change_forces_full_run(self, app, test_user):
+        """Changed thresholds invalidate every stored result."""
+        with app.app_context():
+            import_revenue_csv(self._csv(), "first.csv")
+            run_analysis_for_all()
+            db.session.add(RevenueConfig(min_revenue_for_outreach=1000))
+            db.session.commit()
+
+            stats = run_analysis_for_all(incremental=True)
+            assert stats['mode'] == 'full'
+            assert stats['analyzed'] + stats['skipped'] == 3
+            # Thresholds recorded, so the next pass can be incremental again
+            assert run_analysis_for_all(incremental=True)['mode'] == 'incremental'
+
+    def test_new_month_stays_incremental(self, app, test_user):
+        """A new month re-analyzes only series with data in the shifted months."""
+        with app.app_context():
+            csv = self._csv().replace(
+                b"Gamma,", b"Delta,Infra,Total,$3000,$3000,$3000,$3000,$3000,$0\nGamma,")
+            import_revenue_csv(csv, "first.csv")
+            # Delta has no November data point
+            CustomerRevenueData.query.filter_by(
+                customer_name='Delta', fiscal_month='FY26-Nov').delete()
+            db.session.commit()
+            run_analysis_for_all()
+            analyzed_at = {a.customer_name: a.analyzed_at for a in RevenueAnalysis.query.all()}
+            # Only Gamma appears in the new file, but December moves November
+            # into the window, so Alpha and Beta (with November data) change too
+            import_revenue_csv(
+                b"FiscalMonth,,,FY26-Dec,Total\n"
+                b"TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR\n"
+                b"Gamma,Analytics,Total,$10000,$0\n",
+                "december.csv",
+            )
+            stats = run_analysis_for_all(incremental=True)
+            assert stats['mode'] == 'incremental'
+            assert stats['analyzed'] + stats['skipped'] == 3
+            after = {a.customer_name: a.analyzed_at for a in RevenueAnalysis.query.all()}
+            assert after['Delta'] == analyzed_at['Delta']
+
+            incremental = {(a.customer_name, a.category, a.priority_score, a.trend_slope)
+                           for a in RevenueAnalysis.query.all()}
+            run_analysis_for_all()
+            full = {(a.customer_name, a.category, a.priority_score, a.trend_slope)
+                    for a in RevenueAnalysis.query.all()}
+            assert incremental == full
+
+    def test_run_without_month_window_forces_full_run(self, app, test_user):
+        """Runs recorded before month windows were stored can't be diffed."""
+        from app.models import RevenueAnalysisRun
+        with app.app_context():
+            import_revenue_csv(self._csv(), "first.csv")
+            run_analysis_for_all()
+            RevenueAnalysisRun.query.update({'month_window': None})
+            db.session.commit()
+            import_revenue_csv(
+                b"FiscalMonth,,,FY26-Dec,Total\n"
+                b"TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR\n"
+                b"Gamma,Analytics,Total,$10000,$0\n",
+                "december.csv",
+            )
+            assert run_analysis_for_all(incremental=True)['mode'] == 'full'
+
+
+class TestRevenueRollups:
+    """Tests for the rollup tables behind the product and whitespace reports."""
+
+    CSV = (
+        b"FiscalMonth,,,FY26-Jul,FY26-Aug,FY26-Sep,FY26-Oct,Total\n"
+        b"TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR,$ ACR,$ ACR,$ ACR\n"
+        b"Alpha,Core DBs,Total,$1000,$1000,$2000,$3000,$0\n"
+        b"Alpha,Core DBs,Azure SQL Database,$1000,$1000,$2000,$3000,$0\n"
+        b"Beta,Core DBs,Total,$0,$0,$500,$700,$0\n"
+        b"Beta,Core DBs,Azure SQL Database,$0,$0,$500,$700,$0\n"
+        b"Beta,Analytics,Total,$0,$0,$0,$0,$0\n"
+        b"Beta,Analytics,Azure Synapse Analytics - Spark,$0,$0,$0,$0,$0\n"
+    )
+
+    def _add_analysis(self, customer_name, seller_name):
+        db.session.add(RevenueAnalysis(
+            customer_name=customer_name, bucket='Core DBs', seller_name=seller_name,
+            months_analyzed=4, avg_revenue=1, latest_revenue=1,
+            category='HEALTHY', recommended_action='NO ACTION',
+            confidence='LOW', priority_score=0,
+        ))
+
+    def test_rollups_built_on_import(self, app, test_user):
+        """An import materializes customer x bucket and product rollups."""
+        from app.models import RevenueBucketRollup, RevenueProductRollup
+        with app.app_context():
+            import_revenue_csv(self.CSV, "rollups.csv")
+
+            alpha = RevenueBucketRollup.query.filter_by(
+                customer_name='Alpha', bucket='Core DBs').one()
+            assert alpha.total_revenue == 7000
+            # Trailing window is Aug-Oct
+            assert alpha.trailing_months == 3
+            assert alpha.trailing_revenue == 6000
+            assert not RevenueBucketRollup.query.filter_by(
+                customer_name='Beta', bucket='Analytics').one().has_spend
+
+            beta = RevenueProductRollup.query.filter_by(
+                customer_name='Beta', product='Azure SQL Database').one()
+            assert beta.first_usage_month == date(2025, 9, 1)
+            assert beta.latest_month == date(2025, 10, 1)
+            assert beta.latest_month_revenue == 700
+
+    def test_product_reports_read_rollups(self, app, test_user):
+        """Product listings keep their semantics when served from the rollups."""
+        from app.services.revenue_import import (
+            get_all_products, get_customers_using_product, get_new_product_users,
+        )
+        with app.app_context():
+            import_revenue_csv(self.CSV, "rollups.csv")
+
+            products = {p['product']: p for p in get_all_products()}
+            # Zero-revenue pairs don't count as usage
+            assert set(products) == {'Azure SQL Database'}
+            assert products['Azure SQL Database']['customer_count'] == 2
+            assert products['Azure SQL Database']['total_revenue'] == 8200
+
+            customers = get_customers_using_product('Azure SQL Database')
+            assert [c['customer_name'] for c in customers] == ['Alpha', 'Beta']
+
+            new_users = get_new_product_users('Azure SQL Database', months_lookback=3)
+            assert [u['customer_name'] for u in new_users] == ['Beta']
+            assert new_users[0]['first_usage_fiscal'] == 'FY26-Sep'
+            assert new_users[0]['total_revenue'] == 1200
+            assert new_users[0]['latest_month_revenue'] == 700
+
+    def test_rollups_rebuild_after_direct_writes(self, app, test_user):
+        """Rows written outside an import are picked up on the next read."""
+        from app.models import ProductRevenueData
+        from app.services.revenue_import import get_all_products
+        with app.app_context():
+            import_revenue_csv(self.CSV, "rollups.csv")
+            assert len(get_all_products()) == 1
+
+            db.session.add(ProductRevenueData(
+                customer_name='Gamma', bucket='Analytics', product='Fabric',
+                fiscal_month='FY26-Oct', month_date=date(2025, 10, 1), revenue=250,
+                last_import_id=RevenueImport.query.first().id,
+            ))
+            db.session.commit()
+
+            assert {p['product'] for p in get_all_products()} == {
+                'Azure SQL Database', 'Fabric'}
+
+    def test_seller_rollup_follows_analyses(self, app, test_user):
+        """Seller x product totals follow the sellers assigned in the analyses."""
+        from app.services.revenue_import import (
+            get_seller_customers_using_product, get_seller_products,
+        )
+        with app.app_context():
+            import_revenue_csv(self.CSV, "rollups.csv")
+            assert get_seller_products('Dana') == []
+
+            self._add_analysis('Alpha', 'Dana')
+            self._add_analysis('Beta', 'Riley')
+            db.session.commit()
+
+            assert get_seller_products('Dana') == [{
+                'product': 'Azure SQL Database', 'customer_count': 1,
+                'total_revenue': 7000,
+            }]
+            rows = get_seller_customers_using_product('Riley', 'Azure SQL Database')
+            assert [r['customer_name'] for r in rows] == ['Beta']
+
+    def test_review_edits_do_not_rebuild_rollups(self, app, client, test_user):
+        """Review-status edits leave the rollups alone; reassigning a seller
+        rebuilds only the seller rollup."""
+        from app.models import RevenueBucketRollup, RevenueSellerProductRollup
+        from app.services.revenue_import import get_seller_products
+        with app.app_context():
+            import_revenue_csv(self.CSV, "rollups.csv")
+            self._add_analysis('Alpha', 'Dana')
+            db.session.commit()
+            assert get_seller_products('Dana')
+            analysis_id = RevenueAnalysis.query.filter_by(customer_name='Alpha').one().id
+
+            rollups = (RevenueBucketRollup.__tablename__,
+                       RevenueSellerProductRollup.__tablename__)
+            resp = client.patch(f'/api/revenue/analysis/{analysis_id}/review',
+                                json={'review_status': 'reviewed'})
+            assert resp.status_code == 200
+            with _count_writes(rollups) as writes:
+                get_seller_products('Dana')
+            assert writes == []
+
+            db.session.get(RevenueAnalysis, analysis_id).seller_name = 'Riley'
+            db.session.commit()
+            with _count_writes(rollups) as writes:
+                assert get_seller_products('Dana') == []
+            assert writes and all(RevenueSellerProductRollup.__tablename__ in w
+                                  for w in writes)
+
+    def test_reads_do_not_scan_source_tables(self, app, test_user):
+        """Current rollups are served without touching the raw revenue tables."""
+        from sqlalchemy import event
+        from app.models import ProductRevenueData
+        from app.services.revenue_import import get_all_products
+        with app.app_context():
+            import_revenue_csv(self.CSV, "rollups.csv")
+            get_all_products()
+
+            statements = []
+
+            def listener(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                get_all_products()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            sources = (CustomerRevenueData.__tablename__, ProductRevenueData.__tablename__)
+            assert not [s for s in statements if any(t in s for t in sources)]
+
+    def test_in_place_update_by_new_import_refreshes(self, app, test_user):
+        """An upsert that keeps row ids and counts is caught by the import stamp."""
+        from sqlalchemy import update
+        from app.models import ProductRevenueData
+        from app.services.revenue_import import get_all_products
+        with app.app_context():
+            import_revenue_csv(self.CSV, "rollups.csv")
+            assert get_all_products()[0]['total_revenue'] == 8200
+
+            # Same shape as the import's ON CONFLICT DO UPDATE: no ORM objects
+            prd = ProductRevenueData.__table__
+            db.session.execute(update(prd).where(
+                prd.c.customer_name == 'Alpha', prd.c.month_date == date(2025, 10, 1),
+            ).values(revenue=prd.c.revenue + 1000))
+            db.session.add(RevenueImport(filename='upsert.csv', record_count=1))
+            db.session.commit()
+
+            assert get_all_products()[0]['total_revenue'] == 9200
+
+
+class TestCustomerRevenueView:
+    """Tests for the cached, two-query customer revenue view."""
+
+    CSV = (
+        "FiscalMonth,,,FY26-Jul,FY26-Aug,FY26-Sep,Total\n"
+        "TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR,$ ACR,$ ACR\n"
+        "View Test Co,Core DBs,Total,$100,$200,$300,$0\n"
+        "View Test Co,Core DBs,Azure SQL Database,$60,$150,$250,$0\n"
+        "View Test Co,Core DBs,Cosmos DB,$40,$50,${cosmos_sep},$0\n"
+        "View Test Co,Analytics,Total,$10,$0,$20,$0\n"
+        "View Test Co,Analytics,Fabric,$10,$0,$20,$0\n"
+    )
+
+    def _import(self, cosmos_sep=50, filename="view.csv"):
+        import_revenue_csv(self.CSV.format(cosmos_sep=cosmos_sep).encode(), filename)
+
+    def _customer(self):
+        customer = Customer(name='View Test Co', tpid=424242)
+        db.session.add(customer)
+        db.session.commit()
+        return customer.id
+
+    def test_view_pivots_buckets_and_products(self, app, test_user, monkeypatch):
+        """Bucket and product series come back pivoted by fiscal month."""
+        from sqlalchemy import event
+        from app.services.revenue_import import get_customer_revenue_view
+        # Database path; the memory-mapped store is covered in TestRevenueHistoryStore
+        monkeypatch.setenv('REVENUE_HISTORY_STORE', '0')
+        with app.app_context():
+            customer_id = self._customer()
+            self._import()
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                view = get_customer_revenue_view(customer_id)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            # Latest import lookup plus one query each for bucket and product rows
+            assert len(statements) == 3
+
+            assert list(view['revenue_by_bucket']) == ['Analytics', 'Core DBs']
+            core = view['bucket_product_data']['Core DBs']
+            assert core['recent_months'] == ['FY26-Jul', 'FY26-Aug', 'FY26-Sep']
+            assert core['bucket_total'] == 600
+            assert [p['product'] for p in core['product_summary']] == [
+                'Azure SQL Database', 'Cosmos DB']
+            assert core['product_summary'][1]['month_revenues'] == {
+                'FY26-Jul': 40, 'FY26-Aug': 50, 'FY26-Sep': 50}
+            assert view['grand_month_revenues'] == {
+                'FY26-Jul': 110, 'FY26-Aug': 200, 'FY26-Sep': 320}
+            assert view['grand_total'] == 630
+
+    def test_view_cached_until_next_import(self, app, test_user):
+        """Views are reused for the same import and rebuilt after a new one."""
+        from app.services.revenue_import import get_customer_revenue_view
+        with app.app_context():
+            customer_id = self._customer()
+            self._import()
+            first = get_customer_revenue_view(customer_id)
+            assert get_customer_revenue_view(customer_id) is first
+
+            self._import(cosmos_sep=90, filename="view2.csv")
+            second = get_customer_revenue_view(customer_id)
+            assert second is not first
+            cosmos = second['bucket_product_data']['Core DBs']['product_summary'][1]
+            assert cosmos['month_revenues']['FY26-Sep'] == 90
+
+    def test_customer_revenue_page(self, app, client, test_user):
+        """The customer revenue page renders the bucket grids."""
+        with app.app_context():
+            customer_id = self._customer()
+            self._import()
+            response = client.get(f'/revenue/customer/{customer_id}')
+            assert response.status_code == 200
+            assert b'Cosmos DB' in response.data
+            assert b'All Buckets' in response.data
+
+
+class TestParallelAnalysis:
+    """Tests for sharding the signal computation across worker processes."""
+
+    def _seed(self, app, count=600):
+        from sqlalchemy import insert
+        from app.services.revenue_import import date_to_fiscal_month
+
+        months = [date(2025, m, 1) for m in range(1, 13)]
+        rows = TestVectorizedSignals._random_series(count, len(months), seed=3)
+        with app.app_context():
+            record = RevenueImport(filename="parallel.csv")
+            db.session.add(record)
+            db.session.commit()
+            db.session.execute(insert(CustomerRevenueData), [
+                {
+                    'customer_name': f"Customer {i // 2}",
+                    'bucket': ('Core DBs', 'Analytics')[i % 2],
+                    'fiscal_month': date_to_fiscal_month(d),
+                    'month_date': d,
+                    'revenue': value,
+                    'last_import_id': record.id,
+                }
+                for i, row in enumerate(rows)
+                for d, value in zip(months, row)
+                if value is not None
+            ])
+            db.session.commit()
+
+    @staticmethod
+    def _results():
+        return {
+            (a.customer_name, a.bucket): (a.category, a.recommended_action,
+                                          a.priority_score, a.engagement_rationale)
+            for a in RevenueAnalysis.query.all()
+        }
+
+    def test_process_pool_matches_in_process(self, app, test_user, monkeypatch):
+        """Sharded worker results merge into the same rows, with streaming progress."""
+        from app.services import revenue_analysis
+        from app.services.revenue_analysis import run_analysis_streaming
+        monkeypatch.setattr(revenue_analysis, '_PARALLEL_MIN_SERIES', 0)
+        monkeypatch.setattr(revenue_analysis, '_SHARD_SIZE', 100)
+        self._seed(app)
+
+        with app.app_context():
+            serial_stats = run_analysis_for_all(workers=0)
+            serial = self._results()
+            RevenueAnalysis.query.delete()
+            db.session.commit()
+
+            updates = list(run_analysis_streaming(workers=2))
+            progress = [u for u in updates if not u.get('complete')]
+            assert [u['current'] for u in progress] == list(range(100, 601, 100))
+            assert progress[-1]['progress'] == 100
+            assert updates[-1]['stats'] == serial_stats
+            assert self._results() == serial
+
+    def test_pool_failure_falls_back_in_process(self, app, test_user, monkeypatch):
+        """A pool that can't start leaves the run to finish in-process."""
+        from app.services import revenue_analysis
+
+        def broken_pool(*args, **kwargs):
+            raise OSError("no process support")
+
+        monkeypatch.setattr(revenue_analysis, '_PARALLEL_MIN_SERIES', 0)
+        monkeypatch.setattr(revenue_analysis, 'ProcessPoolExecutor', broken_pool)
+        self._seed(app, count=50)
+
+        with app.app_context():
+            stats = run_analysis_for_all(workers=4)
+            assert stats['analyzed'] + stats['skipped'] == 50
+            assert RevenueAnalysis.query.count() == stats['analyzed']
+
+    def test_worker_count(self, monkeypatch):
+        """Small runs stay in-process; the environment can pin the worker count."""
+        from app.services.revenue_analysis import _analysis_workers
+        assert _analysis_workers(8, 100) == 0
+        assert _analysis_workers(1, 10 ** 6) == 0
+        assert _analysis_workers(3, 10 ** 6) == 3
+        monkeypatch.setenv('REVENUE_ANALYSIS_WORKERS', '0')
+        assert _analysis_workers(None, 10 ** 6) == 0
+        monkeypatch.setenv('REVENUE_ANALYSIS_WORKERS', '2')
+        assert _analysis_workers(None, 10 ** 6) == 2
+
+
+class TestRevenueViewCache:
+    """Tests for the import-versioned cache behind the revenue pages."""
+
+    CSV = (
+        b"FiscalMonth,,,FY26-Jul,FY26-Aug,FY26-Sep,FY26-Oct,FY26-Nov,FY26-Dec,Total\n"
+        b"TPAccountName,ServiceCompGrouping,ServiceLevel4,$ ACR,$ ACR,$ ACR,$ ACR,$ ACR,$ ACR,$ ACR\n"
+        b"Cache Co,Core DBs,Total,$90000,$80000,$60000,$40000,$20000,$10000,$0\n"
+        b"Cache Co,Core DBs,Azure SQL Database,$90000,$80000,$60000,$40000,$20000,$10000,$0\n"
+    )
+
+    def _setup(self):
+        from app.models import Seller
+        seller = Seller(name='Cache Seller')
+        db.session.add(seller)
+        db.session.flush()
+        db.session.add(Customer(name='Cache Co', tpid=515151, seller_id=seller.id))
+        db.session.commit()
+        import_revenue_csv(self.CSV, "cache.csv")
+        run_analysis_for_all()
+
+    def test_dashboard_and_seller_pages_hit_cache(self, app, client, test_user):
+        """Repeat visits are served from the cache until analysis re-runs."""
+        from app.services.revenue_cache import (
+            dashboard_views, seller_product_views, seller_views,
+        )
+        with app.app_context():
+            self._setup()
+            alert = RevenueAnalysis.query.filter_by(customer_name='Cache Co').one()
+            assert alert.recommended_action not in ('NO ACTION', 'MONITOR')
+
+            pages = [
+                (dashboard_views, '/reports/revenue'),
+                (seller_views, '/revenue/seller/Cache Seller'),
+                (seller_product_views, '/revenue/seller/Cache Seller/products'),
+                (seller_product_views, '/revenue/seller/Cache Seller/product/Azure SQL Database'),
+            ]
+            for cache, url in pages:
+                before = cache.stats()
+                assert client.get(url).status_code == 200
+                assert client.get(url).status_code == 200
+                after = cache.stats()
+                assert after['misses'] == before['misses'] + 1, url
+                assert after['hits'] == before['hits'] + 1, url
+
+            # Re-running analysis moves the version on
+            run_analysis_for_all()
+            misses = dashboard_views.stats()['misses']
+            client.get('/reports/revenue')
+            assert dashboard_views.stats()['misses'] == misses + 1
+
+    def test_review_status_stays_live(self, app, client, test_user):
+        """Cached alert lists still show review changes made since."""
+        with app.app_context():
+            self._setup()
+            alert = RevenueAnalysis.query.filter_by(customer_name='Cache Co').one()
+            client.get('/revenue/seller/Cache Seller')
+
+            alert.review_status = 'dismissed'
+            db.session.commit()
+            response = client.get('/revenue/seller/Cache Seller')
+            assert f'data-analysis-id="{alert.id}"'.encode() in response.data
+            assert b'opacity: 0.6' in response.data
+
+    def test_admin_panel_shows_hit_rates(self, app, client, test_user):
+        """The admin panel lists each revenue cache with its hit rate."""
+        from app.services.revenue_cache import revenue_cache_stats
+        with app.app_context():
+            self._setup()
+            client.get('/reports/revenue')
+            client.get('/reports/revenue')
+            stats = {s['name']: s for s in revenue_cache_stats()}
+            assert stats['Revenue dashboard']['hits'] >= 1
+
+            response = client.get('/admin')
+            assert b'Revenue Page Cache' in response.data
+            assert b'Revenue dashboard' in response.data
+
+
+class TestRevenueHistoryStore:
+    """Tests for the memory-mapped revenue history sidecar."""
+
+    CSV = TestCustomerRevenueView.CSV
+
+    def _setup(self, cosmos_sep=50, filename="store.csv"):
+        customer = Customer.query.filter_by(name='View Test Co').first()
+        if customer is None:
+            customer = Customer(name='View Test Co', tpid=434343)
+            db.session.add(customer)
+            db.session.commit()
+        import_revenue_csv(self.CSV.format(cosmos_sep=cosmos_sep).encode(), filename)
+        return customer.id
+
+    def test_store_written_and_matches_database(self, app, test_user, monkeypatch):
+        """Reads from the mapped arrays equal the database queries."""
+        import numpy as np
+        from app.services.revenue_import import load_revenue_series
+        from app.services.revenue_store import get_revenue_store
+        with app.app_context():
+            customer_id = self._setup()
+            store = get_revenue_store()
+            assert store is not None
+            assert isinstance(store.levels['product']['revenue'], np.memmap)
+
+            for lookup in ({'customer_id': customer_id},
+                           {'customer_name': 'View Test Co', 'bucket': 'Core DBs'}):
+                from_store = load_revenue_series(**lookup)
+                monkeypatch.setenv('REVENUE_HISTORY_STORE', '0')
+                from_db = load_revenue_series(**lookup)
+                monkeypatch.delenv('REVENUE_HISTORY_STORE')
+                assert from_db[0]
+                for store_rows, db_rows in zip(from_store, from_db):
+                    assert sorted(store_rows) == sorted(db_rows)
+
+            assert store.product_points(customer_name='Nobody') == []
+            assert store.product_points(customer_id=customer_id, product='Nothing') == []
+
+    def test_store_written_in_chunks(self, app, test_user, monkeypatch):
+        """Rows are streamed in chunks; the result matches a single-chunk write."""
+        from app.services import revenue_store
+        from app.services.revenue_import import load_revenue_series
+        with app.app_context():
+            customer_id = self._setup()
+            single = load_revenue_series(customer_id=customer_id)
+
+            monkeypatch.setattr(revenue_store, 'STORE_CHUNK_ROWS', 2)
+            revenue_store.clear_revenue_store()
+            assert revenue_store.write_revenue_store()
+            assert revenue_store.get_revenue_store() is not None
+            chunked = load_revenue_series(customer_id=customer_id)
+            assert single[0]
+            for chunked_rows, single_rows in zip(chunked, single):
+                assert sorted(chunked_rows) == sorted(single_rows)
+
+    def test_grid_reads_no_revenue_rows(self, app, test_user):
+        """With a current store the bucket grid doesn't query revenue tables."""
+        from sqlalchemy import event
+        from app.services.revenue_import import get_bucket_revenue_grid
+        with app.app_context():
+            customer_id = self._setup()
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                grid = get_bucket_revenue_grid('Core DBs', customer_id=customer_id)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            assert not any('SELECT customer_revenue_data.bucket' in s
+                           or 'SELECT product_revenue_data.bucket' in s for s in statements)
+
+            assert grid['bucket_total'] == 600
+            assert [p['product'] for p in grid['products']] == ['Azure SQL Database', 'Cosmos DB']
+            assert [r['revenue'] for r in grid['product_history']['Cosmos DB']] == [40, 50, 50]
+
+    def test_stale_store_falls_back_to_database(self, app, test_user):
+        """Rows written outside an import aren't served from an old store."""
+        from app.services.revenue_import import get_bucket_revenue_grid
+        from app.services.revenue_store import get_revenue_store
+        with app.app_context():
+            customer_id = self._setup()
+            assert get_revenue_store() is not None
+            row = CustomerRevenueData.query.filter_by(
+                customer_name='View Test Co', bucket='Analytics', fiscal_month='FY26-Aug').first()
+            if row is not None:
+                db.session.delete(row)
+            db.session.add(CustomerRevenueData(
+                customer_name='View Test Co', customer_id=customer_id, bucket='Analytics',
+                fiscal_month='FY26-Aug', month_date=date(2025, 8, 1), revenue=5,
+                last_import_id=RevenueImport.query.order_by(RevenueImport.id.desc()).first().id,
+            ))
+            db.session.commit()
+
+            assert get_revenue_store() is None
+            grid = get_bucket_revenue_grid('Analytics', customer_id=customer_id)
+            assert grid['bucket_month_revenues']['FY26-Aug'] == 5
+
+            # The next import writes a current store again
+            self._setup(cosmos_sep=90, filename="store2.csv")
+            assert get_revenue_store() is not None
+
+    def test_store_lookup_does_not_scan_source_tables(self, app, test_user):
+        """Finding the current store is a lookup on the imports table only."""
+        from sqlalchemy import event
+        from app.models import ProductRevenueData
+        from app.services.revenue_store import get_revenue_store
+        with app.app_context():
+            self._setup()
+            statements = []
+
+            def listener(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                assert get_revenue_store() is not None
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            sources = (CustomerRevenueData.__tablename__, ProductRevenueData.__tablename__)
+            assert statements
+            assert not [s for s in statements if any(t in s for t in sources)]
+
+    def test_pages_render_from_store(self, app, client, test_user):
+        """The bucket page renders from the store."""
+        with app.app_context():
+            customer_id = self._setup()
+            response = client.get(f'/revenue/customer/{customer_id}/bucket/Core DBs')
+            assert response.status_code == 200
+            assert b'Cosmos DB' in response.data
+            assert b'FY26-Sep' in response.data
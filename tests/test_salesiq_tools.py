@@ -398,3 +398,76 @@ class TestToolExecution:
         with app.app_context():
             result = execute_tool('get_revenue_customer_detail', {})
             assert 'error' in result
+
+
+class TestResultShaping:
+    """Token-budgeted shaping of tool results for the chat prompt."""
+
+    def test_small_result_unchanged(self):
+        from app.services.salesiq_tools import shape_tool_result
+        result = {'id': 1, 'name': 'Acme Corp', 'notes': [{'id': 1}]}
+        assert shape_tool_result('get_customer_summary', result) == (result, 0)
+
+    def test_html_stripped_from_strings(self):
+        from app.services.salesiq_tools import shape_tool_result
+        shaped, _ = shape_tool_result('search_notes', [
+            {'snippet': '<p>Discussed <strong>AKS</strong> &amp; Fabric</p>'},
+        ])
+        assert shaped == [{'snippet': 'Discussed AKS & Fabric'}]
+
+    def test_note_snippets_are_plain_text(self, app, sample_data):
+        with app.app_context():
+            result = execute_tool('search_notes', {'query': 'migration'})
+        assert all('<' not in n['snippet'] for n in result)
+
+    def test_long_list_paged_within_budget(self):
+        from app.services.salesiq_tools import (
+            TOOLS, estimate_tokens, shape_tool_result,
+        )
+        budget = next(t['budget'] for t in TOOLS if t['name'] == 'report_whats_new')
+        result = {
+            'days': 14,
+            'created': [{'id': i, 'title': f'Milestone {i} ' + 'x' * 100} for i in range(200)],
+            'updated': [],
+        }
+        shaped, saved = shape_tool_result('report_whats_new', result)
+
+        assert estimate_tokens(shaped) <= budget
+        assert saved > 0
+        page = shaped['_pagination'][0]
+        assert page['field'] == 'created'
+        assert page['returned'] == len(shaped['created']) < 200
+        assert page['total'] == 200
+
+        # The cursor continues where the first page stopped
+        shaped2, _ = shape_tool_result('report_whats_new', result, page['next_cursor'])
+        assert shaped2['created'][0]['id'] == page['returned']
+        assert shaped2['_pagination'][0]['offset'] == page['returned']
+
+    def test_bare_list_wrapped_when_paged(self):
+        from app.services.salesiq_tools import shape_tool_result
+        result = [{'id': i, 'snippet': 'note text ' * 20} for i in range(100)]
+        shaped, _ = shape_tool_result('search_notes', result)
+        assert set(shaped) == {'items', '_pagination'}
+        assert shaped['_pagination'][0]['field'] == 'items'
+
+    def test_long_strings_capped_before_lists_cut(self):
+        from app.services.salesiq_tools import shape_tool_result
+        result = {'recent_notes': [{'id': i, 'snippet': 'y' * 5000} for i in range(3)]}
+        shaped, _ = shape_tool_result('get_customer_summary', result)
+        assert len(shaped['recent_notes']) == 3
+        assert all(len(n['snippet']) <= 600 for n in shaped['recent_notes'])
+        assert '_pagination' not in shaped
+
+    def test_invalid_cursor_raises(self):
+        from app.services.salesiq_tools import encode_cursor, shape_tool_result
+        with pytest.raises(ValueError, match='Invalid cursor'):
+            shape_tool_result('search_notes', [], 'not-a-cursor!')
+        with pytest.raises(ValueError, match='does not match'):
+            shape_tool_result('search_notes', {'a': 1}, encode_cursor(('a',), 0))
+
+    def test_openai_tools_accept_cursor(self):
+        for t in get_openai_tools():
+            assert 'cursor' in t['function']['parameters']['properties']
+        # The registry itself (used for MCP) is unchanged
+        assert all('cursor' not in t['parameters']['properties'] for t in TOOLS)
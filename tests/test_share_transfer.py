@@ -0,0 +1,155 @@
+"""
+Tests for chunked share transfers — packing, unpacking and the API
+endpoints. The hub's chunk/ack/resume relay is tested against the real
+handlers in infra/gateway/test_sharing_hub.py.
+"""
+import base64
+import hashlib
+import random
+import zlib
+
+import pytest
+
+from app.models import db, Partner, PartnerContact, Specialty
+from app.services.share_transfer import (
+    ShareTransferError,
+    pack_payload,
+    unpack_chunks,
+)
+
+
+def _directory(n: int) -> dict:
+    return {'partners': [
+        {'name': f'Partner {i}', 'overview': 'Azure migration specialist. ' * 20,
+         'specialties': ['Kubernetes', 'AI'],
+         'contacts': [{'name': 'Pat', 'email': f'pat@partner{i}.com', 'is_primary': True}]}
+        for i in range(n)
+    ]}
+
+
+def _raw_package(raw: bytes) -> dict:
+    """A well-formed single-chunk transfer of arbitrary raw bytes."""
+    compressed = zlib.compress(raw)
+    digest = hashlib.sha256(compressed).hexdigest()
+    return {
+        'transfer': {'encoding': 'zlib+base64', 'total': 1, 'sha256': digest},
+        'chunks': [{'index': 0, 'data': base64.b64encode(compressed).decode(),
+                    'sha256': digest}],
+    }
+
+
+def _noisy(n: int) -> dict:
+    """A directory with random overviews, which compresses poorly."""
+    rng = random.Random(n)
+    payload = _directory(n)
+    for partner in payload['partners']:
+        partner['overview'] = ''.join(rng.choice('abcdefgh ') for _ in range(200))
+    return payload
+
+
+class TestPackPayload:
+    """Compression, chunking, and checksums."""
+
+    def test_round_trip(self):
+        payload = _noisy(50)
+        package = pack_payload(payload, chunk_size=1024)
+        assert package['transfer']['total'] == len(package['chunks']) > 1
+        assert unpack_chunks(package['transfer'], package['chunks']) == payload
+
+    def test_compresses_repetitive_payload(self):
+        package = pack_payload(_directory(200))
+        transfer = package['transfer']
+        assert transfer['encoding'] == 'zlib+base64'
+        assert transfer['compressed_size'] < transfer['size'] / 5
+        assert transfer['total'] == 1
+
+    def test_chunk_order_does_not_matter(self):
+        payload = _noisy(20)
+        package = pack_payload(payload, chunk_size=512)
+        chunks = list(reversed(package['chunks']))
+        assert unpack_chunks(package['transfer'], chunks) == payload
+
+    def test_corrupt_chunk_reported(self):
+        package = pack_payload(_noisy(20), chunk_size=512)
+        bad = package['chunks'][2]
+        raw = bytearray(base64.b64decode(bad['data']))
+        raw[0] ^= 0xFF
+        bad['data'] = base64.b64encode(bytes(raw)).decode()
+
+        with pytest.raises(ShareTransferError) as exc:
+            unpack_chunks(package['transfer'], package['chunks'])
+        assert exc.value.bad_chunks == [2]
+
+    def test_missing_chunks_reported(self):
+        package = pack_payload(_noisy(20), chunk_size=512)
+        chunks = [c for c in package['chunks'] if c['index'] not in (1, 3)]
+        with pytest.raises(ShareTransferError) as exc:
+            unpack_chunks(package['transfer'], chunks)
+        assert exc.value.bad_chunks == [1, 3]
+
+    def test_unknown_encoding_rejected(self):
+        package = pack_payload({'note': {}})
+        package['transfer']['encoding'] = 'brotli'
+        with pytest.raises(ShareTransferError):
+            unpack_chunks(package['transfer'], package['chunks'])
+
+    def test_oversized_payload_rejected(self, monkeypatch):
+        import app.services.share_transfer as share_transfer
+        monkeypatch.setattr(share_transfer, 'MAX_PAYLOAD_BYTES', 1000)
+        package = pack_payload(_directory(20))
+        with pytest.raises(ShareTransferError, match='maximum payload size'):
+            unpack_chunks(package['transfer'], package['chunks'])
+
+    def test_malformed_json_rejected(self):
+        package = _raw_package(b'{"partners": [')
+        with pytest.raises(ShareTransferError, match='not valid JSON'):
+            unpack_chunks(package['transfer'], package['chunks'])
+
+
+class TestTransferEndpoints:
+    """?packed=1 on the share endpoints and /api/share/unpack."""
+
+    def _partner(self):
+        partner = Partner(name='Contoso', website='contoso.com')
+        partner.contacts.append(PartnerContact(name='Ann', email='ann@contoso.com'))
+        partner.specialties.append(Specialty(name='AKS'))
+        db.session.add(partner)
+        db.session.commit()
+        return partner.id
+
+    def test_packed_directory_round_trips_through_unpack(self, client, app):
+        with app.app_context():
+            self._partner()
+        plain = client.get('/api/share/directory').get_json()
+        packed = client.get('/api/share/directory?packed=1').get_json()
+        assert packed['count'] == 1
+        assert 'partners' not in packed
+
+        resp = client.post('/api/share/unpack', json={
+            'transfer': packed['transfer'], 'chunks': packed['chunks'],
+        })
+        assert resp.status_code == 200
+        assert resp.get_json()['payload'] == {'partners': plain['partners']}
+
+    def test_packed_single_partner_uses_partners_list(self, client, app):
+        with app.app_context():
+            partner_id = self._partner()
+        packed = client.get(f'/api/share/partner/{partner_id}?packed=1').get_json()
+        payload = client.post('/api/share/unpack', json=packed).get_json()['payload']
+        assert [p['name'] for p in payload['partners']] == ['Contoso']
+
+    def test_unpack_reports_bad_chunks(self, client):
+        package = pack_payload(_noisy(20), chunk_size=512)
+        del package['chunks'][1]
+        resp = client.post('/api/share/unpack', json=package)
+        assert resp.status_code == 400
+        assert resp.get_json()['bad_chunks'] == [1]
+
+    def test_unpack_rejects_malformed_json(self, client):
+        resp = client.post('/api/share/unpack', json=_raw_package(b'\xff\xfe not json'))
+        assert resp.status_code == 400
+        assert resp.get_json()['bad_chunks'] == []
+
+    def test_unpack_requires_transfer(self, client):
+        resp = client.post('/api/share/unpack', json={'chunks': []})
+        assert resp.status_code == 400